@@ -1,5 +1,31 @@
 __version__ = "0.1.9"
 
 import os
+import importlib
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# public names imported from their module on first access (PEP 562), so
+# `import bopbot` does not load pyppeteer or any browser module
+LAZY_EXPORTS = {
+    "BaseAction": "bopbot.actions.actuators",
+    "TypingMode": "bopbot.actions.actuators",
+    "get_default_bot": "bopbot.actions.actuators",
+    "compile_flow": "bopbot.actions.flows",
+    "RawDriver": "bopbot.browser.driver",
+    "BrowserConfig": "bopbot.browser.launcher",
+    "BrowserWindow": "bopbot.browser.launcher",
+    "LabeledSelector": "bopbot.dom.elements",
+    "add_selector_to": "bopbot.dom.elements",
+}
+
+
+def __getattr__(name: str):
+    if name not in LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(LAZY_EXPORTS[name]), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(LAZY_EXPORTS))
@@ -1,22 +1,104 @@
+from __future__ import annotations
+
 import os
+import time
+import random
 import asyncio
+from enum import Enum
 from uuid import uuid4
-
-from pyppeteer.errors import TimeoutError
-from pyppeteer.frame_manager import Frame
-from pyppeteer.element_handle import ElementHandle
-
-from bopbot.dom.elements import LabeledSelector
+from typing import TYPE_CHECKING
+
+from bopbot.dom.elements import LabeledSelector, SelectorResolver, flatten_field_map
+from bopbot.dom.forms import FieldFill
+from bopbot.dom.geometry import ElementGeometry
+from bopbot.dom.pages import PageObject
+from bopbot.dom.snapshot import DomSnapshot
+from bopbot.jsinject.scripts import (
+    CAPTURE_SNAPSHOT,
+    ELEMENT_GEOMETRY,
+    EXTRACT_ROWS,
+    FILL_FORM,
+    READ_BATCH,
+    RESOLVE_ALTERNATIVES,
+    SELECT_VALUES,
+    PASTE_TEXT,
+    WAIT_FOR_ALTERNATIVES,
+)
 from bopbot.browser.driver import RawDriver
-from bopbot.actions.exceptions import ElementNotFoundError
+from bopbot.actions.exceptions import (
+    ElementNotFoundError,
+    ElementNotInteractableError,
+    FrameNotFoundError,
+)
+from bopbot.actions.groups import ActionGroup
+from bopbot.browser.calibration import HeadlessMode, select_headless_mode
 from bopbot.browser.launcher import BrowserConfig, BrowserWindow
 
+if TYPE_CHECKING:
+    from pyppeteer.frame_manager import Frame
+    from pyppeteer.element_handle import ElementHandle
+
+
+class TypingMode(Enum):
+    """
+    Ways BaseAction.type(..) can enter text, from most to least human-like.
+    CDP round trips for a 100 char / ~17 word text:
+    - keystroke: keyDown + keyUp per char, plus `delay` ms per char (~200 round trips)
+    - word: one Input.insertText per word plus a jittered pause between words (~17)
+    - insert: a single Input.insertText for the whole text (1)
+    - paste: a single evaluate dispatching paste/input/change events (1)
+    """
+
+    keystroke = "keystroke"
+    word = "word"
+    insert = "insert"
+    paste = "paste"
+
 
 class BaseAction:
-    def __init__(self, driver: RawDriver):
+    def __init__(self, driver: RawDriver, cache_handles=False, check_geometry=False):
+        """
+        Parameters
+        ==========
+        driver: RawDriver to run actions with
+        cache_handles: If True, click/type/select reuse ElementHandles from
+                       self.driver.page_manager.handles instead of re-querying
+                       the selector on every call
+        check_geometry: If True, click measures the element with self.geometry(..)
+                        first, raising ElementNotInteractableError for hidden or
+                        covered elements and clicking the point hit testing reached
+        """
         self.driver = driver
+        self.cache_handles = cache_handles
+        self.check_geometry = check_geometry
+        # which alternative of each selector matched on this bot's pages
+        self.resolver = SelectorResolver()
+
+    def active(self, elem: LabeledSelector) -> LabeledSelector:
+        """
+        Selector of the hierarchy of elem that last matched on this bot's
+        pages, elem itself for selectors without (resolved) alternatives
+        """
+        return self.resolver.selector(elem)
+
+    async def get_cached_handle(self, elem: LabeledSelector) -> ElementHandle:
+        """
+        ElementHandle for elem from the page's handle cache, or None when
+        handle caching is disabled or the selector matches nothing.
+        """
+        if not self.cache_handles:
+            return None
+
+        return await self.driver.page_manager.handles.get(elem=self.active(elem))
+
+    def group(self, max_concurrency: int = None) -> ActionGroup:
+        """
+        Returns an ActionGroup for running independent actions of this bot
+        concurrently on self.driver.page, see bopbot.actions.groups.ActionGroup
+        """
+        return ActionGroup(max_concurrency=max_concurrency)
 
-    def wait_for_element(self, elem: LabeledSelector, as_visible=True):
+    async def wait_for_element(self, elem: LabeledSelector, as_visible=True):
         """
         For a given selector we run a coroutine to wait for it durating a
         self.driver.animation_timeout period.
@@ -28,10 +110,18 @@ class BaseAction:
         as_visible: If True, we expect the element to be visible. If not visible
                     the coroutine fails even if selector exisits.
                     - If False we just wait for the selector to exists (no visibility)
+
+        Raises ElementNotFoundError once the timeout passes, so it must be awaited
         """
+        # imported here so importing this module does not load pyppeteer
+        from pyppeteer.errors import TimeoutError
+
+        if getattr(elem, "has_alternatives", False):
+            return await self.wait_for_alternatives(elem=elem, as_visible=as_visible)
+
         try:
-            self.driver.page.waitForSelector(
-                selector=elem.to_str(),
+            await self.driver.page.waitForSelector(
+                selector=self.active(elem).to_str(),
                 timeout=self.driver.animation_timeout,
                 options={"visible": as_visible},
             )
@@ -41,6 +131,103 @@ class BaseAction:
             )
             raise ElementNotFoundError(error_msg)
 
+    async def wait_for_alternatives(self, elem: LabeledSelector, as_visible=True):
+        """
+        self.wait_for_element(..) for selectors with alternatives: every candidate
+        is polled in the same wait, so a missing primary hierarchy no longer costs
+        self.driver.animation_timeout before an alternative is tried.
+        The first match is activated through self.resolver.record_match(..)
+        """
+        from pyppeteer.errors import TimeoutError
+
+        # captured before waiting, concurrent resolutions may reorder the cascade
+        indexes, candidates = self.resolver.candidates(elem)
+        try:
+            handle = await self.driver.page.waitForFunction(
+                WAIT_FOR_ALTERNATIVES,
+                {"timeout": self.driver.animation_timeout},
+                candidates,
+                as_visible,
+            )
+        except TimeoutError:
+            self.resolver.record_match(elem, None)
+            raise ElementNotFoundError(
+                "can not find element [{}] {} with any of {}".format(
+                    elem.label,
+                    "visible" if as_visible else "even as not visible",
+                    candidates,
+                )
+            )
+        position = await handle.jsonValue() - 1
+        self.resolver.record_match(elem, indexes[position])
+
+    async def resolve_in_frame(self, frame: Frame, elems: [LabeledSelector]) -> [int]:
+        """
+        Core function for self.resolve(..), but we do not default the frame
+        to self.driver.page
+        """
+        # captured before evaluating, concurrent resolutions may reorder the cascades
+        cascades = [self.resolver.candidates(elem) for elem in elems]
+        positions = await frame.evaluate(
+            RESOLVE_ALTERNATIVES, [candidates for _, candidates in cascades]
+        )
+        return [
+            self.resolver.record_match(
+                elem, indexes[position] if position >= 0 else None
+            )
+            for elem, (indexes, _), position in zip(elems, cascades, positions)
+        ]
+
+    async def resolve(self, elems: [LabeledSelector]) -> [int]:
+        """
+        Tests every alternative of several selectors in one evaluate and
+        activates the first match of each, without waiting. Later queries,
+        clicks, .. of this bot on the selectors use the matched hierarchy.
+
+        Parameters
+        ==========
+        elems: selectors to resolve, usually ones declaring alternatives
+
+        Returns
+        =======
+        index of the matched hierarchy per selector (0 is dom_hierarchy,
+        1 the first alternative, ..), None for selectors nothing matched
+        """
+        return await self.resolve_in_frame(frame=self.driver.page, elems=elems)
+
+    async def get_frame(
+        self, name: str = None, url_pattern: str = None, elem: LabeledSelector = None
+    ) -> Frame:
+        """
+        Looks up an iframe through self.driver.page_manager.frames instead of
+        walking self.driver.page.frames. Exactly one lookup key should be passed.
+
+        Parameters
+        ==========
+        name: iframe name attribute
+        url_pattern: regex searched against the frame's url
+        elem: selector pointing to the iframe element
+
+        Returns
+        =======
+        pyppeteer Frame usable with the *_in_frame(..) functions
+        """
+        frames = self.driver.page_manager.frames
+        if name is not None:
+            frame, key = frames.by_name(name), f"name [{name}]"
+        elif url_pattern is not None:
+            frame, key = frames.by_url_pattern(url_pattern), f"url [{url_pattern}]"
+        elif elem is not None:
+            frame = await frames.by_selector(self.active(elem))
+            key = f"element [{elem.label}]"
+        else:
+            raise FrameNotFoundError("one of name, url_pattern or elem is required")
+
+        if frame is None:
+            raise FrameNotFoundError(f"can not find frame with {key}")
+
+        return frame
+
     async def query_frame(self, frame: Frame, elem: LabeledSelector, attr="innerText"):
         """
         Core function for self.query(...), but we do not default the query frame to
@@ -56,7 +243,7 @@ class BaseAction:
         =======
         Whatever the query evaluation results to
         """
-        return await frame.evaluate(f"{elem.to_query()}.{attr}")
+        return await frame.evaluate(f"{self.active(elem).to_query()}.{attr}")
 
     async def query(self, elem: LabeledSelector, attr="innerText"):
         """
@@ -94,7 +281,7 @@ class BaseAction:
         True if selector exists in page otherwise False
         """
         try:
-            return await frame.evaluate(f"{elem.to_query()} !== null")
+            return await frame.evaluate(f"{self.active(elem).to_query()} !== null")
         except Exception:
             return False
 
@@ -114,9 +301,263 @@ class BaseAction:
         """
         return await self.selector_exists_in_frame(frame=self.driver.page, elem=elem)
 
+    async def iter_extract_in_frame(
+        self, frame: Frame, container: LabeledSelector, fields: {}, chunk_size=500
+    ):
+        """
+        Core function for self.iter_extract(..), but we do not default the
+        frame to self.driver.page
+
+        Parameters
+        ==========
+        frame: iframe or web page to extract rows from
+        container: selector matching every row element (e.g. "table > tbody > tr")
+        fields: map of row field name to relative sub-selector and attr.
+                See bopbot.dom.elements.flatten_field_map(..) for accepted values
+        chunk_size: max rows returned per evaluate round trip (0 returns all at once)
+
+        Yields
+        ======
+        lists of row dicts, in document order
+        """
+        field_spec = flatten_field_map(fields=fields)
+        offset = 0
+        while True:
+            chunk = await frame.evaluate(
+                EXTRACT_ROWS,
+                self.active(container).to_str(),
+                field_spec,
+                offset,
+                chunk_size,
+            )
+            rows = chunk["rows"]
+            if not rows:
+                break
+            yield rows
+            offset += len(rows)
+            if offset >= chunk["total"]:
+                break
+
+    async def iter_extract(
+        self, container: LabeledSelector, fields: {}, chunk_size=500
+    ):
+        """
+        Streams structured rows out of self.driver.page in chunks. Each chunk is
+        a single in-page evaluate regardless of how many fields a row has.
+        - NOTE: rows are indexed by position, if the page mutates the matched
+                rows between chunks, rows may be skipped or repeated.
+        """
+        async for rows in self.iter_extract_in_frame(
+            frame=self.driver.page,
+            container=container,
+            fields=fields,
+            chunk_size=chunk_size,
+        ):
+            yield rows
+
+    async def extract_in_frame(
+        self, frame: Frame, container: LabeledSelector, fields: {}, chunk_size=500
+    ):
+        """
+        Core function for self.extract(..), but we do not default the frame
+        to self.driver.page
+        """
+        extracted = []
+        async for rows in self.iter_extract_in_frame(
+            frame=frame, container=container, fields=fields, chunk_size=chunk_size
+        ):
+            extracted.extend(rows)
+
+        return extracted
+
+    async def extract(self, container: LabeledSelector, fields: {}, chunk_size=500):
+        """
+        Bulk version of self.query(..) for lists and tables. For example:
+        await bot.extract(
+            container=result_rows,
+            fields={"title": "h3", "link": ("a", "href"), "rank": (None, "@data-rank")},
+        )
+
+        Parameters
+        ==========
+        container: selector matching every row element
+        fields: map of row field name to relative sub-selector and attr
+        chunk_size: max rows returned per evaluate round trip (0 returns all at once)
+
+        Returns
+        =======
+        list of dicts, one per container match, keyed by field name
+        """
+        return await self.extract_in_frame(
+            frame=self.driver.page,
+            container=container,
+            fields=fields,
+            chunk_size=chunk_size,
+        )
+
+    async def read_batch_in_frame(self, frame: Frame, reads: []) -> []:
+        """
+        Core function for self.read_batch(..), but we do not default the frame
+        to self.driver.page
+        """
+        specs = [
+            [self.active(elem).to_str(), kind, attr if attr else "innerText"]
+            for elem, kind, attr in reads
+        ]
+        return await frame.evaluate(READ_BATCH, specs)
+
+    async def read_batch(self, reads: []) -> []:
+        """
+        Runs several independent reads in a single evaluate round trip. For example:
+        title, has_next = await bot.read_batch(
+            reads=[(title, "query", "innerText"), (next_button, "exists", None)]
+        )
+
+        Parameters
+        ==========
+        reads: [(LabeledSelector, kind, attr)] where kind is one of
+            - "query": attr is a property path ("innerText", "dataset.id")
+                       or "@<name>" to read an HTML attribute
+            - "exists": same as self.selector_exists(..), attr is ignored
+            - "visible": same as self.selector_visible(..), attr is ignored
+
+        Returns
+        =======
+        list of read values in the order of reads. Unlike self.query(..) a
+        "query" of a missing element returns None instead of raising
+        """
+        return await self.read_batch_in_frame(frame=self.driver.page, reads=reads)
+
+    async def page_states_in_frame(self, frame: Frame, page: PageObject) -> {}:
+        """
+        Core function for self.page_states(..), but we do not default the frame
+        to self.driver.page
+        """
+        return page.parse_states(await frame.evaluate(page.states_script))
+
+    async def page_states(self, page: PageObject) -> {}:
+        """
+        Checks every selector of a PageObject in a single evaluate of its
+        precompiled page.states_script
+
+        Parameters
+        ==========
+        page: PageObject subclass (or instance) whose selectors are checked
+
+        Returns
+        =======
+        {label: {"exists": bool, "visible": bool}}
+        """
+        return await self.page_states_in_frame(frame=self.driver.page, page=page)
+
+    async def page_selectors_exist(self, page: PageObject, as_visible=False) -> bool:
+        """
+        Returns
+        =======
+        True if every selector of page exists (and is visible when as_visible)
+        """
+        key = "visible" if as_visible else "exists"
+        states = await self.page_states(page=page)
+        return all(state[key] for state in states.values())
+
+    async def geometry_in_frame(
+        self,
+        frame: Frame,
+        elems: [LabeledSelector],
+        hit_test=True,
+        scroll_into_view=False,
+    ) -> [ElementGeometry]:
+        """
+        Core function for self.geometry(..), but we do not default the frame
+        to self.driver.page
+        """
+        results = await frame.evaluate(
+            ELEMENT_GEOMETRY,
+            [self.active(elem).to_str() for elem in elems],
+            hit_test,
+            scroll_into_view,
+        )
+        return [
+            ElementGeometry.from_result(label=elem.label, result=result)
+            for elem, result in zip(elems, results)
+        ]
+
+    async def geometry(
+        self, elems: [LabeledSelector], hit_test=True, scroll_into_view=False
+    ) -> [ElementGeometry]:
+        """
+        Measures the true visibility of several selectors in one evaluate: computed
+        style (display, visibility, opacity up the tree), bounding box, viewport
+        intersection and hit testing. Unlike self.selector_visible(..), which only
+        reads the inline style, hidden, zero size, off screen and covered elements
+        are reported with the reason. For example:
+        banner, accept = await bot.geometry(elems=[banner, accept])
+        if accept.visible: await bot.driver.page.mouse.click(*accept.click_point)
+
+        Parameters
+        ==========
+        elems: selectors to measure
+        hit_test: If False, elementFromPoint checks are skipped and covered
+                  elements are reported visible
+        scroll_into_view: If True, existing elements outside the viewport are
+                          scrolled to its center before being measured
+
+        Returns
+        =======
+        list of ElementGeometry in the order of elems
+        """
+        return await self.geometry_in_frame(
+            frame=self.driver.page,
+            elems=elems,
+            hit_test=hit_test,
+            scroll_into_view=scroll_into_view,
+        )
+
+    async def snapshot_in_frame(
+        self, frame: Frame, include_frames=False
+    ) -> DomSnapshot:
+        """
+        Core function for self.snapshot(..), but we do not default the frame
+        to self.driver.page
+        """
+        return DomSnapshot.from_capture(
+            await frame.evaluate(CAPTURE_SNAPSHOT, include_frames)
+        )
+
+    async def snapshot(self, include_frames=False) -> DomSnapshot:
+        """
+        Captures the whole document in a single evaluate, reads against the
+        snapshot then run in Python without further devtools traffic:
+        snapshot = await bot.snapshot()
+        snapshot.query(elem=title), snapshot.extract(container=rows, fields=fields)
+
+        Parameters
+        ==========
+        include_frames: If True, same origin iframe documents are captured as well
+                        and queried through the frame argument of the snapshot's reads
+
+        Returns
+        =======
+        DomSnapshot of the page at capture time
+        """
+        return await self.snapshot_in_frame(
+            frame=self.driver.page, include_frames=include_frames
+        )
+
     async def click(self, elem: LabeledSelector, as_visible=True):
-        self.wait_for_element(elem=elem, as_visible=as_visible)
-        await self.driver.page.click(selector=elem.to_str())
+        await self.wait_for_element(elem=elem, as_visible=as_visible)
+        if self.check_geometry:
+            (geometry,) = await self.geometry(elems=[elem], scroll_into_view=True)
+            if not geometry.visible:
+                raise ElementNotInteractableError(geometry.describe())
+            await self.driver.page.mouse.click(*geometry.click_point)
+            return
+
+        handle = await self.get_cached_handle(elem=elem)
+        if handle:
+            await handle.click()
+        else:
+            await self.driver.page.click(selector=self.active(elem).to_str())
 
     async def click_element_handle(self, elem: ElementHandle):
         await elem.click()
@@ -129,15 +570,187 @@ class BaseAction:
     async def selector_visible(self, elem: LabeledSelector):
         return await self.selector_visible_in_frame(frame=self.driver.page, elem=elem)
 
-    async def type(self, elem: LabeledSelector, text: str, delay=15):
-        self.wait_for_element(elem=elem, as_visible=True)
-        await self.driver.page.type(
-            selector=elem.to_str(), text=text, options={"delay": delay}
-        )
+    async def type(
+        self,
+        elem: LabeledSelector,
+        text: str,
+        delay=15,
+        mode: TypingMode = TypingMode.keystroke,
+        word_delay=120,
+    ):
+        """
+        Enters text into the element elem points to
+
+        Parameters
+        ==========
+        elem: selector of the input/textarea to type into
+        text: text to enter
+        delay: miliseconds between key presses (TypingMode.keystroke only)
+        mode: TypingMode trading stealth for speed, defaults to per key typing
+        word_delay: average miliseconds paused between words (TypingMode.word only),
+                    each pause is randomly jittered by +/- 50%
+        """
+        await self.wait_for_element(elem=elem, as_visible=True)
+        handle = await self.get_cached_handle(elem=elem)
+        if mode == TypingMode.paste:
+            await self.driver.page.evaluate(
+                PASTE_TEXT, handle or self.active(elem).to_str(), text
+            )
+            return
+
+        if mode == TypingMode.keystroke:
+            if handle:
+                await handle.type(text=text, options={"delay": delay})
+            else:
+                await self.driver.page.type(
+                    selector=self.active(elem).to_str(),
+                    text=text,
+                    options={"delay": delay},
+                )
+            return
+
+        if handle:
+            await handle.focus()
+        else:
+            await self.driver.page.focus(self.active(elem).to_str())
+        if mode == TypingMode.insert:
+            await self.driver.page.keyboard.sendCharacter(text)
+            return
+
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            chunk = word if index == len(words) - 1 else f"{word} "
+            if chunk:
+                await self.driver.page.keyboard.sendCharacter(chunk)
+            if index < len(words) - 1:
+                await self.sleep_for(
+                    seconds=random.uniform(0.5, 1.5) * word_delay / 1000
+                )
 
     async def select(self, elem: LabeledSelector, text: str):
-        self.wait_for_element(elem=elem, as_visible=True)
-        await self.driver.page.select(elem.to_str(), text)
+        await self.wait_for_element(elem=elem, as_visible=True)
+        handle = await self.get_cached_handle(elem=elem)
+        if handle:
+            await self.driver.page.evaluate(SELECT_VALUES, handle, [text])
+        else:
+            await self.driver.page.select(self.active(elem).to_str(), text)
+
+    async def fill_form_in_frame(
+        self, frame: Frame, fields: {}, required: [LabeledSelector] = ()
+    ) -> [FieldFill]:
+        """
+        Core function for self.fill_form(..), but we do not default the frame
+        to self.driver.page and typed fields are left to the caller
+
+        Parameters
+        ==========
+        frame: iframe or web page holding the form
+        fields: {LabeledSelector: value} to set in one evaluate
+        required: further selectors that must exist before anything is filled
+        """
+        from pyppeteer.errors import TimeoutError
+
+        elems = list(fields)
+        alternatives = [
+            elem
+            for elem in elems + list(required)
+            if getattr(elem, "has_alternatives", False)
+        ]
+        if alternatives:
+            await self.resolve_in_frame(frame=frame, elems=alternatives)
+
+        try:
+            handle = await frame.waitForFunction(
+                FILL_FORM,
+                {"timeout": self.driver.animation_timeout},
+                [[self.active(elem).to_str(), v] for elem, v in fields.items()],
+                [self.active(elem).to_str() for elem in required],
+            )
+        except TimeoutError:
+            checked = elems + list(required)
+            exists = await self.read_batch_in_frame(
+                frame=frame, reads=[(elem, "exists", None) for elem in checked]
+            )
+            missing = [elem.label for elem, found in zip(checked, exists) if not found]
+            raise ElementNotFoundError(f"can not find form fields {missing}")
+
+        results = await handle.jsonValue()
+        if isinstance(results, dict):
+            # one of unsupported or invalid is populated, nothing was filled
+            unsupported = set(results["unsupported"])
+            rejected = unsupported | set(results["invalid"])
+            labels = [
+                elem.label for elem in elems if self.active(elem).to_str() in rejected
+            ]
+            if unsupported:
+                raise ElementNotInteractableError(f"can not fill form fields {labels}")
+            raise ValueError(
+                f"form fields {labels} have no option or radio for their value"
+            )
+
+        return [
+            FieldFill.from_result(label=elem.label, result=result)
+            for elem, result in zip(elems, results)
+        ]
+
+    async def fill_form(
+        self,
+        fields: {},
+        typed: [LabeledSelector] = (),
+        mode: TypingMode = TypingMode.keystroke,
+        delay=15,
+    ) -> [FieldFill]:
+        """
+        Fills a whole form in a few round trips instead of waiting for and typing
+        into every field. Every field is waited for in one poll, then inputs,
+        textareas, selects, checkboxes, radios and contenteditables are set in
+        one evaluate firing input/change events. For example:
+        await bot.fill_form(
+            fields={name: "Ada", country: "uk", terms: True, plan: "pro"},
+            typed=[name],
+        )
+
+        Parameters
+        ==========
+        fields: {LabeledSelector: value}, where value is
+            - str: the text of inputs/textareas/contenteditables, the option value
+                   of selects or the value of the radio to check in the group
+            - [str]: the option values of multiple selects
+            - bool: the checked state of checkboxes, True checks a radio
+        typed: selectors of fields, keys of fields, entered through self.type(..)
+               for human-like typing once every other field is set. A ValueError
+               is raised for selectors missing from fields
+        mode: TypingMode of typed fields
+        delay: miliseconds between key presses of typed fields (TypingMode.keystroke)
+
+        Returns
+        =======
+        list of FieldFill with per field timings, in the order of fields.
+        Nothing is filled when a field is missing (ElementNotFoundError), can
+        not be set (ElementNotInteractableError) or is a select or radio group
+        without an option for its value (ValueError)
+        """
+        typed = list(typed)
+        unknown = [elem.label for elem in typed if elem not in fields]
+        if unknown:
+            raise ValueError(f"typed fields {unknown} are not keys of fields")
+        bulk = {elem: value for elem, value in fields.items() if elem not in typed}
+        filled = await self.fill_form_in_frame(
+            frame=self.driver.page, fields=bulk, required=typed
+        )
+        fills = dict(zip(bulk, filled))
+        for elem in typed:
+            start = time.perf_counter()
+            await self.type(elem=elem, text=str(fields[elem]), delay=delay, mode=mode)
+            fills[elem] = FieldFill(
+                label=elem.label,
+                kind=None,
+                value=None,
+                seconds=time.perf_counter() - start,
+                typed=True,
+            )
+
+        return [fills[elem] for elem in fields]
 
     async def sleep_for(self, seconds=2):
         await asyncio.sleep(seconds)
@@ -156,8 +769,18 @@ class BaseAction:
 
 
 def get_default_bot(headless_mode=True):
+    """
+    Parameters
+    ==========
+    headless_mode: If True, launches in the headless mode calibrated fastest on
+                   this host, xvfb until python -m bopbot.browser.calibration ran,
+                   see bopbot.browser.calibration.select_headless_mode()
+    """
+    mode = select_headless_mode() if headless_mode else None
     chrome_config = BrowserConfig(
-        browser_window=BrowserWindow(), xvfb_headless=headless_mode
+        browser_window=BrowserWindow(),
+        native_headless=mode == HeadlessMode.native,
+        xvfb_headless=mode == HeadlessMode.xvfb,
     )
     chrome_driver = RawDriver(chrome_config=chrome_config)
     return BaseAction(driver=chrome_driver)
@@ -1,2 +1,30 @@
 class ElementNotFoundError(Exception):
     pass
+
+
+class FrameNotFoundError(Exception):
+    pass
+
+
+class FlowError(Exception):
+    """Raised when a declarative flow can not be compiled"""
+
+    pass
+
+
+class FlowAssertionError(Exception):
+    """Raised when an assert step of a running flow fails"""
+
+    pass
+
+
+class ActionGroupError(Exception):
+    """Raised when actions of an ActionGroup are declared inconsistently"""
+
+    pass
+
+
+class ElementNotInteractableError(Exception):
+    """Raised when an element exists but is hidden, off screen or covered"""
+
+    pass
@@ -0,0 +1,416 @@
+"""
+Declarative flows: a list of steps compiled once into a FlowPlan and then
+executed on a BaseAction. For example:
+
+{
+    "name": "search",
+    "selectors": {"search": {"box": ["form", "input"], "submit": ["form", "button"]}},
+    "steps": [
+        {"goto": "https://site.test/"},
+        {"wait": ["search.box", "search.submit"]},
+        {"type": {"selector": "search.box", "text": "bopbot"}},
+        {"click": "search.submit"},
+        {"wait": "results.first"},
+        {"read": {"selector": "results.first", "as": "first"}},
+        {"exists": {"selector": "results.next_page", "as": "has_next"}},
+        {"assert": {"result": "first", "contains": "bopbot"}},
+        {"extract": {"container": "results.rows", "fields": {"title": "h3"}, "as": "rows"}},
+    ],
+}
+
+Compiling coalesces consecutive read/exists/visible steps (and selector
+asserts) into one BaseAction.read_batch(..) round trip and consecutive wait
+steps into one concurrently awaited group.
+"""
+import json
+import asyncio
+from types import SimpleNamespace
+
+from bopbot.actions.actuators import BaseAction, TypingMode
+from bopbot.actions.exceptions import FlowError, FlowAssertionError
+from bopbot.dom.elements import (
+    BaseSelector,
+    LabeledSelector,
+    add_selector_to,
+    create_labeled_selector,
+    flatten_field_map,
+)
+from bopbot.dom.exceptions import SelectorError
+
+
+READ_KINDS = {"read": "query", "exists": "exists", "visible": "visible"}
+STEP_KINDS = ("goto", "wait", "sleep", "click", "type", "select", "extract", "assert")
+COMPARATORS = {
+    "equals": lambda value, expected: value == expected,
+    "not_equals": lambda value, expected: value != expected,
+    "contains": lambda value, expected: value is not None and expected in value,
+}
+
+
+class Check:
+    """
+    Compares a stored flow result against an expected value
+    """
+
+    def __init__(self, step: int, result: str, comparator: str, expected):
+        self.step = step
+        self.result = result
+        self.comparator = comparator
+        self.expected = expected
+
+    def verify(self, results: {}):
+        if self.result not in results:
+            raise FlowAssertionError(
+                f"step {self.step}: result [{self.result}] was never stored"
+            )
+        value = results[self.result]
+        if not COMPARATORS[self.comparator](value, self.expected):
+            raise FlowAssertionError(
+                f"step {self.step}: [{self.result}] = {value!r} "
+                f"does not satisfy {self.comparator} {self.expected!r}"
+            )
+
+
+class CallOp:
+    """
+    One sequential BaseAction call, result stored under store_as when set
+    """
+
+    def __init__(self, description: str, call, store_as: str = None):
+        """
+        Parameters
+        ==========
+        description: human readable summary used by FlowPlan.describe()
+        call: callable receiving the bot and returning an awaitable
+        store_as: result name the awaited value is stored under
+        """
+        self.description = description
+        self.call = call
+        self.store_as = store_as
+
+    async def run(self, bot: BaseAction, results: {}):
+        value = await self.call(bot)
+        if self.store_as:
+            results[self.store_as] = value
+
+
+class WaitOp:
+    """
+    Waits for several selectors concurrently instead of one after another
+    """
+
+    def __init__(self):
+        self.waits = []
+
+    @property
+    def description(self) -> str:
+        labels = ", ".join(elem.label for elem, _ in self.waits)
+        return f"wait [{labels}]"
+
+    async def run(self, bot: BaseAction, results: {}):
+        await asyncio.gather(
+            *[
+                bot.wait_for_element(elem=elem, as_visible=as_visible)
+                for elem, as_visible in self.waits
+            ]
+        )
+
+
+class ReadOp:
+    """
+    Consecutive reads evaluated in a single BaseAction.read_batch(..). Checks
+    attached to the batch are verified in step order: each one sees only the
+    reads compiled before it, as if the steps had run one after another
+    """
+
+    def __init__(self):
+        self.reads = []
+        self.names = []
+        # (number of reads compiled before the check, Check)
+        self.checks = []
+
+    @property
+    def description(self) -> str:
+        return f"read_batch [{', '.join(self.names)}]"
+
+    def add_check(self, check: Check):
+        self.checks.append((len(self.reads), check))
+
+    async def run(self, bot: BaseAction, results: {}):
+        values = await bot.read_batch(reads=self.reads) if self.reads else []
+        stored = 0
+        for position, check in self.checks:
+            results.update(zip(self.names[stored:position], values[stored:position]))
+            stored = position
+            check.verify(results=results)
+        results.update(zip(self.names[stored:], values[stored:]))
+
+
+class FlowPlan:
+    """
+    Compiled flow, reusable across bots and runs
+    """
+
+    def __init__(self, name: str, ops: []):
+        self.name = name
+        self.ops = ops
+
+    def describe(self) -> [str]:
+        return [op.description for op in self.ops]
+
+    async def run(self, bot: BaseAction, results: {} = None) -> {}:
+        """
+        Parameters
+        ==========
+        bot: bot whose driver already has a browser
+        results: initial results, e.g. values asserted against by the flow
+
+        Returns
+        =======
+        dict of every value stored by the flow's "as" keys
+        """
+        results = dict(results or {})
+        for op in self.ops:
+            await op.run(bot=bot, results=results)
+
+        return results
+
+
+def build_flow_pages(selectors: {}) -> {}:
+    """
+    Builds page objects from a flow's "selectors" section,
+    {page: {label: selector_hierarchy}}, through add_selector_to(..)
+    """
+    pages = {}
+    for page_name, labels in selectors.items():
+        page = SimpleNamespace()
+        for label, selector_hierarchy in labels.items():
+            add_selector_to(page, label=label, selector_hierarchy=selector_hierarchy)
+        pages[page_name] = page
+
+    return pages
+
+
+class FlowCompiler:
+    """
+    Turns a flow's steps into a FlowPlan. Step arguments, selector references
+    and extract fields are checked at compile time, so a typo in them fails
+    before any browser is launched. Assert result names are checked when the
+    plan runs, they may name initial results passed to FlowPlan.run(..).
+    """
+
+    def __init__(self, page_objects: {} = None):
+        """
+        Parameters
+        ==========
+        page_objects: {name: object} with LabeledSelector attributes (a PageObject
+                      subclass or see add_selector_to), steps reference them
+                      as "<name>.<label>"
+        """
+        self.page_objects = dict(page_objects or {})
+        self.pages = {}
+        self.step = 0
+        self.ops = []
+
+    def compile(self, flow: {}) -> FlowPlan:
+        if not isinstance(flow, dict) or not isinstance(flow.get("steps"), list):
+            raise FlowError("flow must be a dict with a list of steps")
+
+        self.pages = dict(self.page_objects)
+        self.pages.update(build_flow_pages(selectors=flow.get("selectors", {})))
+        self.ops = []
+        for index, step in enumerate(flow["steps"]):
+            self.step = index
+            self.compile_step(step=step)
+
+        return FlowPlan(name=flow.get("name", "flow"), ops=self.ops)
+
+    def error(self, message: str) -> FlowError:
+        return FlowError(f"step {self.step}: {message}")
+
+    def compile_step(self, step: {}):
+        if not isinstance(step, dict) or len(step) != 1:
+            raise self.error(f"[{step}] must be a dict with a single step key")
+
+        kind, args = next(iter(step.items()))
+        if kind in READ_KINDS:
+            return self.compile_read(kind=kind, args=self.as_args(args, "selector"))
+
+        if kind not in STEP_KINDS:
+            raise self.error(f"unknown step [{kind}]")
+        getattr(self, f"compile_{kind}")(args=args)
+
+    def as_args(self, args, key: str) -> {}:
+        """
+        Expands step shorthands such as {"click": "page.button"} to {key: value}
+        """
+        if isinstance(args, dict):
+            return args
+        return {key: args}
+
+    def require(self, args: {}, key: str):
+        if not isinstance(args, dict) or key not in args:
+            raise self.error(f"missing [{key}]")
+        return args[key]
+
+    def resolve(self, selector) -> LabeledSelector:
+        """
+        Parameters
+        ==========
+        selector: "<page>.<label>" reference, LabeledSelector or dom hierarchy list
+        """
+        if isinstance(selector, BaseSelector):
+            return selector
+        if isinstance(selector, list):
+            return create_labeled_selector(
+                label="flow_selector", selector_hierarchy=selector
+            )
+        if isinstance(selector, str) and "." in selector:
+            page_name, label = selector.split(".", 1)
+            elem = getattr(self.pages.get(page_name), label, None)
+            if isinstance(elem, BaseSelector):
+                return elem
+
+        raise self.error(f"can not resolve selector [{selector}]")
+
+    def last_op(self, op_type):
+        """
+        Returns the previous op when it is of op_type, otherwise appends a new one
+        """
+        if not self.ops or not isinstance(self.ops[-1], op_type):
+            self.ops.append(op_type())
+        return self.ops[-1]
+
+    def add_call(self, description: str, call, store_as: str = None):
+        self.ops.append(CallOp(description=description, call=call, store_as=store_as))
+
+    def compile_goto(self, args):
+        url = self.require(self.as_args(args, "url"), "url")
+        self.add_call(f"goto {url}", lambda bot: bot.driver.goto(url=url))
+
+    def compile_wait(self, args):
+        waits = args if isinstance(args, list) else [args]
+        op = self.last_op(WaitOp)
+        for wait in waits:
+            wait = self.as_args(wait, "selector")
+            elem = self.resolve(self.require(wait, "selector"))
+            op.waits.append((elem, wait.get("visible", True)))
+
+    def compile_sleep(self, args):
+        try:
+            seconds = float(args)
+        except (TypeError, ValueError):
+            raise self.error(f"sleep needs seconds, got [{args}]")
+        self.add_call(f"sleep {seconds}", lambda bot: bot.sleep_for(seconds=seconds))
+
+    def compile_click(self, args):
+        args = self.as_args(args, "selector")
+        elem = self.resolve(self.require(args, "selector"))
+        as_visible = args.get("visible", True)
+        self.add_call(
+            f"click [{elem.label}]",
+            lambda bot: bot.click(elem=elem, as_visible=as_visible),
+        )
+
+    def compile_type(self, args):
+        elem = self.resolve(self.require(args, "selector"))
+        text = self.require(args, "text")
+        try:
+            mode = TypingMode(args.get("mode", TypingMode.keystroke.value))
+        except ValueError:
+            raise self.error(f"unknown typing mode [{args['mode']}]")
+        self.add_call(
+            f"type [{elem.label}]",
+            lambda bot: bot.type(elem=elem, text=text, mode=mode),
+        )
+
+    def compile_select(self, args):
+        elem = self.resolve(self.require(args, "selector"))
+        value = self.require(args, "value")
+        self.add_call(
+            f"select [{elem.label}]", lambda bot: bot.select(elem=elem, text=value)
+        )
+
+    def compile_extract(self, args):
+        container = self.resolve(self.require(args, "container"))
+        fields = self.require(args, "fields")
+        try:
+            flatten_field_map(fields=fields)
+        except SelectorError as error:
+            raise self.error(str(error))
+        chunk_size = args.get("chunk_size", 500)
+        self.add_call(
+            f"extract [{container.label}]",
+            lambda bot: bot.extract(
+                container=container, fields=fields, chunk_size=chunk_size
+            ),
+            store_as=args.get("as"),
+        )
+
+    def compile_read(self, kind: str, args: {}) -> str:
+        """
+        Appends a read to the current batch
+
+        Returns
+        =======
+        result name the value is stored under
+        """
+        elem = self.resolve(self.require(args, "selector"))
+        name = args.get("as", f"{elem.label}.{kind}")
+        op = self.last_op(ReadOp)
+        op.reads.append((elem, READ_KINDS[kind], args.get("attr")))
+        op.names.append(name)
+        return name
+
+    def compile_assert(self, args):
+        comparators = [key for key in COMPARATORS if key in args]
+        if "selector" in args and ("exists" in args or "visible" in args):
+            kind = "exists" if "exists" in args else "visible"
+            result = self.compile_read(kind=kind, args=args)
+            comparator, expected = "equals", args[kind]
+        elif len(comparators) != 1:
+            raise self.error(f"assert needs exactly one of {list(COMPARATORS)}")
+        else:
+            comparator = comparators[0]
+            expected = args[comparator]
+            if "selector" in args:
+                result = self.compile_read(kind="read", args=args)
+            else:
+                result = self.require(args, "result")
+
+        check = Check(
+            step=self.step, result=result, comparator=comparator, expected=expected
+        )
+        # result only asserts are local, so they ride along the open batch
+        self.last_op(ReadOp).add_check(check)
+
+
+def compile_flow(flow: {}, page_objects: {} = None) -> FlowPlan:
+    """
+    Parameters
+    ==========
+    flow: {"name": str, "selectors": {page: {label: hierarchy}}, "steps": [..]}
+    page_objects: {name: object} whose LabeledSelector attributes steps reference
+
+    Returns
+    =======
+    FlowPlan executed with `await plan.run(bot)`
+    """
+    return FlowCompiler(page_objects=page_objects).compile(flow=flow)
+
+
+def load_flow(path: str) -> {}:
+    """
+    Reads a flow from a .json or, when PyYAML is installed, a .yml/.yaml file
+    """
+    with open(path) as fl:
+        if path.endswith((".yml", ".yaml")):
+            try:
+                import yaml
+            except ImportError:
+                raise FlowError(
+                    "reading YAML flows requires PyYAML (pip install pyyaml)"
+                )
+            return yaml.safe_load(fl)
+
+        return json.load(fl)
@@ -0,0 +1,94 @@
+import asyncio
+
+from bopbot.actions.exceptions import ActionGroupError
+
+
+class ActionGroup:
+    """
+    Issues independent BaseAction calls on one page concurrently, so their
+    devtools round trips overlap instead of running one after another.
+    Actions only wait on each other where declared through `after`.
+
+    Usage:
+        group = bot.group()
+        group.add("title", bot.query, elem=title)
+        group.add("has_next", bot.selector_exists, elem=next_page)
+        group.add("banner", bot.selector_visible, elem=cookie_banner)
+        group.add("accept", bot.click, elem=accept_cookies, after=["banner"])
+        results = await group.run()
+        results["title"], results["has_next"]
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        """
+        Parameters
+        ==========
+        max_concurrency: max actions in flight at once, None runs every action at once
+        """
+        self.max_concurrency = max_concurrency
+        self._actions = {}
+
+    def __len__(self):
+        return len(self._actions)
+
+    def add(self, name: str, action, *args, after: [str] = None, **kwargs):
+        """
+        Parameters
+        ==========
+        name: key the action's result is returned under
+        action: coroutine function, usually a bound BaseAction method
+        args, kwargs: arguments action is called with
+        after: names of previously added actions that must complete before
+               this one starts. Actions without `after` have no ordering guarantee.
+
+        Returns
+        =======
+        self, so adds can be chained
+        """
+        if name in self._actions:
+            raise ActionGroupError(f"action [{name}] was already added")
+        after = list(after or [])
+        for dependency in after:
+            if dependency not in self._actions:
+                raise ActionGroupError(
+                    f"action [{name}] can not run after unknown action [{dependency}]"
+                )
+
+        self._actions[name] = (action, args, kwargs, after)
+        return self
+
+    async def run(self) -> {}:
+        """
+        Runs every added action, failing fast: the first exception cancels
+        the actions still running and is raised
+
+        Returns
+        =======
+        {name: action result} in the order actions were added
+        """
+        semaphore = (
+            asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        )
+        tasks = {}
+
+        async def run_action(action, args, kwargs, after):
+            if after:
+                await asyncio.gather(*[tasks[dependency] for dependency in after])
+            if semaphore is None:
+                return await action(*args, **kwargs)
+            async with semaphore:
+                return await action(*args, **kwargs)
+
+        for name, (action, args, kwargs, after) in self._actions.items():
+            tasks[name] = asyncio.ensure_future(run_action(action, args, kwargs, after))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # retrieve the remaining outcomes so failures are not reported twice
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
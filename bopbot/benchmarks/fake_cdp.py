@@ -0,0 +1,369 @@
+import re
+import json
+import asyncio
+import itertools
+from collections import Counter
+
+import websockets
+
+
+class FakeNode:
+    """
+    Stand-in for a DOM node returned to pyppeteer as an ElementHandle
+    """
+
+    ids = itertools.count(1)
+
+    def __init__(self, name="node"):
+        self.name = name
+        self.object_id = f"{name}-{next(FakeNode.ids)}"
+
+
+def node_response(*_):
+    return FakeNode()
+
+
+class FakeTarget:
+    def __init__(self, target_id, url="about:blank"):
+        self.target_id = target_id
+        self.session_id = None
+        self.url = url
+        self.loader_ids = itertools.count(1)
+        self.context_ids = itertools.count(1)
+        self.loader_id = f"loader-{next(self.loader_ids)}"
+        self.context_id = next(self.context_ids)
+
+    @property
+    def frame(self) -> {}:
+        return {
+            "id": self.target_id,
+            "loaderId": self.loader_id,
+            "url": self.url,
+            "name": "",
+            "securityOrigin": self.url,
+            "mimeType": "text/html",
+        }
+
+    @property
+    def info(self) -> {}:
+        return {
+            "targetId": self.target_id,
+            "type": "page",
+            "title": self.url,
+            "url": self.url,
+            "attached": self.session_id is not None,
+        }
+
+
+class FakeBrowser:
+    """
+    Targets of one websocket connection, every connection gets its own browser
+    the same way every RawDriver launches its own Chrome
+    """
+
+    def __init__(self):
+        self.targets = {}
+        self.sessions = {}
+        self.target_ids = itertools.count(1)
+
+
+class FakeChrome:
+    """
+    Local websocket server speaking enough of the devtools protocol (Target,
+    Page, Runtime, Network, Input) for pyppeteer, RawDriver and BaseAction to
+    run against it without a browser. Every response is delayed by a
+    configurable latency and Runtime evaluations are answered from scripted
+    responses, so benchmarks only measure bopbot's Python layer.
+
+    Usage:
+        async with FakeChrome(latency=0.002) as chrome:
+            await driver.connect_browser(chrome.ws_endpoint)
+    """
+
+    default_scripts = [
+        (r"^document$", node_response),
+        (r"\.querySelector\(selector\)", node_response),
+        (r"return this\.isConnected", True),
+        (r"waitForPredicatePageFunction", node_response),
+    ]
+
+    def __init__(self, latency=0.0, method_latency: {} = None, scripts: [] = None):
+        """
+        Parameters
+        ==========
+        latency: seconds every protocol response is delayed by
+        method_latency: per protocol method latency overrides, {"Page.navigate": 0.05}
+        scripts: [(regex, response)] pairs matched against evaluated JS source.
+                 response is a JSON serializable value, a FakeNode or a callable
+                 receiving the evaluation arguments. First match wins.
+        """
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.scripts = [
+            (re.compile(pattern), response)
+            for pattern, response in list(scripts or []) + self.default_scripts
+        ]
+        self.calls = Counter()
+        self.server = None
+        self.port = None
+        self._script_ids = itertools.count(1)
+        self.handlers = {
+            "Target.getBrowserContexts": self.target_get_browser_contexts,
+            "Target.setDiscoverTargets": self.target_set_discover_targets,
+            "Target.createTarget": self.target_create_target,
+            "Target.attachToTarget": self.target_attach_to_target,
+            "Target.closeTarget": self.target_close_target,
+            "Browser.getVersion": self.browser_get_version,
+            "Page.getFrameTree": self.page_get_frame_tree,
+            "Runtime.enable": self.runtime_enable,
+            "Page.navigate": self.page_navigate,
+            "Page.addScriptToEvaluateOnNewDocument": self.page_add_script,
+            "Page.getLayoutMetrics": self.page_get_layout_metrics,
+            "Page.captureScreenshot": self.page_capture_screenshot,
+            "DOM.getContentQuads": self.dom_get_content_quads,
+            "Runtime.evaluate": self.runtime_evaluate,
+            "Runtime.callFunctionOn": self.runtime_call_function_on,
+        }
+
+    @property
+    def ws_endpoint(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/devtools/browser/fake"
+
+    async def start(self):
+        self.server = await websockets.serve(self.handle_connection, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def add_script(self, pattern: str, response):
+        self.scripts.insert(0, (re.compile(pattern), response))
+
+    @property
+    def round_trips(self) -> int:
+        """
+        Number of protocol calls received, excluding Target.sendMessageToTarget
+        envelopes (the wrapped session call is counted instead)
+        """
+        return sum(self.calls.values()) - self.calls["Target.sendMessageToTarget"]
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    async def handle_connection(self, websocket, path):
+        browser = FakeBrowser()
+        pending = set()
+        try:
+            async for message in websocket:
+                task = asyncio.ensure_future(
+                    self.dispatch(websocket, browser, json.loads(message))
+                )
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except websockets.ConnectionClosed:
+            pass
+        for task in pending:
+            task.cancel()
+
+    async def dispatch(self, websocket, browser: FakeBrowser, message, session_id=None):
+        method = message["method"]
+        params = message.get("params", {})
+        self.calls[method] += 1
+        if method == "Target.sendMessageToTarget":
+            await self.send(websocket, {"id": message["id"], "result": {}})
+            inner = json.loads(params["message"])
+            await self.dispatch(
+                websocket, browser, inner, session_id=params["sessionId"]
+            )
+            return
+
+        delay = self.method_latency.get(method, self.latency)
+        if delay:
+            await asyncio.sleep(delay)
+        target = browser.sessions.get(session_id)
+        events, result = self.handle(method, params, browser, target)
+        for event_method, event_params in events:
+            await self.emit(websocket, event_method, event_params, target)
+        await self.reply(websocket, {"id": message["id"], "result": result}, target)
+
+    async def send(self, websocket, payload: {}):
+        try:
+            await websocket.send(json.dumps(payload))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def reply(self, websocket, payload: {}, target: FakeTarget = None):
+        if target is None:
+            await self.send(websocket, payload)
+            return
+
+        await self.send(
+            websocket,
+            {
+                "method": "Target.receivedMessageFromTarget",
+                "params": {
+                    "sessionId": target.session_id,
+                    "targetId": target.target_id,
+                    "message": json.dumps(payload),
+                },
+            },
+        )
+
+    async def emit(self, websocket, method, params, target: FakeTarget = None):
+        await self.reply(websocket, {"method": method, "params": params}, target)
+
+    def handle(self, method, params, browser: FakeBrowser, target: FakeTarget):
+        """
+        Returns ([(event_method, event_params)], result) for a protocol call.
+        Events of browser level calls are sent on the browser connection,
+        events of session calls on the target's session.
+        """
+        handler = self.handlers.get(method)
+        if handler is None:
+            return [], {}
+
+        return handler(params, browser, target)
+
+    def target_get_browser_contexts(self, params, browser, target):
+        return [], {"browserContextIds": []}
+
+    def target_set_discover_targets(self, params, browser, target):
+        events = [
+            ("Target.targetCreated", {"targetInfo": fake.info})
+            for fake in browser.targets.values()
+        ]
+        return events, {}
+
+    def target_create_target(self, params, browser, _):
+        target = FakeTarget(
+            target_id=f"target-{next(browser.target_ids)}",
+            url=params.get("url", "about:blank"),
+        )
+        browser.targets[target.target_id] = target
+        return (
+            [("Target.targetCreated", {"targetInfo": target.info})],
+            {"targetId": target.target_id},
+        )
+
+    def target_attach_to_target(self, params, browser, _):
+        target = browser.targets[params["targetId"]]
+        target.session_id = f"session-{target.target_id}"
+        browser.sessions[target.session_id] = target
+        return [], {"sessionId": target.session_id}
+
+    def target_close_target(self, params, browser, _):
+        target = browser.targets.pop(params["targetId"], None)
+        if target is None:
+            return [], {"success": False}
+        browser.sessions.pop(target.session_id, None)
+        events = [("Target.targetDestroyed", {"targetId": target.target_id})]
+        if target.session_id:
+            events.append(
+                (
+                    "Target.detachedFromTarget",
+                    {"sessionId": target.session_id, "targetId": target.target_id},
+                )
+            )
+        return events, {"success": True}
+
+    def browser_get_version(self, params, browser, target):
+        return [], {"product": "FakeChrome/1.0", "userAgent": "FakeChrome/1.0"}
+
+    def page_get_frame_tree(self, params, browser, target):
+        return [], {"frameTree": {"frame": target.frame, "childFrames": []}}
+
+    def execution_context_created(self, target: FakeTarget):
+        context = {
+            "id": target.context_id,
+            "origin": target.url,
+            "name": "",
+            "auxData": {"isDefault": True, "frameId": target.target_id},
+        }
+        return ("Runtime.executionContextCreated", {"context": context})
+
+    def runtime_enable(self, params, browser, target):
+        return [self.execution_context_created(target=target)], {}
+
+    def page_navigate(self, params, browser, target):
+        target.url = params["url"]
+        target.loader_id = f"loader-{next(target.loader_ids)}"
+        target.context_id = next(target.context_ids)
+        events = [
+            ("Runtime.executionContextsCleared", {}),
+            ("Page.frameNavigated", {"frame": target.frame}),
+            self.execution_context_created(target=target),
+        ]
+        for name in ("init", "DOMContentLoaded", "load", "networkIdle"):
+            lifecycle = {
+                "frameId": target.target_id,
+                "loaderId": target.loader_id,
+                "name": name,
+                "timestamp": 0,
+            }
+            events.append(("Page.lifecycleEvent", lifecycle))
+        return events, {"frameId": target.target_id, "loaderId": target.loader_id}
+
+    def page_add_script(self, params, browser, target):
+        return [], {"identifier": str(next(self._script_ids))}
+
+    def page_get_layout_metrics(self, params, browser, target):
+        viewport = {"clientWidth": 1200, "clientHeight": 800, "pageX": 0, "pageY": 0}
+        return [], {"layoutViewport": viewport, "contentSize": {"width": 1200}}
+
+    def page_capture_screenshot(self, params, browser, target):
+        return [], {"data": ""}
+
+    def dom_get_content_quads(self, params, browser, target):
+        return [], {"quads": [[10, 10, 110, 10, 110, 40, 10, 40]]}
+
+    def runtime_evaluate(self, params, browser, target):
+        value = self.script_response(source=params["expression"], args=[])
+        return [], self.remote_result(value, by_value=params.get("returnByValue"))
+
+    def runtime_call_function_on(self, params, browser, target):
+        args = [
+            argument.get("objectId", argument.get("value"))
+            for argument in params.get("arguments", [])
+        ]
+        value = self.script_response(source=params["functionDeclaration"], args=args)
+        return [], self.remote_result(value, by_value=params.get("returnByValue"))
+
+    def script_response(self, source, args):
+        source = source.split("//# sourceURL=")[0].strip()
+        for pattern, response in self.scripts:
+            if pattern.search(source):
+                return response(*args) if callable(response) else response
+
+        return None
+
+    @staticmethod
+    def remote_result(value, by_value=False) -> {}:
+        if isinstance(value, FakeNode):
+            if by_value:
+                return {"result": {"type": "object", "value": {}}}
+            remote = {
+                "type": "object",
+                "subtype": "node",
+                "className": "HTMLElement",
+                "objectId": value.object_id,
+            }
+        elif value is None:
+            remote = {"type": "undefined"}
+        elif isinstance(value, bool):
+            remote = {"type": "boolean", "value": value}
+        elif isinstance(value, (int, float)):
+            remote = {"type": "number", "value": value}
+        elif isinstance(value, str):
+            remote = {"type": "string", "value": value}
+        else:
+            remote = {"type": "object", "value": value}
+
+        return {"result": remote}
@@ -0,0 +1,106 @@
+"""
+Import cost of bopbot entry points, measured with `python -X importtime` in
+fresh interpreters so earlier imports of the benchmark process don't hide cost
+
+    python -m bopbot.benchmarks.imports --output imports.json
+"""
+import sys
+import argparse
+import subprocess
+
+from bopbot.benchmarks.timing import BenchmarkReport, Timing
+
+
+ENTRY_POINTS = (
+    "bopbot",
+    "bopbot.dom.elements",
+    "bopbot.browser.launcher",
+    "bopbot.browser.driver",
+    "bopbot.actions.actuators",
+    "bopbot.actions.flows",
+)
+# third party packages that should only load once a browser is used
+HEAVY_MODULES = ("pyppeteer", "psutil", "websockets")
+
+
+def parse_importtime(stderr: str) -> {}:
+    """
+    Returns
+    =======
+    {module: cumulative microseconds} parsed from `-X importtime` output lines
+    "import time: <self us> | <cumulative us> | <indented module name>"
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+
+    return modules
+
+
+def measure_import(module: str) -> {}:
+    """
+    Imports module in a fresh interpreter
+
+    Returns
+    =======
+    {"seconds": cumulative import time of module, "modules": {module: microseconds}}
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    modules = parse_importtime(stderr=completed.stderr)
+    return {"seconds": modules[module] / 1e6, "modules": modules}
+
+
+def heavy_imports(modules: {}) -> [str]:
+    return sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+
+
+def benchmark_imports(
+    report: BenchmarkReport, entry_points=ENTRY_POINTS, rounds=5
+) -> {}:
+    """
+    Adds one import time summary per entry point to report
+
+    Returns
+    =======
+    {entry point: [heavy modules it loads]}
+    """
+    loaded = {}
+    for entry_point in entry_points:
+        timing = Timing(name=f"import.{entry_point}")
+        for _ in range(rounds):
+            measured = measure_import(module=entry_point)
+            timing.add(measured["seconds"])
+        loaded[entry_point] = heavy_imports(modules=measured["modules"])
+        report.add(
+            timing,
+            modules=len(measured["modules"]),
+            heavy_modules=sorted({name.split(".")[0] for name in loaded[entry_point]}),
+        )
+
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure import time of bopbot entry points"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default="bopbot-imports.json")
+    args = parser.parse_args(argv)
+
+    report = BenchmarkReport(suite="bopbot.benchmarks.imports", python=sys.version)
+    benchmark_imports(report=report, rounds=args.rounds)
+    report.dump(args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Cost of getting a clean page for the next job, with a real browser:
+- reset: RawDriver.reset_page(), the current tab is cleaned and reused
+- new_tab: PageManager.set_single_page(), a new tab replaces the current one
+- new_browser: the browser is closed and a new one launched
+
+Every round loads a sandbox page first, so there is state to clean.
+
+    python -m bopbot.benchmarks.lifecycle --rounds 10 --output lifecycle.json
+"""
+import sys
+import time
+import asyncio
+import argparse
+import platform
+
+import bopbot
+from bopbot.actions.actuators import BaseAction, get_default_bot
+from bopbot.benchmarks.sandbox import StaticSandbox
+from bopbot.benchmarks.timing import BenchmarkReport, Timing
+
+
+STRATEGIES = ("reset", "new_tab", "new_browser")
+
+
+async def clean_page(bot: BaseAction, strategy: str):
+    driver = bot.driver
+    if strategy == "reset":
+        await driver.reset_page()
+    elif strategy == "new_tab":
+        await driver.page_manager.set_single_page()
+    else:
+        await driver.close()
+        await driver.get_new_browser()
+
+
+async def benchmark_page_lifecycle(
+    sandbox: StaticSandbox, report: BenchmarkReport, rounds=10, bot: BaseAction = None
+) -> {}:
+    """
+    Times every strategy in STRATEGIES rounds times on one bot and adds one
+    summary per strategy to report
+
+    Returns
+    =======
+    {strategy: Timing}
+    """
+    bot = bot if bot else get_default_bot()
+    url = sandbox.url("/table", rows=200, cols=5)
+    timings = {strategy: Timing(name=f"page.{strategy}") for strategy in STRATEGIES}
+
+    await bot.driver.get_new_browser()
+    try:
+        for strategy, timing in timings.items():
+            for _ in range(rounds):
+                await bot.driver.goto(url=url)
+                start = time.perf_counter()
+                await clean_page(bot=bot, strategy=strategy)
+                timing.add(time.perf_counter() - start)
+    finally:
+        await bot.driver.close()
+
+    reset = timings["reset"].mean
+    for timing in timings.values():
+        report.add(timing, relative_to_reset=timing.mean / reset)
+
+    return timings
+
+
+async def run_benchmarks(rounds=10) -> BenchmarkReport:
+    report = BenchmarkReport(
+        suite="bopbot.benchmarks.lifecycle",
+        bopbot_version=bopbot.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        rounds=rounds,
+    )
+    with StaticSandbox() as sandbox:
+        await benchmark_page_lifecycle(sandbox=sandbox, report=report, rounds=rounds)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare page reset, new tab and new browser costs"
+    )
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--output", default="bopbot-lifecycle.json")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(run_benchmarks(rounds=args.rounds))
+    report.dump(args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
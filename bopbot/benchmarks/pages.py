@@ -0,0 +1,110 @@
+"""
+Generated pages served by bopbot.benchmarks.sandbox.StaticSandbox. Every page
+is a pure function of its query parameters, so two runs against the same
+parameters automate against byte identical documents.
+"""
+from html import escape
+
+
+def html_document(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+def deep_dom(depth=50, breadth=2) -> str:
+    """
+    Nested <div class="level"> chain depth levels deep. Every level also gets
+    breadth - 1 sibling leaves so selector engines have to discard branches.
+    The innermost node is <span id="deepest">.
+    """
+    opening, closing = [], []
+    for level in range(depth):
+        siblings = "".join(
+            f"<p class='leaf'>leaf {level}.{index}</p>" for index in range(breadth - 1)
+        )
+        opening.append(f"<div class='level' data-level='{level}'>{siblings}")
+        closing.append("</div>")
+    body = "".join(opening) + "<span id='deepest'>bottom</span>" + "".join(closing)
+
+    return html_document(title=f"deep dom {depth}x{breadth}", body=body)
+
+
+def large_table(rows=1000, cols=5) -> str:
+    """
+    <table id="data"> with rows x cols cells. Each row carries data-row and
+    a link in its first cell, matching the shape of typical result listings.
+    """
+    header = "".join(f"<th>col {col}</th>" for col in range(cols))
+    lines = []
+    for row in range(rows):
+        cells = [f"<td><a href='/item/{row}'>item {row}</a></td>"]
+        cells.extend(f"<td class='c{col}'>{row}-{col}</td>" for col in range(1, cols))
+        lines.append(f"<tr data-row='{row}'>{''.join(cells)}</tr>")
+    body = (
+        f"<table id='data'><thead><tr>{header}</tr></thead>"
+        f"<tbody>{''.join(lines)}</tbody></table>"
+    )
+
+    return html_document(title=f"table {rows}x{cols}", body=body)
+
+
+def many_frames(count=10, rows=10) -> str:
+    """
+    Page embedding count named iframes (frame-0, frame-1, ..) that each load
+    a large_table(rows=rows, cols=2)
+    """
+    frames = "".join(
+        f"<iframe name='frame-{index}' src='/table?rows={rows}&cols=2'></iframe>"
+        for index in range(count)
+    )
+    body = f"<h1 id='title'>{count} frames</h1>{frames}"
+
+    return html_document(title=f"frames {count}", body=body)
+
+
+def slow_resources(count=5, delay=500) -> str:
+    """
+    Page referencing count images and one script that the sandbox serves
+    after delay miliseconds, to measure how load waiting strategies behave
+    """
+    images = "".join(
+        f"<img src='/asset?delay={delay}&n={index}'>" for index in range(count)
+    )
+    body = (
+        f"<h1 id='title'>{count} slow resources</h1>{images}"
+        f"<script src='/asset?delay={delay}&n=script'></script>"
+    )
+
+    return html_document(title=f"slow {count}x{delay}ms", body=body)
+
+
+# path -> (page generator, {query parameter: type})
+PAGES = {
+    "/deep": (deep_dom, {"depth": int, "breadth": int}),
+    "/table": (large_table, {"rows": int, "cols": int}),
+    "/frames": (many_frames, {"count": int, "rows": int}),
+    "/slow": (slow_resources, {"count": int, "delay": int}),
+}
+
+
+def render_page(path: str, params: {}) -> str:
+    """
+    Parameters
+    ==========
+    path: one of the PAGES keys
+    params: query parameters as strings, unknown parameters are ignored
+
+    Returns
+    =======
+    html document, or None when path is not a generated page
+    """
+    if path not in PAGES:
+        return None
+
+    generator, types = PAGES[path]
+    kwargs = {
+        name: cast(params[name]) for name, cast in types.items() if name in params
+    }
+    return generator(**kwargs)
@@ -0,0 +1,127 @@
+"""
+Launch time and memory footprint of each LaunchProfile, with a real browser.
+Every round launches a browser, loads a sandbox table page, samples the
+resident memory of the browser process tree (renderers, GPU and utility
+processes included) and closes it.
+
+    python -m bopbot.benchmarks.profiles --rounds 5 --output profiles.json
+"""
+import sys
+import time
+import asyncio
+import argparse
+import platform
+
+import bopbot
+from bopbot.benchmarks.sandbox import StaticSandbox
+from bopbot.benchmarks.timing import BenchmarkReport, Timing
+from bopbot.browser.driver import RawDriver
+from bopbot.browser.launcher import BrowserConfig, BrowserWindow, LaunchProfile
+from bopbot.browser.resources import process_tree_rss
+
+
+# lets renderers finish post load work before memory is sampled
+SETTLE_SECONDS = 0.5
+
+
+async def measure_launch(config: BrowserConfig, url: str) -> {}:
+    """
+    Returns
+    =======
+    {"launch": seconds, "goto": seconds, "rss": bytes} of one browser
+    """
+    driver = RawDriver(chrome_config=config)
+    start = time.perf_counter()
+    await driver.get_new_browser()
+    launched = time.perf_counter()
+    try:
+        await driver.goto(url)
+        loaded = time.perf_counter()
+        await asyncio.sleep(SETTLE_SECONDS)
+        rss = process_tree_rss(pids=[driver.launcher.proc.pid])
+    finally:
+        await driver.close()
+
+    return {"launch": launched - start, "goto": loaded - launched, "rss": rss}
+
+
+async def benchmark_launch_profile(
+    profile: LaunchProfile,
+    sandbox: StaticSandbox,
+    report: BenchmarkReport,
+    rounds=3,
+    xvfb_headless=False,
+) -> {}:
+    """
+    Launches rounds browsers with profile one after another and adds the
+    launch time summary, with mean navigation time and RSS, to report
+
+    Returns
+    =======
+    report entry
+    """
+    url = sandbox.url("/table", rows=1000, cols=5)
+    launches = Timing(name=f"profile.{profile.value}.launch")
+    gotos, rss = [], []
+    for _ in range(rounds):
+        config = BrowserConfig(
+            browser_window=BrowserWindow(use_size_buffer=False),
+            native_headless=not xvfb_headless,
+            xvfb_headless=xvfb_headless,
+            launch_profile=profile,
+        )
+        sample = await measure_launch(config=config, url=url)
+        launches.add(sample["launch"])
+        gotos.append(sample["goto"])
+        rss.append(sample["rss"])
+
+    return report.add(
+        launches,
+        profile=profile.value,
+        goto_mean_ms=round(sum(gotos) / rounds * 1000, 3),
+        rss_mean_mb=round(sum(rss) / rounds / 2 ** 20, 1),
+        rss_max_mb=round(max(rss) / 2 ** 20, 1),
+    )
+
+
+async def run_benchmarks(rounds=3, profiles=tuple(LaunchProfile)) -> BenchmarkReport:
+    report = BenchmarkReport(
+        suite="bopbot.benchmarks.profiles",
+        bopbot_version=bopbot.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        rounds=rounds,
+    )
+    with StaticSandbox() as sandbox:
+        for profile in profiles:
+            await benchmark_launch_profile(
+                profile=profile, sandbox=sandbox, report=report, rounds=rounds
+            )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare launch time and memory of Chrome launch profiles"
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=[profile.value for profile in LaunchProfile],
+        help="only run these profiles",
+    )
+    parser.add_argument("--output", default="bopbot-profiles.json")
+    args = parser.parse_args(argv)
+
+    profiles = [LaunchProfile(value) for value in args.profile or []]
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(
+        run_benchmarks(rounds=args.rounds, profiles=profiles or tuple(LaunchProfile))
+    )
+    report.dump(args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
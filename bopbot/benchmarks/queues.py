@@ -0,0 +1,122 @@
+"""
+Throughput of SqliteQueue in jobs per second, no browser needed:
+- put: jobs enqueued by one producer, in batches of put_batch
+- consume: jobs leased and acked by worker processes sharing the queue file
+
+    python -m bopbot.benchmarks.queues --jobs 20000 --workers 1 4 --output queues.json
+"""
+import os
+import sys
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing
+
+import bopbot
+from bopbot.benchmarks.timing import BenchmarkReport
+from bopbot.jobs.exceptions import QueueError
+from bopbot.jobs.queues import SqliteQueue
+
+
+def consume_all(path: str, lease_count: int) -> (float, float, [int]):
+    """
+    Leases and acks until the queue has no visible message, runs in a worker process
+
+    Returns
+    =======
+    wall clock start and end, ids of the acked messages
+    """
+    acked = []
+    with SqliteQueue(path=path) as queue:
+        start = time.time()
+        while True:
+            messages = queue.lease(count=lease_count)
+            if not messages:
+                break
+            for message in messages:
+                queue.ack(message)
+                acked.append(message.id)
+        end = time.time()
+
+    return start, end, acked
+
+
+def benchmark_queue(
+    report: BenchmarkReport, jobs=10000, workers=4, lease_count=1, put_batch=100
+) -> {}:
+    """
+    Fills a fresh queue with jobs, then drains it with workers processes and
+    adds the put and consume throughput to report. Every job must be acked
+    exactly once, a lease handed to two workers raises
+
+    Returns
+    =======
+    report entry
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "queue.sqlite")
+        with SqliteQueue(path=path) as queue:
+            start = time.perf_counter()
+            for offset in range(0, jobs, put_batch):
+                bodies = [
+                    {"url": f"https://site.test/{index}"}
+                    for index in range(offset, min(jobs, offset + put_batch))
+                ]
+                queue.put_many(bodies)
+            put_seconds = time.perf_counter() - start
+
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = pool.starmap(consume_all, [(path, lease_count)] * workers)
+
+    acked = [message_id for _, _, ids in results for message_id in ids]
+    if len(acked) != jobs or len(set(acked)) != jobs:
+        raise QueueError(
+            f"{len(set(acked))} distinct of {len(acked)} acked, {jobs} put"
+        )
+    consume_seconds = max(end for _, end, _ in results) - min(
+        start for start, _, _ in results
+    )
+
+    return report.add(
+        name=f"queue.workers_{workers}.lease_{lease_count}",
+        jobs=jobs,
+        workers=workers,
+        lease_count=lease_count,
+        put_jobs_per_s=round(jobs / put_seconds),
+        consume_jobs_per_s=round(jobs / consume_seconds),
+    )
+
+
+def run_benchmarks(jobs=10000, workers=(1, 4), lease_count=1) -> BenchmarkReport:
+    report = BenchmarkReport(
+        suite="bopbot.benchmarks.queues",
+        bopbot_version=bopbot.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpus=os.cpu_count(),
+    )
+    for count in workers:
+        benchmark_queue(
+            report=report, jobs=jobs, workers=count, lease_count=lease_count
+        )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure SqliteQueue jobs per second")
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--lease-count", type=int, default=1)
+    parser.add_argument("--output", default="bopbot-queues.json")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        jobs=args.jobs, workers=args.workers, lease_count=args.lease_count
+    )
+    report.dump(args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
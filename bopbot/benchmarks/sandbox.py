@@ -0,0 +1,115 @@
+import time
+import threading
+from urllib.parse import urlencode, urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bopbot.benchmarks.pages import render_page
+
+
+# 1x1 transparent gif served for every /asset request
+PIXEL_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\x00\x00\x00!\xf9\x04\x01"
+    b"\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+class SandboxRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves bopbot.benchmarks.pages generated documents and /asset?delay=<ms>
+    """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path == "/asset":
+            return self.serve_asset(params=params)
+
+        try:
+            document = render_page(path=url.path, params=params)
+        except ValueError:
+            return self.send_error(400, "page parameters must be integers")
+        if document is None:
+            return self.send_error(404)
+
+        self.respond(body=document.encode(), content_type="text/html; charset=utf-8")
+
+    def serve_asset(self, params: {}):
+        try:
+            delay = int(params.get("delay", 0))
+        except ValueError:
+            return self.send_error(400, "asset delay must be an integer")
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if params.get("n") == "script":
+            self.respond(body=b"", content_type="application/javascript")
+        else:
+            self.respond(body=PIXEL_GIF, content_type="image/gif")
+
+    def respond(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # request logging would dominate benchmark output
+        pass
+
+
+class StaticSandbox:
+    """
+    Pure Python stand-in for the npm built Vue sandbox. Serves generated pages
+    of configurable size from a background thread, so benchmarks can run on
+    any machine that has Chrome.
+
+    Usage:
+        with StaticSandbox() as sandbox:
+            await bot.driver.goto(sandbox.url("/table", rows=5000))
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Parameters
+        ==========
+        host: interface to listen on
+        port: port to listen on, 0 picks a free port
+        """
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path: str, **params) -> str:
+        """
+        Parameters
+        ==========
+        path: generated page path, one of bopbot.benchmarks.pages.PAGES
+        params: page size parameters, e.g. url("/deep", depth=200)
+        """
+        query = f"?{urlencode(params)}" if params else ""
+        return f"{self.endpoint}{path}{query}"
+
+    def start(self):
+        self.server = ThreadingHTTPServer((self.host, self.port), SandboxRequestHandler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
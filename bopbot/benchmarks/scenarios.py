@@ -0,0 +1,248 @@
+"""
+End-to-end scenario flows (launch, goto, query, extract, screenshot) run
+against a StaticSandbox with a real browser.
+
+    python -m bopbot.benchmarks.scenarios --rounds 5 --output report.json
+"""
+import sys
+import time
+import asyncio
+import argparse
+import platform
+
+import bopbot
+from bopbot.actions.actuators import BaseAction, get_default_bot
+from bopbot.benchmarks.sandbox import StaticSandbox
+from bopbot.benchmarks.timing import BenchmarkReport, Timing
+from bopbot.dom.elements import LabeledSelector
+
+
+PHASES = ("launch", "goto", "query", "extract", "screenshot", "close")
+
+
+class Scenario:
+    """
+    One flow automated against a generated sandbox page. Phases that are
+    not configured (no selectors, no extract container, ..) are skipped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        page_params: {} = None,
+        selectors: [LabeledSelector] = None,
+        container: LabeledSelector = None,
+        fields: {} = None,
+        screenshot=True,
+    ):
+        """
+        Parameters
+        ==========
+        name: label results are reported under
+        path: sandbox page the flow navigates to, see bopbot.benchmarks.pages.PAGES
+        page_params: page size parameters passed to the page generator
+        selectors: selectors read one bot.query(..) at a time in the query phase
+        container: row selector for the extract phase
+        fields: field map for the extract phase, see BaseAction.extract(..)
+        screenshot: whether to capture a full viewport screenshot
+        """
+        self.name = name
+        self.path = path
+        self.page_params = page_params or {}
+        self.selectors = selectors or []
+        self.container = container
+        self.fields = fields
+        self.screenshot = screenshot
+
+
+def table_scenario(rows=1000, cols=5) -> Scenario:
+    cells = [
+        LabeledSelector(
+            label=f"cell_{row}",
+            dom_hierarchy=["#data", "tbody", f"tr:nth-child({row + 1})", "td.c1"],
+        )
+        for row in range(0, rows, max(1, rows // 20))
+    ]
+    return Scenario(
+        name=f"table.{rows}x{cols}",
+        path="/table",
+        page_params={"rows": rows, "cols": cols},
+        selectors=cells,
+        container=LabeledSelector(label="rows", dom_hierarchy=["#data", "tbody", "tr"]),
+        fields={"item": "a", "link": ("a", "@href"), "row": (None, "@data-row")},
+    )
+
+
+def deep_dom_scenario(depth=200, breadth=3) -> Scenario:
+    return Scenario(
+        name=f"deep.{depth}x{breadth}",
+        path="/deep",
+        page_params={"depth": depth, "breadth": breadth},
+        selectors=[
+            LabeledSelector(label="deepest", dom_hierarchy=["#deepest"]),
+            LabeledSelector(label="level", dom_hierarchy=["div.level", "p.leaf"]),
+        ],
+        container=LabeledSelector(label="leaves", dom_hierarchy=["p.leaf"]),
+        fields={"text": None},
+    )
+
+
+def frames_scenario(count=20, rows=10) -> Scenario:
+    return Scenario(
+        name=f"frames.{count}",
+        path="/frames",
+        page_params={"count": count, "rows": rows},
+        selectors=[LabeledSelector(label="title", dom_hierarchy=["#title"])],
+    )
+
+
+def slow_resources_scenario(count=5, delay=500) -> Scenario:
+    return Scenario(
+        name=f"slow.{count}x{delay}ms",
+        path="/slow",
+        page_params={"count": count, "delay": delay},
+        selectors=[LabeledSelector(label="title", dom_hierarchy=["#title"])],
+        screenshot=False,
+    )
+
+
+def get_default_scenarios() -> [Scenario]:
+    return [
+        table_scenario(rows=100),
+        table_scenario(rows=5000),
+        deep_dom_scenario(),
+        frames_scenario(),
+        slow_resources_scenario(),
+    ]
+
+
+async def run_scenario(
+    scenario: Scenario, sandbox: StaticSandbox, bot: BaseAction = None
+) -> {}:
+    """
+    Runs every configured phase of scenario once, timing each phase
+
+    Parameters
+    ==========
+    scenario: flow to run
+    sandbox: running sandbox serving the scenario page
+    bot: bot whose browser is launched and closed by the flow,
+         defaults to get_default_bot()
+
+    Returns
+    =======
+    {phase: seconds} for the phases that ran, plus "rows" extracted
+    """
+    bot = bot if bot else get_default_bot()
+    durations = {}
+    rows = []
+
+    start = time.perf_counter()
+    await bot.driver.get_new_browser()
+    durations["launch"] = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        await bot.driver.goto(url=sandbox.url(scenario.path, **scenario.page_params))
+        durations["goto"] = time.perf_counter() - start
+
+        if scenario.selectors:
+            start = time.perf_counter()
+            for elem in scenario.selectors:
+                await bot.query(elem=elem)
+            durations["query"] = time.perf_counter() - start
+
+        if scenario.container:
+            start = time.perf_counter()
+            rows = await bot.extract(
+                container=scenario.container, fields=scenario.fields
+            )
+            durations["extract"] = time.perf_counter() - start
+
+        if scenario.screenshot:
+            start = time.perf_counter()
+            await bot.driver.page.screenshot()
+            durations["screenshot"] = time.perf_counter() - start
+    finally:
+        start = time.perf_counter()
+        await bot.driver.close()
+        durations["close"] = time.perf_counter() - start
+
+    durations["rows"] = len(rows)
+    return durations
+
+
+async def benchmark_scenario(
+    scenario: Scenario, sandbox: StaticSandbox, report: BenchmarkReport, rounds=5
+):
+    """
+    Runs scenario rounds times and adds one latency summary per phase, plus
+    flow throughput, to report
+    """
+    timings = {phase: Timing(name=f"{scenario.name}.{phase}") for phase in PHASES}
+    flows = Timing(name=f"{scenario.name}.flow")
+    rows = 0
+    for _ in range(rounds):
+        durations = await run_scenario(scenario=scenario, sandbox=sandbox)
+        rows = durations.pop("rows")
+        for phase, seconds in durations.items():
+            timings[phase].add(seconds)
+        flows.add(sum(durations.values()))
+
+    for phase, timing in timings.items():
+        if not timing.samples:
+            continue
+        values = {}
+        if phase == "query":
+            values["queries_per_second"] = len(scenario.selectors) / timing.mean
+        elif phase == "extract":
+            values["rows"] = rows
+            values["rows_per_second"] = rows / timing.mean
+        report.add(timing, **values)
+    report.add(flows, flows_per_minute=60 / flows.mean)
+
+
+async def run_benchmarks(scenarios: [Scenario], rounds=5) -> BenchmarkReport:
+    report = BenchmarkReport(
+        suite="bopbot.benchmarks.scenarios",
+        bopbot_version=bopbot.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        rounds=rounds,
+    )
+    with StaticSandbox() as sandbox:
+        for scenario in scenarios:
+            await benchmark_scenario(
+                scenario=scenario, sandbox=sandbox, report=report, rounds=rounds
+            )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run end-to-end benchmark scenarios against a StaticSandbox"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default="bopbot-benchmarks.json")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="only run scenarios whose name starts with this prefix",
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = [
+        scenario
+        for scenario in get_default_scenarios()
+        if not args.scenario or scenario.name.startswith(tuple(args.scenario))
+    ]
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(
+        run_benchmarks(scenarios=scenarios, rounds=args.rounds)
+    )
+    report.dump(args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
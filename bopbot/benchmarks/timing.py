@@ -0,0 +1,84 @@
+import json
+import time
+import statistics
+
+
+class Timing:
+    """
+    Wall clock samples of a benchmarked operation, in seconds
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples = []
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    @property
+    def mean(self) -> float:
+        return statistics.mean(self.samples)
+
+    def percentile(self, percent: int) -> float:
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def summary(self) -> {}:
+        return {
+            "name": self.name,
+            "rounds": len(self.samples),
+            "mean_ms": round(self.mean * 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "min_ms": round(min(self.samples) * 1000, 3),
+            "max_ms": round(max(self.samples) * 1000, 3),
+        }
+
+
+async def time_async(name: str, func, rounds=20, warmup=1) -> Timing:
+    """
+    Awaits func() warmup + rounds times and records the duration of the timed rounds
+
+    Parameters
+    ==========
+    name: label the timing is reported under
+    func: zero argument callable returning an awaitable
+    rounds: number of timed calls
+    warmup: number of untimed calls made first
+    """
+    for _ in range(warmup):
+        await func()
+
+    timing = Timing(name=name)
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func()
+        timing.add(time.perf_counter() - start)
+
+    return timing
+
+
+class BenchmarkReport:
+    """
+    Collects benchmark results and writes them as one JSON document, so
+    runs of different releases can be diffed
+    """
+
+    def __init__(self, suite: str, **metadata):
+        self.suite = suite
+        self.metadata = metadata
+        self.results = []
+
+    def add(self, timing: Timing = None, **values):
+        result = timing.summary() if timing else {}
+        result.update(values)
+        self.results.append(result)
+        return result
+
+    def to_dict(self) -> {}:
+        return {"suite": self.suite, "metadata": self.metadata, "results": self.results}
+
+    def dump(self, path: str):
+        with open(path, "w") as fl:
+            json.dump(self.to_dict(), fl, indent=2)
@@ -0,0 +1,287 @@
+"""
+Picks the headless mode to launch Chrome with by measuring each mode the host
+supports against a local StaticSandbox page, once per Chrome install. The
+winner is cached in a JSON file that get_default_bot() reads; it never
+measures itself, calibrate a host after installing or updating Chrome with
+
+    python -m bopbot.browser.calibration --rounds 3
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import shutil
+import asyncio
+import logging
+import argparse
+from enum import Enum
+
+from bopbot.browser.exceptions import BrowserSetupError
+from bopbot.browser.launcher import (
+    BrowserConfig,
+    BrowserWindow,
+    SupportedOS,
+    get_chrome_path,
+    identify_running_os,
+)
+from bopbot.utils import EnvReader, create_path
+
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessMode(Enum):
+    native = "native"
+    xvfb = "xvfb"
+
+
+# mode bots launched with before calibration existed, used when no mode
+# could be measured
+FALLBACK_MODE = HeadlessMode.xvfb
+
+
+def get_calibration_path() -> str:
+    default = os.path.join(os.path.expanduser("~"), ".cache", "bopbot", "headless.json")
+    return EnvReader.get_str("BOPBOT_CALIBRATION_PATH", default=default)
+
+
+def available_modes(running_os: SupportedOS) -> [HeadlessMode]:
+    """
+    Returns
+    =======
+    headless modes the host can launch: xvfb needs linux and xvfb-run
+    """
+    modes = [HeadlessMode.native]
+    if running_os == SupportedOS.linux and shutil.which("xvfb-run"):
+        modes.append(HeadlessMode.xvfb)
+
+    return modes
+
+
+def chrome_fingerprint(exe_path: str) -> float:
+    """
+    Returns
+    =======
+    modification time of the Chrome executable, a Chrome update invalidates
+    the cached calibration. None when Chrome is not installed
+    """
+    try:
+        return os.path.getmtime(exe_path)
+    except OSError:
+        return None
+
+
+def get_headless_config(mode: HeadlessMode, running_os: SupportedOS) -> BrowserConfig:
+    return BrowserConfig(
+        browser_window=BrowserWindow(use_size_buffer=False),
+        running_os=running_os,
+        native_headless=mode == HeadlessMode.native,
+        xvfb_headless=mode == HeadlessMode.xvfb,
+    )
+
+
+async def calibrate_headless(
+    modes: [HeadlessMode], running_os: SupportedOS, rounds=2
+) -> {HeadlessMode: {}}:
+    """
+    Launches a browser rounds times per mode and loads a StaticSandbox table page
+
+    Returns
+    =======
+    {mode: {"launch": seconds, "goto": seconds, "rss": bytes}} means per mode,
+    modes that failed to launch or navigate are left out
+    """
+    from bopbot.benchmarks.profiles import measure_launch
+    from bopbot.benchmarks.sandbox import StaticSandbox
+
+    results = {}
+    with StaticSandbox() as sandbox:
+        url = sandbox.url("/table", rows=200, cols=5)
+        for mode in modes:
+            samples = []
+            try:
+                for _ in range(rounds):
+                    config = get_headless_config(mode=mode, running_os=running_os)
+                    samples.append(await measure_launch(config=config, url=url))
+            except Exception:
+                logger.exception(f"{mode.value} headless mode failed, skipping it")
+                continue
+            results[mode] = {
+                key: sum(sample[key] for sample in samples) / rounds
+                for key in ("launch", "goto", "rss")
+            }
+
+    return results
+
+
+def pick_winner(results: {HeadlessMode: {}}) -> HeadlessMode:
+    """
+    Returns
+    =======
+    mode with the fastest launch plus navigation, lower memory breaks ties
+    """
+    return min(
+        results,
+        key=lambda mode: (
+            results[mode]["launch"] + results[mode]["goto"],
+            results[mode]["rss"],
+        ),
+    )
+
+
+def load_calibration(path: str, exe_path: str) -> HeadlessMode:
+    """
+    Returns
+    =======
+    cached winner, None when missing, unreadable or measured on another Chrome
+    """
+    try:
+        with open(path, "r") as fl:
+            cached = json.load(fl)
+        fingerprint = chrome_fingerprint(exe_path)
+        if cached["exe_path"] != exe_path or cached["exe_mtime"] != fingerprint:
+            return None
+        return HeadlessMode(cached["mode"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_calibration(path: str, exe_path: str, mode: HeadlessMode, results: {}):
+    create_path(os.path.dirname(path) or ".")
+    calibration = {
+        "mode": mode.value,
+        "exe_path": exe_path,
+        "exe_mtime": chrome_fingerprint(exe_path),
+        "calibrated_at": time.time(),
+        "results": {measured.value: values for measured, values in results.items()},
+    }
+    with open(f"{path}.tmp", "w") as fl:
+        json.dump(calibration, fl, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def host_modes() -> (SupportedOS, [HeadlessMode]):
+    running_os = identify_running_os()
+    return running_os, available_modes(running_os=running_os)
+
+
+def select_headless_mode(path: str = None) -> HeadlessMode:
+    """
+    Headless mode get_default_bot() launches with, never measures:
+    - BOPBOT_HEADLESS_MODE (native or xvfb) when set
+    - the only mode the host supports (native on mac)
+    - the winner cached by calibrate(..) for the installed Chrome
+    - otherwise FALLBACK_MODE
+
+    Parameters
+    ==========
+    path: calibration cache file, defaults to BOPBOT_CALIBRATION_PATH or
+          ~/.cache/bopbot/headless.json
+    """
+    forced = EnvReader.get_str("BOPBOT_HEADLESS_MODE")
+    if forced:
+        try:
+            return HeadlessMode(forced)
+        except ValueError:
+            raise BrowserSetupError(
+                f"BOPBOT_HEADLESS_MODE must be one of "
+                f"{[mode.value for mode in HeadlessMode]}, got {forced}"
+            )
+
+    running_os, modes = host_modes()
+    if len(modes) == 1:
+        return modes[0]
+
+    path = path if path else get_calibration_path()
+    exe_path = get_chrome_path(running_os=running_os)
+    cached = load_calibration(path=path, exe_path=exe_path)
+    return cached if cached in modes else FALLBACK_MODE
+
+
+def lock_calibration(path: str):
+    """
+    Blocks until this process holds the exclusive lock on path + ".lock", so
+    bots started together on a host measure once instead of launching Chrome
+    side by side
+
+    Returns
+    =======
+    open lock file, the lock is released when it is closed
+    """
+    create_path(os.path.dirname(path) or ".")
+    lock = open(f"{path}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+    except BaseException:
+        lock.close()
+        raise
+    return lock
+
+
+async def calibrate(rounds=2, path: str = None, recalibrate=False) -> HeadlessMode:
+    """
+    Measures the headless modes of the host and caches the winner for
+    select_headless_mode(). Launches Chrome rounds times per mode, a few
+    seconds once per host and Chrome version. Callers waiting on another
+    process's calibration get its winner instead of measuring again.
+
+    Parameters
+    ==========
+    rounds: launches per mode
+    path: calibration cache file, defaults to BOPBOT_CALIBRATION_PATH or
+          ~/.cache/bopbot/headless.json
+    recalibrate: If True, measures even when a winner is cached
+
+    Returns
+    =======
+    winner, FALLBACK_MODE when Chrome is missing or no mode could be measured
+    """
+    running_os, modes = host_modes()
+    if len(modes) == 1:
+        return modes[0]
+
+    path = path if path else get_calibration_path()
+    exe_path = get_chrome_path(running_os=running_os)
+    if chrome_fingerprint(exe_path) is None:
+        # nothing to measure, launching fails the same way in every mode
+        return FALLBACK_MODE
+
+    # flock blocks, waiting for another process must not stall the loop
+    lock = await asyncio.get_event_loop().run_in_executor(None, lock_calibration, path)
+    try:
+        cached = None if recalibrate else load_calibration(path=path, exe_path=exe_path)
+        if cached in modes:
+            return cached
+
+        results = await calibrate_headless(
+            modes=modes, running_os=running_os, rounds=rounds
+        )
+        if not results:
+            logger.warning("no headless mode could be measured, not caching a winner")
+            return FALLBACK_MODE
+
+        winner = pick_winner(results)
+        save_calibration(path=path, exe_path=exe_path, mode=winner, results=results)
+        return winner
+    finally:
+        lock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure headless modes and cache the fastest for get_default_bot()"
+    )
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--path", default=None, help="calibration cache file")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.get_event_loop()
+    mode = loop.run_until_complete(
+        calibrate(rounds=args.rounds, path=args.path, recalibrate=True)
+    )
+    print(mode.value)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
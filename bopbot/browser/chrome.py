@@ -0,0 +1,116 @@
+import os
+import subprocess
+import psutil
+
+from pyppeteer import launcher
+from pyppeteer.browser import Browser
+from pyppeteer.connection import Connection
+
+from bopbot.browser.launcher import BrowserConfig
+
+
+class ChromeLauncher(launcher.Launcher):
+    def __init__(
+        self, chrome_config: BrowserConfig, loop=None,
+    ):
+        """
+        Parameters
+        ==========
+        chrome_config: BrowserConfig
+        loop: execution loop for chrome to use. If not set, launcher.Launcher creates one
+        """
+        options = chrome_config.chrome_launch_options()
+        if loop:
+            options["loop"] = loop
+        super().__init__(options=options)
+        # launcher.Launcher properties
+        self.autoClose = False
+        # custom properties for inheriting class
+        self.executable_path = chrome_config.exe_path
+        self.xvfb_headless = chrome_config.xvfb_headless
+        self.native_headless = chrome_config.native_headless
+
+    def _launch_cmd(self):
+        if self.xvfb_headless:
+            cmd = [
+                "xvfb-run",
+                "--auto-servernum",
+                "-e",
+                "/dev/stdout",
+                self.executable_path,
+            ]
+        elif self.native_headless:
+            cmd = [
+                self.executable_path,
+                "--headless",
+                "--disable-gpu",
+                "--hide-scrollbars",
+                "--mute-audio",
+            ]
+        else:
+            cmd = [self.executable_path]
+
+        return cmd + self.chromeArguments
+
+    async def launch_chrome(self):
+        self.chromeClosed = False
+        self.connection = None
+        self.proc = subprocess.Popen(
+            self._launch_cmd(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        # Signal handlers for exits used to be here
+        connectionDelay = self.slowMo
+        self.browserWSEndpoint = launcher.get_ws_endpoint(self.url)
+        self.connection = Connection(
+            self.browserWSEndpoint, self._loop, connectionDelay
+        )
+        return await Browser.create(
+            connection=self.connection,
+            contextIds=[],
+            ignoreHTTPSErrors=self.ignoreHTTPSErrors,
+            defaultViewport=self.defaultViewport,
+            process=self.proc,
+            closeCallBack=self.killChrome,
+        )
+
+    def xvfb_processes(self) -> [psutil.Process]:
+        """
+        Xvfb servers started by this launcher's xvfb-run, other bots on the
+        host run their own and must not be touched
+        """
+        try:
+            children = psutil.Process(self.proc.pid).children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return []
+        xvfb = []
+        for child in children:
+            try:
+                if child.name().lower() == "xvfb":
+                    xvfb.append(child)
+            except psutil.Error:
+                pass
+        return xvfb
+
+    def remove_xvfb_lock_file(self, process: psutil.Process):
+        try:
+            displays = [arg for arg in process.cmdline() if arg.startswith(":")]
+        except psutil.Error:
+            return
+        for display in displays:
+            lock_file = f"/tmp/.X{display[1:]}-lock"
+            if os.path.exists(lock_file):
+                os.remove(lock_file)
+
+    def kill_xvfb_process(self, processes: [psutil.Process]):
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.Error:
+                continue
+            self.remove_xvfb_lock_file(process)
+
+    async def close_chrome(self):
+        # looked up first, xvfb-run exits with Chrome and orphans its Xvfb
+        xvfb = self.xvfb_processes() if self.xvfb_headless else []
+        await self.killChrome()
+        self.kill_xvfb_process(xvfb)
@@ -1,10 +1,16 @@
 import asyncio
 import json
-from user_agent import generate_navigator_js
+from urllib.parse import urlsplit
 
-from bopbot.browser.launcher import BrowserConfig, ChromeLauncher
+from bopbot.browser.launcher import BrowserConfig
+from bopbot.browser.frames import FrameRegistry
+from bopbot.browser.handles import ElementHandleCache
+from bopbot.browser.replay import NetworkMode, get_network_handler
+from bopbot.browser.resources import ResourceController
 from bopbot.jsinject.navigator import get_default_user_agent
-from bopbot.jsinject.jslibs import NAVIGATOR_OVERRIDE, JQUERY_3_3_1
+from bopbot.jsinject.fingerprints import FingerprintCatalog, get_default_catalog
+from bopbot.jsinject import jslibs
+from bopbot.jsinject.scripts import CLEAR_SESSION_STORAGE
 from bopbot.browser.exceptions import PageError
 
 
@@ -15,6 +21,11 @@ class RawDriver:
         user_agent: str = None,
         animation_timeout=5000,
         pageload_timeout=30000,
+        fingerprints: FingerprintCatalog = None,
+        network_mode=NetworkMode.live,
+        network_archive: str = None,
+        resource_controller: ResourceController = None,
+        sample_viewport=False,
     ):
         """
         Parameters
@@ -22,13 +33,31 @@ class RawDriver:
         chrome_config: BrowserConfig
         animation_timeout: miliseconds to wait for JS animation to render
         user_agent: user agent to spoof request header and navigator with
-            - if not populated uses coded default with random chrome version
+            - if not populated uses coded default with random chrome version until
+              a navigator profile is sampled, then the profile's user agent
         pageload_timeout: amount of time we're willing to wait for page to load
+        fingerprints: catalog to sample navigator profiles from
+            - if not populated uses the process wide default catalog
+        network_mode: NetworkMode.record captures every response into network_archive,
+                      NetworkMode.replay serves requests from it without the network
+        network_archive: path of the archive used by the record/replay network modes
+        resource_controller: host level controller get_new_browser() waits on for a
+                             browser slot, the slot is released by close()
+        sample_viewport: If True, navigator profiles also set the page viewport
+                         when it fits chrome_config's browser_window, see PageManager
         """
         self.chrome_config = chrome_config
         self.user_agent = user_agent if user_agent else get_default_user_agent()
+        self.pin_user_agent = user_agent is not None
         self.animation_timeout = animation_timeout
         self.pageload_timeout = pageload_timeout
+        self.fingerprints = fingerprints
+        self.network_mode = network_mode
+        self.network_archive = network_archive
+        self.resource_controller = resource_controller
+        self.sample_viewport = sample_viewport
+        # whether a browser slot of resource_controller is held, released once
+        self.holds_browser_slot = False
         self.launcher = None
         self.browser = None
         self.page_manager = None
@@ -39,20 +68,72 @@ class RawDriver:
 
     @property
     def loop(self):
-        return self.launcher._loop
+        if self.launcher:
+            return self.launcher._loop
+        return asyncio.get_event_loop()
 
     async def get_new_browser(self):
-        self.launcher = ChromeLauncher(chrome_config=self.chrome_config)
-        self.browser = await self.launcher.launch_chrome()
+        # pyppeteer is loaded with the first browser, not when this module is imported
+        from bopbot.browser.chrome import ChromeLauncher
+
+        if self.resource_controller:
+            await self.resource_controller.browsers.acquire()
+            self.holds_browser_slot = True
+        try:
+            self.launcher = ChromeLauncher(chrome_config=self.chrome_config)
+            self.browser = await self.launcher.launch_chrome()
+        except Exception:
+            await self.release_resources()
+            raise
+        if self.resource_controller:
+            self.resource_controller.register_process(pid=self.launcher.proc.pid)
+        await self.set_page_manager()
+        return self.browser
+
+    async def release_resources(self):
+        if not self.holds_browser_slot:
+            return
+        self.holds_browser_slot = False
+        process = getattr(self.launcher, "proc", None)
+        if process:
+            self.resource_controller.unregister_process(pid=process.pid)
+        await self.resource_controller.browsers.release()
+
+    async def connect_browser(self, browser_ws_endpoint: str):
+        """
+        Attach to an already running browser instead of launching one
+
+        Parameters
+        ==========
+        browser_ws_endpoint: devtools websocket url, ws://<host>:<port>/devtools/browser/<id>
+        """
+        from pyppeteer import launcher
+
+        self.launcher = None
+        self.browser = await launcher.connect(
+            browserWSEndpoint=browser_ws_endpoint,
+            ignoreHTTPSErrors=True,
+            defaultViewport=self.chrome_config.browser_window.view_port,
+            logLevel="CRITICAL",
+        )
+        await self.set_page_manager()
+        return self.browser
+
+    async def set_page_manager(self):
         self.page_manager = PageManager(
             loop=self.loop,
             browser=self.browser,
             viewport=self.chrome_config.browser_window.view_port,
             user_agent=self.user_agent,
+            pin_user_agent=self.pin_user_agent,
             timeout=self.pageload_timeout,
+            fingerprints=self.fingerprints,
+            sample_viewport=self.sample_viewport,
+            network=get_network_handler(
+                mode=self.network_mode, archive_path=self.network_archive
+            ),
         )
         await self.page_manager.set_single_page()
-        return self.browser
 
     async def goto(self, url):
         """
@@ -60,17 +141,62 @@ class RawDriver:
         """
         await self.page_manager.goto(url)
 
+    async def reset_page(self, regenerate_navigator=False):
+        """
+        Cleans the current tab for the next job instead of opening a new one,
+        see PageManager.reset_page()
+        """
+        await self.page_manager.set_single_page(
+            reset=True, regenerate_navigator=regenerate_navigator
+        )
+
     async def close(self):
-        await self.launcher.close_chrome()
+        if self.page_manager:
+            await self.page_manager.flush_network()
+        if self.launcher:
+            try:
+                await self.launcher.close_chrome()
+            finally:
+                await self.release_resources()
+        else:
+            await self.browser.disconnect()
 
 
 class PageManager:
-    def __init__(self, loop, browser, viewport, user_agent, timeout):
+    def __init__(
+        self,
+        loop,
+        browser,
+        viewport,
+        user_agent,
+        timeout,
+        fingerprints: FingerprintCatalog = None,
+        network=None,
+        pin_user_agent=False,
+        sample_viewport=False,
+    ):
+        """
+        Parameters
+        ==========
+        viewport: page viewport, the size of the launched window
+        user_agent: user agent until a navigator profile is sampled
+        fingerprints: catalog navigator profiles are sampled from when cloaking.
+                      Defaults to the process wide get_default_catalog()
+        network: NetworkRecorder | NetworkReplayer attached to every new page,
+                 None leaves requests untouched
+        pin_user_agent: If True, user_agent is kept over the sampled profiles'
+                        user agents, which are consistent with their platform
+        sample_viewport: If True, a sampled profile's viewport replaces viewport
+                         when it fits in it. The window keeps its launch size, a
+                         larger viewport would report innerWidth > outerWidth
+        """
         self.loop = loop
         self.browser = browser
         self.page = None
         self.os = ("win", "mac", "linux")
         self.viewport = viewport
+        self.window_viewport = viewport
+        self.sample_viewport = sample_viewport
         self.navigator_defaults = {
             "userAgent": user_agent,
             "os": self.os,
@@ -83,7 +209,17 @@ class PageManager:
             "webdriver": False,
         }
         self.navigator_config = {}
+        self.pin_user_agent = pin_user_agent
         self.timeout = timeout
+        self.fingerprints = fingerprints
+        self.frames = FrameRegistry()
+        self.handles = ElementHandleCache()
+        self.network = network
+        # navigator injection source and its id on self.page, built once per
+        # navigator config and registered once per tab
+        self.injection = None
+        self.injection_id = None
+        self.visited_origins = set()
 
     @property
     def user_agent(self):
@@ -99,26 +235,76 @@ class PageManager:
         dump = json.dumps(self.navigator_config)
         _ = f"const _navigator = {dump};"
 
-        injection = "{\n%s\n%s\n%s}" % (JQUERY_3_3_1, _, NAVIGATOR_OVERRIDE)
-        await self.page.evaluateOnNewDocument(f"() => {injection}")
+        injection = "{\n%s\n%s\n%s}" % (
+            jslibs.JQUERY_3_3_1,
+            _,
+            jslibs.NAVIGATOR_OVERRIDE,
+        )
+        self.injection = f"(() => {injection})()"
+        await self.arm_navigator()
 
         if hard:
             await self.page.setUserAgent(self.user_agent)
             await self.sync_request_agent()
 
+    async def arm_navigator(self):
+        """
+        Registers the cached navigator injection to run on every new document
+        of self.page, replacing the one registered before so reused tabs never
+        stack overrides of different navigator configs
+        """
+        client = self.page._client
+        if self.injection_id:
+            await client.send(
+                "Page.removeScriptToEvaluateOnNewDocument",
+                {"identifier": self.injection_id},
+            )
+            self.injection_id = None
+        response = await client.send(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": self.injection}
+        )
+        self.injection_id = response.get("identifier")
+
+    def sample_navigator(self):
+        """
+        Samples a navigator profile into self.navigator_config, and into
+        self.viewport when sampling viewports
+        """
+        if self.fingerprints is None:
+            self.fingerprints = get_default_catalog()
+        profile = self.fingerprints.sample()
+        defaults = dict(self.navigator_defaults)
+        if not self.pin_user_agent:
+            defaults.pop("userAgent")
+        self.navigator_config = profile.navigator
+        self.navigator_config.update(defaults)
+        if self.sample_viewport and self.fits_window(profile.view_port):
+            self.viewport = profile.view_port
+
+    def fits_window(self, viewport: {}) -> bool:
+        window = self.window_viewport
+        if window is None:
+            return False
+        fits_width = viewport["width"] <= window["width"]
+        return fits_width and viewport["height"] <= window["height"]
+
     async def cloak_navigator(self):
         """
         Emulate another browser's navigator properties
         and set webdriver false, inject jQuery.
         """
-        self.navigator_config = generate_navigator_js(os=self.os, navigator=("chrome"))
-        self.navigator_config.update(self.navigator_defaults)
-        await self.resync_navigator()
+        self.sample_navigator()
+        await asyncio.gather(
+            self.resync_navigator(hard=True), self.page.setViewport(self.viewport)
+        )
 
     async def goto(self, url, regenerate_navigator=False):
         if not self.navigator_config or regenerate_navigator:
             await self.cloak_navigator()
+        elif self.injection_id is None:
+            await self.arm_navigator()
         await self.page.setUserAgent(self.user_agent)
+        self.visited_origins.add(get_origin(url))
         try:
             await self.loop.create_task(
                 self.page.goto(url, timeout=self.timeout, waitUntil="domcontentloaded")
@@ -133,18 +319,101 @@ class PageManager:
         Creates a new tab and sets it as the "context" page (self.page)
         """
         self.page = await self.browser.newPage()
+        self.injection_id = None
+        self.frames.attach(self.page)
+        self.handles.attach(self.page)
+        if self.network:
+            await self.network.attach(self.page)
         if self.viewport:
             await self.page.setViewport(self.viewport)
         await self.sync_request_agent()
 
-    async def set_single_page(self):
+    async def flush_network(self):
+        """
+        Writes recorded responses to the network archive, no-op unless recording
+        """
+        if self.network:
+            await self.network.flush()
+
+    async def reset_page(self, regenerate_navigator=False):
+        """
+        Returns self.page to a clean state without paying for a new tab:
+        navigates to about:blank, clears cookies and the storage of every
+        origin visited since the last reset, resets emulation to the page
+        viewport and the profile's user agent and re-arms the navigator injection.
+        The HTTP cache is kept on purpose, it is part of what makes a reused
+        tab cheaper than a new one.
+        - NOTE: sessionStorage is not part of Storage.clearDataForOrigin, it is
+                cleared for the page's current origin before leaving it. The
+                sessionStorage of other origins the tab navigated away from
+                during the job survives, use a new tab when jobs rely on it.
+
+        Parameters
+        ==========
+        regenerate_navigator: If True, samples a new navigator profile for the next job
+        """
+        origin = get_origin(self.page.url)
+        if origin:
+            self.visited_origins.add(origin)
+            await self.page.evaluate(CLEAR_SESSION_STORAGE)
+        await self.page.goto("about:blank")
+        self.handles.clear()
+
+        # independent commands are pipelined, a reset costs about one round trip
+        if regenerate_navigator or not self.navigator_config:
+            self.sample_navigator()
+            arm = self.resync_navigator()
+        else:
+            arm = self.arm_navigator()
+
+        client = self.page._client
+        commands = [
+            client.send("Network.clearBrowserCookies"),
+            client.send("Emulation.clearGeolocationOverride"),
+            client.send("Emulation.setEmulatedMedia", {"media": ""}),
+            self.page.setUserAgent(self.user_agent),
+            self.sync_request_agent(),
+        ]
+        commands += [
+            client.send(
+                "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+            )
+            for origin in self.visited_origins - {None}
+        ]
+        if self.viewport:
+            commands.append(self.page.setViewport(self.viewport))
+        commands.append(arm)
+        await asyncio.gather(*commands)
+        self.visited_origins.clear()
+
+    async def set_single_page(self, reset=False, regenerate_navigator=False):
         """
         Used for making sure the only open page is one we
         create having the desired dimensions, and js vars
+
+        Parameters
+        ==========
+        reset: If True and a page is open, it is cleaned through self.reset_page()
+               and kept instead of being replaced by a new tab
+        regenerate_navigator: forwarded to self.reset_page()
         """
-        await self.set_newpage()
+        if reset and self.page and not self.page.isClosed():
+            await self.reset_page(regenerate_navigator=regenerate_navigator)
+        else:
+            await self.set_newpage()
         pages = await self.browser.pages()
-        # we assume that whenever a new page is created, it's the last one
-        page_count = len(pages)
-        for cur_pg in range(page_count - 1):
-            await pages[cur_pg].close()
+        for page in pages:
+            if page is not self.page:
+                await page.close()
+
+
+def get_origin(url: str) -> str:
+    """
+    Returns
+    =======
+    scheme://host[:port] of an http(s) url, None for about:, data:, .. urls
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
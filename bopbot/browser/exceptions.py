@@ -6,3 +6,15 @@ class PageError(Exception):
     """Raised when loading page times out"""
 
     pass
+
+
+class NetworkArchiveError(Exception):
+    """Raised when a network archive is missing or cannot be read"""
+
+    pass
+
+
+class ResourceBudgetError(Exception):
+    """Raised when a resource budget is configured with inconsistent limits"""
+
+    pass
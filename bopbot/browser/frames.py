@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from bopbot.dom.elements import LabeledSelector
+
+if TYPE_CHECKING:
+    from pyppeteer.frame_manager import Frame
+
+
+class FrameRegistry:
+    """
+    Index of a page's frames kept in sync through the page's frameattached,
+    framenavigated and framedetached events. Lookups by name and url are dict
+    hits, url pattern and iframe selector lookups are resolved once and cached
+    until the frame tree changes.
+    """
+
+    def __init__(self):
+        self.page = None
+        self._frame_keys = {}
+        self._by_name = {}
+        self._by_url = {}
+        self._by_pattern = {}
+        self._by_selector = {}
+
+    @property
+    def frames(self) -> [Frame]:
+        return list(self._frame_keys)
+
+    def attach(self, page):
+        """
+        Starts following frame events of page, dropping any previously followed page
+        """
+        self.detach()
+        self.page = page
+        for frame in page.frames:
+            self._index(frame)
+        page.on("frameattached", self._index)
+        page.on("framenavigated", self._on_navigated)
+        page.on("framedetached", self._on_detached)
+
+    def detach(self):
+        if self.page:
+            self.page.remove_listener("frameattached", self._index)
+            self.page.remove_listener("framenavigated", self._on_navigated)
+            self.page.remove_listener("framedetached", self._on_detached)
+        self.page = None
+        self._frame_keys.clear()
+        self._by_name.clear()
+        self._by_url.clear()
+        self._by_pattern.clear()
+        self._by_selector.clear()
+
+    def _index(self, frame: Frame):
+        self._frame_keys[frame] = (frame.name, frame.url)
+        if frame.name:
+            self._by_name[frame.name] = frame
+        if frame.url:
+            self._by_url[frame.url] = frame
+        self._by_pattern.clear()
+
+    def _unindex(self, frame: Frame):
+        name, url = self._frame_keys.pop(frame, ("", ""))
+        if self._by_name.get(name) is frame:
+            del self._by_name[name]
+        if self._by_url.get(url) is frame:
+            del self._by_url[url]
+        self._by_pattern.clear()
+        for selector, indexed_frame in list(self._by_selector.items()):
+            if indexed_frame is frame:
+                del self._by_selector[selector]
+
+    def _on_navigated(self, frame: Frame):
+        self._unindex(frame)
+        self._index(frame)
+        if frame.parentFrame is None:
+            # main document changed, iframe elements resolved by selector are gone
+            self._by_selector.clear()
+
+    def _on_detached(self, frame: Frame):
+        self._unindex(frame)
+
+    def by_name(self, name: str) -> Frame:
+        return self._by_name.get(name)
+
+    def by_url(self, url: str) -> Frame:
+        return self._by_url.get(url)
+
+    def by_url_pattern(self, pattern: str) -> Frame:
+        """
+        First frame whose url matches the regex pattern (re.search semantics)
+        """
+        if pattern not in self._by_pattern:
+            matcher = re.compile(pattern)
+            self._by_pattern[pattern] = next(
+                (
+                    frame
+                    for frame, (_, url) in self._frame_keys.items()
+                    if matcher.search(url)
+                ),
+                None,
+            )
+
+        return self._by_pattern[pattern]
+
+    async def by_selector(self, elem: LabeledSelector) -> Frame:
+        """
+        Frame rendered by the iframe element elem points to. The element is only
+        queried on first lookup, or after the frame or main document changes.
+        """
+        selector = elem.to_str()
+        frame = self._by_selector.get(selector)
+        if frame is None or frame.isDetached():
+            handle = await self.page.querySelector(selector)
+            if handle is None:
+                return None
+            frame = await handle.contentFrame()
+            await handle.dispose()
+            if frame is None:
+                return None
+            self._by_selector[selector] = frame
+
+        return frame
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from bopbot.dom.elements import LabeledSelector
+
+if TYPE_CHECKING:
+    from pyppeteer.frame_manager import Frame
+    from pyppeteer.element_handle import ElementHandle
+
+
+class ElementHandleCache:
+    """
+    Per-page cache of resolved ElementHandles keyed by selector string and frame.
+    Cached handles are dropped when their frame navigates or detaches, and
+    optionally checked with a single isConnected call before reuse.
+
+    An uncached page.click(selector) costs querySelector + click + dispose of
+    the handle. A cache hit costs the click only, so it saves both the
+    querySelector and the dispose. A validated hit costs isConnected + click,
+    as many round trips as the uncached click, which is why validation is
+    opt-in: turn it on for pages that replace elements without navigating
+    (client side rendered apps), where a trusted handle can be detached.
+
+    Handles evicted while their document is alive (disconnected or invalidated)
+    are disposed, so they do not pin detached DOM in the page. Handles dropped on
+    navigation/detach are not, their execution context already released them.
+    """
+
+    is_connected_js = "function() { return this.isConnected; }"
+
+    def __init__(self, validate=False):
+        """
+        Parameters
+        ==========
+        validate: If True, cached handles are checked with isConnected before reuse.
+                  If False, handles are trusted until navigation/detach invalidates them.
+        """
+        self.validate = validate
+        self.page = None
+        self.hits = 0
+        self.misses = 0
+        self._handles = {}
+
+    def attach(self, page):
+        """
+        Starts following navigation events of page, dropping any previously cached handles
+        """
+        self.detach()
+        self.page = page
+        page.on("framenavigated", self.invalidate_frame)
+        page.on("framedetached", self.invalidate_frame)
+
+    def detach(self):
+        if self.page:
+            self.page.remove_listener("framenavigated", self.invalidate_frame)
+            self.page.remove_listener("framedetached", self.invalidate_frame)
+        self.page = None
+        self.clear()
+
+    def clear(self):
+        self._handles.clear()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def invalidate_frame(self, frame: Frame):
+        if frame.parentFrame is None:
+            # main document was replaced, every cached handle is stale
+            self.clear()
+            return
+
+        for key in [key for key in self._handles if key[0] is frame]:
+            del self._handles[key]
+
+    def invalidate(self, elem: LabeledSelector, frame: Frame = None):
+        handle = self._handles.pop((frame, elem.to_str()), None)
+        if handle is not None:
+            asyncio.ensure_future(self.dispose(handle))
+
+    async def dispose(self, handle: ElementHandle):
+        try:
+            await handle.dispose()
+        except Exception:
+            # the page or the handle's execution context is already gone
+            pass
+
+    async def is_connected(self, handle: ElementHandle) -> bool:
+        try:
+            response = await handle._client.send(
+                "Runtime.callFunctionOn",
+                {
+                    "functionDeclaration": self.is_connected_js,
+                    "objectId": handle._remoteObject.get("objectId"),
+                    "returnByValue": True,
+                },
+            )
+        except Exception:
+            return False
+
+        return response.get("result", {}).get("value") is True
+
+    async def get(self, elem: LabeledSelector, frame: Frame = None) -> ElementHandle:
+        """
+        Parameters
+        ==========
+        elem: selector to resolve
+        frame: iframe to resolve elem in. If None, elem is resolved in self.page
+
+        Returns
+        =======
+        ElementHandle for elem or None if the selector matches nothing
+        """
+        key = (frame, elem.to_str())
+        handle = self._handles.get(key)
+        stale = []
+        if handle is not None:
+            if not self.validate or await self.is_connected(handle):
+                self.hits += 1
+                return handle
+            del self._handles[key]
+            # released in the same round trip as the new query
+            stale.append(self.dispose(handle))
+
+        self.misses += 1
+        handle, *_ = await asyncio.gather(
+            (frame or self.page).querySelector(key[1]), *stale
+        )
+        if handle is not None:
+            self._handles[key] = handle
+
+        return handle
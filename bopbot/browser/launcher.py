@@ -1,16 +1,8 @@
-import asyncio
 from enum import Enum
 import random
 import os
-import subprocess
-import glob
-import psutil
 import platform
 
-from pyppeteer import launcher
-from pyppeteer.browser import Browser
-from pyppeteer.connection import Connection
-
 from bopbot.browser.exceptions import BrowserSetupError
 
 
@@ -49,6 +41,64 @@ def identify_running_os():
         raise BrowserSetupError(f"detected OS {detected_os} is not supported")
 
 
+class LaunchProfile(Enum):
+    # the flags bopbot always used
+    default = "default"
+    # fewer processes and smaller caches and heaps, for more browsers per host.
+    # The JS heap cap can crash heavy single page apps, benchmark before using it
+    dense = "dense"
+    # software raster without GPU process and no background work, for launch
+    # and render latency
+    fast = "fast"
+
+
+# extra flags per profile, added after the default ones
+PROFILE_ARGS = {
+    LaunchProfile.default: [],
+    LaunchProfile.dense: [
+        "--renderer-process-limit=2",
+        "--process-per-site",
+        "--disable-site-isolation-trials",
+        "--aggressive-cache-discard",
+        "--disk-cache-size=1048576",
+        "--media-cache-size=1048576",
+        "--js-flags=--max-old-space-size=256",
+        "--disable-gpu",
+        "--disable-software-rasterizer",
+    ],
+    LaunchProfile.fast: [
+        "--disable-gpu",
+        "--disable-gpu-rasterization",
+        "--disable-backgrounding-occluded-windows",
+        "--disable-renderer-backgrounding",
+        "--disable-component-update",
+        "--disable-domain-reliability",
+        "--disable-breakpad",
+        "--no-pings",
+        "--no-default-browser-check",
+    ],
+}
+# Chrome keeps only the last --disable-features flag, so features of every
+# profile are merged into one
+PROFILE_DISABLED_FEATURES = {
+    LaunchProfile.default: ["site-per-process"],
+    LaunchProfile.dense: [
+        "site-per-process",
+        "IsolateOrigins",
+        "BackForwardCache",
+        "AudioServiceOutOfProcess",
+        "SpareRendererForSitePerProcess",
+    ],
+    LaunchProfile.fast: [
+        "site-per-process",
+        "Translate",
+        "OptimizationHints",
+        "MediaRouter",
+        "InterestFeedContentSuggestions",
+    ],
+}
+
+
 class BrowserWindow:
     def __init__(
         self, width=1200, height=800, use_size_buffer=True,
@@ -119,6 +169,7 @@ class BrowserConfig:
         devtools=False,
         native_headless=False,
         xvfb_headless=False,
+        launch_profile=LaunchProfile.default,
     ):
         """
         Parameters
@@ -126,6 +177,8 @@ class BrowserConfig:
         running_os: OS we're executing the bopbot on
         browser_window: browser window dimensions
         devtools: if true, we open browser's JS developer console
+        launch_profile: LaunchProfile picking Chrome flags tuned for density or
+                        speed, `python -m bopbot.benchmarks.profiles` measures them
         """
         self.running_os = running_os if running_os else identify_running_os()
         self.browser_window = browser_window
@@ -133,6 +186,7 @@ class BrowserConfig:
         self.devtools = devtools
         self.native_headless = native_headless
         self.xvfb_headless = xvfb_headless
+        self.launch_profile = launch_profile
         self.validate_headless()
         self.browser_profile_path = "browserData"
         create_path(path=self.browser_profile_path)
@@ -151,6 +205,10 @@ class BrowserConfig:
     def slow_down(self) -> int:
         return random.randint(1, 3)
 
+    def disabled_features_arg(self) -> str:
+        features = ",".join(PROFILE_DISABLED_FEATURES[self.launch_profile])
+        return f"--disable-features={features}"
+
     def default_args(self) -> []:
         process_args = [
             '--cryptauth-http-host ""',
@@ -163,7 +221,7 @@ class BrowserConfig:
             "--disable-dev-shm-usage",
             "--disable-device-discovery-notifications",
             "--disable-extensions",
-            "--disable-features=site-per-process",
+            self.disabled_features_arg(),
             "--disable-hang-monitor",
             "--disable-java",
             "--disable-popup-blocking",
@@ -182,6 +240,7 @@ class BrowserConfig:
             "--enable-features=NetworkService",
             self.browser_window.as_arg_option(),
         ]
+        process_args.extend(PROFILE_ARGS[self.launch_profile])
         if self.running_os == SupportedOS.linux:
             process_args.append("--no-sandbox")
 
@@ -207,87 +266,11 @@ class BrowserConfig:
         }
 
 
-class ChromeLauncher(launcher.Launcher):
-    def __init__(
-        self, chrome_config: BrowserConfig, loop=None,
-    ):
-        """
-        Parameters
-        ==========
-        chrome_config: BrowserConfig
-        loop: execution loop for chrome to use. If not set, launcher.Launcher creates one
-        """
-        options = chrome_config.chrome_launch_options()
-        if loop:
-            options["loop"] = loop
-        super().__init__(options=options)
-        # launcher.Launcher properties
-        self.autoClose = False
-        # custom properties for inheriting class
-        self.executable_path = chrome_config.exe_path
-        self.xvfb_headless = chrome_config.xvfb_headless
-        self.native_headless = chrome_config.native_headless
-
-    def _launch_cmd(self):
-        if self.xvfb_headless:
-            cmd = [
-                "xvfb-run",
-                "--auto-servernum",
-                "-e",
-                "/dev/stdout",
-                self.executable_path,
-            ]
-        elif self.native_headless:
-            cmd = [
-                self.executable_path,
-                "--headless",
-                "--disable-gpu",
-                "--hide-scrollbars",
-                "--mute-audio",
-            ]
-        else:
-            cmd = [self.executable_path]
-
-        return cmd + self.chromeArguments
-
-    async def launch_chrome(self):
-        self.chromeClosed = False
-        self.connection = None
-        self.proc = subprocess.Popen(
-            self._launch_cmd(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT
-        )
-        # Signal handlers for exits used to be here
-        connectionDelay = self.slowMo
-        self.browserWSEndpoint = launcher.get_ws_endpoint(self.url)
-        self.connection = Connection(
-            self.browserWSEndpoint, self._loop, connectionDelay
-        )
-        return await Browser.create(
-            connection=self.connection,
-            contextIds=[],
-            ignoreHTTPSErrors=self.ignoreHTTPSErrors,
-            defaultViewport=self.defaultViewport,
-            process=self.proc,
-            closeCallBack=self.killChrome,
-        )
+def __getattr__(name: str):
+    # ChromeLauncher subclasses pyppeteer's Launcher, it is imported from
+    # bopbot.browser.chrome on first use so building configs stays pyppeteer free
+    if name == "ChromeLauncher":
+        from bopbot.browser.chrome import ChromeLauncher
 
-    def remove_xvfb_lock_file(self):
-        lock_file_query = "/tmp/.X*-lock"
-        lock_files_found = glob.glob(lock_file_query)
-        for lock_file in lock_files_found:
-            os.remove(lock_file)
-
-    def kill_xvfb_process(self):
-        process_name = "xvfb"
-        existing_pids = psutil.pids()
-        for pid in existing_pids:
-            process = psutil.Process(pid)
-            if process.name().lower() == process_name:
-                process.kill()
-                self.remove_xvfb_lock_file()
-                break
-
-    async def close_chrome(self):
-        await self.killChrome()
-        if self.xvfb_headless:
-            self.kill_xvfb_process()
+        return ChromeLauncher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
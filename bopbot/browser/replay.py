@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import os
+import json
+import asyncio
+import hashlib
+import zipfile
+from enum import Enum
+from typing import TYPE_CHECKING
+from urllib.parse import urldefrag
+
+from bopbot.browser.exceptions import NetworkArchiveError
+
+if TYPE_CHECKING:
+    from pyppeteer.network_manager import Request, Response
+
+
+class NetworkMode(Enum):
+    live = "live"  # requests go to the network untouched
+    record = "record"  # responses are captured into a NetworkArchive
+    replay = "replay"  # requests are fulfilled from a NetworkArchive
+
+
+# headers describing the transfer rather than the content, the archive stores
+# decoded bodies so replaying them would corrupt the response
+TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def request_key(method: str, url: str, post_data: str = None) -> str:
+    """
+    Archive index key of a request. Fragments never reach the server so they
+    are dropped, bodies of POST/PUT requests are part of the key.
+    """
+    key = f"{method.upper()} {urldefrag(url)[0]}"
+    if post_data:
+        key = f"{key} {hashlib.sha1(post_data.encode()).hexdigest()}"
+
+    return key
+
+
+class NetworkArchive:
+    """
+    Zip file holding an index.json of recorded responses (status, headers)
+    and their bodies. Bodies are stored compressed once per distinct content
+    under bodies/<sha1> and only read from disk when a request asks for them.
+    """
+
+    index_name = "index.json"
+    version = 1
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ==========
+        path: location of the archive, it is only read/written on self.load()/self.save()
+        """
+        self.path = path
+        self.entries = {}
+        self._bodies = {}
+        self._zip = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key: str):
+        return key in self.entries
+
+    def add(self, key: str, url: str, status: int, headers: {}, body: bytes) -> bool:
+        """
+        Stores a response, the first response recorded for a key wins
+        so repeated requests replay what the page saw first
+
+        Returns
+        =======
+        True if the response was stored
+        """
+        if key in self.entries:
+            return False
+
+        digest = hashlib.sha1(body).hexdigest()
+        self._bodies.setdefault(digest, body)
+        self.entries[key] = {
+            "url": url,
+            "status": status,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in TRANSFER_HEADERS
+            },
+            "body": digest,
+        }
+        return True
+
+    def get(self, key: str) -> {}:
+        """
+        Returns
+        =======
+        {"url", "status", "headers", "body": bytes} or None if key was not recorded
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        return dict(entry, body=self.read_body(digest=entry["body"]))
+
+    def read_body(self, digest: str) -> bytes:
+        if digest not in self._bodies:
+            self._bodies[digest] = self._zip.read(f"bodies/{digest}")
+        return self._bodies[digest]
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise NetworkArchiveError(f"network archive [{self.path}] does not exist")
+
+        self.close()
+        self._zip = zipfile.ZipFile(self.path)
+        try:
+            index = json.loads(self._zip.read(self.index_name))
+        except (KeyError, ValueError) as ex:
+            raise NetworkArchiveError(f"[{self.path}] is not a network archive: {ex}")
+        if index.get("version") != self.version:
+            raise NetworkArchiveError(
+                f"[{self.path}] has unsupported version {index.get('version')}"
+            )
+        self.entries = index["entries"]
+        self._bodies = {}
+        return self
+
+    def save(self):
+        """
+        Writes the archive next to self.path first and then moves it in place,
+        so an interrupted save never leaves a truncated archive behind
+        """
+        for entry in self.entries.values():
+            self.read_body(digest=entry["body"])
+
+        temp_path = f"{self.path}.tmp"
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as fl:
+            index = {"version": self.version, "entries": self.entries}
+            fl.writestr(self.index_name, json.dumps(index, separators=(",", ":")))
+            for digest, body in self._bodies.items():
+                fl.writestr(f"bodies/{digest}", body)
+        self.close()
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+            self._zip = None
+
+
+class NetworkRecorder:
+    """
+    Captures every response a page receives into a NetworkArchive
+    """
+
+    def __init__(self, archive: NetworkArchive):
+        self.archive = archive
+        self.page = None
+        self._pending = set()
+
+    async def attach(self, page):
+        self.detach()
+        self.page = page
+        page.on("response", self.on_response)
+
+    def detach(self):
+        if self.page:
+            self.page.remove_listener("response", self.on_response)
+        self.page = None
+
+    def on_response(self, response: Response):
+        task = asyncio.ensure_future(self.record(response=response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def record(self, response: Response):
+        request = response.request
+        if request.url.startswith("data:"):
+            return
+
+        try:
+            body = await response.buffer()
+        except Exception:
+            # redirects and aborted requests have no body to fetch
+            body = b""
+        self.archive.add(
+            key=request_key(request.method, request.url, request.postData),
+            url=request.url,
+            status=response.status,
+            headers=response.headers,
+            body=body,
+        )
+
+    async def flush(self):
+        """
+        Waits for in flight bodies and writes the archive to disk
+        """
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        self.archive.save()
+
+
+class NetworkReplayer:
+    """
+    Fulfills a page's requests from a NetworkArchive through request interception
+    """
+
+    def __init__(self, archive: NetworkArchive, allow_network=False):
+        """
+        Parameters
+        ==========
+        archive: loaded archive responses are served from
+        allow_network: If True, requests missing from the archive go to the network.
+                       If False, they are aborted so replays never leave the machine.
+        """
+        self.archive = archive
+        self.allow_network = allow_network
+        self.page = None
+        self.hits = 0
+        self.misses = 0
+
+    async def attach(self, page):
+        self.detach()
+        self.page = page
+        await page.setRequestInterception(True)
+        page.on("request", self.on_request)
+
+    def detach(self):
+        if self.page:
+            self.page.remove_listener("request", self.on_request)
+        self.page = None
+
+    def on_request(self, request: Request):
+        asyncio.ensure_future(self.fulfill(request=request))
+
+    async def fulfill(self, request: Request):
+        if request.url.startswith("data:"):
+            await request.continue_()
+            return
+
+        entry = self.archive.get(
+            key=request_key(request.method, request.url, request.postData)
+        )
+        if entry:
+            self.hits += 1
+            await request.respond(
+                {
+                    "status": entry["status"],
+                    "headers": entry["headers"],
+                    "body": entry["body"],
+                }
+            )
+            return
+
+        self.misses += 1
+        if self.allow_network:
+            await request.continue_()
+        else:
+            await request.abort("internetdisconnected")
+
+    async def flush(self):
+        pass
+
+
+def get_network_handler(mode: NetworkMode, archive_path: str = None):
+    """
+    Returns
+    =======
+    NetworkRecorder | NetworkReplayer for mode, None for NetworkMode.live
+    """
+    if mode == NetworkMode.live:
+        return None
+    if not archive_path:
+        raise NetworkArchiveError(f"network mode [{mode.value}] needs an archive path")
+    if mode == NetworkMode.record:
+        return NetworkRecorder(archive=NetworkArchive(path=archive_path))
+
+    return NetworkReplayer(archive=NetworkArchive(path=archive_path).load())
@@ -0,0 +1,279 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from bopbot.browser.exceptions import ResourceBudgetError
+
+
+logger = logging.getLogger(__name__)
+
+
+class HostSample:
+    """
+    Host usage at one point in time, percentages are 0-100
+    """
+
+    __slots__ = ("cpu_percent", "memory_percent", "chrome_rss")
+
+    def __init__(self, cpu_percent: float, memory_percent: float, chrome_rss=0):
+        self.cpu_percent = cpu_percent
+        self.memory_percent = memory_percent
+        self.chrome_rss = chrome_rss
+
+
+def process_tree_rss(pids: [int]) -> int:
+    """
+    Resident memory in bytes of the processes in pids and all their children
+    (Chrome renderer, GPU and utility processes). Exited processes count as 0.
+    """
+    import psutil
+
+    rss = 0
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            tree = [process] + process.children(recursive=True)
+        except psutil.Error:
+            continue
+        for member in tree:
+            try:
+                rss += member.memory_info().rss
+            except psutil.Error:
+                pass
+
+    return rss
+
+
+def sample_host(pids: [int]) -> HostSample:
+    """
+    psutil backed sampler used by ResourceController. cpu_percent is measured
+    since the previous call, so the first sample of a process reads 0.
+    """
+    import psutil
+
+    return HostSample(
+        cpu_percent=psutil.cpu_percent(interval=None),
+        memory_percent=psutil.virtual_memory().percent,
+        chrome_rss=process_tree_rss(pids=pids),
+    )
+
+
+class Budget:
+    """
+    AIMD limited pool of slots: the limit grows by one while the host has
+    headroom and slots are in demand, and is cut by decrease_factor under pressure
+    """
+
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int):
+        if not minimum <= initial <= maximum:
+            raise ResourceBudgetError(
+                f"{name} budget needs minimum <= initial <= maximum, "
+                f"got {minimum}, {initial}, {maximum}"
+            )
+        self.name = name
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_use = 0
+        self.waiting = 0
+        self._condition = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # created lazily so the budget binds to the loop that first uses it
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @property
+    def saturated(self) -> bool:
+        return self.waiting > 0 or self.in_use >= self.limit
+
+    async def acquire(self):
+        async with self.condition:
+            self.waiting += 1
+            try:
+                await self.condition.wait_for(lambda: self.in_use < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_use += 1
+
+    async def release(self):
+        async with self.condition:
+            self.in_use = max(0, self.in_use - 1)
+            self.condition.notify()
+
+    async def set_limit(self, limit: int):
+        limit = max(self.minimum, min(self.maximum, limit))
+        async with self.condition:
+            if limit > self.limit:
+                self.condition.notify(limit - self.limit)
+            self.limit = limit
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+class ResourceController:
+    """
+    Host level admission control for browsers and tabs. A background task
+    samples CPU, memory and the registered Chrome process trees every interval
+    and adjusts both budgets AIMD style:
+    - any threshold exceeded: limits are multiplied by decrease_factor
+    - headroom below every threshold and a saturated budget: its limit grows by 1
+
+    Usage:
+        controller = ResourceController()
+        await controller.start()
+        driver = RawDriver(chrome_config=config, resource_controller=controller)
+        await driver.get_new_browser()  # waits for a browser slot
+        controller.limits  # {"browsers": 3, "tabs": 12, ..}
+
+    RawDriver only takes browser slots. The tabs budget is not acquired by
+    bopbot, code opening tabs of its own takes a slot per tab:
+        async with controller.tab_slot():
+            page = await driver.browser.newPage()
+            ..
+    """
+
+    def __init__(
+        self,
+        max_browsers: int = None,
+        max_tabs: int = None,
+        initial_browsers=1,
+        initial_tabs=4,
+        cpu_high=85.0,
+        memory_high=85.0,
+        chrome_rss_high: int = None,
+        headroom=10.0,
+        decrease_factor=0.5,
+        interval=2.0,
+        sampler=None,
+    ):
+        """
+        Parameters
+        ==========
+        max_browsers: browser limit ceiling, defaults to the host's cpu count
+        max_tabs: tab limit ceiling, defaults to 4 tabs per max_browsers
+        initial_browsers/initial_tabs: limits before the first adjustment
+        cpu_high: cpu percent above which limits are decreased
+        memory_high: host memory percent above which limits are decreased
+        chrome_rss_high: bytes of Chrome process tree memory above which limits
+                         are decreased, None disables the check
+        headroom: percent points below cpu_high/memory_high required to increase
+        decrease_factor: multiplicative decrease applied under pressure
+        interval: seconds between samples
+        sampler: callable(pids) -> HostSample, defaults to psutil through sample_host
+        """
+        max_browsers = max_browsers if max_browsers else os.cpu_count() or 1
+        max_tabs = max_tabs if max_tabs else 4 * max_browsers
+        self.browsers = Budget(
+            name="browsers", initial=initial_browsers, minimum=1, maximum=max_browsers
+        )
+        self.tabs = Budget(
+            name="tabs", initial=initial_tabs, minimum=1, maximum=max_tabs
+        )
+        self.cpu_high = cpu_high
+        self.memory_high = memory_high
+        self.chrome_rss_high = chrome_rss_high
+        self.headroom = headroom
+        self.decrease_factor = decrease_factor
+        self.interval = interval
+        self.sampler = sampler if sampler else sample_host
+        self.pids = set()
+        self.last_sample = None
+        self._task = None
+
+    @property
+    def limits(self) -> {}:
+        limits = {
+            "browsers": self.browsers.limit,
+            "browsers_in_use": self.browsers.in_use,
+            "tabs": self.tabs.limit,
+            "tabs_in_use": self.tabs.in_use,
+        }
+        if self.last_sample:
+            limits.update(
+                cpu_percent=self.last_sample.cpu_percent,
+                memory_percent=self.last_sample.memory_percent,
+                chrome_rss=self.last_sample.chrome_rss,
+            )
+        return limits
+
+    def register_process(self, pid: int):
+        """
+        Adds a Chrome root process whose tree memory is watched
+        """
+        self.pids.add(pid)
+
+    def unregister_process(self, pid: int):
+        self.pids.discard(pid)
+
+    def browser_slot(self):
+        return self.browsers.slot()
+
+    def tab_slot(self):
+        return self.tabs.slot()
+
+    def under_pressure(self, sample: HostSample) -> bool:
+        chrome_rss_high = self.chrome_rss_high
+        return any(
+            (
+                sample.cpu_percent > self.cpu_high,
+                sample.memory_percent > self.memory_high,
+                chrome_rss_high is not None and sample.chrome_rss > chrome_rss_high,
+            )
+        )
+
+    def has_headroom(self, sample: HostSample) -> bool:
+        return all(
+            (
+                sample.cpu_percent < self.cpu_high - self.headroom,
+                sample.memory_percent < self.memory_high - self.headroom,
+            )
+        )
+
+    async def adjust(self, sample: HostSample):
+        """
+        Applies one AIMD step to both budgets from sample
+        """
+        self.last_sample = sample
+        for budget in (self.browsers, self.tabs):
+            if self.under_pressure(sample=sample):
+                await budget.set_limit(int(budget.limit * self.decrease_factor))
+            elif self.has_headroom(sample=sample) and budget.saturated:
+                await budget.set_limit(budget.limit + 1)
+
+    async def step(self):
+        loop = asyncio.get_event_loop()
+        # psutil calls block, keep them off the loop driving the browsers
+        sample = await loop.run_in_executor(None, self.sampler, list(self.pids))
+        await self.adjust(sample=sample)
+
+    async def run(self):
+        while True:
+            try:
+                await self.step()
+            except Exception:
+                # a failed sample must not freeze the limits for good
+                logger.exception("resource sampling failed, keeping current limits")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,75 @@
+import math
+from hashlib import blake2b
+
+from bopbot.crawl.exceptions import FrontierError
+
+
+class BloomFilter:
+    """
+    Fixed size set membership test: memory depends on capacity and error_rate
+    only, never on the number of added keys. Keys are never reported missing
+    once added, but up to error_rate of never added keys are reported present
+    (for a crawl frontier: that share of new urls is skipped as seen).
+    10 million keys at a 0.1% error rate take ~18MB.
+    """
+
+    def __init__(self, capacity: int, error_rate=0.001, bits: bytes = None, count=0):
+        """
+        Parameters
+        ==========
+        capacity: number of keys the error_rate holds for, more keys raise it
+        error_rate: false positive probability at capacity, 0 - 1
+        bits: filter state from self.to_bytes(), starts empty when None
+        count: number of keys added to bits
+        """
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise FrontierError(
+                f"bloom filter needs capacity > 0 and 0 < error_rate < 1, "
+                f"got {capacity}, {error_rate}"
+            )
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        nbytes = (self.size + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise FrontierError(
+                f"bloom filter state has {len(bits)} bytes, {nbytes} expected"
+            )
+        self.bits = bytearray(bits) if bits is not None else bytearray(nbytes)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def positions(self, key: str):
+        # double hashing, two 64 bit halves of one digest make every position
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * step) % self.size for index in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[bit >> 3] & (1 << (bit & 7)) for bit in self.positions(key))
+
+    def add(self, key: str) -> bool:
+        """
+        Returns
+        =======
+        True if key was not in the filter before (it may be a false positive otherwise)
+        """
+        bits = self.bits
+        added = False
+        for bit in self.positions(key):
+            mask = 1 << (bit & 7)
+            if not bits[bit >> 3] & mask:
+                bits[bit >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+        return added
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
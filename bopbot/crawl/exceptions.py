@@ -0,0 +1,4 @@
+class FrontierError(Exception):
+    """Raised when a crawl frontier is configured or used inconsistently"""
+
+    pass
@@ -0,0 +1,445 @@
+import time
+import asyncio
+import sqlite3
+from enum import Enum
+from hashlib import blake2b
+
+from bopbot.crawl.bloom import BloomFilter
+from bopbot.crawl.exceptions import FrontierError
+from bopbot.crawl.urls import get_host, normalize_url
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    leased INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_by_priority ON urls (leased, priority DESC, id);
+CREATE INDEX IF NOT EXISTS urls_by_host ON urls (host, leased, priority DESC, id);
+CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+# hosts passed per query, below the 999 variables limit of older sqlite builds
+MAX_HOST_FILTER = 900
+
+
+class DedupMode(Enum):
+    # fixed memory, about error_rate of new urls are skipped as already seen
+    bloom = "bloom"
+    # set of url digests in the frontier file, exact but grows with every url
+    exact = "exact"
+
+
+class CrawlRequest:
+    """
+    Url leased by CrawlFrontier.next_url(), hand it back through CrawlFrontier.done(..)
+    """
+
+    __slots__ = ("id", "url", "host", "priority", "depth")
+
+    def __init__(self, id: int, url: str, host: str, priority: int, depth: int):
+        self.id = id
+        self.url = url
+        self.host = host
+        self.priority = priority
+        self.depth = depth
+
+    def __repr__(self):
+        return f"<CrawlRequest {self.url} priority={self.priority} depth={self.depth}>"
+
+
+class HostPolicy:
+    __slots__ = ("max_active", "delay")
+
+    def __init__(self, max_active: int, delay: float):
+        """
+        Parameters
+        ==========
+        max_active: urls of the host leased at the same time
+        delay: min seconds between two leases of the host
+        """
+        if max_active < 1 or delay < 0:
+            raise FrontierError(
+                f"host policy needs max_active >= 1 and delay >= 0, "
+                f"got {max_active}, {delay}"
+            )
+        self.max_active = max_active
+        self.delay = delay
+
+
+class HostState:
+    __slots__ = ("pending", "active", "next_at")
+
+    def __init__(self):
+        self.pending = 0
+        self.active = 0
+        self.next_at = 0.0
+
+
+class CrawlFrontier:
+    """
+    Urls to crawl, kept in a SQLite file so memory stays constant however many
+    urls are queued. Urls are normalized and deduplicated on add(..), leased in
+    priority order (higher first, then insertion order) by next_url() while
+    respecting per host concurrency and delay limits, and removed by done(..).
+
+    The queue and the dedup state are committed together by checkpoint(),
+    which runs every checkpoint_every changes and on close(). Opening the same
+    path again resumes from the last checkpoint, urls leased but not done by
+    then are queued again. Usage with a pool of bots:
+
+        async def crawl(bot, frontier):
+            while True:
+                request = await frontier.next_url()
+                if request is None:
+                    break  # nothing queued or in flight
+                try:
+                    await bot.driver.goto(request.url)
+                    links = await bot.extract(container=anchors, fields=href)
+                    frontier.add_many(
+                        [link["href"] for link in links],
+                        base=request.url,
+                        depth=request.depth + 1,
+                    )
+                finally:
+                    frontier.done(request)
+
+        with CrawlFrontier(path="crawl.sqlite", host_delay=2.0) as frontier:
+            frontier.add("https://site.test/")
+            await asyncio.gather(*[crawl(bot, frontier) for bot in bots])
+    """
+
+    def __init__(
+        self,
+        path=":memory:",
+        dedup=DedupMode.bloom,
+        capacity=1_000_000,
+        error_rate=0.001,
+        max_per_host=1,
+        host_delay=1.0,
+        max_depth: int = None,
+        checkpoint_every=10_000,
+        clock=time.monotonic,
+    ):
+        """
+        Parameters
+        ==========
+        path: SQLite file of the frontier, ":memory:" keeps it in memory without resume
+        dedup: DedupMode used for urls never queued before
+        capacity: urls the bloom filter is sized for (DedupMode.bloom only),
+                  ignored when resuming, the checkpointed filter keeps its size
+        error_rate: bloom filter false positive rate at capacity
+        max_per_host: default HostPolicy.max_active, see self.set_host_policy(..)
+        host_delay: default HostPolicy.delay in seconds
+        max_depth: urls added with a greater depth are dropped, None keeps all
+        checkpoint_every: changes (adds, leases, dones) between automatic
+                          checkpoints, 0 disables them. A checkpoint rewrites the
+                          whole bloom filter, ~1.8MB per million urls of capacity
+        clock: monotonic time source in seconds
+        """
+        self.path = path
+        self.dedup = dedup
+        self.max_depth = max_depth
+        self.checkpoint_every = checkpoint_every
+        self.clock = clock
+        self.default_policy = HostPolicy(max_active=max_per_host, delay=host_delay)
+        self.policies = {}
+        self.hosts = {}
+        self.pending = 0
+        self.active = 0
+        self.changes = 0
+        self._changed = None
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.bloom = (
+            self.load_bloom(capacity=capacity, error_rate=error_rate)
+            if dedup == DedupMode.bloom
+            else None
+        )
+        self.resume()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.pending
+
+    @property
+    def changed(self) -> asyncio.Event:
+        # created lazily so the event binds to the loop that first waits on it
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        True when no url is queued or leased, so no new url can show up
+        """
+        return self.pending == 0 and self.active == 0
+
+    def load_bloom(self, capacity: int, error_rate: float) -> BloomFilter:
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        if "bloom" not in meta:
+            return BloomFilter(capacity=capacity, error_rate=error_rate)
+
+        return BloomFilter(
+            capacity=meta["bloom_capacity"],
+            error_rate=meta["bloom_error_rate"],
+            bits=meta["bloom"],
+            count=meta["bloom_count"],
+        )
+
+    def resume(self):
+        """
+        Re-queues urls leased when the last checkpoint was taken and rebuilds
+        the per host counters from the queue
+        """
+        self.db.execute("UPDATE urls SET leased = 0 WHERE leased = 1")
+        for host, pending in self.db.execute(
+            "SELECT host, COUNT(*) FROM urls GROUP BY host"
+        ):
+            self.host_state(host).pending = pending
+            self.pending += pending
+
+    def policy(self, host: str) -> HostPolicy:
+        return self.policies.get(host, self.default_policy)
+
+    def set_host_policy(self, host: str, max_active: int = None, delay: float = None):
+        """
+        Overrides the default concurrency and delay limits for one host
+        """
+        default = self.policy(host)
+        self.policies[host] = HostPolicy(
+            max_active=max_active if max_active is not None else default.max_active,
+            delay=delay if delay is not None else default.delay,
+        )
+
+    def host_state(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState()
+        return state
+
+    def mark_seen(self, url: str) -> bool:
+        """
+        Returns
+        =======
+        True if url was never marked before
+        """
+        if self.bloom is not None:
+            return self.bloom.add(url)
+
+        digest = blake2b(url.encode("utf-8"), digest_size=16).digest()
+        cursor = self.db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (digest,))
+        return cursor.rowcount == 1
+
+    def add(self, url: str, priority=0, depth=0, base: str = None) -> bool:
+        """
+        Queues url unless it is not crawlable, deeper than max_depth or seen before
+
+        Parameters
+        ==========
+        url: absolute url, or relative to base
+        priority: urls with a higher priority are leased first
+        depth: link distance from the seed urls
+        base: url of the page url was found on
+
+        Returns
+        =======
+        True if url was queued
+        """
+        url = normalize_url(url, base=base)
+        if url is None or (self.max_depth is not None and depth > self.max_depth):
+            return False
+        if not self.mark_seen(url):
+            return False
+
+        host = get_host(url)
+        self.db.execute(
+            "INSERT INTO urls (url, host, priority, depth) VALUES (?, ?, ?, ?)",
+            (url, host, priority, depth),
+        )
+        self.host_state(host).pending += 1
+        self.pending += 1
+        self.changed.set()
+        self.count_change()
+        return True
+
+    def add_many(self, urls: [str], priority=0, depth=0, base: str = None) -> int:
+        """
+        Returns
+        =======
+        number of urls queued, see self.add(..)
+        """
+        return sum(
+            self.add(url, priority=priority, depth=depth, base=base) for url in urls
+        )
+
+    def host_filter(self, now: float) -> (str, []):
+        """
+        Returns
+        =======
+        SQL condition and parameters restricting the next lease to hosts whose
+        limits allow one, None when no host does
+        """
+        eligible, blocked = [], []
+        for host, state in list(self.hosts.items()):
+            if not state.pending:
+                if not state.active and state.next_at <= now:
+                    # nothing left to throttle, keeps memory bound to live hosts
+                    del self.hosts[host]
+                continue
+            policy = self.policy(host)
+            if state.active < policy.max_active and state.next_at <= now:
+                eligible.append(host)
+            else:
+                blocked.append(host)
+
+        if not eligible:
+            return None
+        if not blocked:
+            return "", []
+        if len(blocked) <= min(len(eligible), MAX_HOST_FILTER):
+            marks = ", ".join("?" * len(blocked))
+            return f"AND host NOT IN ({marks})", blocked
+        eligible = eligible[:MAX_HOST_FILTER]
+        return f"AND host IN ({', '.join('?' * len(eligible))})", eligible
+
+    def poll(self) -> CrawlRequest:
+        """
+        Leases the highest priority url a host limit allows without waiting
+
+        Returns
+        =======
+        CrawlRequest, None when every queued url waits on its host's limits
+        """
+        now = self.clock()
+        host_filter = self.host_filter(now=now)
+        if host_filter is None:
+            return None
+
+        condition, hosts = host_filter
+        row = self.db.execute(
+            "SELECT id, url, host, priority, depth FROM urls WHERE leased = 0 "
+            f"{condition} ORDER BY priority DESC, id LIMIT 1",
+            hosts,
+        ).fetchone()
+        if row is None:
+            return None
+
+        request = CrawlRequest(*row)
+        self.db.execute("UPDATE urls SET leased = 1 WHERE id = ?", (request.id,))
+        state = self.host_state(request.host)
+        state.pending -= 1
+        state.active += 1
+        state.next_at = now + self.policy(request.host).delay
+        self.pending -= 1
+        self.active += 1
+        self.count_change()
+        return request
+
+    def next_ready_in(self) -> float:
+        """
+        Returns
+        =======
+        seconds until a delayed host may be leased again, None when every host
+        with queued urls waits for a done(..)
+        """
+        now = self.clock()
+        waits = [
+            state.next_at - now
+            for host, state in self.hosts.items()
+            if state.pending and state.active < self.policy(host).max_active
+        ]
+        return max(0.0, min(waits)) if waits else None
+
+    async def next_url(self, timeout: float = None) -> CrawlRequest:
+        """
+        Waits for the next url host limits allow crawling
+
+        Parameters
+        ==========
+        timeout: max seconds to wait, None waits as long as urls may still show up
+
+        Returns
+        =======
+        CrawlRequest to pass to self.done(..) once crawled, None when the
+        frontier is exhausted (nothing queued and nothing leased)
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            self.changed.clear()
+            request = self.poll()
+            if request is not None:
+                return request
+            if self.exhausted:
+                return None
+
+            wait = self.next_ready_in()
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def done(self, request: CrawlRequest, retry=False):
+        """
+        Hands a leased url back
+
+        Parameters
+        ==========
+        request: CrawlRequest returned by self.next_url()
+        retry: If True, the url is queued again instead of removed
+        """
+        state = self.host_state(request.host)
+        state.active -= 1
+        self.active -= 1
+        if retry:
+            self.db.execute("UPDATE urls SET leased = 0 WHERE id = ?", (request.id,))
+            state.pending += 1
+            self.pending += 1
+        else:
+            self.db.execute("DELETE FROM urls WHERE id = ?", (request.id,))
+        self.changed.set()
+        self.count_change()
+
+    def count_change(self):
+        self.changes += 1
+        if self.checkpoint_every and self.changes >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Commits the queue and the dedup state in one transaction
+        """
+        if self.bloom is not None:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("bloom", self.bloom.to_bytes()),
+                    ("bloom_capacity", self.bloom.capacity),
+                    ("bloom_error_rate", self.bloom.error_rate),
+                    ("bloom_count", self.bloom.count),
+                ],
+            )
+        self.db.commit()
+        self.changes = 0
+
+    def close(self):
+        self.checkpoint()
+        self.db.close()
@@ -0,0 +1,118 @@
+import re
+from urllib.parse import (
+    parse_qsl,
+    quote,
+    urlencode,
+    urljoin,
+    urlsplit,
+    urlunsplit,
+)
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# query parameters that identify a campaign or click, not a resource
+TRACKING_PARAMS = frozenset(
+    ("fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "yclid")
+)
+TRACKING_PREFIXES = ("utm_",)
+UNRESERVED = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+)
+# characters left as is in paths, "%" keeps existing escapes intact
+PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+ESCAPE = re.compile("%([0-9a-fA-F]{2})")
+
+
+def is_tracking_param(name: str) -> bool:
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_escapes(component: str) -> str:
+    """
+    Decodes escaped unreserved characters (%7E -> ~) and upper cases the
+    remaining escapes (%2f -> %2F), as in RFC 3986 6.2.2
+    """
+
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED else f"%{match.group(1).upper()}"
+
+    return ESCAPE.sub(fix, quote(component, safe=PATH_SAFE))
+
+
+def remove_dot_segments(path: str) -> str:
+    """
+    Resolves "." and ".." segments, "/a/./b/../c" -> "/a/c"
+    """
+    segments = path.split("/")
+    output = []
+    for segment in segments:
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+        elif segment != ".":
+            output.append(segment)
+    if segments[-1] in (".", ".."):
+        output.append("")
+
+    return "/".join(output)
+
+
+def get_host(url: str) -> str:
+    """
+    Returns
+    =======
+    lower cased host name of url, the key politeness limits are applied per
+    """
+    return urlsplit(url).hostname or ""
+
+
+def normalize_url(url: str, base: str = None, drop_tracking=True) -> str:
+    """
+    Canonical form of an http(s) url, so equivalent urls dedup to one entry:
+    - relative urls are resolved against base
+    - scheme and host are lower cased, default ports and fragments dropped
+    - dot segments resolved, an empty path becomes "/"
+    - escapes normalized, query parameters sorted
+    - tracking parameters (utm_*, gclid, ..) dropped when drop_tracking
+
+    Parameters
+    ==========
+    url: absolute url, or relative to base
+    base: url of the page url was found on
+    drop_tracking: If False, tracking parameters are kept
+
+    Returns
+    =======
+    normalized url, None for non http(s) urls (mailto:, javascript:, ..) and
+    urls without a valid host or port
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+
+    host = parts.hostname.rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if "@" in parts.netloc:
+        netloc = f"{parts.netloc.rpartition('@')[0]}@{netloc}"
+
+    path = normalize_escapes(remove_dot_segments(parts.path)) or "/"
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if drop_tracking:
+        params = [
+            (name, value) for name, value in params if not is_tracking_param(name)
+        ]
+    query = urlencode(sorted(params), quote_via=quote)
+
+    return urlunsplit((scheme, netloc, path, query, ""))
@@ -0,0 +1,430 @@
+"""
+CSS selector engine used to query DomSnapshot trees without the browser.
+
+Supported syntax:
+- type, universal, #id, .class selectors
+- attribute selectors [name], [name=value] with ~= |= ^= $= *= and the i flag
+- descendant, child (>), adjacent (+) and general sibling (~) combinators
+- selector lists separated by commas
+- :first-child, :last-child, :only-child, :nth-child(), :nth-last-child(),
+  :first-of-type, :last-of-type, :only-of-type, :nth-of-type(),
+  :nth-last-of-type(), :not(), :is(), :where(), :root, :empty, :checked,
+  :disabled, :enabled
+
+Selectors match against any tree exposing tag(index), attribute(index, name),
+parent(index) (-1 for roots), element_siblings(index), sibling_index(index)
+and has_children(index).
+"""
+import re
+import string
+from functools import lru_cache
+
+from bopbot.dom.exceptions import SelectorError
+
+
+IDENTIFIER = re.compile(r"(?:[-\w\u00a0-\uffff]|\\[0-9a-fA-F]{1,6}\s?|\\.)+")
+ESCAPE = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)")
+NTH = re.compile(r"^([+-]?\d*)n(?:([+-]\d+))?$")
+ATTRIBUTE_OPERATORS = ("~=", "|=", "^=", "$=", "*=", "=")
+COMBINATORS = ">+~"
+
+
+def unescape(identifier: str) -> str:
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[0] in string.hexdigits:
+            return chr(int(escaped.strip(), 16))
+        return escaped
+
+    return ESCAPE.sub(replace, identifier)
+
+
+def parse_nth(argument: str) -> (int, int):
+    """
+    Returns
+    =======
+    (a, b) of an an+b expression, "odd" and "even" included
+    """
+    argument = argument.replace(" ", "").lower()
+    if argument == "odd":
+        return 2, 1
+    if argument == "even":
+        return 2, 0
+    if re.match(r"^[+-]?\d+$", argument):
+        return 0, int(argument)
+
+    match = NTH.match(argument)
+    if not match:
+        raise SelectorError(f"invalid nth expression [{argument}]")
+    a, b = match.groups()
+    a = int(f"{a}1") if a in ("", "+", "-") else int(a)
+    return a, int(b) if b else 0
+
+
+def nth_matches(a: int, b: int, position: int) -> bool:
+    """
+    True if the 1 based position equals a*n + b for some n >= 0
+    """
+    if a == 0:
+        return position == b
+    return (position - b) % a == 0 and (position - b) // a >= 0
+
+
+class AttributeTest:
+    def __init__(self, name: str, operator: str = None, value: str = None, flag=""):
+        self.name = name.lower()
+        self.operator = operator
+        self.ignore_case = flag == "i"
+        self.value = value.lower() if value and self.ignore_case else value
+
+    def matches(self, actual: str) -> bool:
+        if actual is None:
+            return False
+        if self.operator is None:
+            return True
+
+        value = self.value
+        if self.ignore_case:
+            actual = actual.lower()
+        if self.operator == "=":
+            return actual == value
+        if self.operator == "~=":
+            return value in actual.split()
+        if self.operator == "|=":
+            return actual == value or actual.startswith(f"{value}-")
+        if not value:
+            # ^= $= *= with an empty value never match
+            return False
+        if self.operator == "^=":
+            return actual.startswith(value)
+        if self.operator == "$=":
+            return actual.endswith(value)
+        return value in actual
+
+
+class Compound:
+    """
+    Sequence of simple selectors that all apply to the same element, e.g. a.link[href]
+    """
+
+    def __init__(self):
+        self.tag = None
+        self.ids = []
+        self.classes = []
+        self.attributes = []
+        self.pseudos = []
+
+    def matches(self, tree, index: int) -> bool:
+        if self.tag and tree.tag(index).lower() != self.tag:
+            return False
+        for element_id in self.ids:
+            if tree.attribute(index, "id") != element_id:
+                return False
+        if self.classes:
+            classes = (tree.attribute(index, "class") or "").split()
+            for class_name in self.classes:
+                if class_name not in classes:
+                    return False
+        for test in self.attributes:
+            if not test.matches(tree.attribute(index, test.name)):
+                return False
+        for name, argument in self.pseudos:
+            if not PSEUDO_CLASSES[name](tree, index, argument):
+                return False
+
+        return True
+
+
+class ComplexSelector:
+    """
+    Compounds joined by combinators, stored right to left: "ul > li a" is
+    [(a, " "), (li, ">"), (ul, None)], so matching starts from the candidate
+    element and walks up/back through the tree
+    """
+
+    def __init__(self, parts: [(Compound, str)]):
+        self.parts = parts
+
+    @property
+    def key(self) -> Compound:
+        """
+        Compound the matched element itself must satisfy
+        """
+        return self.parts[0][0]
+
+    def matches(self, tree, index: int, part=0) -> bool:
+        compound, combinator = self.parts[part]
+        if not compound.matches(tree, index):
+            return False
+        if combinator is None:
+            return True
+
+        part += 1
+        if combinator == ">":
+            parent = tree.parent(index)
+            return parent >= 0 and self.matches(tree, parent, part)
+        if combinator == " ":
+            parent = tree.parent(index)
+            while parent >= 0:
+                if self.matches(tree, parent, part):
+                    return True
+                parent = tree.parent(parent)
+            return False
+
+        siblings = tree.element_siblings(index)
+        previous = siblings[: tree.sibling_index(index)]
+        if combinator == "+":
+            return bool(previous) and self.matches(tree, previous[-1], part)
+        return any(self.matches(tree, sibling, part) for sibling in previous)
+
+
+class SelectorList:
+    def __init__(self, selectors: [ComplexSelector]):
+        self.selectors = selectors
+
+    def matches(self, tree, index: int) -> bool:
+        return any(selector.matches(tree, index) for selector in self.selectors)
+
+
+class SelectorParser:
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.position = 0
+
+    def error(self, message: str) -> SelectorError:
+        return SelectorError(
+            f"{message} at position {self.position} of selector [{self.selector}]"
+        )
+
+    def peek(self) -> str:
+        if self.position < len(self.selector):
+            return self.selector[self.position]
+        return ""
+
+    def skip_whitespace(self) -> bool:
+        start = self.position
+        while self.peek() and self.peek().isspace():
+            self.position += 1
+        return self.position > start
+
+    def identifier(self) -> str:
+        match = IDENTIFIER.match(self.selector, self.position)
+        if not match:
+            raise self.error("expected an identifier")
+        self.position = match.end()
+        return unescape(match.group())
+
+    def parse(self) -> SelectorList:
+        selectors = self.selector_list()
+        if self.position < len(self.selector):
+            raise self.error(f"unexpected [{self.peek()}]")
+        return selectors
+
+    def selector_list(self) -> SelectorList:
+        selectors = [self.complex_selector()]
+        while self.peek() == ",":
+            self.position += 1
+            selectors.append(self.complex_selector())
+        return SelectorList(selectors=selectors)
+
+    def complex_selector(self) -> ComplexSelector:
+        self.skip_whitespace()
+        compounds = [self.compound()]
+        combinators = []
+        while True:
+            had_whitespace = self.skip_whitespace()
+            char = self.peek()
+            if not char or char in ",)":
+                break
+            if char in COMBINATORS:
+                self.position += 1
+                self.skip_whitespace()
+                combinators.append(char)
+            elif had_whitespace:
+                combinators.append(" ")
+            else:
+                raise self.error(f"unexpected [{char}]")
+            compounds.append(self.compound())
+
+        parts = [(compounds[-1], combinators[-1] if combinators else None)]
+        for position in range(len(compounds) - 2, -1, -1):
+            combinator = combinators[position - 1] if position > 0 else None
+            parts.append((compounds[position], combinator))
+        return ComplexSelector(parts=parts)
+
+    def compound(self) -> Compound:
+        compound = Compound()
+        start = self.position
+        if self.peek() == "*":
+            self.position += 1
+        elif IDENTIFIER.match(self.selector, self.position):
+            compound.tag = self.identifier().lower()
+
+        while True:
+            char = self.peek()
+            if char == "#":
+                self.position += 1
+                compound.ids.append(self.identifier())
+            elif char == ".":
+                self.position += 1
+                compound.classes.append(self.identifier())
+            elif char == "[":
+                compound.attributes.append(self.attribute())
+            elif char == ":":
+                compound.pseudos.append(self.pseudo())
+            else:
+                break
+
+        if self.position == start:
+            raise self.error("expected a selector")
+        return compound
+
+    def attribute(self) -> AttributeTest:
+        self.position += 1
+        self.skip_whitespace()
+        name = self.identifier()
+        self.skip_whitespace()
+        if self.peek() == "]":
+            self.position += 1
+            return AttributeTest(name=name)
+
+        operator = next(
+            (
+                operator
+                for operator in ATTRIBUTE_OPERATORS
+                if self.selector.startswith(operator, self.position)
+            ),
+            None,
+        )
+        if operator is None:
+            raise self.error("expected an attribute operator")
+        self.position += len(operator)
+        self.skip_whitespace()
+        value = self.attribute_value()
+        self.skip_whitespace()
+        flag = ""
+        if self.peek().lower() in ("i", "s"):
+            flag = self.peek().lower()
+            self.position += 1
+            self.skip_whitespace()
+        if self.peek() != "]":
+            raise self.error("expected ]")
+        self.position += 1
+        return AttributeTest(name=name, operator=operator, value=value, flag=flag)
+
+    def attribute_value(self) -> str:
+        quote = self.peek()
+        if quote not in ("'", '"'):
+            return self.identifier()
+
+        end = self.position + 1
+        while end < len(self.selector) and self.selector[end] != quote:
+            end += 2 if self.selector[end] == "\\" else 1
+        if end >= len(self.selector):
+            raise self.error("unterminated string")
+        start = self.position + 1
+        value = unescape(self.selector[start:end])
+        self.position = end + 1
+        return value
+
+    def pseudo(self) -> (str, object):
+        self.position += 1
+        if self.peek() == ":":
+            raise self.error("pseudo elements can not be matched")
+        name = self.identifier().lower()
+        if name not in PSEUDO_CLASSES:
+            raise self.error(f"unsupported pseudo class [:{name}]")
+        if name not in FUNCTIONAL_PSEUDO_CLASSES:
+            return name, None
+
+        if self.peek() != "(":
+            raise self.error(f":{name} needs an argument")
+        self.position += 1
+        if name in ("not", "is", "where"):
+            argument = self.selector_list()
+        else:
+            end = self.selector.find(")", self.position)
+            if end < 0:
+                raise self.error("expected )")
+            start = self.position
+            argument = parse_nth(self.selector[start:end])
+            self.position = end
+        self.skip_whitespace()
+        if self.peek() != ")":
+            raise self.error("expected )")
+        self.position += 1
+        return name, argument
+
+
+def position_of(tree, index: int, of_type=False, from_end=False) -> int:
+    """
+    1 based position of index among its element siblings (of the same tag)
+    """
+    siblings = tree.element_siblings(index)
+    if of_type:
+        tag = tree.tag(index)
+        siblings = [sibling for sibling in siblings if tree.tag(sibling) == tag]
+        position = siblings.index(index)
+    else:
+        position = tree.sibling_index(index)
+    if from_end:
+        return len(siblings) - position
+    return position + 1
+
+
+def only_of_type(tree, index: int) -> bool:
+    tags = [tree.tag(sibling) for sibling in tree.element_siblings(index)]
+    return tags.count(tree.tag(index)) == 1
+
+
+PSEUDO_CLASSES = {
+    "first-child": lambda tree, index, _: position_of(tree, index) == 1,
+    "last-child": lambda tree, index, _: position_of(tree, index, from_end=True) == 1,
+    "only-child": lambda tree, index, _: len(tree.element_siblings(index)) == 1,
+    "nth-child": lambda tree, index, nth: nth_matches(*nth, position_of(tree, index)),
+    "nth-last-child": lambda tree, index, nth: nth_matches(
+        *nth, position_of(tree, index, from_end=True)
+    ),
+    "first-of-type": lambda tree, index, _: position_of(tree, index, True) == 1,
+    "last-of-type": lambda tree, index, _: position_of(tree, index, True, True) == 1,
+    "only-of-type": lambda tree, index, _: only_of_type(tree, index),
+    "nth-of-type": lambda tree, index, nth: nth_matches(
+        *nth, position_of(tree, index, of_type=True)
+    ),
+    "nth-last-of-type": lambda tree, index, nth: nth_matches(
+        *nth, position_of(tree, index, of_type=True, from_end=True)
+    ),
+    "not": lambda tree, index, selectors: not selectors.matches(tree, index),
+    "is": lambda tree, index, selectors: selectors.matches(tree, index),
+    "where": lambda tree, index, selectors: selectors.matches(tree, index),
+    "root": lambda tree, index, _: tree.parent(index) < 0,
+    "empty": lambda tree, index, _: not tree.has_children(index),
+    "checked": lambda tree, index, _: any(
+        tree.attribute(index, name) is not None for name in ("checked", "selected")
+    ),
+    "disabled": lambda tree, index, _: tree.attribute(index, "disabled") is not None,
+    "enabled": lambda tree, index, _: tree.attribute(index, "disabled") is None,
+}
+FUNCTIONAL_PSEUDO_CLASSES = (
+    "nth-child",
+    "nth-last-child",
+    "nth-of-type",
+    "nth-last-of-type",
+    "not",
+    "is",
+    "where",
+)
+
+
+@lru_cache(maxsize=1024)
+def parse_selector(selector: str) -> SelectorList:
+    """
+    Parses a CSS selector (list) once, repeated queries reuse the compiled selector
+
+    Raises
+    ======
+    SelectorError for invalid or unsupported selectors
+    """
+    if not isinstance(selector, str) or not selector.strip():
+        raise SelectorError(f"selector [{selector}] is not a populated str")
+    return SelectorParser(selector=selector).parse()
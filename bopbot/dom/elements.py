@@ -88,19 +88,153 @@ class BaseSelector:
 class LabeledSelector(BaseSelector):
     """
     Resource for defining dom paths with a human readable label describing
-    the dom object
+    the dom object.
+
+    A selector may carry alternative hierarchies for markup that changes,
+    e.g. after a site redesign. BaseAction resolves them in a single evaluate
+    (see BaseAction.resolve(..)) and keeps which one matched in its own
+    SelectorResolver, the selector itself only declares the hierarchies and
+    may be shared by several bots.
     """
 
-    def __init__(self, label: str, dom_hierarchy: [str]):
+    def __init__(self, label: str, dom_hierarchy: [str], alternatives: [[str]] = None):
         """
         Parameters
         ==========
         label: Human readable name representation for dom object.
         dom_hierarchy: list of HTML/DOM tags in order representing path to selector.
                        Last element assumed to be target dom element.
+        alternatives: hierarchies tried, in order, when dom_hierarchy matches nothing
         """
         super().__init__(dom_hierarchy=dom_hierarchy)
         self.label = label
+        for alternative in alternatives or []:
+            validate_dom_hierarchy(dom_hierarchy=alternative)
+        self.hierarchies = [dom_hierarchy] + list(alternatives or [])
+
+    @property
+    def alternatives(self) -> [[str]]:
+        return self.hierarchies[1:]
+
+    @property
+    def has_alternatives(self) -> bool:
+        return len(self.hierarchies) > 1
+
+    def candidates(self) -> [str]:
+        """
+        Flattened hierarchies in declared order
+        """
+        return [
+            BaseSelector.flatten_hierarchy(dom_hierarchy=hierarchy)
+            for hierarchy in self.hierarchies
+        ]
+
+    def set_hierarchy(self, dom_hierarchy: [str]):
+        super().set_hierarchy(dom_hierarchy=dom_hierarchy)
+        self.hierarchies[0] = dom_hierarchy
+
+
+class Resolution:
+    """
+    Resolution state of one selector with alternatives, see SelectorResolver
+    """
+
+    __slots__ = ("scores", "order", "active", "matched", "selector")
+
+    def __init__(self, elem: LabeledSelector):
+        self.scores = [0.0] * len(elem.hierarchies)
+        # hierarchy indexes in the order candidates are tried
+        self.order = list(range(len(elem.hierarchies)))
+        # index of the active hierarchy
+        self.active = 0
+        # hierarchy index of the last resolution, None until resolved or if nothing matched
+        self.matched = None
+        # selector flattening the active hierarchy
+        self.selector = elem
+
+
+class SelectorResolver:
+    """
+    Which alternative of each LabeledSelector matched, kept per bot so selectors
+    shared between bots (e.g. PageObject class attributes) are never mutated.
+    Alternatives that keep matching are promoted to the front of the cascade,
+    scores decay so promotions follow markup changes back and forth.
+    """
+
+    # weight kept by past matches on every new match
+    promotion_decay = 0.9
+
+    def __init__(self):
+        self._resolutions = {}
+
+    def resolution(self, elem: LabeledSelector) -> Resolution:
+        resolution = self._resolutions.get(elem)
+        if resolution is None:
+            resolution = self._resolutions[elem] = Resolution(elem=elem)
+        return resolution
+
+    def candidates(self, elem: LabeledSelector) -> ([int], [str]):
+        """
+        Returns
+        =======
+        hierarchy indexes and their flattened hierarchies, in the order they are tried
+        """
+        order = list(self.resolution(elem).order)
+        return (
+            order,
+            [
+                BaseSelector.flatten_hierarchy(dom_hierarchy=elem.hierarchies[index])
+                for index in order
+            ],
+        )
+
+    def record_match(self, elem: LabeledSelector, index: int) -> int:
+        """
+        Records a resolution and activates the matching hierarchy
+
+        Parameters
+        ==========
+        elem: resolved selector
+        index: index in elem.hierarchies of the first match, None if none matched
+
+        Returns
+        =======
+        index
+        """
+        resolution = self.resolution(elem)
+        resolution.matched = index
+        if index is None:
+            return None
+
+        resolution.scores = [
+            score * self.promotion_decay for score in resolution.scores
+        ]
+        resolution.scores[index] += 1
+        # sorted() is stable, ties keep the declared order
+        resolution.order = sorted(
+            resolution.order, key=lambda item: -resolution.scores[item]
+        )
+        if index != resolution.active:
+            resolution.active = index
+            resolution.selector = (
+                elem
+                if index == 0
+                else LabeledSelector(
+                    label=elem.label, dom_hierarchy=elem.hierarchies[index]
+                )
+            )
+        return index
+
+    def matched(self, elem: LabeledSelector) -> int:
+        resolution = self._resolutions.get(elem)
+        return resolution.matched if resolution else None
+
+    def selector(self, elem: LabeledSelector) -> LabeledSelector:
+        """
+        Selector of elem's active hierarchy, elem itself until an alternative matched
+        """
+        resolution = self._resolutions.get(elem)
+        return resolution.selector if resolution else elem
 
 
 def flatten_selector_hierarchy(selector_hierarchy: []) -> []:
@@ -135,6 +269,15 @@ def flatten_selector_hierarchy(selector_hierarchy: []) -> []:
 
 
 def create_labeled_selector(label, selector_hierarchy: []) -> LabeledSelector:
+    if len(selector_hierarchy) == 1 and isinstance(
+        selector_hierarchy[0], LabeledSelector
+    ):
+        # relabeling a selector keeps its fallback cascade
+        hierarchies = [list(item) for item in selector_hierarchy[0].hierarchies]
+        return LabeledSelector(
+            label=label, dom_hierarchy=hierarchies[0], alternatives=hierarchies[1:]
+        )
+
     return LabeledSelector(
         label=label,
         dom_hierarchy=flatten_selector_hierarchy(selector_hierarchy=selector_hierarchy),
@@ -156,3 +299,43 @@ def add_selector_to(obj, label: str, selector_hierarchy: []):
         label=label, selector_hierarchy=selector_hierarchy
     )
     setattr(obj, label, selector)
+
+
+def flatten_field_map(fields: {}, default_attr="innerText") -> []:
+    """
+    Converts a field map used for bulk extraction into the
+    [name, relative_selector, attr] triples consumed by jsinject.scripts.EXTRACT_ROWS
+
+    Parameters
+    ==========
+    fields: {
+        name: BaseSelector | [str] | str | None,
+        name: (BaseSelector | [str] | str | None, attr),
+    }
+        - selectors are relative to the container element, None targets the container
+        - attr is a property path (e.g. "href", "dataset.id") or "@<name>" to
+          read an HTML attribute through getAttribute
+    default_attr: attr used when a field does not declare one
+
+    Returns
+    =======
+    list of [name, selector str ("" for the container itself), attr]
+    """
+    if not isinstance(fields, dict) or not fields:
+        raise SelectorError(f"passed fields [{fields}] is not a populated dict")
+
+    flattened_fields = []
+    for name, field in fields.items():
+        validate_label_name(label=name)
+        selector, attr = field if isinstance(field, tuple) else (field, default_attr)
+        if selector is None:
+            selector_str = ""
+        elif isinstance(selector, BaseSelector):
+            selector_str = selector.to_str()
+        elif isinstance(selector, list):
+            selector_str = BaseSelector.flatten_hierarchy(dom_hierarchy=selector)
+        else:
+            selector_str = selector
+        flattened_fields.append([name, selector_str, attr])
+
+    return flattened_fields
@@ -1,2 +1,8 @@
 class SelectorError(Exception):
     pass
+
+
+class SnapshotError(Exception):
+    """Raised when a DomSnapshot can not be built or answer a read"""
+
+    pass
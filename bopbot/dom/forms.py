@@ -0,0 +1,39 @@
+class FieldFill:
+    """
+    Outcome of filling one form field through BaseAction.fill_form(..)
+    """
+
+    __slots__ = ("label", "kind", "value", "seconds", "typed")
+
+    def __init__(self, label: str, kind: str, value, seconds: float, typed=False):
+        """
+        Parameters
+        ==========
+        label: label of the field's selector
+        kind: input, textarea, select, checkbox, radio or contenteditable,
+              None for typed fields
+        value: value read back after filling: the text, the selected option
+               values, the checked state or the checked radio's value.
+               None for typed fields
+        seconds: time spent setting the field, measured in page for bulk filled
+                 fields and around BaseAction.type(..) for typed ones
+        typed: whether the field was typed instead of set
+        """
+        self.label = label
+        self.kind = kind
+        self.value = value
+        self.seconds = seconds
+        self.typed = typed
+
+    def __repr__(self):
+        how = "typed" if self.typed else self.kind
+        return f"<FieldFill {self.label} {how} {self.seconds * 1000:.2f}ms>"
+
+    @classmethod
+    def from_result(cls, label: str, result: {}):
+        return cls(
+            label=label,
+            kind=result["kind"],
+            value=result["value"],
+            seconds=result["ms"] / 1000,
+        )
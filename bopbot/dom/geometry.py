@@ -0,0 +1,100 @@
+from enum import Enum
+
+
+class HiddenReason(Enum):
+    missing = "missing"  # selector matches nothing
+    display_none = "display_none"  # the element or an ancestor has display: none
+    not_rendered = "not_rendered"  # no layout box, e.g. display: contents
+    visibility_hidden = "visibility_hidden"  # visibility: hidden/collapse
+    transparent = "transparent"  # the element or an ancestor has opacity: 0
+    zero_size = "zero_size"  # bounding box without width or height
+    off_screen = "off_screen"  # bounding box outside the viewport
+    covered = "covered"  # hit testing reaches another element first
+
+
+class Box:
+    """
+    Bounding box in CSS pixels relative to the viewport
+    """
+
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x: float, y: float, width: float, height: float):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"Box(x={self.x}, y={self.y}, width={self.width}, height={self.height})"
+
+    @property
+    def center(self) -> (float, float):
+        return self.x + self.width / 2, self.y + self.height / 2
+
+
+class ElementGeometry:
+    """
+    Visibility of one selector as computed by jsinject.scripts.ELEMENT_GEOMETRY
+    """
+
+    def __init__(
+        self,
+        label: str,
+        exists: bool,
+        reason: HiddenReason = None,
+        box: Box = None,
+        viewport_ratio=0.0,
+        click_point: (float, float) = None,
+        covered_by: str = None,
+    ):
+        """
+        Parameters
+        ==========
+        label: label of the measured selector
+        exists: whether the selector matched an element
+        reason: first check the element failed, None when it is visible
+        box: bounding box, None when the element does not exist
+        viewport_ratio: share of the box inside the viewport, 0 - 1
+        click_point: viewport coordinates hit testing reached the element at,
+                     None when the element is not (or not known to be) clickable
+        covered_by: tag#id.class of the element covering it when reason is covered
+        """
+        self.label = label
+        self.exists = exists
+        self.reason = reason
+        self.box = box
+        self.viewport_ratio = viewport_ratio
+        self.click_point = click_point
+        self.covered_by = covered_by
+
+    def __repr__(self):
+        state = "visible" if self.visible else self.reason.value
+        return f"<ElementGeometry {self.label} {state}>"
+
+    @property
+    def visible(self) -> bool:
+        return self.exists and self.reason is None
+
+    def describe(self) -> str:
+        if self.visible:
+            return f"[{self.label}] is visible"
+        description = f"[{self.label}] is not visible: {self.reason.value}"
+        if self.covered_by:
+            description = f"{description} by {self.covered_by}"
+        return description
+
+    @classmethod
+    def from_result(cls, label: str, result: {}):
+        box = result.get("box")
+        point = result.get("point")
+        reason = result.get("reason")
+        return cls(
+            label=label,
+            exists=result["exists"],
+            reason=HiddenReason(reason) if reason else None,
+            box=Box(*box) if box else None,
+            viewport_ratio=result.get("viewportRatio", 0.0),
+            click_point=tuple(point) if point and not reason else None,
+            covered_by=result.get("coveredBy"),
+        )
@@ -0,0 +1,95 @@
+import json
+
+from bopbot.dom.elements import (
+    BaseSelector,
+    LabeledSelector,
+    create_labeled_selector,
+    validate_label_name,
+)
+from bopbot.dom.exceptions import SelectorError
+
+
+# state of every bundled selector in one evaluate, selectors are embedded as
+# a JSON array literal so the script is static per page object class
+SELECTOR_STATES_TEMPLATE = """
+() => {
+    const selectors = %s;
+    return selectors.map(selector => {
+        const node = document.querySelector(selector);
+        return [node !== null, node !== null && node.style.display != "none"];
+    });
+}
+"""
+
+
+class PageObject:
+    """
+    Page object declaring its selectors at class level. Public class attributes
+    holding a dom hierarchy list (or a selector) are compiled once, when the
+    class is created, into LabeledSelector attributes labeled with the attribute
+    name. Hierarchies may build on selectors declared before them:
+
+    class SearchPage(PageObject):
+        form = ["#search", "form"]
+        box = [form, "input[type=text]"]
+        submit = [form, "button"]
+
+    SearchPage.box.to_str() == "#search > form > input[type=text]"
+
+    Subclasses inherit and may override their parents' selectors. Selectors are
+    shared by every user of the class, so they must not be mutated (pop(), ..).
+    """
+
+    # {label: LabeledSelector} in declaration order, parents first
+    selectors = {}
+    # single evaluate script returning [exists, visible] per selector
+    states_script = SELECTOR_STATES_TEMPLATE % "[]"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        selectors = {}
+        for base in reversed(cls.__mro__[1:]):
+            selectors.update(getattr(base, "selectors", {}))
+
+        for name, value in list(vars(cls).items()):
+            if name.startswith("_") or not isinstance(value, (list, BaseSelector)):
+                continue
+            hierarchy = [value] if isinstance(value, BaseSelector) else value
+            try:
+                validate_label_name(label=name)
+                selector = create_labeled_selector(
+                    label=name, selector_hierarchy=hierarchy
+                )
+                # flatten once, every later to_str()/to_query() is a cached lookup
+                selector.to_str()
+            except SelectorError as ex:
+                raise SelectorError(f"{cls.__name__}.{name}: {ex}")
+            setattr(cls, name, selector)
+            selectors[name] = selector
+
+        cls.selectors = selectors
+        cls.states_script = SELECTOR_STATES_TEMPLATE % json.dumps(
+            [selector.to_str() for selector in selectors.values()]
+        )
+
+    @classmethod
+    def get_selector(cls, label: str) -> LabeledSelector:
+        if label not in cls.selectors:
+            raise SelectorError(f"{cls.__name__} has no selector [{label}]")
+        return cls.selectors[label]
+
+    @classmethod
+    def parse_states(cls, states: []) -> {}:
+        """
+        Parameters
+        ==========
+        states: result of evaluating cls.states_script
+
+        Returns
+        =======
+        {label: {"exists": bool, "visible": bool}}
+        """
+        return {
+            label: {"exists": exists, "visible": visible}
+            for label, (exists, visible) in zip(cls.selectors, states)
+        }
@@ -0,0 +1,539 @@
+"""
+Array backed DOM snapshots queried with CSS selectors in Python, so read heavy
+pages cost one capture instead of an evaluate round trip per read:
+
+    snapshot = await bot.snapshot()
+    snapshot.query(elem=title)
+    snapshot.extract(container=rows, fields={"name": "td:nth-child(1)"})
+
+Nodes (elements and text) are kept in document order in parallel int arrays,
+every string (tag names, attribute names and values, text) is stored once
+and referenced by index. A node's subtree is the contiguous range
+[index + 1, ends[index]), so text and subtree scans are slices.
+"""
+import re
+import sys
+import itertools
+from array import array
+from bisect import bisect_left
+from html.parser import HTMLParser
+
+from bopbot.dom.css import parse_selector
+from bopbot.dom.elements import BaseSelector, flatten_field_map
+from bopbot.dom.exceptions import SnapshotError
+
+
+TEXT_NODE = "#text"
+# text of these elements never renders, it is not captured
+SKIPPED_TEXT = ("script", "style", "noscript", "template")
+VOID_ELEMENTS = (
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+)
+# properties readable through query(..) attrs, mapped to the attribute holding them
+PROPERTY_ATTRIBUTES = {
+    "className": "class",
+    "htmlFor": "for",
+    "id": "id",
+    "href": "href",
+    "src": "src",
+    "value": "value",
+    "name": "name",
+    "title": "title",
+    "type": "type",
+    "alt": "alt",
+    "placeholder": "placeholder",
+    "action": "action",
+    "rel": "rel",
+    "target": "target",
+}
+TEXT_PROPERTIES = ("innerText", "textContent")
+DISPLAY_NONE = re.compile(r"(^|;)\s*display\s*:\s*none\s*(!important\s*)?(;|$)")
+
+
+class SnapshotNode:
+    """
+    Light view of one element of a DomSnapshot
+    """
+
+    __slots__ = ("snapshot", "index")
+
+    def __init__(self, snapshot, index: int):
+        self.snapshot = snapshot
+        self.index = index
+
+    def __eq__(self, other):
+        if not isinstance(other, SnapshotNode):
+            return False
+        return other.snapshot is self.snapshot and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.snapshot), self.index))
+
+    def __repr__(self):
+        return f"<SnapshotNode {self.tag} #{self.index}>"
+
+    @property
+    def tag(self) -> str:
+        return self.snapshot.tag(self.index)
+
+    @property
+    def attributes(self) -> {}:
+        return self.snapshot.attributes(self.index)
+
+    def get_attribute(self, name: str) -> str:
+        return self.snapshot.attribute(self.index, name)
+
+    @property
+    def text(self) -> str:
+        return self.snapshot.text(self.index)
+
+    @property
+    def parent(self):
+        parent = self.snapshot.parent(self.index)
+        return SnapshotNode(self.snapshot, parent) if parent >= 0 else None
+
+    @property
+    def children(self) -> []:
+        return [
+            SnapshotNode(self.snapshot, child)
+            for child in self.snapshot.element_children(self.index)
+        ]
+
+    def query_selector(self, selector: str):
+        return self.snapshot.query_selector(selector, root=self.index)
+
+    def query_selector_all(self, selector: str) -> []:
+        return self.snapshot.query_selector_all(selector, root=self.index)
+
+
+class DomSnapshot:
+    """
+    Captured document tree. Frame 0 is the captured document, same origin
+    iframe documents captured with it are frames 1, 2, .. (see frame_urls).
+    Selectors never cross frame boundaries, like document.querySelector(..).
+
+    Attribute and text values are the ones at capture time: live properties
+    such as a typed input's value are not captured, only their attributes.
+    """
+
+    def __init__(
+        self,
+        strings: [str],
+        parents: [int],
+        names: [int],
+        values: [int],
+        frames: [int],
+        attr_offsets: [int],
+        attrs: [int],
+        frame_urls: [str] = None,
+    ):
+        """
+        Parameters
+        ==========
+        strings: interned strings every other array references by index
+        parents: parent node index per node, -1 for the root of each frame's
+                 document (its parent in the tree is the iframe element)
+        names: tag name string index per node, TEXT_NODE for text nodes
+        values: text string index per text node, -1 for elements
+        frames: frame index per node
+        attr_offsets: attrs[attr_offsets[i]:attr_offsets[i + 1]] are node i's
+                      attribute (name, value) string index pairs, len(nodes) + 1 items
+        attrs: flat attribute name/value string indexes
+        frame_urls: url of each captured frame document
+        """
+        self.strings = strings
+        self.parents = array("i", parents)
+        self.names = array("i", names)
+        self.values = array("i", values)
+        self.frames = array("i", frames)
+        self.attr_offsets = array("i", attr_offsets)
+        self.attrs = array("i", attrs)
+        self.frame_urls = list(frame_urls or [""])
+        self.ends = self._subtree_ends()
+        self._string_ids = None
+        self._children = {}
+        self._sibling_index = {}
+        self._elements = None
+        self._by_tag = None
+        self._by_id = None
+
+    def __len__(self):
+        return len(self.parents)
+
+    @classmethod
+    def from_capture(cls, capture: {}):
+        """
+        Builds a snapshot from the result of evaluating jsinject.scripts.CAPTURE_SNAPSHOT
+        """
+        try:
+            attr_offsets = [0]
+            for count in capture["attrCounts"]:
+                attr_offsets.append(attr_offsets[-1] + 2 * count)
+            return cls(
+                strings=capture["strings"],
+                parents=capture["parents"],
+                names=capture["names"],
+                values=capture["values"],
+                frames=capture["frames"],
+                attr_offsets=attr_offsets,
+                attrs=capture["attrs"],
+                frame_urls=capture["frameUrls"],
+            )
+        except (KeyError, TypeError) as ex:
+            raise SnapshotError(f"invalid snapshot capture: {ex}")
+
+    def _subtree_ends(self) -> array:
+        ends = array("i", range(1, len(self.parents) + 1))
+        # nodes are in document order, so children always follow their parent
+        for index in range(len(self.parents) - 1, -1, -1):
+            parent = self.parents[index]
+            if parent >= 0 and ends[index] > ends[parent]:
+                ends[parent] = ends[index]
+        return ends
+
+    def memory_usage(self) -> int:
+        """
+        Returns
+        =======
+        approximate bytes held by the snapshot's arrays and strings
+        """
+        arrays = (
+            self.parents,
+            self.names,
+            self.values,
+            self.frames,
+            self.attr_offsets,
+            self.attrs,
+            self.ends,
+        )
+        strings = sys.getsizeof(self.strings)
+        strings += sum(sys.getsizeof(value) for value in self.strings)
+        return strings + sum(sys.getsizeof(values) for values in arrays)
+
+    # tree protocol used by bopbot.dom.css
+
+    def is_element(self, index: int) -> bool:
+        return self.values[index] < 0
+
+    def tag(self, index: int) -> str:
+        return self.strings[self.names[index]]
+
+    def string_id(self, value: str) -> int:
+        if self._string_ids is None:
+            self._string_ids = {
+                value: index for index, value in enumerate(self.strings)
+            }
+        return self._string_ids.get(value, -1)
+
+    def attribute(self, index: int, name: str) -> str:
+        name_id = self.string_id(name)
+        if name_id < 0:
+            return None
+        attrs = self.attrs
+        for position in range(
+            self.attr_offsets[index], self.attr_offsets[index + 1], 2
+        ):
+            if attrs[position] == name_id:
+                return self.strings[attrs[position + 1]]
+        return None
+
+    def attributes(self, index: int) -> {}:
+        attrs = self.attrs
+        return {
+            self.strings[attrs[position]]: self.strings[attrs[position + 1]]
+            for position in range(
+                self.attr_offsets[index], self.attr_offsets[index + 1], 2
+            )
+        }
+
+    def parent(self, index: int) -> int:
+        parent = self.parents[index]
+        if parent >= 0 and self.frames[parent] != self.frames[index]:
+            return -1
+        return parent
+
+    def element_children(self, index: int) -> [int]:
+        children = self._children.get(index)
+        if children is None:
+            children = []
+            frame = self.frames[index]
+            child = index + 1
+            while child < self.ends[index]:
+                if self.values[child] < 0 and self.frames[child] == frame:
+                    children.append(child)
+                child = self.ends[child]
+            self._children[index] = children
+        return children
+
+    def element_siblings(self, index: int) -> [int]:
+        parent = self.parent(index)
+        return self.element_children(parent) if parent >= 0 else [index]
+
+    def sibling_index(self, index: int) -> int:
+        if index not in self._sibling_index:
+            for position, sibling in enumerate(self.element_siblings(index)):
+                self._sibling_index[sibling] = position
+        return self._sibling_index[index]
+
+    def has_children(self, index: int) -> bool:
+        return self.ends[index] > index + 1
+
+    def text(self, index: int) -> str:
+        """
+        Text of a node with whitespace collapsed, an approximation of innerText
+        that does not add line breaks between block elements
+        """
+        values = self.values
+        strings = self.strings
+        frame = self.frames[index]
+        pieces = [
+            strings[values[node]]
+            for node in range(index, self.ends[index])
+            if values[node] >= 0 and self.frames[node] == frame
+        ]
+        return " ".join("".join(pieces).split())
+
+    # selector queries
+
+    def _index_elements(self):
+        self._elements = []
+        self._by_tag = {}
+        self._by_id = {}
+        id_name = self.string_id("id")
+        for index in range(len(self.parents)):
+            if self.values[index] >= 0:
+                continue
+            self._elements.append(index)
+            self._by_tag.setdefault(self.tag(index).lower(), []).append(index)
+            for position in range(
+                self.attr_offsets[index], self.attr_offsets[index + 1], 2
+            ):
+                if self.attrs[position] == id_name:
+                    element_id = self.strings[self.attrs[position + 1]]
+                    self._by_id.setdefault(element_id, []).append(index)
+
+    def _candidates(self, selector) -> [int]:
+        """
+        Elements in document order that may match a ComplexSelector, narrowed
+        through the id and tag indexes built on the first query
+        """
+        if self._by_tag is None:
+            self._index_elements()
+        key = selector.key
+        if key.ids:
+            return self._by_id.get(key.ids[0], [])
+        if key.tag:
+            return self._by_tag.get(key.tag, [])
+        return self._elements
+
+    def _iter_matches(self, selector: str, frame: int, root: int):
+        """
+        Yields one document ordered generator of matching node indexes per
+        selector of the list, scoped to the subtree of root when given
+        """
+        if root is not None:
+            frame = self.frames[root]
+            start, end = root + 1, self.ends[root]
+        else:
+            start, end = 0, len(self.parents)
+
+        def matches(complex_selector):
+            candidates = self._candidates(complex_selector)
+            # candidates are sorted, only the ones inside [start, end) are visited
+            first, last = bisect_left(candidates, start), bisect_left(candidates, end)
+            for position in range(first, last):
+                index = candidates[position]
+                if self.frames[index] != frame:
+                    continue
+                if complex_selector.matches(self, index):
+                    yield index
+
+        for complex_selector in parse_selector(selector).selectors:
+            yield matches(complex_selector)
+
+    def query_selector_all(self, selector: str, frame=0, root: int = None) -> []:
+        """
+        Parameters
+        ==========
+        selector: CSS selector (list), see bopbot.dom.css
+        frame: index of the frame document to query
+        root: only return descendants of this node index, like element.querySelectorAll(..)
+
+        Returns
+        =======
+        [SnapshotNode] in document order
+        """
+        matches = set()
+        for selector_matches in self._iter_matches(selector, frame=frame, root=root):
+            matches.update(selector_matches)
+
+        return [SnapshotNode(self, index) for index in sorted(matches)]
+
+    def query_selector(self, selector: str, frame=0, root: int = None):
+        """
+        Returns
+        =======
+        first SnapshotNode matching selector in document order, None if nothing matches
+        """
+        firsts = [
+            index
+            for selector_matches in self._iter_matches(selector, frame=frame, root=root)
+            for index in itertools.islice(selector_matches, 1)
+        ]
+        return SnapshotNode(self, min(firsts)) if firsts else None
+
+    def read(self, node: SnapshotNode, attr="innerText"):
+        """
+        Reads attr off a node the way jsinject.scripts.READ_NODE does in the page
+
+        Parameters
+        ==========
+        attr: "innerText"/"textContent", "@<attribute>", "dataset.<name>" or one of
+              PROPERTY_ATTRIBUTES. Other properties were not captured and raise SnapshotError
+        """
+        if node is None:
+            return None
+        if attr in TEXT_PROPERTIES:
+            return node.text
+        if attr.startswith("@"):
+            return node.get_attribute(attr[1:])
+        if attr.startswith("dataset."):
+            name = re.sub(r"([A-Z])", r"-\1", attr.split(".", 1)[1]).lower()
+            return node.get_attribute(f"data-{name}")
+        if attr in PROPERTY_ATTRIBUTES:
+            return node.get_attribute(PROPERTY_ATTRIBUTES[attr])
+
+        raise SnapshotError(f"property [{attr}] is not part of a snapshot")
+
+    def visible(self, node: SnapshotNode) -> bool:
+        """
+        Same check as BaseAction.selector_visible(..): the inline style does not hide node
+        """
+        return not DISPLAY_NONE.search(node.get_attribute("style") or "")
+
+    def query(self, elem: BaseSelector, attr="innerText", frame=0):
+        """
+        Local counterpart of BaseAction.query(..), a missing element reads None
+        """
+        return self.read(self.query_selector(elem.to_str(), frame=frame), attr=attr)
+
+    def selector_exists(self, elem: BaseSelector, frame=0) -> bool:
+        return self.query_selector(elem.to_str(), frame=frame) is not None
+
+    def selector_visible(self, elem: BaseSelector, frame=0) -> bool:
+        node = self.query_selector(elem.to_str(), frame=frame)
+        return node is not None and self.visible(node)
+
+    def read_batch(self, reads: [], frame=0) -> []:
+        """
+        Local counterpart of BaseAction.read_batch(..), same reads and results
+        """
+        values = []
+        for elem, kind, attr in reads:
+            node = self.query_selector(elem.to_str(), frame=frame)
+            if kind == "exists":
+                values.append(node is not None)
+            elif node is None:
+                values.append(None)
+            elif kind == "visible":
+                values.append(self.visible(node))
+            else:
+                values.append(self.read(node, attr=attr if attr else "innerText"))
+        return values
+
+    def extract(self, container: BaseSelector, fields: {}, frame=0) -> [{}]:
+        """
+        Local counterpart of BaseAction.extract(..), same field map and rows
+        """
+        fields = flatten_field_map(fields=fields)
+        rows = []
+        for node in self.query_selector_all(container.to_str(), frame=frame):
+            row = {}
+            for name, selector, attr in fields:
+                target = node.query_selector(selector) if selector else node
+                row[name] = self.read(target, attr=attr)
+            rows.append(row)
+        return rows
+
+
+class SnapshotBuilder(HTMLParser):
+    """
+    Builds a DomSnapshot from HTML without a browser, used for offline
+    tests and benchmarks. Unclosed elements are closed by their parent's end
+    tag, there is no further HTML5 error recovery.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.strings = []
+        self.string_ids = {}
+        self.parents = []
+        self.names = []
+        self.values = []
+        self.attr_offsets = [0]
+        self.attrs = []
+        self.stack = []
+
+    def intern(self, value: str) -> int:
+        if value not in self.string_ids:
+            self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return self.string_ids[value]
+
+    def add_node(self, name: str, value=-1, attrs=()):
+        self.parents.append(self.stack[-1] if self.stack else -1)
+        self.names.append(self.intern(name))
+        self.values.append(value)
+        for attr_name, attr_value in attrs:
+            self.attrs.extend((self.intern(attr_name), self.intern(attr_value or "")))
+        self.attr_offsets.append(len(self.attrs))
+        return len(self.parents) - 1
+
+    def handle_starttag(self, tag, attrs):
+        index = self.add_node(name=tag, attrs=attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(index)
+
+    def handle_startendtag(self, tag, attrs):
+        self.add_node(name=tag, attrs=attrs)
+
+    def handle_endtag(self, tag):
+        for position in range(len(self.stack) - 1, -1, -1):
+            if self.names[self.stack[position]] == self.string_ids.get(tag):
+                del self.stack[position:]
+                return
+
+    def handle_data(self, data):
+        if not self.stack or self.strings[self.names[self.stack[-1]]] in SKIPPED_TEXT:
+            return
+        self.add_node(name=TEXT_NODE, value=self.intern(data if data.strip() else " "))
+
+    def build(self, html: str) -> DomSnapshot:
+        self.feed(html)
+        self.close()
+        return DomSnapshot(
+            strings=self.strings,
+            parents=self.parents,
+            names=self.names,
+            values=self.values,
+            frames=[0] * len(self.parents),
+            attr_offsets=self.attr_offsets,
+            attrs=self.attrs,
+        )
+
+
+def parse_html(html: str) -> DomSnapshot:
+    return SnapshotBuilder().build(html=html)
@@ -0,0 +1,261 @@
+import json
+import time
+import sqlite3
+from enum import Enum
+
+from bopbot.jobs.exceptions import CheckpointError
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    step TEXT,
+    data TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state);
+"""
+
+
+class JobState(Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class JobRecord:
+    """
+    Last checkpointed state of a job
+    """
+
+    __slots__ = ("job_id", "state", "attempts", "step", "data", "error", "updated")
+
+    def __init__(
+        self,
+        job_id: str,
+        state=JobState.pending,
+        attempts=0,
+        step: str = None,
+        data: {} = None,
+        error: str = None,
+        updated: float = None,
+    ):
+        """
+        Parameters
+        ==========
+        job_id: unique id of the job within the store
+        state: JobState
+        attempts: number of times the job was started
+        step: name of the last step the job checkpointed, None before any
+        data: JSON serializable progress saved with step, e.g. the last page crawled
+        error: repr of the exception of the last failed attempt
+        updated: wall clock time of the last transition
+        """
+        self.job_id = job_id
+        self.state = state
+        self.attempts = attempts
+        self.step = step
+        self.data = data if data is not None else {}
+        self.error = error
+        self.updated = updated if updated is not None else time.time()
+
+    def __repr__(self):
+        return (
+            f"<JobRecord {self.job_id} {self.state.value} "
+            f"attempts={self.attempts} step={self.step}>"
+        )
+
+    def to_row(self) -> tuple:
+        return (
+            self.job_id,
+            self.state.value,
+            self.attempts,
+            self.step,
+            json.dumps(self.data),
+            self.error,
+            self.updated,
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "JobRecord":
+        job_id, state, attempts, step, data, error, updated = row
+        return cls(
+            job_id=job_id,
+            state=JobState(state),
+            attempts=attempts,
+            step=step,
+            data=json.loads(data) if data else {},
+            error=error,
+            updated=updated,
+        )
+
+
+class CheckpointStore:
+    """
+    SQLite file recording the state transitions of jobs, so a runner restarted
+    after a Chrome crash or an OOM kill skips finished jobs and resumes the
+    ones in flight from their last step instead of redoing the whole batch.
+
+    Transitions are buffered and written in one transaction every batch_size
+    transitions or flush_interval seconds, whichever comes first: checkpointing
+    costs a dict update per action, and a crash loses at most the unflushed
+    transitions (those jobs are redone, never skipped). Starts are written
+    right away so attempts count even when the job kills its worker. Reads see
+    buffered transitions.
+    """
+
+    def __init__(self, path: str, batch_size=100, flush_interval=1.0, clock=time.time):
+        """
+        Parameters
+        ==========
+        path: SQLite file of the store, created if missing
+        batch_size: transitions buffered before they are written
+        flush_interval: max seconds a transition stays buffered, checked on
+                        each transition
+        clock: wall clock used for the updated timestamps
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._dirty = {}
+        self._last_flush = time.monotonic()
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, job_id: str) -> JobRecord:
+        """
+        Returns
+        =======
+        JobRecord of job_id, None for a job never checkpointed
+        """
+        record = self._dirty.get(job_id)
+        if record is not None:
+            return record
+
+        row = self.db.execute(
+            "SELECT id, state, attempts, step, data, error, updated "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        return JobRecord.from_row(row) if row else None
+
+    def state(self, job_id: str) -> JobState:
+        record = self.get(job_id)
+        return record.state if record else None
+
+    def counts(self) -> {JobState: int}:
+        self.flush()
+        counts = {state: 0 for state in JobState}
+        for state, count in self.db.execute(
+            "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+        ):
+            counts[JobState(state)] = count
+
+        return counts
+
+    def in_flight(self) -> [JobRecord]:
+        """
+        Returns
+        =======
+        jobs left running by the previous run, the ones to resume first
+        """
+        self.flush()
+        rows = self.db.execute(
+            "SELECT id, state, attempts, step, data, error, updated "
+            "FROM jobs WHERE state = ? ORDER BY updated",
+            (JobState.running.value,),
+        )
+        return [JobRecord.from_row(row) for row in rows]
+
+    def record(self, record: JobRecord):
+        record.updated = self.clock()
+        self._dirty[record.job_id] = record
+        elapsed = time.monotonic() - self._last_flush
+        if len(self._dirty) >= self.batch_size or elapsed >= self.flush_interval:
+            self.flush()
+
+    def start(self, job_id: str) -> JobRecord:
+        """
+        Moves a new, failed or interrupted job to running
+
+        Returns
+        =======
+        JobRecord holding the step and data checkpointed by previous attempts
+        """
+        record = self.get(job_id) or JobRecord(job_id=job_id)
+        if record.state == JobState.done:
+            raise CheckpointError(f"job [{job_id}] is already done")
+        record.state = JobState.running
+        record.attempts += 1
+        self.record(record)
+        # written right away: a worker killed by the job (OOM, Chrome crash)
+        # must still count the attempt, or it would be retried forever
+        self.flush()
+        return record
+
+    def save(self, job_id: str, step: str, data: {} = None):
+        """
+        Checkpoints the progress of a running job
+
+        Parameters
+        ==========
+        step: name of the step just completed
+        data: JSON serializable progress the job needs to resume after step
+        """
+        record = self.running(job_id)
+        record.step = step
+        if data is not None:
+            record.data = data
+        self.record(record)
+
+    def finish(self, job_id: str):
+        record = self.running(job_id)
+        record.state = JobState.done
+        record.error = None
+        self.record(record)
+
+    def fail(self, job_id: str, error: str):
+        record = self.running(job_id)
+        record.state = JobState.failed
+        record.error = error
+        self.record(record)
+
+    def running(self, job_id: str) -> JobRecord:
+        record = self.get(job_id)
+        if record is None or record.state != JobState.running:
+            raise CheckpointError(f"job [{job_id}] is not running")
+        return record
+
+    def flush(self):
+        """
+        Writes buffered transitions in one transaction
+        """
+        if self._dirty:
+            rows = [record.to_row() for record in self._dirty.values()]
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO jobs "
+                    "(id, state, attempts, step, data, error, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self._dirty = {}
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.db.close()
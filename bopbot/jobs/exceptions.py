@@ -0,0 +1,10 @@
+class CheckpointError(Exception):
+    """Raised when a job checkpoint transition is not allowed"""
+
+    pass
+
+
+class QueueError(Exception):
+    """Raised when a queue message is handed back without holding its lease"""
+
+    pass
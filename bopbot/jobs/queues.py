@@ -0,0 +1,341 @@
+import json
+import time
+import uuid
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from bopbot.jobs.exceptions import QueueError
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    visible_at REAL NOT NULL,
+    lease TEXT,
+    dead INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_by_visibility
+    ON messages (queue, dead, visible_at, id);
+"""
+
+
+class QueueMessage:
+    """
+    Message leased from a WorkQueue, hand it back with ack(..) or nack(..)
+    before visible_at or another consumer may lease it
+    """
+
+    __slots__ = ("id", "body", "attempts", "lease", "visible_at", "error")
+
+    def __init__(
+        self,
+        id: int,
+        body,
+        attempts: int,
+        lease: str = None,
+        visible_at: float = None,
+        error: str = None,
+    ):
+        """
+        Parameters
+        ==========
+        id: message id within the queue
+        body: JSON serializable job description
+        attempts: number of times the message was leased, this lease included
+        lease: token proving the lease, None for dead letters
+        visible_at: wall clock time the lease expires at
+        error: error recorded by the last nack(..)
+        """
+        self.id = id
+        self.body = body
+        self.attempts = attempts
+        self.lease = lease
+        self.visible_at = visible_at
+        self.error = error
+
+    def __repr__(self):
+        return f"<QueueMessage {self.id} attempts={self.attempts}>"
+
+
+class WorkQueue(ABC):
+    """
+    At least once job queue shared by bots in several processes.
+    A leased message is hidden from other consumers for a visibility timeout;
+    unless it is acked first it becomes visible again and is redelivered.
+    Messages leased max_attempts times without an ack are dead-lettered.
+
+    SqliteQueue is the single host reference implementation, brokers shared
+    by several nodes plug in by implementing the abstract methods.
+    """
+
+    name = "default"
+
+    @abstractmethod
+    def put(self, body, delay=0.0) -> int:
+        """
+        Parameters
+        ==========
+        body: JSON serializable job description
+        delay: seconds before the message can be leased
+
+        Returns
+        =======
+        message id
+        """
+
+    def put_many(self, bodies: [], delay=0.0) -> [int]:
+        return [self.put(body, delay=delay) for body in bodies]
+
+    @abstractmethod
+    def lease(self, count=1, visibility_timeout: float = None) -> [QueueMessage]:
+        """
+        Parameters
+        ==========
+        count: max messages leased at once
+        visibility_timeout: seconds the messages stay hidden, None uses the queue default
+
+        Returns
+        =======
+        leased messages, oldest first, empty when none is visible
+        """
+
+    @abstractmethod
+    def ack(self, message: QueueMessage):
+        """
+        Removes a processed message, raises QueueError when its lease expired
+        """
+
+    @abstractmethod
+    def nack(self, message: QueueMessage, delay=0.0, error: str = None):
+        """
+        Makes a message visible again after delay seconds, or dead-letters it
+        when it is out of attempts. Raises QueueError when its lease expired
+        """
+
+    @abstractmethod
+    def extend(self, message: QueueMessage, visibility_timeout: float):
+        """
+        Keeps a message hidden for visibility_timeout more seconds, for jobs
+        running longer than the timeout they were leased with
+        """
+
+    @abstractmethod
+    def dead_letters(self, limit=100) -> [QueueMessage]:
+        """
+        Returns
+        =======
+        dead-lettered messages, oldest first, without leases
+        """
+
+    @abstractmethod
+    def requeue_dead(self) -> int:
+        """
+        Makes every dead letter visible again with its attempts reset
+
+        Returns
+        =======
+        number of requeued messages
+        """
+
+    @abstractmethod
+    def counts(self) -> {str: int}:
+        """
+        Returns
+        =======
+        number of ready, leased, delayed and dead messages
+        """
+
+
+class SqliteQueue(WorkQueue):
+    """
+    WorkQueue in a SQLite file, for development, tests and single host
+    deployments without a broker. Every process on the host opens its own
+    SqliteQueue on the same path; leases run in BEGIN IMMEDIATE transactions
+    so concurrent consumers never lease the same visible message.
+
+    Single host only: the file is in WAL mode, whose shared memory index
+    does not work over a network filesystem, so keep it on a local disk and
+    use a broker backed WorkQueue to spread jobs across nodes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name="default",
+        visibility_timeout=60.0,
+        max_attempts=5,
+        busy_timeout=30.0,
+        clock=time.time,
+    ):
+        """
+        Parameters
+        ==========
+        path: SQLite file of the queue, created if missing
+        name: queue name, several queues can share one file
+        visibility_timeout: default seconds a leased message stays hidden
+        max_attempts: leases of a message before it is dead-lettered
+        busy_timeout: seconds to wait for another process's transaction
+        clock: wall clock shared by every consumer, leases expire by it
+        """
+        self.path = path
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+        self.db = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        # takes the write lock up front, a deferred transaction could read
+        # messages another process leases before this one writes
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def put(self, body, delay=0.0) -> int:
+        return self.put_many([body], delay=delay)[0]
+
+    def put_many(self, bodies: [], delay=0.0) -> [int]:
+        visible_at = self.clock() + delay
+        ids = []
+        with self.transaction():
+            for body in bodies:
+                cursor = self.db.execute(
+                    "INSERT INTO messages (queue, body, visible_at) VALUES (?, ?, ?)",
+                    (self.name, json.dumps(body), visible_at),
+                )
+                ids.append(cursor.lastrowid)
+
+        return ids
+
+    def lease(self, count=1, visibility_timeout: float = None) -> [QueueMessage]:
+        now = self.clock()
+        timeout = (
+            self.visibility_timeout
+            if visibility_timeout is None
+            else visibility_timeout
+        )
+        messages = []
+        with self.transaction():
+            while len(messages) < count:
+                # leased with a visibility timeout of 0, they are still visible
+                leased = [message.id for message in messages]
+                rows = self.db.execute(
+                    "SELECT id, body, attempts, lease, error FROM messages "
+                    "WHERE queue = ? AND dead = 0 AND visible_at <= ? "
+                    f"AND id NOT IN ({', '.join('?' * len(leased))}) "
+                    "ORDER BY visible_at, id LIMIT ?",
+                    (self.name, now, *leased, count - len(messages)),
+                ).fetchall()
+                if not rows:
+                    break
+                for id, body, attempts, lease, error in rows:
+                    if lease is not None and attempts >= self.max_attempts:
+                        # expired on its last attempt, not redelivered
+                        self.db.execute(
+                            "UPDATE messages SET dead = 1, lease = NULL, "
+                            "error = COALESCE(error, 'lease expired') WHERE id = ?",
+                            (id,),
+                        )
+                        continue
+                    message = QueueMessage(
+                        id=id,
+                        body=json.loads(body),
+                        attempts=attempts + 1,
+                        lease=uuid.uuid4().hex,
+                        visible_at=now + timeout,
+                        error=error,
+                    )
+                    self.db.execute(
+                        "UPDATE messages SET lease = ?, attempts = ?, visible_at = ? "
+                        "WHERE id = ?",
+                        (message.lease, message.attempts, message.visible_at, id),
+                    )
+                    messages.append(message)
+
+        return messages
+
+    def check_lease(self, cursor, message: QueueMessage):
+        if cursor.rowcount != 1:
+            raise QueueError(
+                f"lease of message {message.id} expired, it may be redelivered"
+            )
+
+    def ack(self, message: QueueMessage):
+        cursor = self.db.execute(
+            "DELETE FROM messages WHERE id = ? AND lease = ?",
+            (message.id, message.lease),
+        )
+        self.check_lease(cursor, message)
+
+    def nack(self, message: QueueMessage, delay=0.0, error: str = None):
+        dead = int(message.attempts >= self.max_attempts)
+        cursor = self.db.execute(
+            "UPDATE messages SET lease = NULL, dead = ?, visible_at = ?, error = ? "
+            "WHERE id = ? AND lease = ?",
+            (dead, self.clock() + delay, error, message.id, message.lease),
+        )
+        self.check_lease(cursor, message)
+
+    def extend(self, message: QueueMessage, visibility_timeout: float):
+        visible_at = self.clock() + visibility_timeout
+        cursor = self.db.execute(
+            "UPDATE messages SET visible_at = ? WHERE id = ? AND lease = ?",
+            (visible_at, message.id, message.lease),
+        )
+        self.check_lease(cursor, message)
+        message.visible_at = visible_at
+
+    def dead_letters(self, limit=100) -> [QueueMessage]:
+        rows = self.db.execute(
+            "SELECT id, body, attempts, error FROM messages "
+            "WHERE queue = ? AND dead = 1 ORDER BY id LIMIT ?",
+            (self.name, limit),
+        )
+        return [
+            QueueMessage(id=id, body=json.loads(body), attempts=attempts, error=error)
+            for id, body, attempts, error in rows
+        ]
+
+    def requeue_dead(self) -> int:
+        cursor = self.db.execute(
+            "UPDATE messages SET dead = 0, attempts = 0, lease = NULL, visible_at = ? "
+            "WHERE queue = ? AND dead = 1",
+            (self.clock(), self.name),
+        )
+        return cursor.rowcount
+
+    def counts(self) -> {str: int}:
+        now = self.clock()
+        counts = {"ready": 0, "leased": 0, "delayed": 0, "dead": 0}
+        rows = self.db.execute(
+            "SELECT CASE WHEN dead THEN 'dead' "
+            "WHEN visible_at <= ? THEN 'ready' "
+            "WHEN lease IS NOT NULL THEN 'leased' ELSE 'delayed' END, COUNT(*) "
+            "FROM messages WHERE queue = ? GROUP BY 1",
+            (now, self.name),
+        )
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+
+from bopbot.browser.driver import RawDriver
+from bopbot.jobs.checkpoints import CheckpointStore, JobRecord, JobState
+from bopbot.jobs.exceptions import QueueError
+from bopbot.jobs.queues import QueueMessage, WorkQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    Job handed to a JobRunner handler. A resumed job (step is not None) picks
+    up after its last checkpointed step instead of starting over.
+    """
+
+    __slots__ = ("payload", "record", "store")
+
+    def __init__(self, payload, record: JobRecord, store: CheckpointStore):
+        self.payload = payload
+        self.record = record
+        self.store = store
+
+    def __repr__(self):
+        return f"<Job {self.job_id} attempt={self.attempt} step={self.step}>"
+
+    @property
+    def job_id(self) -> str:
+        return self.record.job_id
+
+    @property
+    def attempt(self) -> int:
+        return self.record.attempts
+
+    @property
+    def step(self) -> str:
+        return self.record.step
+
+    @property
+    def data(self) -> {}:
+        return self.record.data
+
+    def checkpoint(self, step: str, **data):
+        """
+        Records step as completed, data is merged into the job's saved progress
+        """
+        self.store.save(job_id=self.job_id, step=step, data={**self.data, **data})
+
+
+class JobRunner:
+    """
+    Runs jobs one after another on a RawDriver, checkpointing every transition
+    in a CheckpointStore. Running the same jobs against the same store after a
+    crash skips done jobs and jobs out of attempts, and resumes the rest:
+
+        async def scrape(driver, job):
+            page = job.data.get("page", 1)
+            if job.step != "listing":
+                await driver.goto(job.payload)
+                job.checkpoint("listing")
+            ...
+            job.checkpoint("paged", page=page + 1)
+
+        with CheckpointStore("jobs.sqlite") as store:
+            runner = JobRunner(driver=bot.driver, store=store)
+            await runner.run(((url, url) for url in urls), handler=scrape)
+
+    When a job raises, the page is reset, or the browser restarted if it
+    crashed, before the next attempt.
+    """
+
+    def __init__(
+        self,
+        driver: RawDriver,
+        store: CheckpointStore,
+        max_attempts=3,
+        reset_page=True,
+    ):
+        """
+        Parameters
+        ==========
+        driver: RawDriver with a launched or connected browser
+        store: CheckpointStore the job states are recorded in
+        max_attempts: starts of a job, counted across runs, before it stays failed
+        reset_page: If True, the page is reset between jobs (see RawDriver.reset_page)
+        """
+        self.driver = driver
+        self.store = store
+        self.max_attempts = max_attempts
+        self.reset_page = reset_page
+
+    def should_skip(self, record: JobRecord) -> bool:
+        if record is None:
+            return False
+        if record.state == JobState.done:
+            return True
+        return self.exhausted(record)
+
+    def exhausted(self, record: JobRecord) -> bool:
+        # a running record was interrupted (worker killed) on its last attempt
+        states = (JobState.failed, JobState.running)
+        return record.state in states and record.attempts >= self.max_attempts
+
+    def fail_interrupted(self, job_id: str):
+        self.store.fail(job_id, error="interrupted on its last attempt")
+
+    def skip(self, job_id: str) -> str:
+        """
+        Returns
+        =======
+        summary key the job counts under when it is not run, None to run it.
+        Jobs interrupted on their last attempt are marked failed
+        """
+        record = self.store.get(job_id)
+        if not self.should_skip(record):
+            return None
+        if record.state == JobState.running:
+            self.fail_interrupted(job_id)
+            return JobState.failed.value
+        return "skipped"
+
+    def browser_crashed(self) -> bool:
+        process = getattr(self.driver.launcher, "proc", None)
+        return process is not None and process.poll() is not None
+
+    async def restart_browser(self):
+        try:
+            await self.driver.close()
+        except Exception:
+            logger.exception("closing the crashed browser failed")
+        await self.driver.get_new_browser()
+
+    async def recover(self):
+        """
+        Gets a clean page after a failed job, restarting the browser when it
+        crashed or the page can not be reset
+        """
+        if self.driver.launcher and self.browser_crashed():
+            await self.restart_browser()
+            return
+        try:
+            await self.driver.reset_page()
+        except Exception:
+            if not self.driver.launcher:
+                raise
+            logger.exception("resetting the page failed, restarting the browser")
+            await self.restart_browser()
+
+    async def run_job(self, job_id: str, payload, handler) -> JobState:
+        while True:
+            record = self.store.start(job_id)
+            if record.attempts > self.max_attempts:
+                self.fail_interrupted(job_id)
+                return JobState.failed
+            try:
+                await handler(
+                    self.driver, Job(payload=payload, record=record, store=self.store)
+                )
+            except asyncio.CancelledError:
+                # left running, resumed by the next run
+                raise
+            except Exception as error:
+                logger.exception(f"job [{job_id}] attempt {record.attempts} failed")
+                self.store.fail(job_id, error=repr(error))
+                await self.recover()
+                if record.attempts >= self.max_attempts:
+                    return JobState.failed
+                continue
+
+            self.store.finish(job_id)
+            if self.reset_page:
+                await self.driver.reset_page()
+            return JobState.done
+
+    async def run(self, jobs, handler) -> {str: int}:
+        """
+        Parameters
+        ==========
+        jobs: iterable of (job_id, payload), job ids must be unique and stable across runs
+        handler: coroutine function called with (driver, Job)
+
+        Returns
+        =======
+        number of jobs done, failed and skipped by this run
+        """
+        summary = {"done": 0, "failed": 0, "skipped": 0}
+        try:
+            for job_id, payload in jobs:
+                skipped = self.skip(job_id)
+                if skipped:
+                    summary[skipped] += 1
+                    continue
+                state = await self.run_job(
+                    job_id=job_id, payload=payload, handler=handler
+                )
+                summary[state.value] += 1
+        finally:
+            self.store.flush()
+
+        return summary
+
+    def hand_back(self, queue: WorkQueue, message: QueueMessage, record: JobRecord):
+        try:
+            if record.state == JobState.done:
+                queue.ack(message)
+            else:
+                queue.nack(message, error=record.error)
+        except QueueError:
+            # another consumer leased it after the visibility timeout, it redoes the job
+            logger.warning(f"job [{record.job_id}] outlived its lease")
+
+    async def run_queue(
+        self, queue: WorkQueue, handler, poll_interval=1.0, stop_when_empty=True
+    ) -> {str: int}:
+        """
+        Consumes jobs from a WorkQueue shared with runners in other processes,
+        on other nodes too when the queue is broker backed. Message bodies are
+        the payloads and job ids are "{queue.name}:{message.id}". Done jobs
+        are acked, failed ones nacked so the queue retries them, possibly
+        elsewhere, until they are dead-lettered. The queue's visibility
+        timeout has to cover all of a job's attempts on one runner.
+
+        Parameters
+        ==========
+        queue: WorkQueue to lease jobs from
+        handler: coroutine function called with (driver, Job)
+        poll_interval: seconds between leases while the queue has no visible message
+        stop_when_empty: If True, returns once no message is visible instead of polling
+
+        Returns
+        =======
+        number of jobs done, failed and skipped by this run
+        """
+        summary = {"done": 0, "failed": 0, "skipped": 0}
+        try:
+            while True:
+                messages = queue.lease(count=1)
+                if not messages:
+                    if stop_when_empty:
+                        break
+                    await asyncio.sleep(poll_interval)
+                    continue
+
+                message = messages[0]
+                job_id = f"{queue.name}:{message.id}"
+                skipped = self.skip(job_id)
+                if skipped:
+                    summary[skipped] += 1
+                else:
+                    state = await self.run_job(
+                        job_id=job_id, payload=message.body, handler=handler
+                    )
+                    summary[state.value] += 1
+                self.hand_back(
+                    queue=queue, message=message, record=self.store.get(job_id)
+                )
+        finally:
+            self.store.flush()
+
+        return summary
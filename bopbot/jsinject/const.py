@@ -1,194 +1,16 @@
-CHROME_VERSIONS = {
-    "01/24/2018:01/31/2018": [
-        "64.0.3282.134",
-        "65.0.3325.31",
-        "64.0.3282.122",
-        "65.0.3325.18",
-        "64.0.3282.119",
-    ],
-    "02/13/2018:02/28/2018": [
-        "65.0.3325.109",
-        "65.0.3325.106",
-        "66.0.3355.0",
-        "66.0.3350.0",
-        "64.0.3282.186",
-        "65.0.3325.89",
-        "65.0.3325.88",
-        "64.0.3282.167",
-    ],
-    "03/16/2018:03/29/2018": [
-        "66.0.3359.66",
-        "67.0.3381.0",
-        "67.0.3377.1",
-        "66.0.3359.45",
-        "65.0.3325.181",
-        "67.0.3371.0",
-    ],
-    "04/17/2018:04/30/2018": [
-        "68.0.3409.2",
-        "67.0.3396.18",
-        "67.0.3396.18",
-        "67.0.3396.10",
-        "66.0.3359.117",
-    ],
-    "05/29/2018:05/31/2018": ["68.0.3440.7", "67.0.3396.62"],
-    "06/05/2018:06/27/2018": [
-        "68.0.3440.42",
-        "69.0.3472.3",
-        "67.0.3396.99",
-        "68.0.3440.33",
-        "64.0.3464.2",
-        "68.0.3440.25",
-        "67.0.3396.87",
-        "68.0.3440.17",
-        "67.0.3396.79",
-        "68.0.3440.15",
-    ],
-    "07/17/2018:07/31/2018": [
-        "68.0.3440.84",
-        "69.0.3497.12",
-        "68.0.3440.75",
-        "68.0.3440.68",
-        "69.0.3493.3",
-    ],
-    "08/01/2018:08/31/2018": [
-        "69.0.3497.72",
-        "70.0.3534.4",
-        "69.0.3497.57",
-        "70.0.3528.4",
-        "69.0.3497.42",
-        "70.0.3521.2",
-        "69.0.3497.32",
-        "68.0.3440.106",
-        "70.0.3514.2",
-        "70.0.3510.0",
-        "69.0.3497.23",
-        "69.0.3497.23",
-    ],
-    "09/04/2018:09/27/2018": [
-        "70.0.3538.35",
-        "71.0.3559.6",
-        "70.0.3538.22",
-        "71.0.3554.4",
-        "69.0.3497.100",
-        "71.0.3551.3",
-        "70.0.3538.16",
-        "70.0.3538.16",
-        "69.0.3497.92",
-        "69.0.3497.92",
-        "70.0.3538.9",
-        "69.0.3497.81",
-    ],
-    "10/16/2018:10/31/2018": [
-        "71.0.3578.30",
-        "72.0.3595.2",
-        "72.0.3590.0",
-        "71.0.3578.20",
-        "70.0.3538.77",
-        "70.0.3538.77",
-        "71.0.3578.20",
-        "71.0.3578.10",
-        "70.0.3538.67",
-        "70.0.3538.67",
-    ],
-    "06/04/2019:06/27/2019": [
-        "76.0.3809.46",
-        "77.0.3833.0",
-        "77.0.3831.6",
-        "76.0.3809.36",
-        "75.0.3770.100",
-        "77.0.3824.6",
-        "76.0.3809.25",
-        "75.0.3770.90",
-        "76.0.3809.21",
-        "75.0.3770.90",
-        "76.0.3809.12",
-        "75.0.3770.80",
-    ],
-    "07/10/2019:07/30/2019": [
-        "76.0.3809.87",
-        "76.0.3809.87",
-        "77.0.3860.5",
-        "76.0.3809.80",
-        "77.0.3854.3",
-        "75.0.3770.142",
-        "76.0.3809.62",
-    ],
-    "08/6/2019:08/30/2019": [
-        "78.0.3895.5",
-        "77.0.3865.56",
-        "76.0.3809.132",
-        "77.0.3865.42",
-        "78.0.3887.7",
-        "77.0.3865.35",
-        "78.0.3876.0",
-        "77.0.3865.19",
-        "77.0.3865.19",
-        "76.0.3809.100",
-        "76.0.3809.100",
-    ],
-    "09/10/2019:09/30/2019": [
-        "78.0.3904.34",
-        "79.0.3921.0",
-        "78.0.3904.21",
-        "77.0.3865.90",
-        "77.0.3865.90",
-        "78.0.3904.17",
-        "78.0.3904.9",
-        "77.0.3865.75",
-    ],
-    "10/10/2019:10/31/2019": [
-        "78.0.3904.87",
-        "79.0.3945.16",
-        "79.0.3945.13",
-        "79.0.3945.16",
-        "79.0.3945.8",
-        "78.0.3904.70",
-        "78.0.3904.85",
-        "78.0.3904.63",
-        "79.0.3941.4",
-        "79.0.3938.0",
-        "77.0.3865.120",
-    ],
-    "11/01/2019:11/26/2019": [
-        "79.0.3945.56",
-        "79.0.3945.45",
-        "80.0.3968.0",
-        "79.0.3945.36",
-        "80.0.3964.0",
-        "80.0.3962.2",
-        "79.0.3904.29",
-        "78.0.3904.97",
-        "80.0.3955.4",
-    ],
-    "12/10/2019:12/19/2019": [
-        "80.0.3987.16",
-        "81.0.4000.3",
-        "79.0.3945.88",
-        "80.0.3987.7",
-        "79.0.3945.79",
-    ],
-    "01/07/2020:01/30/2020": [
-        "80.0.3987.78",
-        "81.0.4040.5",
-        "80.0.3987.66",
-        "81.0.4033.2",
-        "79.0.3945.130",
-        "80.0.3987.53",
-        "81.0.4021.2",
-        "80.0.3987.42",
-        "79.0.3945.117",
-    ],
-    "02/04/2020:02/20/2020": [
-        "82.0.4062.3",
-        "81.0.4044.26",
-        "80.0.3987.116",
-        "82.0.4056.3",
-        "80.0.3987.106",
-        "81.0.4044.17",
-        "81.0.4044.17",
-        "80.0.3987.100",
-        "81.0.4044.9",
-        "80.0.3987.87",
-    ],
-}
+"""
+CHROME_VERSIONS, {"<release window mm/dd/yyyy:mm/dd/yyyy>": [versions]} ordered
+from oldest to newest window, is read from bopbot/static on first access
+"""
+import json
+
+from bopbot.jsinject.jslibs import read_static
+
+
+def __getattr__(name: str):
+    if name != "CHROME_VERSIONS":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    chrome_versions = json.loads(read_static("chrome_versions.json"))
+    globals()[name] = chrome_versions
+    return chrome_versions
@@ -0,0 +1,168 @@
+import gzip
+import json
+import random
+
+from bopbot.utils import EnvReader
+from bopbot.jsinject.navigator import get_random_chrome_version
+
+
+PLATFORMS = {
+    "win": {
+        "ua_os": "Windows NT 10.0; Win64; x64",
+        "platform": "Win32",
+        "viewports": [(1920, 1080), (1366, 768), (1536, 864), (1440, 900), (1280, 720)],
+    },
+    "mac": {
+        "ua_os": "Macintosh; Intel Mac OS X 10_14_6",
+        "platform": "MacIntel",
+        "viewports": [(1440, 900), (1680, 1050), (1280, 800), (1920, 1080)],
+    },
+    "linux": {
+        "ua_os": "X11; Linux x86_64",
+        "platform": "Linux x86_64",
+        "viewports": [(1920, 1080), (1366, 768), (1600, 900), (1280, 1024)],
+    },
+}
+HARDWARE_CONCURRENCY = (2, 4, 4, 8, 8, 8, 12, 16)
+DEVICE_MEMORY = (2, 4, 8, 8, 8)
+# column order of profiles stored on disk by FingerprintCatalog.save(..)
+PROFILE_COLUMNS = (
+    "os",
+    "chrome_version",
+    "hardwareConcurrency",
+    "deviceMemory",
+    "width",
+    "height",
+)
+
+
+class Fingerprint:
+    """
+    Navigator and window properties that are consistent with each other
+    (the user agent's OS matches platform and viewport, etc.)
+    """
+
+    __slots__ = PROFILE_COLUMNS
+
+    def __init__(
+        self, os, chrome_version, hardwareConcurrency, deviceMemory, width, height
+    ):
+        self.os = os
+        self.chrome_version = chrome_version
+        self.hardwareConcurrency = hardwareConcurrency
+        self.deviceMemory = deviceMemory
+        self.width = width
+        self.height = height
+
+    @property
+    def user_agent(self) -> str:
+        ua_os = PLATFORMS[self.os]["ua_os"]
+        webkit = "AppleWebKit/537.36 (KHTML, like Gecko)"
+        return (
+            f"Mozilla/5.0 ({ua_os}) {webkit} Chrome/{self.chrome_version} Safari/537.36"
+        )
+
+    @property
+    def navigator(self) -> {}:
+        """
+        Properties in the format PageManager.navigator_config expects
+        """
+        user_agent = self.user_agent
+        return {
+            "appCodeName": "Mozilla",
+            "appName": "Netscape",
+            "appVersion": user_agent.split("/", 1)[1],
+            "platform": PLATFORMS[self.os]["platform"],
+            "userAgent": user_agent,
+            "product": "Gecko",
+            "productSub": "20030107",
+            "vendor": "Google Inc.",
+            "vendorSub": "",
+            "hardwareConcurrency": self.hardwareConcurrency,
+            "deviceMemory": self.deviceMemory,
+        }
+
+    @property
+    def view_port(self) -> {}:
+        return {"width": self.width, "height": self.height}
+
+    def as_row(self) -> []:
+        return [getattr(self, column) for column in PROFILE_COLUMNS]
+
+
+class FingerprintCatalog:
+    """
+    Pool of pre-generated Fingerprints. Generation cost is paid once when the
+    catalog is built (or loaded from disk), sample() is then a single random.choice(..)
+    """
+
+    def __init__(self, size=256, seed=None, os=("win", "mac", "linux"), profiles=None):
+        """
+        Parameters
+        ==========
+        size: number of profiles generated for the pool
+        seed: seeds both pool generation and sampling for reproducible runs
+        os: platforms profiles are generated for, keys of PLATFORMS
+        profiles: pre-built Fingerprint list, skips generation (see self.load(..))
+        """
+        self.rng = random.Random(seed)
+        self.profiles = (
+            profiles
+            if profiles is not None
+            else [self.generate(running_os=self.rng.choice(os)) for _ in range(size)]
+        )
+
+    def generate(self, running_os: str) -> Fingerprint:
+        width, height = self.rng.choice(PLATFORMS[running_os]["viewports"])
+        return Fingerprint(
+            os=running_os,
+            chrome_version=get_random_chrome_version(rng=self.rng),
+            hardwareConcurrency=self.rng.choice(HARDWARE_CONCURRENCY),
+            deviceMemory=self.rng.choice(DEVICE_MEMORY),
+            width=width,
+            height=height,
+        )
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def sample(self) -> Fingerprint:
+        return self.rng.choice(self.profiles)
+
+    def save(self, path):
+        """
+        Writes profiles as gzipped JSON rows ordered by PROFILE_COLUMNS
+        """
+        payload = {
+            "columns": PROFILE_COLUMNS,
+            "rows": [profile.as_row() for profile in self.profiles],
+        }
+        with gzip.open(path, "wt") as fl:
+            json.dump(payload, fl, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path, seed=None):
+        with gzip.open(path, "rt") as fl:
+            payload = json.load(fl)
+        columns = payload["columns"]
+        profiles = [Fingerprint(**dict(zip(columns, row))) for row in payload["rows"]]
+
+        return cls(seed=seed, profiles=profiles)
+
+
+_default_catalog = None
+
+
+def get_default_catalog() -> FingerprintCatalog:
+    """
+    Process wide catalog shared by every PageManager. Loaded from the
+    BOPBOT_FINGERPRINTS file when set, otherwise generated on first use.
+    """
+    global _default_catalog
+    if _default_catalog is None:
+        path = EnvReader.get_str("BOPBOT_FINGERPRINTS")
+        _default_catalog = (
+            FingerprintCatalog.load(path) if path else FingerprintCatalog()
+        )
+
+    return _default_catalog
@@ -1,13 +1,30 @@
 import random
 
-from bopbot.jsinject.const import CHROME_VERSIONS
+from bopbot.jsinject import const
 
 
-def get_random_chrome_version():
-    version_numbers = []
-    for releases in CHROME_VERSIONS.values():
-        version_numbers.extend(releases)
-    return random.choice(version_numbers)
+_chrome_version_table = None
+
+
+def get_chrome_version_table() -> ():
+    """
+    Flattened const.CHROME_VERSIONS where each version is repeated by the recency rank
+    of its release window (oldest window once, newest window len(CHROME_VERSIONS)
+    times). Built once per process so sampling is a single random.choice(..).
+    """
+    global _chrome_version_table
+    if _chrome_version_table is None:
+        table = []
+        for rank, releases in enumerate(const.CHROME_VERSIONS.values(), start=1):
+            for version in releases:
+                table.extend([version] * rank)
+        _chrome_version_table = tuple(table)
+
+    return _chrome_version_table
+
+
+def get_random_chrome_version(rng=random):
+    return rng.choice(get_chrome_version_table())
 
 
 def get_default_user_agent():
@@ -0,0 +1,445 @@
+"""
+In-page functions evaluated through Frame.evaluate(<script>, *args).
+Arguments are passed as JSON by the devtools protocol, so selectors never
+need to be escaped into the script source.
+"""
+
+# reads a property path ("innerText", "dataset.id") or "@<attribute>" off a node
+READ_NODE = """
+    const read = (node, attr) => {
+        if (!node) {
+            return null;
+        }
+        if (attr[0] === "@") {
+            return node.getAttribute(attr.slice(1));
+        }
+        let value = node;
+        for (const key of attr.split(".")) {
+            if (value === null || value === undefined) {
+                return null;
+            }
+            value = value[key];
+        }
+        return value === undefined ? null : value;
+    };
+"""
+
+EXTRACT_ROWS = "".join(
+    (
+        """
+(containerSelector, fields, offset, limit) => {""",
+        READ_NODE,
+        """
+    const containers = document.querySelectorAll(containerSelector);
+    const end = limit > 0 ? Math.min(containers.length, offset + limit) : containers.length;
+    const rows = [];
+    for (let i = offset; i < end; i++) {
+        const row = {};
+        for (const [name, selector, attr] of fields) {
+            const node = selector ? containers[i].querySelector(selector) : containers[i];
+            row[name] = read(node, attr);
+        }
+        rows.push(row);
+    }
+    return {total: containers.length, rows: rows};
+}
+""",
+    )
+)
+
+READ_BATCH = "".join(
+    (
+        """
+(reads) => {""",
+        READ_NODE,
+        """
+    return reads.map(([selector, kind, attr]) => {
+        const node = document.querySelector(selector);
+        if (kind === "exists") {
+            return node !== null;
+        }
+        if (node === null) {
+            return null;
+        }
+        if (kind === "visible") {
+            return node.style.display != "none";
+        }
+        return read(node, attr);
+    });
+}
+""",
+    )
+)
+
+SELECT_VALUES = """
+(element, values) => {
+    if (element.nodeName.toLowerCase() !== "select") {
+        throw new Error("Element is not a <select> element.");
+    }
+    const options = Array.from(element.options);
+    element.value = undefined;
+    for (const option of options) {
+        option.selected = values.includes(option.value);
+        if (option.selected && !element.multiple) {
+            break;
+        }
+    }
+    element.dispatchEvent(new Event("input", {bubbles: true}));
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+    return options.filter(option => option.selected).map(option => option.value);
+}
+"""
+
+PASTE_TEXT = """
+(target, text) => {
+    const element = typeof target === "string" ? document.querySelector(target) : target;
+    element.focus();
+    const clipboard = new DataTransfer();
+    clipboard.setData("text/plain", text);
+    const pasteEvent = new ClipboardEvent("paste", {
+        clipboardData: clipboard, bubbles: true, cancelable: true
+    });
+    if (!element.dispatchEvent(pasteEvent)) {
+        return element.value;
+    }
+    // native setter so frameworks tracking the value property (React, Vue) see the change,
+    // taken from the built-in prototype as customized built-ins may override it
+    const prototype = HTMLTextAreaElement.prototype.isPrototypeOf(element)
+        ? HTMLTextAreaElement.prototype
+        : HTMLInputElement.prototype;
+    const descriptor = Object.getOwnPropertyDescriptor(prototype, "value");
+    descriptor.set.call(element, element.value + text);
+    element.dispatchEvent(new InputEvent("input", {
+        bubbles: true, inputType: "insertFromPaste", data: text
+    }));
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+    return element.value;
+}
+"""
+
+# serializes the document (and same origin iframe documents) into the flat,
+# string interned arrays read by bopbot.dom.snapshot.DomSnapshot.from_capture(..).
+# Nodes are listed in document order, an iframe's document directly follows
+# the iframe element's own children. Script and style text is dropped.
+CAPTURE_SNAPSHOT = """
+(includeFrames) => {
+    const strings = [];
+    const stringIds = new Map();
+    const intern = (value) => {
+        let id = stringIds.get(value);
+        if (id === undefined) {
+            id = strings.length;
+            strings.push(value);
+            stringIds.set(value, id);
+        }
+        return id;
+    };
+    const skipText = new Set(["script", "style", "noscript", "template"]);
+    const textName = intern("#text");
+    const parents = [], names = [], values = [], frames = [];
+    const attrCounts = [], attrs = [], frameUrls = [document.URL];
+
+    // explicit stack, deep documents would overflow a recursive walk
+    const stack = [[document.documentElement, -1, 0]];
+    while (stack.length) {
+        const [node, parent, frame] = stack.pop();
+        const index = parents.length;
+        parents.push(parent);
+        frames.push(frame);
+        if (node.nodeType === Node.TEXT_NODE) {
+            const text = node.nodeValue;
+            names.push(textName);
+            values.push(intern(text.trim() ? text : " "));
+            attrCounts.push(0);
+            continue;
+        }
+
+        names.push(intern(node.localName));
+        values.push(-1);
+        attrCounts.push(node.attributes.length);
+        for (const attribute of node.attributes) {
+            attrs.push(intern(attribute.name), intern(attribute.value));
+        }
+        if (includeFrames && (node.localName === "iframe" || node.localName === "frame")) {
+            let frameDocument = null;
+            try {
+                frameDocument = node.contentDocument;
+            } catch (error) {}
+            if (frameDocument && frameDocument.documentElement) {
+                stack.push([frameDocument.documentElement, index, frameUrls.length]);
+                frameUrls.push(frameDocument.URL);
+            }
+        }
+        const keepText = !skipText.has(node.localName);
+        const children = node.childNodes;
+        for (let i = children.length - 1; i >= 0; i--) {
+            const child = children[i];
+            const isText = child.nodeType === Node.TEXT_NODE;
+            if (child.nodeType === Node.ELEMENT_NODE || (keepText && isText)) {
+                stack.push([child, index, frame]);
+            }
+        }
+    }
+    return {strings, parents, names, values, frames, attrCounts, attrs, frameUrls};
+}
+"""
+
+# visibility and geometry of many selectors in one call, all reads share one
+# layout. Reasons are checked cheapest first and the first failing one is
+# returned: missing, display_none, not_rendered, visibility_hidden,
+# transparent, zero_size, off_screen, covered.
+ELEMENT_GEOMETRY = """
+(selectors, hitTest, scrollIntoView) => {
+    const describe = (node) => {
+        let description = node.localName || node.nodeName.toLowerCase();
+        if (node.id) {
+            description += "#" + node.id;
+        }
+        if (typeof node.className === "string" && node.className.trim()) {
+            description += "." + node.className.trim().split(/\\s+/).join(".");
+        }
+        return description;
+    };
+    const isTransparent = (node) => {
+        if (node.checkVisibility) {
+            return !node.checkVisibility({checkOpacity: true});
+        }
+        for (let current = node; current; current = current.parentElement) {
+            if (getComputedStyle(current).opacity === "0") {
+                return true;
+            }
+        }
+        return false;
+    };
+    const hasHiddenAncestor = (node) => {
+        for (let current = node; current; current = current.parentElement) {
+            if (getComputedStyle(current).display === "none") {
+                return true;
+            }
+        }
+        return false;
+    };
+    const inViewport = (rect) => {
+        const left = Math.max(rect.left, 0);
+        const top = Math.max(rect.top, 0);
+        const right = Math.min(rect.right, window.innerWidth);
+        const bottom = Math.min(rect.bottom, window.innerHeight);
+        if (right <= left || bottom <= top) {
+            return null;
+        }
+        return {left, top, width: right - left, height: bottom - top};
+    };
+    const hits = (node, x, y) => {
+        const hit = document.elementFromPoint(x, y);
+        return hit !== null && (hit === node || node.contains(hit));
+    };
+
+    return selectors.map((selector) => {
+        const node = document.querySelector(selector);
+        if (node === null) {
+            return {exists: false, reason: "missing"};
+        }
+        let reason = null;
+        if (node.getClientRects().length === 0) {
+            reason = hasHiddenAncestor(node) ? "display_none" : "not_rendered";
+        } else if (getComputedStyle(node).visibility !== "visible") {
+            reason = "visibility_hidden";
+        } else if (isTransparent(node)) {
+            reason = "transparent";
+        }
+
+        let rect = node.getBoundingClientRect();
+        if (reason === null && (rect.width === 0 || rect.height === 0)) {
+            reason = "zero_size";
+        }
+        let visible = inViewport(rect);
+        if (reason === null && visible === null && scrollIntoView) {
+            node.scrollIntoView({block: "center", inline: "center"});
+            rect = node.getBoundingClientRect();
+            visible = inViewport(rect);
+        }
+        if (reason === null && visible === null) {
+            reason = "off_screen";
+        }
+
+        let point = null;
+        let coveredBy = null;
+        // only a visible element gets a click point, a hidden one in the viewport has none
+        if (reason === null && visible !== null) {
+            // center of the part inside the viewport, then its quarter points
+            const points = [[0.5, 0.5], [0.25, 0.25], [0.75, 0.25], [0.25, 0.75], [0.75, 0.75]].map(
+                ([fx, fy]) => [visible.left + visible.width * fx, visible.top + visible.height * fy]
+            );
+            point = points[0];
+            if (hitTest) {
+                point = points.find(([x, y]) => hits(node, x, y)) || null;
+                if (point === null) {
+                    reason = "covered";
+                    const cover = document.elementFromPoint(points[0][0], points[0][1]);
+                    coveredBy = cover ? describe(cover) : null;
+                }
+            }
+        }
+        const area = rect.width * rect.height;
+        return {
+            exists: true,
+            reason: reason,
+            box: [rect.x, rect.y, rect.width, rect.height],
+            viewportRatio: visible && area ? (visible.width * visible.height) / area : 0,
+            point: point,
+            coveredBy: coveredBy,
+        };
+    });
+}
+"""
+
+# position of the first matching candidate of each selector cascade, -1 if none match
+RESOLVE_ALTERNATIVES = """
+(cascades) => cascades.map(
+    (candidates) => candidates.findIndex((selector) => document.querySelector(selector) !== null)
+)
+"""
+
+# polled through Page.waitForFunction, resolves to 1 + the position of the
+# first (visible) candidate. Visibility matches pyppeteer's waitForSelector.
+WAIT_FOR_ALTERNATIVES = """
+(candidates, visible) => {
+    for (let position = 0; position < candidates.length; position++) {
+        const node = document.querySelector(candidates[position]);
+        if (node === null) {
+            continue;
+        }
+        if (!visible) {
+            return position + 1;
+        }
+        const style = window.getComputedStyle(node);
+        const rect = node.getBoundingClientRect();
+        if (style && style.visibility !== "hidden" && rect.width && rect.height) {
+            return position + 1;
+        }
+    }
+    return false;
+}
+"""
+
+# polled through Page.waitForFunction with [[selector, value]] fields and the
+# selectors of fields typed afterwards: keeps polling (false) until every selector
+# matches, then sets all field values at once. Nothing is filled when a field
+# matches an element it can not set, its selector is reported as unsupported, or
+# when a select or radio group has no option for its value, reported as invalid.
+FILL_FORM = """
+(fields, required) => {
+    for (const selector of required) {
+        if (document.querySelector(selector) === null) {
+            return false;
+        }
+    }
+    const kindOf = (element) => {
+        const name = element.nodeName.toLowerCase();
+        if (name === "select" || name === "textarea") {
+            return name;
+        }
+        if (name === "input") {
+            const type = (element.type || "text").toLowerCase();
+            if (type === "checkbox" || type === "radio") {
+                return type;
+            }
+            return ["button", "submit", "reset", "image", "file"].includes(type) ? null : "input";
+        }
+        return element.isContentEditable ? "contenteditable" : null;
+    };
+    const targets = [];
+    for (const [selector, value] of fields) {
+        const element = document.querySelector(selector);
+        if (element === null) {
+            return false;
+        }
+        targets.push([selector, element, kindOf(element), value]);
+    }
+    const unsupported = targets.filter(([, , kind]) => kind === null).map(([selector]) => selector);
+    if (unsupported.length) {
+        return {unsupported: unsupported, invalid: []};
+    }
+    const selectValues = (value) => (Array.isArray(value) ? value : [value]).map(String);
+    // true checks the matched radio, a string checks the radio of its group with that value
+    const radioFor = (element, value) => {
+        if (typeof value !== "string") {
+            return element;
+        }
+        const scope = element.form || document;
+        const group = Array.from(scope.querySelectorAll("input[type=radio]"));
+        return group.find((other) => other.name === element.name && other.value === value) || null;
+    };
+    const isValid = (element, kind, value) => {
+        if (kind === "select") {
+            const options = Array.from(element.options).map(option => option.value);
+            return selectValues(value).every(selected => options.includes(selected));
+        }
+        return kind !== "radio" || radioFor(element, value) !== null;
+    };
+    const invalid = targets.filter(([, element, kind, value]) => !isValid(element, kind, value))
+        .map(([selector]) => selector);
+    if (invalid.length) {
+        return {unsupported: [], invalid: invalid};
+    }
+    const notify = (element) => {
+        element.dispatchEvent(new Event("input", {bubbles: true}));
+        element.dispatchEvent(new Event("change", {bubbles: true}));
+    };
+    // native setters so frameworks tracking the properties (React, Vue) see the change,
+    // looked up on the built-in prototype as customized built-ins may override them
+    const nativePrototypes = [HTMLInputElement.prototype, HTMLTextAreaElement.prototype];
+    const setProperty = (element, property, value) => {
+        const prototype = nativePrototypes.find((native) => native.isPrototypeOf(element));
+        Object.getOwnPropertyDescriptor(prototype, property).set.call(element, value);
+    };
+    const fill = (element, kind, value) => {
+        if (kind === "select") {
+            const values = selectValues(value);
+            for (const option of element.options) {
+                option.selected = values.includes(option.value);
+            }
+            notify(element);
+            return Array.from(element.selectedOptions).map(option => option.value);
+        }
+        if (kind === "checkbox") {
+            setProperty(element, "checked", Boolean(value));
+            notify(element);
+            return element.checked;
+        }
+        if (kind === "radio") {
+            const radio = radioFor(element, value);
+            if (value !== false) {
+                setProperty(radio, "checked", true);
+                notify(radio);
+            }
+            return radio.checked ? radio.value : null;
+        }
+        if (kind === "contenteditable") {
+            element.textContent = String(value);
+            element.dispatchEvent(new InputEvent("input", {bubbles: true}));
+            return element.textContent;
+        }
+        element.focus();
+        setProperty(element, "value", String(value));
+        notify(element);
+        element.blur();
+        return element.value;
+    };
+    return targets.map(([selector, element, kind, value]) => {
+        const start = performance.now();
+        const filled = fill(element, kind, value);
+        return {kind: kind, value: filled, ms: performance.now() - start};
+    });
+}
+"""
+
+# sessionStorage lives per tab and origin, Storage.clearDataForOrigin leaves it.
+# Sandboxed documents throw on access, there is nothing to clear then.
+CLEAR_SESSION_STORAGE = """
+() => {
+    try {
+        sessionStorage.clear();
+    } catch (error) {}
+}
+"""
@@ -0,0 +1,4 @@
+class ResultSinkError(Exception):
+    """Raised when results cannot be written to or read from a sink"""
+
+    pass
@@ -0,0 +1,375 @@
+import io
+import os
+import re
+import gzip
+import json
+import time
+import queue
+import threading
+from enum import Enum
+
+from bopbot.results.exceptions import ResultSinkError
+
+
+class Compression(Enum):
+    none = ".jsonl"
+    gzip = ".jsonl.gz"
+    # needs the optional zstandard package (pip install zstandard)
+    zstd = ".jsonl.zst"
+
+    @property
+    def suffix(self) -> str:
+        return self.value
+
+    @classmethod
+    def from_path(cls, path: str) -> "Compression":
+        for compression in (cls.gzip, cls.zstd):
+            if path.endswith(compression.suffix):
+                return compression
+        return cls.none
+
+
+def get_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ResultSinkError(
+            "zstd compressed results require zstandard (pip install zstandard)"
+        )
+    return zstandard
+
+
+def compress(payload: bytes, compression: Compression) -> bytes:
+    """
+    Every batch becomes a complete gzip member / zstd frame: concatenated they
+    read back as one stream, and any batch boundary is a valid truncation point
+    """
+    if compression == Compression.gzip:
+        return gzip.compress(payload, compresslevel=6)
+    if compression == Compression.zstd:
+        return get_zstandard().ZstdCompressor().compress(payload)
+    return payload
+
+
+def open_lines(path: str):
+    compression = Compression.from_path(path)
+    if compression == Compression.gzip:
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == Compression.zstd:
+        reader = (
+            get_zstandard()
+            .ZstdDecompressor()
+            .stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_records(path: str):
+    """
+    Lazily yields the records of one JSONL file, compressed or not (picked by
+    suffix), without loading the file in memory
+
+    Parameters
+    ==========
+    path: file written by JsonlSink or any JSON lines file
+    """
+    with open_lines(path) as fl:
+        for line in fl:
+            if line.strip():
+                yield json.loads(line)
+
+
+def part_name(prefix: str, index: int, compression: Compression) -> str:
+    return f"{prefix}-{index:05d}{compression.suffix}"
+
+
+def list_parts(directory: str, prefix="results") -> [(int, str)]:
+    """
+    Returns
+    =======
+    (index, path) of the sink's part files in write order
+    """
+    pattern = re.compile(
+        rf"{re.escape(prefix)}-(\d+)\.jsonl(\.gz|\.zst)?$", flags=re.ASCII
+    )
+    parts = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            parts.append((int(match.group(1)), os.path.join(directory, name)))
+
+    return sorted(parts)
+
+
+def checkpoint_path(directory: str, prefix="results") -> str:
+    return os.path.join(directory, f"{prefix}.checkpoint")
+
+
+def load_checkpoint(directory: str, prefix="results") -> {}:
+    """
+    Returns
+    =======
+    last checkpoint marker of a sink: part index, byte offset in it, total
+    records and key of the last durable record. None when nothing was written
+    """
+    try:
+        with open(checkpoint_path(directory=directory, prefix=prefix), "r") as fl:
+            return json.load(fl)
+    except FileNotFoundError:
+        return None
+
+
+def iter_results(directory: str, prefix="results"):
+    """
+    Lazily yields the records of every part of a sink, in write order.
+    Records written after the last checkpoint marker are skipped, they are
+    dropped when the sink is opened again
+
+    Parameters
+    ==========
+    directory: JsonlSink directory
+    prefix: JsonlSink prefix
+    """
+    marker = load_checkpoint(directory=directory, prefix=prefix)
+    if marker is None:
+        return
+
+    for index, path in list_parts(directory=directory, prefix=prefix):
+        if index > marker["part"]:
+            break
+        if index < marker["part"]:
+            yield from iter_records(path)
+            continue
+        with open(path, "rb") as fl:
+            durable = fl.read(marker["offset"])
+        if not durable:
+            continue
+        if Compression.from_path(path) == Compression.gzip:
+            durable = gzip.decompress(durable)
+        elif Compression.from_path(path) == Compression.zstd:
+            reader = (
+                get_zstandard()
+                .ZstdDecompressor()
+                .stream_reader(io.BytesIO(durable), read_across_frames=True)
+            )
+            durable = reader.read()
+        for line in durable.decode("utf-8").splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+
+class JsonlSink:
+    """
+    Append only JSON lines sink for extracted results. write(..) serializes the
+    record and enqueues it; a background thread writes batches to part files
+    ({prefix}-00000.jsonl[.gz|.zst]) so the event loop never blocks on disk.
+
+    After each batch is written (and fsynced) the {prefix}.checkpoint marker is
+    atomically replaced with the part, byte offset, record count and the key of
+    the last durable record. Opening a sink on the same directory truncates
+    whatever was written after the marker, and resume_key tells the producer
+    where to pick up, so a crash neither loses nor duplicates checkpointed
+    records (records queued or written after the last marker are redone):
+
+        with JsonlSink(directory="out", compression=Compression.gzip) as sink:
+            for url in urls_after(sink.resume_key):
+                await bot.driver.goto(url)
+                sink.write(await bot.extract(container, fields), key=url)
+
+        for record in iter_results("out"):
+            ...
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix="results",
+        compression=Compression.none,
+        max_bytes=64 * 1024 * 1024,
+        max_seconds: float = None,
+        batch_size=256,
+        flush_interval=1.0,
+        fsync=True,
+    ):
+        """
+        Parameters
+        ==========
+        directory: folder of the part files and checkpoint marker, created if missing
+        prefix: part file and marker name prefix
+        compression: Compression of the part files, each batch compressed separately
+        max_bytes: start a new part once the current one reaches this size on disk
+                   (0 disables size based rolling)
+        max_seconds: start a new part once the current one is this old, None disables it
+        batch_size: records buffered before a write
+        flush_interval: max seconds a record waits in the buffer
+        fsync: If False, batches are not fsynced before the marker moves: faster,
+               but the OS may lose checkpointed records on power loss
+        """
+        if compression == Compression.zstd:
+            get_zstandard()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.error = None
+        self.closed = False
+
+        marker = self.recover()
+        self.part = marker["part"] if marker else 0
+        self.offset = marker["offset"] if marker else 0
+        self.records = marker["records"] if marker else 0
+        self.resume_key = marker["key"] if marker else None
+        self.part_opened_at = time.monotonic()
+
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(
+            target=self.run, name=f"JsonlSink-{prefix}", daemon=True
+        )
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def part_path(self) -> str:
+        name = part_name(
+            prefix=self.prefix, index=self.part, compression=self.compression
+        )
+        return os.path.join(self.directory, name)
+
+    def recover(self) -> {}:
+        """
+        Truncates the current part to the checkpointed offset and removes parts
+        started after it, dropping records the marker does not cover
+
+        Returns
+        =======
+        checkpoint marker, None for an empty sink
+        """
+        marker = load_checkpoint(directory=self.directory, prefix=self.prefix)
+        last_part = marker["part"] if marker else -1
+        for index, path in list_parts(directory=self.directory, prefix=self.prefix):
+            if index > last_part:
+                os.remove(path)
+            elif index == last_part:
+                if Compression.from_path(path) != self.compression:
+                    raise ResultSinkError(
+                        f"{path} is not {self.compression.name} compressed, "
+                        f"reopen the sink with Compression.from_path(..)"
+                    )
+                with open(path, "r+b") as fl:
+                    fl.truncate(marker["offset"])
+
+        return marker
+
+    def raise_error(self):
+        if self.error is not None:
+            raise ResultSinkError(f"writing results failed: {self.error!r}")
+
+    def write(self, record, key=None):
+        """
+        Queues record for writing, does not block on disk
+
+        Parameters
+        ==========
+        record: JSON serializable result, serialized right away so later
+                changes to it are not written
+        key: identifies the work that produced record (url, job id, ..),
+             stored in the checkpoint marker once record is durable
+        """
+        self.raise_error()
+        if self.closed:
+            raise ResultSinkError("writing to a closed sink")
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self.queue.put((line + "\n", key))
+
+    def flush(self, timeout: float = None):
+        """
+        Blocks until every record queued so far is written and checkpointed
+        """
+        done = threading.Event()
+        self.queue.put(done)
+        if not done.wait(timeout=timeout):
+            raise ResultSinkError(f"flush did not finish within {timeout}s")
+        self.raise_error()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        self.raise_error()
+
+    def run(self):
+        batch, key = [], None
+        while True:
+            timeout = self.flush_interval if batch else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            if isinstance(item, tuple):
+                batch.append(item[0])
+                key = item[1] if item[1] is not None else key
+                if len(batch) < self.batch_size:
+                    continue
+            self.write_batch(lines=batch, key=key)
+            batch = []
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def write_batch(self, lines: [str], key):
+        if not lines or self.error is not None:
+            return
+        try:
+            self.roll()
+            payload = compress("".join(lines).encode("utf-8"), self.compression)
+            with open(self.part_path, "ab") as fl:
+                fl.write(payload)
+                fl.flush()
+                if self.fsync:
+                    os.fsync(fl.fileno())
+            self.offset += len(payload)
+            self.records += len(lines)
+            self.resume_key = key if key is not None else self.resume_key
+            self.write_checkpoint()
+        except Exception as error:
+            # surfaced on the caller's next write/flush/close
+            self.error = error
+
+    def roll(self):
+        age = time.monotonic() - self.part_opened_at
+        aged = self.max_seconds is not None and age >= self.max_seconds
+        full = self.max_bytes and self.offset >= self.max_bytes
+        if self.offset and (full or aged):
+            self.part += 1
+            self.offset = 0
+            self.part_opened_at = time.monotonic()
+
+    def write_checkpoint(self):
+        marker = {
+            "part": self.part,
+            "offset": self.offset,
+            "records": self.records,
+            "key": self.resume_key,
+        }
+        path = checkpoint_path(directory=self.directory, prefix=self.prefix)
+        with open(f"{path}.tmp", "w") as fl:
+            json.dump(marker, fl)
+            fl.flush()
+            if self.fsync:
+                os.fsync(fl.fileno())
+        os.replace(f"{path}.tmp", path)
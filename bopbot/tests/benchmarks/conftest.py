@@ -0,0 +1,21 @@
+import pytest
+
+from bopbot.utils import EnvReader
+from bopbot.benchmarks.timing import BenchmarkReport
+
+
+REPORT = BenchmarkReport(suite="bopbot.tests.benchmarks")
+
+
+@pytest.fixture
+def report():
+    return REPORT
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Writes collected benchmark results when BOPBOT_BENCH_REPORT points to a file
+    """
+    report_path = EnvReader.get_str("BOPBOT_BENCH_REPORT")
+    if report_path and REPORT.results:
+        REPORT.dump(report_path)
@@ -0,0 +1,415 @@
+import time
+import asyncio
+
+import pytest
+
+from bopbot.actions.actuators import BaseAction, TypingMode
+from bopbot.benchmarks.fake_cdp import FakeChrome, FakeNode
+from bopbot.benchmarks.timing import time_async
+from bopbot.browser.driver import RawDriver
+from bopbot.browser.launcher import BrowserConfig, BrowserWindow, SupportedOS
+from bopbot.dom.elements import LabeledSelector
+
+
+pytestmark = pytest.mark.benchmark
+
+
+ROWS = [{"title": f"result {i}", "link": f"https://site.test/{i}"} for i in range(1000)]
+
+
+def extract_rows(container, fields, offset, limit):
+    end = len(ROWS) if limit <= 0 else offset + limit
+    return {"total": len(ROWS), "rows": ROWS[offset:end]}
+
+
+SCRIPTS = [
+    (r"containerSelector", extract_rows),
+    (r"!== null$", True),
+    (r"style\.display != 'none'$", True),
+    (r"\.innerText$", "result"),
+]
+title = LabeledSelector(label="title", dom_hierarchy=["#results", "li", "h3"])
+results = LabeledSelector(label="results", dom_hierarchy=["#results", "li"])
+
+
+async def get_fake_bot(chrome: FakeChrome, cache_handles=False) -> BaseAction:
+    config = BrowserConfig(
+        browser_window=BrowserWindow(use_size_buffer=False),
+        running_os=SupportedOS.linux,
+    )
+    bot = BaseAction(
+        driver=RawDriver(chrome_config=config), cache_handles=cache_handles
+    )
+    await bot.driver.connect_browser(chrome.ws_endpoint)
+    await bot.driver.goto("https://site.test/")
+    chrome.reset_calls()
+    return bot
+
+
+class TestActionOverhead:
+    @pytest.mark.asyncio
+    async def test_per_action_overhead(self, report):
+        """
+        With zero protocol latency the timings are bopbot + pyppeteer overhead only
+        """
+        actions = {
+            "query": lambda bot: bot.query(elem=title),
+            "selector_exists": lambda bot: bot.selector_exists(elem=title),
+            "selector_visible": lambda bot: bot.selector_visible(elem=title),
+            "click": lambda bot: bot.click(elem=title),
+            "select": lambda bot: bot.select(elem=title, text="audi"),
+        }
+        async with FakeChrome(scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            for name, action in actions.items():
+                chrome.reset_calls()
+                timing = await time_async(
+                    name=f"action.{name}", func=lambda: action(bot), warmup=0
+                )
+                round_trips = chrome.round_trips / len(timing.samples)
+                report.add(timing, round_trips_per_call=round_trips)
+                assert round_trips >= 1
+            await bot.driver.close()
+
+    @pytest.mark.asyncio
+    async def test_handle_cache_saves_round_trips(self, report):
+        async with FakeChrome(scripts=SCRIPTS) as chrome:
+            round_trips = {}
+            for cache_handles in (False, True):
+                bot = await get_fake_bot(chrome=chrome, cache_handles=cache_handles)
+                chrome.reset_calls()
+                timing = await time_async(
+                    name=f"action.click.cache_handles={cache_handles}",
+                    func=lambda: bot.click(elem=title),
+                )
+                round_trips[cache_handles] = chrome.round_trips
+                report.add(timing, round_trips=chrome.round_trips)
+                await bot.driver.close()
+
+        assert round_trips[True] < round_trips[False]
+
+    @pytest.mark.asyncio
+    async def test_typing_modes_per_100_chars(self, report):
+        text = ("lorem ipsum " * 9)[:100]
+        async with FakeChrome(latency=0.001, scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            per_mode = {}
+            for mode in TypingMode:
+                chrome.reset_calls()
+                timing = await time_async(
+                    name=f"type.{mode.value}.100_chars",
+                    func=lambda: bot.type(elem=title, text=text, mode=mode),
+                    rounds=3,
+                    warmup=0,
+                )
+                per_mode[mode] = timing.mean
+                report.add(timing, round_trips=chrome.round_trips / 3)
+            await bot.driver.close()
+
+        assert per_mode[TypingMode.keystroke] > per_mode[TypingMode.word]
+        assert per_mode[TypingMode.keystroke] > per_mode[TypingMode.insert]
+        assert per_mode[TypingMode.keystroke] > per_mode[TypingMode.paste]
+
+
+class TestBatchApis:
+    @pytest.mark.asyncio
+    async def test_extract_vs_query_per_row(self, report):
+        fields = {"title": "h3", "link": ("a", "href")}
+        async with FakeChrome(latency=0.001, scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+
+            start = time.perf_counter()
+            rows = await bot.extract(container=results, fields=fields, chunk_size=500)
+            extract_trips = chrome.round_trips
+            report.add(
+                name="extract.1000_rows",
+                seconds=time.perf_counter() - start,
+                round_trips=extract_trips,
+            )
+
+            chrome.reset_calls()
+            start = time.perf_counter()
+            for _ in range(len(ROWS)):
+                await bot.query(elem=title)
+                await bot.query(elem=title, attr="innerText")
+            report.add(
+                name="query.1000_rows_x_2_fields",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            await bot.driver.close()
+
+        assert rows == ROWS
+        assert extract_trips <= 4
+        assert chrome.round_trips >= 2 * len(ROWS)
+
+
+class TestConcurrencyScaling:
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_on_one_page(self, report):
+        latency = 0.01
+        async with FakeChrome(latency=latency, scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            elapsed = {}
+            for concurrency in (1, 4, 16):
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *[bot.query(elem=title) for _ in range(concurrency)]
+                )
+                elapsed[concurrency] = time.perf_counter() - start
+                report.add(
+                    name=f"concurrency.page.{concurrency}_queries",
+                    seconds=elapsed[concurrency],
+                    queries_per_second=concurrency / elapsed[concurrency],
+                )
+            await bot.driver.close()
+
+        # 16 sequential queries would take at least 16 * latency
+        assert elapsed[16] < 16 * latency / 2
+
+    @pytest.mark.asyncio
+    async def test_action_group_vs_sequential_reads(self, report):
+        latency = 0.01
+        async with FakeChrome(latency=latency, scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            start = time.perf_counter()
+            await bot.query(elem=title)
+            await bot.selector_exists(elem=title)
+            await bot.selector_visible(elem=title)
+            await bot.query(elem=title, attr="innerText")
+            sequential = time.perf_counter() - start
+
+            group = bot.group()
+            group.add("title", bot.query, elem=title)
+            group.add("exists", bot.selector_exists, elem=title)
+            group.add("visible", bot.selector_visible, elem=title)
+            group.add("text", bot.query, elem=title, attr="innerText")
+            start = time.perf_counter()
+            results = await group.run()
+            grouped = time.perf_counter() - start
+            await bot.driver.close()
+
+        report.add(name="reads.sequential.4", seconds=sequential)
+        report.add(name="reads.group.4", seconds=grouped, speedup=sequential / grouped)
+        assert results["exists"] is True
+        assert grouped < sequential / 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_drivers(self, report):
+        async with FakeChrome(latency=0.005, scripts=SCRIPTS) as chrome:
+            for concurrency in (1, 4, 8):
+                bots = await asyncio.gather(
+                    *[get_fake_bot(chrome=chrome) for _ in range(concurrency)]
+                )
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *[
+                        bot.extract(container=results, fields={"t": "h3"})
+                        for bot in bots
+                    ]
+                )
+                seconds = time.perf_counter() - start
+                report.add(
+                    name=f"concurrency.drivers.{concurrency}_extracts",
+                    seconds=seconds,
+                    rows_per_second=concurrency * len(ROWS) / seconds,
+                )
+                for bot in bots:
+                    await bot.driver.close()
+
+
+class TestPageLifecycle:
+    @pytest.mark.asyncio
+    async def test_reset_vs_new_tab_vs_new_browser(self, report):
+        """
+        The fake browser has no renderer to start, so this compares the
+        protocol work of each strategy, bopbot.benchmarks.lifecycle measures
+        the real costs
+        """
+        async with FakeChrome(latency=0.002, scripts=SCRIPTS) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            page = bot.driver.page
+
+            async def new_browser():
+                await bot.driver.close()
+                await bot.driver.connect_browser(chrome.ws_endpoint)
+
+            strategies = {
+                "reset": bot.driver.reset_page,
+                "new_tab": bot.driver.page_manager.set_single_page,
+                "new_browser": new_browser,
+            }
+            timings = {}
+            for name, strategy in strategies.items():
+                chrome.reset_calls()
+                timing = await time_async(
+                    name=f"page.{name}", func=strategy, rounds=5, warmup=0
+                )
+                timings[name] = timing.mean
+                report.add(timing, round_trips=chrome.round_trips / 5)
+                if name == "reset":
+                    assert bot.driver.page is page
+                    assert chrome.calls["Target.createTarget"] == 0
+                    assert chrome.calls["Storage.clearDataForOrigin"] == 1
+                    assert chrome.calls["Page.addScriptToEvaluateOnNewDocument"] == 5
+            await bot.driver.close()
+
+        assert timings["reset"] < timings["new_tab"] < timings["new_browser"]
+
+
+def measure_visible(selectors, hit_test, scroll_into_view):
+    box = [10, 10, 100, 30]
+    return [
+        {
+            "exists": True,
+            "reason": None,
+            "box": box,
+            "viewportRatio": 1,
+            "point": [60, 25],
+        }
+        for _ in selectors
+    ]
+
+
+class TestGeometry:
+    @pytest.mark.asyncio
+    async def test_geometry_vs_per_selector_visibility(self, report):
+        elems = [
+            LabeledSelector(
+                label="item", dom_hierarchy=["#results", f"li:nth-child({i})"]
+            )
+            for i in range(1, 21)
+        ]
+        scripts = [(r"hitTest, scrollIntoView", measure_visible)] + SCRIPTS
+        async with FakeChrome(latency=0.002, scripts=scripts) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            start = time.perf_counter()
+            for elem in elems:
+                await bot.selector_visible(elem=elem)
+            report.add(
+                name="visibility.inline_style.20",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+
+            chrome.reset_calls()
+            start = time.perf_counter()
+            geometries = await bot.geometry(elems=elems)
+            report.add(
+                name="visibility.geometry.20",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            await bot.driver.close()
+
+        assert all(geometry.visible for geometry in geometries)
+        assert chrome.round_trips == 1
+
+    @pytest.mark.asyncio
+    async def test_checked_click_round_trips(self, report):
+        scripts = [(r"hitTest, scrollIntoView", measure_visible)] + SCRIPTS
+        async with FakeChrome(latency=0.002, scripts=scripts) as chrome:
+            round_trips = {}
+            for check_geometry in (False, True):
+                bot = await get_fake_bot(chrome=chrome)
+                bot.check_geometry = check_geometry
+                chrome.reset_calls()
+                timing = await time_async(
+                    name=f"action.click.check_geometry={check_geometry}",
+                    func=lambda: bot.click(elem=title),
+                    warmup=0,
+                )
+                round_trips[check_geometry] = chrome.round_trips / len(timing.samples)
+                report.add(timing, round_trips_per_call=round_trips[check_geometry])
+                await bot.driver.close()
+
+        # measuring replaces the handle query, scroll and content quad calls
+        assert round_trips[True] <= round_trips[False]
+
+
+class TestSelectorAlternatives:
+    @pytest.mark.asyncio
+    async def test_resolve_vs_sequential_fallback(self, report):
+        """
+        Primary and first alternative are gone, only the last alternative matches
+        """
+        elems = [
+            LabeledSelector(
+                label="field",
+                dom_hierarchy=[f"#gone-{i}"],
+                alternatives=[[f".gone-{i}"], [f"[name=field-{i}]"]],
+            )
+            for i in range(10)
+        ]
+        scripts = [
+            (r"cascades", lambda cascades: [len(c) - 1 for c in cascades]),
+            (r"gone-\d+\"\) !== null$", False),
+        ] + SCRIPTS
+        async with FakeChrome(latency=0.002, scripts=scripts) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            start = time.perf_counter()
+            for elem in elems:
+                for candidate in elem.candidates():
+                    fallback = LabeledSelector(label="field", dom_hierarchy=[candidate])
+                    if await bot.selector_exists(elem=fallback):
+                        break
+            report.add(
+                name="alternatives.sequential.10x3",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            sequential_trips = chrome.round_trips
+
+            chrome.reset_calls()
+            start = time.perf_counter()
+            matched = await bot.resolve(elems=elems)
+            report.add(
+                name="alternatives.resolve.10x3",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            await bot.driver.close()
+
+        assert matched == [2] * 10
+        assert sequential_trips == 30 and chrome.round_trips == 1
+
+
+def fill_fields(body, polling, timeout, *args):
+    if "(fields, required)" not in body:
+        return FakeNode()
+    fields, _ = args
+    return [{"kind": "input", "value": value, "ms": 0.1} for _, value in fields]
+
+
+class TestFillForm:
+    @pytest.mark.asyncio
+    async def test_fill_form_vs_typing_each_field(self, report):
+        fields = {}
+        for i in range(15):
+            field = LabeledSelector(label=f"field_{i}", dom_hierarchy=[f"#field-{i}"])
+            fields[field] = f"value {i:04d}"
+        scripts = [(r"waitForPredicatePageFunction", fill_fields)] + SCRIPTS
+        async with FakeChrome(latency=0.002, scripts=scripts) as chrome:
+            bot = await get_fake_bot(chrome=chrome)
+            start = time.perf_counter()
+            for elem, value in fields.items():
+                await bot.type(elem=elem, text=value, delay=0)
+            report.add(
+                name="form.type_each.15_fields",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            typed_trips = chrome.round_trips
+
+            chrome.reset_calls()
+            start = time.perf_counter()
+            fills = await bot.fill_form(fields=fields)
+            report.add(
+                name="form.fill_form.15_fields",
+                seconds=time.perf_counter() - start,
+                round_trips=chrome.round_trips,
+            )
+            await bot.driver.close()
+
+        assert [fill.value for fill in fills] == list(fields.values())
+        assert chrome.round_trips <= 3 and typed_trips > 100 * chrome.round_trips
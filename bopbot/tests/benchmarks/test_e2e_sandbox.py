@@ -0,0 +1,71 @@
+"""
+Scenario flows against the pure Python sandbox, these need Chrome installed
+(same image as the integration tests) but not the npm built Vue sandbox
+"""
+import os
+
+import pytest
+
+from bopbot.benchmarks.lifecycle import benchmark_page_lifecycle
+from bopbot.benchmarks.sandbox import StaticSandbox
+from bopbot.browser.exceptions import BrowserSetupError
+from bopbot.browser.launcher import get_chrome_path, identify_running_os
+from bopbot.benchmarks.scenarios import (
+    benchmark_scenario,
+    table_scenario,
+    deep_dom_scenario,
+    frames_scenario,
+    slow_resources_scenario,
+)
+
+
+def chrome_installed() -> bool:
+    try:
+        return os.path.exists(get_chrome_path(running_os=identify_running_os()))
+    except BrowserSetupError:
+        return False
+
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not chrome_installed(), reason="needs Chrome installed"),
+]
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    with StaticSandbox() as static_sandbox:
+        yield static_sandbox
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        table_scenario(rows=100),
+        table_scenario(rows=5000),
+        deep_dom_scenario(),
+        frames_scenario(),
+        slow_resources_scenario(),
+    ],
+    ids=lambda scenario: scenario.name,
+)
+async def test_scenario(sandbox, report, scenario):
+    await benchmark_scenario(
+        scenario=scenario, sandbox=sandbox, report=report, rounds=3
+    )
+    flow = report.results[-1]
+    assert flow["name"] == f"{scenario.name}.flow"
+    if scenario.container:
+        extract = next(
+            result
+            for result in report.results
+            if result["name"] == f"{scenario.name}.extract"
+        )
+        assert extract["rows"] > 0
+
+
+@pytest.mark.asyncio
+async def test_page_lifecycle(sandbox, report):
+    timings = await benchmark_page_lifecycle(sandbox=sandbox, report=report, rounds=3)
+    assert timings["reset"].mean < timings["new_browser"].mean
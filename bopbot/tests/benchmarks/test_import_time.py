@@ -0,0 +1,12 @@
+import pytest
+
+from bopbot.benchmarks.imports import ENTRY_POINTS, benchmark_imports
+
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_entry_point_import_time(report):
+    loaded = benchmark_imports(report=report, entry_points=ENTRY_POINTS, rounds=3)
+    for entry_point in ENTRY_POINTS:
+        assert loaded[entry_point] == [], f"{entry_point} loads {loaded[entry_point]}"
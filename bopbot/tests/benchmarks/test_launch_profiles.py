@@ -0,0 +1,31 @@
+"""
+Launch time and RSS per LaunchProfile, needs Chrome installed
+"""
+import pytest
+
+from bopbot.benchmarks.profiles import benchmark_launch_profile
+from bopbot.benchmarks.sandbox import StaticSandbox
+from bopbot.browser.launcher import LaunchProfile
+from bopbot.tests.benchmarks.test_e2e_sandbox import chrome_installed
+
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not chrome_installed(), reason="needs Chrome installed"),
+]
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    with StaticSandbox() as static_sandbox:
+        yield static_sandbox
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("profile", list(LaunchProfile), ids=lambda p: p.value)
+async def test_launch_profile(sandbox, report, profile):
+    result = await benchmark_launch_profile(
+        profile=profile, sandbox=sandbox, report=report, rounds=2
+    )
+    assert result["profile"] == profile.value
+    assert result["rss_mean_mb"] > 0 and result["mean_ms"] > 0
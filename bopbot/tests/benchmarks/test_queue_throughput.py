@@ -0,0 +1,20 @@
+"""
+SqliteQueue jobs per second with one and several consumer processes
+"""
+import pytest
+
+from bopbot.benchmarks.queues import benchmark_queue
+
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_queue_throughput(report, workers):
+    result = benchmark_queue(report=report, jobs=5000, workers=workers)
+    assert result["put_jobs_per_s"] > 0 and result["consume_jobs_per_s"] > 0
+
+
+def test_batched_leases_throughput(report):
+    result = benchmark_queue(report=report, jobs=5000, workers=4, lease_count=20)
+    assert result["consume_jobs_per_s"] > 0
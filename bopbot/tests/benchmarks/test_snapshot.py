@@ -0,0 +1,148 @@
+"""
+Memory and query cost of DomSnapshot on generated large pages, no browser needed
+"""
+import time
+import tracemalloc
+
+import pytest
+
+from bopbot.benchmarks.fake_cdp import FakeChrome
+from bopbot.benchmarks.pages import deep_dom, large_table
+from bopbot.dom.elements import LabeledSelector
+from bopbot.dom.snapshot import DomSnapshot, parse_html
+from bopbot.tests.benchmarks.test_driver_overhead import get_fake_bot
+
+
+pytestmark = pytest.mark.benchmark
+
+
+cell = LabeledSelector(label="cell", dom_hierarchy=["#data", "tbody", "tr", "td.c2"])
+
+
+def to_capture(snapshot: DomSnapshot) -> {}:
+    """
+    CAPTURE_SNAPSHOT shaped result of a parsed snapshot, what the page would send
+    """
+    offsets = snapshot.attr_offsets
+    return {
+        "strings": list(snapshot.strings),
+        "parents": list(snapshot.parents),
+        "names": list(snapshot.names),
+        "values": list(snapshot.values),
+        "frames": list(snapshot.frames),
+        "attrCounts": [
+            (offsets[index + 1] - offsets[index]) // 2 for index in range(len(snapshot))
+        ],
+        "attrs": list(snapshot.attrs),
+        "frameUrls": list(snapshot.frame_urls),
+    }
+
+
+def to_dict_tree(capture: {}) -> {}:
+    """
+    Naive object per node tree the snapshot is compared against
+    """
+    strings = capture["strings"]
+    nodes = []
+    position = 0
+    for index, parent in enumerate(capture["parents"]):
+        count = capture["attrCounts"][index]
+        end = position + 2 * count
+        attrs = capture["attrs"][position:end]
+        position = end
+        node = {
+            "tag": strings[capture["names"][index]],
+            "attrs": {
+                strings[attrs[i]]: strings[attrs[i + 1]]
+                for i in range(0, len(attrs), 2)
+            },
+            "text": strings[capture["values"][index]]
+            if capture["values"][index] >= 0
+            else None,
+            "children": [],
+        }
+        nodes.append(node)
+        if parent >= 0:
+            nodes[parent]["children"].append(node)
+    return nodes[0]
+
+
+def traced_bytes(build) -> (object, int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before
+
+
+@pytest.mark.parametrize(
+    "name,html",
+    [
+        ("table.5000x5", large_table(rows=5000, cols=5)),
+        ("deep.200x3", deep_dom(depth=200, breadth=3)),
+    ],
+)
+def test_snapshot_memory(report, name, html):
+    capture = to_capture(parse_html(html))
+    snapshot, snapshot_bytes = traced_bytes(lambda: DomSnapshot.from_capture(capture))
+    _, tree_bytes = traced_bytes(lambda: to_dict_tree(capture))
+    nodes = len(snapshot)
+    report.add(
+        name=f"snapshot.memory.{name}",
+        nodes=nodes,
+        snapshot_bytes=snapshot_bytes,
+        snapshot_bytes_per_node=snapshot_bytes / nodes,
+        # includes the strings, which both structures share in this comparison
+        snapshot_memory_usage=snapshot.memory_usage(),
+        dict_tree_bytes=tree_bytes,
+        dict_tree_bytes_per_node=tree_bytes / nodes,
+    )
+    assert snapshot_bytes < tree_bytes / 5
+
+
+def test_snapshot_queries(report):
+    snapshot = parse_html(large_table(rows=5000, cols=5))
+    selectors = {
+        "id_child": "#data > tbody > tr",
+        "class": "td.c2",
+        "nth_child": "tr:nth-child(odd) > td:first-child a",
+        "attribute": "tr[data-row$='99']",
+    }
+    for name, selector in selectors.items():
+        start = time.perf_counter()
+        matches = snapshot.query_selector_all(selector)
+        report.add(
+            name=f"snapshot.query_all.{name}",
+            seconds=time.perf_counter() - start,
+            matches=len(matches),
+        )
+        assert matches
+
+
+@pytest.mark.asyncio
+async def test_snapshot_vs_per_read_queries(report):
+    capture = to_capture(parse_html(large_table(rows=500, cols=5)))
+    scripts = [(r"includeFrames", capture), (r"\.innerText$", "0-2")]
+    async with FakeChrome(latency=0.002, scripts=scripts) as chrome:
+        bot = await get_fake_bot(chrome=chrome)
+        start = time.perf_counter()
+        for _ in range(50):
+            await bot.query(elem=cell)
+        per_read = time.perf_counter() - start
+        per_read_trips = chrome.round_trips
+
+        chrome.reset_calls()
+        start = time.perf_counter()
+        snapshot = await bot.snapshot()
+        values = [snapshot.query(elem=cell) for _ in range(50)]
+        snapshotted = time.perf_counter() - start
+        await bot.driver.close()
+
+    report.add(name="reads.query.50", seconds=per_read, round_trips=per_read_trips)
+    report.add(
+        name="reads.snapshot.50", seconds=snapshotted, round_trips=chrome.round_trips
+    )
+    assert values[0] == "0-2"
+    assert chrome.round_trips == 1
+    assert snapshotted < per_read
@@ -2,8 +2,14 @@ import os
 import pytest
 from uuid import uuid4
 
-from bopbot.actions.actuators import get_default_bot
+from bopbot.actions.actuators import BaseAction, get_default_bot, TypingMode
+from bopbot.actions.flows import compile_flow
+from bopbot.browser.driver import RawDriver
+from bopbot.browser.launcher import BrowserConfig, BrowserWindow
+from bopbot.browser.replay import NetworkMode
 from bopbot.dom.elements import LabeledSelector
+from bopbot.dom.geometry import HiddenReason
+from bopbot.dom.pages import PageObject
 
 
 SANDBOX_ENDPOINT = "http://localhost:8080/"
@@ -36,6 +42,13 @@ def sandbox_exec(test_func):
     return exec_wrapper
 
 
+class SandboxPage(PageObject):
+    app = ["#app", "div"]
+    welcome = [app, "h1"]
+    random_input = [app, "input[type=text]"]
+    hidden_item = [app, "ul:nth-child(6)", "li:nth-child(6)"]
+
+
 class TestBaseAction:
     @pytest.mark.asyncio
     @sandbox_exec
@@ -104,3 +117,200 @@ class TestBaseAction:
 
         bot.driver.page.screenshot = screenshot_mock
         await bot.screenshot()
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_extract_rows_in_chunks(self, bot):
+        essential_links = LabeledSelector(
+            label="essential_links",
+            dom_hierarchy=["#app", "div", "ul:nth-child(6)", "li"],
+        )
+        fields = {"text": None, "link": ("a", "href")}
+        rows = await bot.extract(container=essential_links, fields=fields, chunk_size=4)
+
+        assert len(rows) == 6
+        assert rows[0] == {"text": "Core Docs", "link": "https://vuejs.org/"}
+        assert rows[-1] == {"text": "HiddenItem", "link": None}
+        chunks = [
+            chunk
+            async for chunk in bot.iter_extract(
+                container=essential_links, fields=fields, chunk_size=4
+            )
+        ]
+        assert [len(chunk) for chunk in chunks] == [4, 2]
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_cached_handles_type_and_select(self, bot):
+        bot.cache_handles = True
+        random_input = LabeledSelector(
+            label="random_input", dom_hierarchy=["#app", "div", "input[type=text]"],
+        )
+        random_dropdown = LabeledSelector(
+            label="random_dropdown", dom_hierarchy=["#app", "div", "select"]
+        )
+        await bot.type(elem=random_input, text="hello")
+        await bot.type(elem=random_input, text=" world")
+        await bot.select(elem=random_dropdown, text="saab")
+
+        handles = bot.driver.page_manager.handles
+        assert (handles.hits, handles.misses) == (1, 2)
+        assert await bot.query(elem=random_input, attr="value") == "hello world"
+        assert await bot.query(elem=random_dropdown, attr="value") == "saab"
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_type_modes(self, bot):
+        random_input = LabeledSelector(
+            label="random_input", dom_hierarchy=["#app", "div", "input[type=text]"],
+        )
+        input_message = "hello world input type"
+        for mode in TypingMode:
+            await bot.clear(elem=random_input)
+            await bot.type(elem=random_input, text=input_message, mode=mode)
+            assert await bot.query(elem=random_input, attr="value") == input_message
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_flow_plan(self, bot):
+        flow = {
+            "selectors": {
+                "sandbox": {
+                    "welcome": ["#app", "div", "h1"],
+                    "random_input": ["#app", "div", "input[type=text]"],
+                    "missing": [f"#missing-{uuid4().hex}"],
+                }
+            },
+            "steps": [
+                {"wait": ["sandbox.welcome", "sandbox.random_input"]},
+                {"type": {"selector": "sandbox.random_input", "text": "flow"}},
+                {"read": {"selector": "sandbox.welcome", "as": "welcome"}},
+                {"read": {"selector": "sandbox.random_input", "attr": "value"}},
+                {"exists": {"selector": "sandbox.missing", "as": "missing"}},
+                {"assert": {"result": "missing", "equals": False}},
+            ],
+        }
+        results = await compile_flow(flow=flow).run(bot=bot)
+        assert results["welcome"] == await bot.query(
+            elem=LabeledSelector(label="welcome", dom_hierarchy=["#app", "div", "h1"])
+        )
+        assert results["random_input.query"] == "flow"
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_action_group(self, bot):
+        welcome = LabeledSelector(label="welcome", dom_hierarchy=["#app", "div", "h1"])
+        hidden_item = LabeledSelector(
+            label="hidden_item",
+            dom_hierarchy=["#app", "div", "ul:nth-child(6)", "li:nth-child(6)"],
+        )
+        group = bot.group()
+        group.add("welcome", bot.query, elem=welcome)
+        group.add("exists", bot.selector_exists, elem=hidden_item)
+        group.add("visible", bot.selector_visible, elem=hidden_item)
+        results = await group.run()
+        assert results["welcome"] == await bot.query(elem=welcome)
+        assert (results["exists"], results["visible"]) == (True, False)
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_page_states(self, bot):
+        states = await bot.page_states(page=SandboxPage)
+        assert states["welcome"] == {"exists": True, "visible": True}
+        assert states["hidden_item"] == {"exists": True, "visible": False}
+        assert await bot.page_selectors_exist(page=SandboxPage) is True
+        assert (
+            await bot.page_selectors_exist(page=SandboxPage, as_visible=True) is False
+        )
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_snapshot_reads_match_page_reads(self, bot):
+        welcome = LabeledSelector(label="welcome", dom_hierarchy=["#app", "div", "h1"])
+        await bot.wait_for_element(elem=welcome)
+        snapshot = await bot.snapshot(include_frames=True)
+        assert snapshot.query(elem=welcome) == await bot.query(elem=welcome)
+        assert snapshot.selector_exists(elem=SandboxPage.hidden_item) is True
+        assert snapshot.selector_visible(
+            elem=SandboxPage.hidden_item
+        ) == await bot.selector_visible(elem=SandboxPage.hidden_item)
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_geometry_reports_hidden_elements(self, bot):
+        missing = LabeledSelector(
+            label="missing", dom_hierarchy=[f"#missing-{uuid4()}"]
+        )
+        await bot.wait_for_element(elem=SandboxPage.welcome)
+        welcome, hidden, absent = await bot.geometry(
+            elems=[SandboxPage.welcome, SandboxPage.hidden_item, missing]
+        )
+        assert welcome.visible is True
+        assert welcome.box.width > 0 and welcome.click_point is not None
+        assert hidden.visible is False and hidden.reason is HiddenReason.display_none
+        assert absent.reason is HiddenReason.missing
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_selector_alternatives(self, bot):
+        welcome = LabeledSelector(
+            label="welcome",
+            dom_hierarchy=[f"#missing-{uuid4()}"],
+            alternatives=[["#app", "div", "h1"]],
+        )
+        await bot.wait_for_element(elem=welcome)
+        assert bot.resolver.matched(welcome) == 1
+        assert await bot.query(elem=welcome) == await bot.query(
+            elem=SandboxPage.welcome
+        )
+        assert await bot.resolve(elems=[welcome]) == [1]
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_fill_form(self, bot):
+        text = f"{uuid4()}"
+        (fill,) = await bot.fill_form(fields={SandboxPage.random_input: text})
+        assert fill.kind == "input" and fill.value == text
+        assert await bot.query(elem=SandboxPage.random_input, attr="value") == text
+
+    @pytest.mark.asyncio
+    @sandbox_exec
+    async def test_reset_page_reuses_clean_tab(self, bot):
+        page = bot.driver.page
+        await page.evaluate("() => localStorage.setItem('job', '1')")
+        await page.evaluate("() => sessionStorage.setItem('job', '1')")
+        await bot.driver.reset_page()
+        assert bot.driver.page is page
+        assert page.url == "about:blank"
+
+        await bot.driver.goto(url=SANDBOX_ENDPOINT)
+        assert await page.evaluate("() => localStorage.getItem('job')") is None
+        assert await page.evaluate("() => sessionStorage.getItem('job')") is None
+        # the navigator injection survives the reset
+        assert await page.evaluate("() => navigator.webdriver") is False
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay_network(self, tmp_path):
+        welcome = LabeledSelector(label="welcome", dom_hierarchy=["#app", "div", "h1"])
+        archive_path = str(tmp_path / "sandbox.zip")
+        titles = []
+        for mode in (NetworkMode.record, NetworkMode.replay):
+            bot = BaseAction(
+                driver=RawDriver(
+                    chrome_config=BrowserConfig(browser_window=BrowserWindow()),
+                    network_mode=mode,
+                    network_archive=archive_path,
+                )
+            )
+            await bot.driver.get_new_browser()
+            try:
+                await bot.driver.goto(url=SANDBOX_ENDPOINT)
+                await bot.wait_for_element(elem=welcome)
+                titles.append(await bot.query(elem=welcome))
+            finally:
+                await bot.driver.close()
+
+        replayer = bot.driver.page_manager.network
+        assert titles[0] == titles[1]
+        # the dev server's live reload polling uses unique urls, only hits are stable
+        assert replayer.hits > 0
@@ -0,0 +1,405 @@
+import pytest
+from mock import Mock, AsyncMock, call
+from pyppeteer.errors import TimeoutError
+
+from bopbot.actions.actuators import BaseAction, TypingMode
+from bopbot.actions.exceptions import (
+    ElementNotFoundError,
+    ElementNotInteractableError,
+)
+from bopbot.dom.elements import LabeledSelector
+from bopbot.dom.pages import PageObject
+from bopbot.dom.geometry import HiddenReason
+from bopbot.jsinject.scripts import (
+    ELEMENT_GEOMETRY,
+    FILL_FORM,
+    PASTE_TEXT,
+    RESOLVE_ALTERNATIVES,
+    WAIT_FOR_ALTERNATIVES,
+)
+
+
+class FakeFrame:
+    """
+    Serves EXTRACT_ROWS evaluations from a static list of rows
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def evaluate(self, script, container, fields, offset, limit):
+        self.calls.append((container, fields, offset, limit))
+        end = len(self.rows) if limit <= 0 else offset + limit
+        return {"total": len(self.rows), "rows": self.rows[offset:end]}
+
+
+class TestExtract:
+    container = LabeledSelector(label="rows", dom_hierarchy=["table", "tr"])
+
+    @pytest.mark.asyncio
+    async def test_extract_pages_through_chunks(self):
+        frame = FakeFrame(rows=[{"cell": i} for i in range(1000)])
+        bot = BaseAction(driver=Mock())
+        rows = await bot.extract_in_frame(
+            frame=frame, container=self.container, fields={"cell": "td"}, chunk_size=300
+        )
+
+        assert rows == frame.rows
+        assert [call[2] for call in frame.calls] == [0, 300, 600, 900]
+        assert frame.calls[0][:2] == ("table > tr", [["cell", "td", "innerText"]])
+
+    @pytest.mark.asyncio
+    async def test_extract_without_matches(self):
+        frame = FakeFrame(rows=[])
+        bot = BaseAction(driver=Mock())
+        rows = await bot.extract_in_frame(
+            frame=frame, container=self.container, fields={"cell": "td"}
+        )
+
+        assert rows == []
+        assert len(frame.calls) == 1
+
+
+class TestWaitForElement:
+    title = LabeledSelector(label="title", dom_hierarchy=["#app", "h1"])
+
+    def get_bot(self, side_effect=None):
+        driver = Mock(animation_timeout=500)
+        driver.page.waitForSelector = AsyncMock(side_effect=side_effect)
+        driver.page.click = AsyncMock()
+        return BaseAction(driver=driver)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_selector(self):
+        bot = self.get_bot()
+        await bot.wait_for_element(elem=self.title, as_visible=False)
+        bot.driver.page.waitForSelector.assert_awaited_once_with(
+            selector="#app > h1", timeout=500, options={"visible": False}
+        )
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_element_not_found(self):
+        bot = self.get_bot(side_effect=TimeoutError())
+        with pytest.raises(ElementNotFoundError, match="title"):
+            await bot.wait_for_element(elem=self.title)
+
+    @pytest.mark.asyncio
+    async def test_click_stops_on_missing_element(self):
+        bot = self.get_bot(side_effect=TimeoutError())
+        with pytest.raises(ElementNotFoundError):
+            await bot.click(elem=self.title)
+        bot.driver.page.click.assert_not_awaited()
+
+
+class TestTypingModes:
+    field = LabeledSelector(label="bio", dom_hierarchy=["form", "textarea"])
+
+    def get_bot(self):
+        driver = Mock()
+        driver.page = AsyncMock()
+        bot = BaseAction(driver=driver)
+        bot.wait_for_element = AsyncMock()
+        bot.sleep_for = AsyncMock()
+        return bot
+
+    @pytest.mark.asyncio
+    async def test_insert_sends_text_once(self):
+        bot = self.get_bot()
+        await bot.type(elem=self.field, text="hello big world", mode=TypingMode.insert)
+
+        bot.driver.page.focus.assert_awaited_once_with("form > textarea")
+        bot.driver.page.keyboard.sendCharacter.assert_awaited_once_with(
+            "hello big world"
+        )
+        bot.driver.page.type.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_word_sends_text_per_word(self):
+        bot = self.get_bot()
+        await bot.type(elem=self.field, text="hello big world", mode=TypingMode.word)
+
+        assert bot.driver.page.keyboard.sendCharacter.await_args_list == [
+            call("hello "),
+            call("big "),
+            call("world"),
+        ]
+        assert bot.sleep_for.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_paste_is_single_evaluate(self):
+        bot = self.get_bot()
+        await bot.type(elem=self.field, text="hello", mode=TypingMode.paste)
+
+        bot.driver.page.evaluate.assert_awaited_once_with(
+            PASTE_TEXT, "form > textarea", "hello"
+        )
+        bot.driver.page.focus.assert_not_awaited()
+
+
+class LoginPage(PageObject):
+    user = ["form", "input[name=user]"]
+    password = ["form", "input[name=password]"]
+
+
+class TestPageStates:
+    @pytest.mark.asyncio
+    async def test_page_states_is_single_evaluate(self):
+        driver = Mock()
+        driver.page.evaluate = AsyncMock(return_value=[[True, True], [True, False]])
+        bot = BaseAction(driver=driver)
+
+        assert await bot.page_selectors_exist(page=LoginPage) is True
+        assert await bot.page_selectors_exist(page=LoginPage, as_visible=True) is False
+        driver.page.evaluate.assert_awaited_with(LoginPage.states_script)
+        assert driver.page.evaluate.await_count == 2
+
+
+VISIBLE = {
+    "exists": True,
+    "reason": None,
+    "box": [10, 20, 100, 40],
+    "viewportRatio": 1,
+    "point": [60, 40],
+    "coveredBy": None,
+}
+COVERED = dict(VISIBLE, reason="covered", point=None, coveredBy="div#cookie-banner")
+
+
+class TestGeometry:
+    accept = LabeledSelector(label="accept", dom_hierarchy=["#consent", "button"])
+
+    def get_bot(self, results):
+        driver = Mock()
+        driver.page.evaluate = AsyncMock(return_value=results)
+        driver.page.mouse.click = AsyncMock()
+        driver.page.click = AsyncMock()
+        bot = BaseAction(driver=driver, check_geometry=True)
+        bot.wait_for_element = AsyncMock()
+        return bot
+
+    @pytest.mark.asyncio
+    async def test_measures_every_selector_in_one_evaluate(self):
+        bot = self.get_bot(results=[VISIBLE, {"exists": False, "reason": "missing"}])
+        accept, banner = await bot.geometry(elems=[self.accept, LoginPage.user])
+
+        bot.driver.page.evaluate.assert_awaited_once_with(
+            ELEMENT_GEOMETRY,
+            ["#consent > button", "form > input[name=user]"],
+            True,
+            False,
+        )
+        assert accept.visible and accept.box.center == (60, 40)
+        assert (banner.label, banner.exists, banner.reason) == (
+            "user",
+            False,
+            HiddenReason.missing,
+        )
+
+    @pytest.mark.asyncio
+    async def test_click_uses_hit_tested_point(self):
+        bot = self.get_bot(results=[VISIBLE])
+        await bot.click(elem=self.accept)
+
+        bot.driver.page.mouse.click.assert_awaited_once_with(60, 40)
+        bot.driver.page.click.assert_not_awaited()
+        assert bot.driver.page.evaluate.await_args[0][3] is True
+
+    @pytest.mark.asyncio
+    async def test_click_refuses_covered_element(self):
+        bot = self.get_bot(results=[COVERED])
+        with pytest.raises(ElementNotInteractableError, match="div#cookie-banner"):
+            await bot.click(elem=self.accept)
+        bot.driver.page.mouse.click.assert_not_awaited()
+
+
+class TestAlternatives:
+    def get_selector(self):
+        return LabeledSelector(
+            label="next_page",
+            dom_hierarchy=["nav", "a.next"],
+            alternatives=[["nav", "a[rel=next]"]],
+        )
+
+    @pytest.mark.asyncio
+    async def test_resolve_is_single_evaluate(self):
+        next_page, submit = self.get_selector(), self.get_selector()
+        driver = Mock()
+        driver.page.evaluate = AsyncMock(return_value=[1, -1])
+        bot = BaseAction(driver=driver)
+
+        assert await bot.resolve(elems=[next_page, submit]) == [1, None]
+        driver.page.evaluate.assert_awaited_once_with(
+            RESOLVE_ALTERNATIVES, [["nav > a.next", "nav > a[rel=next]"]] * 2,
+        )
+        assert bot.active(next_page).to_str() == "nav > a[rel=next]"
+        assert next_page.to_str() == "nav > a.next"
+
+    @pytest.mark.asyncio
+    async def test_wait_polls_every_alternative(self):
+        next_page = self.get_selector()
+        driver = Mock(animation_timeout=500)
+        handle = Mock(jsonValue=AsyncMock(return_value=2))
+        driver.page.waitForFunction = AsyncMock(return_value=handle)
+        driver.page.waitForSelector = AsyncMock()
+        bot = BaseAction(driver=driver)
+
+        await bot.wait_for_element(elem=next_page)
+        driver.page.waitForFunction.assert_awaited_once_with(
+            WAIT_FOR_ALTERNATIVES,
+            {"timeout": 500},
+            ["nav > a.next", "nav > a[rel=next]"],
+            True,
+        )
+        driver.page.waitForSelector.assert_not_awaited()
+        assert bot.resolver.matched(next_page) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_resolution_maps_the_sent_cascade(self):
+        elem = LabeledSelector(
+            label="target", dom_hierarchy=["#a"], alternatives=[["#b"], ["#c"]]
+        )
+        driver = Mock(animation_timeout=500)
+        bot = BaseAction(driver=driver)
+        bot.resolver.record_match(elem, 2)
+
+        async def reorder_then_match(*_):
+            # another resolution promotes #a while the page evaluates ["#c", "#a", "#b"]
+            for _ in range(3):
+                bot.resolver.record_match(elem, 0)
+            return Mock(jsonValue=AsyncMock(return_value=1))
+
+        driver.page.waitForFunction = AsyncMock(side_effect=reorder_then_match)
+        await bot.wait_for_element(elem=elem)
+        assert driver.page.waitForFunction.await_args[0][2] == ["#c", "#a", "#b"]
+        assert bot.resolver.matched(elem) == 2
+        assert bot.active(elem).to_str() == "#c"
+
+    @pytest.mark.asyncio
+    async def test_bots_sharing_selectors_resolve_independently(self):
+        class NavPage(PageObject):
+            next_page = LabeledSelector(
+                label="next_page",
+                dom_hierarchy=["nav", "a.next"],
+                alternatives=[["nav", "a[rel=next]"]],
+            )
+
+        first, second = BaseAction(driver=Mock()), BaseAction(driver=Mock())
+        first.driver.page.evaluate = AsyncMock(return_value=[1])
+        second.driver.page.evaluate = AsyncMock(return_value=[0])
+        await first.resolve(elems=[NavPage.next_page])
+        await second.resolve(elems=[NavPage.next_page])
+        assert first.active(NavPage.next_page).to_str() == "nav > a[rel=next]"
+        assert second.active(NavPage.next_page) is NavPage.next_page
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self):
+        driver = Mock(animation_timeout=500)
+        driver.page.waitForFunction = AsyncMock(side_effect=TimeoutError())
+        bot = BaseAction(driver=driver)
+
+        with pytest.raises(ElementNotFoundError, match="a\\[rel=next\\]"):
+            await bot.wait_for_element(elem=self.get_selector())
+
+
+class TestFillForm:
+    def get_fields(self):
+        return (
+            LabeledSelector(label="name", dom_hierarchy=["form", "#name"]),
+            LabeledSelector(label="country", dom_hierarchy=["form", "#country"]),
+            LabeledSelector(label="terms", dom_hierarchy=["form", "#terms"]),
+        )
+
+    def get_bot(self, result=None, side_effect=None):
+        driver = Mock(animation_timeout=500)
+        handle = Mock(jsonValue=AsyncMock(return_value=result))
+        driver.page.waitForFunction = AsyncMock(
+            return_value=handle, side_effect=side_effect
+        )
+        driver.page.evaluate = AsyncMock(return_value=[True, False, True])
+        driver.page.waitForSelector = AsyncMock()
+        driver.page.type = AsyncMock()
+        return BaseAction(driver=driver)
+
+    @pytest.mark.asyncio
+    async def test_fields_set_in_one_poll(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot(
+            result=[
+                {"kind": "input", "value": "Ada", "ms": 0.5},
+                {"kind": "select", "value": ["uk"], "ms": 1.0},
+                {"kind": "checkbox", "value": True, "ms": 0.25},
+            ]
+        )
+
+        fills = await bot.fill_form(fields={name: "Ada", country: "uk", terms: True})
+        bot.driver.page.waitForFunction.assert_awaited_once_with(
+            FILL_FORM,
+            {"timeout": 500},
+            [
+                ["form > #name", "Ada"],
+                ["form > #country", "uk"],
+                ["form > #terms", True],
+            ],
+            [],
+        )
+        bot.driver.page.waitForSelector.assert_not_awaited()
+        assert [fill.label for fill in fills] == ["name", "country", "terms"]
+        assert [fill.value for fill in fills] == ["Ada", ["uk"], True]
+        assert fills[1].seconds == 0.001
+
+    @pytest.mark.asyncio
+    async def test_typed_fields_are_opt_in(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot(
+            result=[
+                {"kind": "select", "value": ["uk"], "ms": 1.0},
+                {"kind": "checkbox", "value": True, "ms": 0.25},
+            ]
+        )
+
+        fills = await bot.fill_form(
+            fields={name: "Ada", country: "uk", terms: True}, typed=[name], delay=5
+        )
+        args = bot.driver.page.waitForFunction.await_args[0]
+        assert args[2] == [["form > #country", "uk"], ["form > #terms", True]]
+        assert args[3] == ["form > #name"]
+        bot.driver.page.type.assert_awaited_once_with(
+            selector="form > #name", text="Ada", options={"delay": 5}
+        )
+        assert [fill.label for fill in fills] == ["name", "country", "terms"]
+        assert fills[0].typed and fills[0].seconds >= 0
+        assert not fills[1].typed
+
+    @pytest.mark.asyncio
+    async def test_missing_fields_are_listed(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot(side_effect=TimeoutError())
+
+        with pytest.raises(ElementNotFoundError, match="\\['country'\\]"):
+            await bot.fill_form(fields={name: "Ada", country: "uk", terms: True})
+
+    @pytest.mark.asyncio
+    async def test_unsupported_fields(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot(result={"unsupported": ["form > #terms"], "invalid": []})
+
+        with pytest.raises(ElementNotInteractableError, match="terms"):
+            await bot.fill_form(fields={name: "Ada", country: "uk", terms: True})
+
+    @pytest.mark.asyncio
+    async def test_values_without_option_are_invalid(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot(result={"unsupported": [], "invalid": ["form > #country"]})
+
+        with pytest.raises(ValueError, match="\\['country'\\]"):
+            await bot.fill_form(fields={name: "Ada", country: "atlantis", terms: True})
+
+    @pytest.mark.asyncio
+    async def test_typed_fields_must_be_fields(self):
+        name, country, terms = self.get_fields()
+        bot = self.get_bot()
+
+        with pytest.raises(ValueError, match="terms"):
+            await bot.fill_form(fields={name: "Ada", country: "uk"}, typed=[terms])
+        bot.driver.page.waitForFunction.assert_not_awaited()
@@ -0,0 +1,149 @@
+import json
+
+import pytest
+from mock import AsyncMock
+
+from bopbot.actions.exceptions import FlowError, FlowAssertionError
+from bopbot.actions.flows import compile_flow, load_flow
+from bopbot.dom.elements import add_selector_to
+
+
+class SearchPage:
+    pass
+
+
+add_selector_to(SearchPage, label="box", selector_hierarchy=["form", "input"])
+add_selector_to(SearchPage, label="submit", selector_hierarchy=["form", "button"])
+
+FLOW = {
+    "name": "search",
+    "selectors": {"results": {"first": ["#results", "li"], "next": ["a.next"]}},
+    "steps": [
+        {"goto": "https://site.test/"},
+        {"wait": ["search.box", "search.submit"]},
+        {"type": {"selector": "search.box", "text": "bopbot", "mode": "insert"}},
+        {"click": "search.submit"},
+        {"wait": {"selector": "results.first", "visible": False}},
+        {"read": {"selector": "results.first", "as": "first"}},
+        {"exists": {"selector": "results.next", "as": "has_next"}},
+        {"assert": {"result": "first", "contains": "bopbot"}},
+        {"assert": {"selector": "results.first", "visible": True}},
+        {
+            "extract": {
+                "container": "results.first",
+                "fields": {"t": "h3"},
+                "as": "rows",
+            }
+        },
+    ],
+}
+
+
+def get_fake_bot(read_values):
+    bot = AsyncMock()
+    bot.read_batch.return_value = read_values
+    bot.extract.return_value = [{"t": "bopbot"}]
+    return bot
+
+
+class TestFlowCompiler:
+    def test_coalesces_reads_and_waits(self):
+        plan = compile_flow(flow=FLOW, page_objects={"search": SearchPage})
+        assert plan.describe() == [
+            "goto https://site.test/",
+            "wait [box, submit]",
+            "type [box]",
+            "click [submit]",
+            "wait [first]",
+            "read_batch [first, has_next, first.visible]",
+            "extract [first]",
+        ]
+
+    @pytest.mark.parametrize(
+        "step",
+        [
+            {"click": "search.missing"},
+            {"hover": "search.box"},
+            {"type": "search.box"},
+            {"type": {"selector": "search.box", "text": "x", "mode": "fast"}},
+            {"assert": {"result": "first"}},
+            {"click": "search.box", "wait": "search.box"},
+            {"sleep": "soon"},
+            {"sleep": None},
+            {"extract": {"container": "search.box", "fields": {}}},
+            {"extract": {"container": "search.box", "fields": {"bad-name": "h3"}}},
+        ],
+    )
+    def test_invalid_steps(self, step):
+        with pytest.raises(FlowError):
+            compile_flow(flow={"steps": [step]}, page_objects={"search": SearchPage})
+
+
+class TestFlowPlan:
+    @pytest.mark.asyncio
+    async def test_run(self):
+        plan = compile_flow(flow=FLOW, page_objects={"search": SearchPage})
+        bot = get_fake_bot(read_values=["bopbot docs", False, True])
+        results = await plan.run(bot=bot)
+
+        assert results == {
+            "first": "bopbot docs",
+            "has_next": False,
+            "first.visible": True,
+            "rows": [{"t": "bopbot"}],
+        }
+        bot.driver.goto.assert_awaited_once_with(url="https://site.test/")
+        assert bot.wait_for_element.await_count == 3
+        bot.read_batch.assert_awaited_once()
+        reads = bot.read_batch.await_args[1]["reads"]
+        assert [(elem.label, kind, attr) for elem, kind, attr in reads] == [
+            ("first", "query", None),
+            ("next", "exists", None),
+            ("first", "visible", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_assert_stops_flow(self):
+        plan = compile_flow(flow=FLOW, page_objects={"search": SearchPage})
+        bot = get_fake_bot(read_values=["nothing", False, True])
+        with pytest.raises(FlowAssertionError, match="step 7"):
+            await plan.run(bot=bot)
+        bot.extract.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_assert_sees_only_earlier_reads_of_its_batch(self):
+        plan = compile_flow(
+            flow={
+                "steps": [
+                    {"read": {"selector": "search.box", "as": "x"}},
+                    {"assert": {"result": "x", "equals": "A"}},
+                    {"read": {"selector": "search.submit", "as": "x"}},
+                ]
+            },
+            page_objects={"search": SearchPage},
+        )
+        assert plan.describe() == ["read_batch [x, x]"]
+        results = await plan.run(bot=get_fake_bot(read_values=["A", "B"]))
+        assert results == {"x": "B"}
+
+    @pytest.mark.asyncio
+    async def test_assert_fails_on_result_read_after_it(self):
+        plan = compile_flow(
+            flow={
+                "steps": [
+                    {"read": {"selector": "search.box", "as": "x"}},
+                    {"assert": {"result": "y", "equals": "B"}},
+                    {"read": {"selector": "search.submit", "as": "y"}},
+                ]
+            },
+            page_objects={"search": SearchPage},
+        )
+        with pytest.raises(FlowAssertionError, match="never stored"):
+            await plan.run(bot=get_fake_bot(read_values=["A", "B"]))
+
+
+def test_load_json_flow(tmp_path):
+    path = tmp_path / "flow.json"
+    path.write_text(json.dumps(FLOW))
+    plan = compile_flow(flow=load_flow(str(path)), page_objects={"search": SearchPage})
+    assert plan.name == "search"
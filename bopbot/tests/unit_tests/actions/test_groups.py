@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from bopbot.actions.exceptions import ActionGroupError
+from bopbot.actions.groups import ActionGroup
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def read(self, name, delay=0.01, fail=False):
+        self.events.append(f"start {name}")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(delay)
+        self.in_flight -= 1
+        self.events.append(f"end {name}")
+        if fail:
+            raise ValueError(name)
+        return name.upper()
+
+
+class TestActionGroup:
+    @pytest.mark.asyncio
+    async def test_runs_independent_actions_concurrently(self):
+        recorder = Recorder()
+        group = ActionGroup()
+        for name in ("a", "b", "c"):
+            group.add(name, recorder.read, name)
+
+        assert await group.run() == {"a": "A", "b": "B", "c": "C"}
+        assert recorder.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_after_orders_actions(self):
+        recorder = Recorder()
+        group = ActionGroup()
+        group.add("slow", recorder.read, "slow", delay=0.05)
+        group.add("fast", recorder.read, "fast", delay=0)
+        group.add("click", recorder.read, "click", after=["slow"])
+        await group.run()
+
+        events = recorder.events
+        assert events.index("end slow") < events.index("start click")
+        assert events.index("end fast") < events.index("end slow")
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency(self):
+        recorder = Recorder()
+        group = ActionGroup(max_concurrency=2)
+        for name in "abcde":
+            group.add(name, recorder.read, name)
+        await group.run()
+        assert recorder.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_remaining_actions(self):
+        recorder = Recorder()
+        group = ActionGroup()
+        group.add("broken", recorder.read, "broken", delay=0, fail=True)
+        group.add("slow", recorder.read, "slow", delay=1)
+        with pytest.raises(ValueError):
+            await group.run()
+        assert "end slow" not in recorder.events
+
+    def test_invalid_declarations(self):
+        group = ActionGroup().add("a", Recorder().read, "a")
+        with pytest.raises(ActionGroupError):
+            group.add("a", Recorder().read, "a")
+        with pytest.raises(ActionGroupError):
+            group.add("b", Recorder().read, "b", after=["c"])
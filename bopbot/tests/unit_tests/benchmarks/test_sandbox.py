@@ -0,0 +1,61 @@
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from bopbot.benchmarks.pages import render_page
+from bopbot.benchmarks.sandbox import StaticSandbox
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    with StaticSandbox() as static_sandbox:
+        yield static_sandbox
+
+
+class TestPages:
+    def test_table_size(self):
+        document = render_page(path="/table", params={"rows": "25", "cols": "3"})
+        assert document.count("<tr data-row=") == 25
+        assert document.count("<th>") == 3
+
+    def test_deep_dom_depth(self):
+        document = render_page(path="/deep", params={"depth": "40", "breadth": "1"})
+        assert document.count("class='level'") == 40
+        assert "class='leaf'" not in document
+        assert "id='deepest'" in document
+
+    def test_frames_point_back_to_sandbox(self):
+        document = render_page(path="/frames", params={"count": "3"})
+        assert document.count("src='/table?rows=10&cols=2'") == 3
+
+    def test_unknown_page(self):
+        assert render_page(path="/missing", params={}) is None
+
+
+class TestStaticSandbox:
+    def test_serves_generated_page(self, sandbox):
+        with urlopen(sandbox.url("/table", rows=5)) as response:
+            assert response.headers["Content-Type"].startswith("text/html")
+            assert response.read().decode().count("<tr data-row=") == 5
+
+    def test_delays_assets(self, sandbox):
+        start = time.perf_counter()
+        with urlopen(sandbox.url("/asset", delay=100)) as response:
+            assert response.headers["Content-Type"] == "image/gif"
+        assert time.perf_counter() - start >= 0.1
+
+    @pytest.mark.parametrize(
+        "url_params",
+        [
+            ("/missing", {}, 404),
+            ("/deep", {"depth": "x"}, 400),
+            ("/asset", {"delay": "x"}, 400),
+        ],
+    )
+    def test_bad_requests(self, sandbox, url_params):
+        path, params, status = url_params
+        with pytest.raises(HTTPError) as error:
+            urlopen(sandbox.url(path, **params))
+        assert error.value.code == status
@@ -0,0 +1,196 @@
+import json
+import asyncio
+
+import pytest
+from mock import AsyncMock, Mock, patch
+
+from bopbot.actions.actuators import get_default_bot
+from bopbot.browser.calibration import (
+    FALLBACK_MODE,
+    HeadlessMode,
+    available_modes,
+    calibrate,
+    calibrate_headless,
+    main,
+    pick_winner,
+    select_headless_mode,
+)
+from bopbot.browser.exceptions import BrowserSetupError
+from bopbot.browser.launcher import SupportedOS
+
+
+def fake_launch(native_launch=1.0, xvfb_launch=2.0):
+    async def measure_launch(config, url):
+        launch = native_launch if config.native_headless else xvfb_launch
+        return {"launch": launch, "goto": 0.5, "rss": 100}
+
+    return measure_launch
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    """
+    Linux host with xvfb-run and Chrome installed, calibration cached in tmp_path
+    """
+    monkeypatch.delenv("BOPBOT_HEADLESS_MODE", raising=False)
+    monkeypatch.setenv(
+        "BOPBOT_CALIBRATION_PATH", str(tmp_path / "cache" / "headless.json")
+    )
+    fingerprint = Mock(return_value=1.0)
+    with patch(
+        "bopbot.browser.calibration.identify_running_os",
+        Mock(return_value=SupportedOS.linux),
+    ), patch(
+        "bopbot.browser.calibration.shutil.which",
+        Mock(return_value="/usr/bin/xvfb-run"),
+    ), patch(
+        "bopbot.browser.calibration.chrome_fingerprint", fingerprint
+    ), patch(
+        "bopbot.benchmarks.profiles.measure_launch",
+        AsyncMock(side_effect=fake_launch()),
+    ) as measure:
+        yield {"measure": measure, "fingerprint": fingerprint, "tmp_path": tmp_path}
+
+
+class TestAvailableModes:
+    def test_xvfb_needs_linux_and_xvfb_run(self):
+        with patch("bopbot.browser.calibration.shutil.which", Mock(return_value=None)):
+            assert available_modes(SupportedOS.linux) == [HeadlessMode.native]
+        with patch(
+            "bopbot.browser.calibration.shutil.which",
+            Mock(return_value="/usr/bin/xvfb-run"),
+        ):
+            assert available_modes(SupportedOS.linux) == [
+                HeadlessMode.native,
+                HeadlessMode.xvfb,
+            ]
+            assert available_modes(SupportedOS.mac) == [HeadlessMode.native]
+
+
+class TestCalibrateHeadless:
+    @pytest.mark.asyncio
+    async def test_measures_every_mode(self, host):
+        results = await calibrate_headless(
+            modes=[HeadlessMode.native, HeadlessMode.xvfb],
+            running_os=SupportedOS.linux,
+            rounds=3,
+        )
+        assert results[HeadlessMode.native] == {"launch": 1.0, "goto": 0.5, "rss": 100}
+        assert results[HeadlessMode.xvfb]["launch"] == 2.0
+        assert host["measure"].await_count == 6
+        url = host["measure"].await_args[1]["url"]
+        assert url.startswith("http://127.0.0.1:") and "/table" in url
+
+    @pytest.mark.asyncio
+    async def test_leaves_out_modes_that_fail(self, host):
+        async def xvfb_fails(config, url):
+            if config.xvfb_headless:
+                raise BrowserSetupError("xvfb-run: error")
+            return {"launch": 1.0, "goto": 0.5, "rss": 100}
+
+        host["measure"].side_effect = xvfb_fails
+        results = await calibrate_headless(
+            modes=[HeadlessMode.native, HeadlessMode.xvfb], running_os=SupportedOS.linux
+        )
+        assert list(results) == [HeadlessMode.native]
+
+
+def test_pick_winner_prefers_speed_then_memory():
+    results = {
+        HeadlessMode.native: {"launch": 1.0, "goto": 0.5, "rss": 300},
+        HeadlessMode.xvfb: {"launch": 1.0, "goto": 0.5, "rss": 200},
+    }
+    assert pick_winner(results) == HeadlessMode.xvfb
+    results[HeadlessMode.native]["goto"] = 0.1
+    assert pick_winner(results) == HeadlessMode.native
+
+
+class TestCalibrate:
+    @pytest.mark.asyncio
+    async def test_calibrates_once_and_caches_the_winner(self, host):
+        host["measure"].side_effect = fake_launch(native_launch=3.0, xvfb_launch=1.0)
+        assert await calibrate(rounds=1) == HeadlessMode.xvfb
+        assert host["measure"].await_count == 2
+
+        cached = json.loads((host["tmp_path"] / "cache" / "headless.json").read_text())
+        assert cached["mode"] == "xvfb" and set(cached["results"]) == {"native", "xvfb"}
+        assert await calibrate(rounds=1) == HeadlessMode.xvfb
+        assert host["measure"].await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_recalibrates_after_chrome_update(self, host):
+        await calibrate(rounds=1)
+        host["fingerprint"].return_value = 2.0
+        await calibrate(rounds=1)
+        assert host["measure"].await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_recalibrate_ignores_cache(self, host):
+        await calibrate(rounds=1)
+        await calibrate(rounds=1, recalibrate=True)
+        assert host["measure"].await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calibrations_measure_once(self, host):
+        modes = await asyncio.gather(calibrate(rounds=1), calibrate(rounds=1))
+        assert modes == [HeadlessMode.native, HeadlessMode.native]
+        assert host["measure"].await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_without_measurements(self, host):
+        host["measure"].side_effect = BrowserSetupError("no display")
+        assert await calibrate(rounds=1) == FALLBACK_MODE
+        assert not (host["tmp_path"] / "cache" / "headless.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_skips_calibration_without_chrome(self, host):
+        host["fingerprint"].return_value = None
+        assert await calibrate() == FALLBACK_MODE
+        host["measure"].assert_not_awaited()
+
+    def test_cli_recalibrates(self, host, capsys):
+        main(["--rounds", "1"])
+        main(["--rounds", "1"])
+        assert capsys.readouterr().out.split() == ["native", "native"]
+        assert host["measure"].await_count == 4
+
+
+class TestSelectHeadlessMode:
+    def test_never_measures(self, host):
+        assert select_headless_mode() == FALLBACK_MODE
+        host["measure"].assert_not_awaited()
+        assert not (host["tmp_path"] / "cache" / "headless.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_uses_the_calibrated_winner(self, host):
+        host["measure"].side_effect = fake_launch(native_launch=1.0, xvfb_launch=3.0)
+        await calibrate(rounds=1)
+        assert select_headless_mode() == HeadlessMode.native
+        host["fingerprint"].return_value = 2.0
+        assert select_headless_mode() == FALLBACK_MODE
+
+    def test_environment_overrides(self, host, monkeypatch):
+        monkeypatch.setenv("BOPBOT_HEADLESS_MODE", "native")
+        assert select_headless_mode() == HeadlessMode.native
+        monkeypatch.setenv("BOPBOT_HEADLESS_MODE", "fast")
+        with pytest.raises(BrowserSetupError):
+            select_headless_mode()
+
+    def test_single_mode(self, host):
+        with patch("bopbot.browser.calibration.shutil.which", Mock(return_value=None)):
+            assert select_headless_mode() == HeadlessMode.native
+
+
+class TestGetDefaultBot:
+    def test_uses_selected_mode(self):
+        select = Mock(return_value=HeadlessMode.native)
+        with patch("bopbot.actions.actuators.select_headless_mode", select):
+            config = get_default_bot().driver.chrome_config
+        assert config.native_headless and not config.xvfb_headless
+
+    def test_headed_skips_selection(self):
+        select = Mock()
+        with patch("bopbot.actions.actuators.select_headless_mode", select):
+            config = get_default_bot(headless_mode=False).driver.chrome_config
+        select.assert_not_called()
+        assert not config.native_headless and not config.xvfb_headless
@@ -0,0 +1,180 @@
+import pytest
+from mock import Mock, AsyncMock, call, patch
+
+from bopbot.browser.driver import PageManager, RawDriver
+from bopbot.browser.resources import ResourceController
+from bopbot.jsinject.scripts import CLEAR_SESSION_STORAGE
+from bopbot.jsinject.fingerprints import FingerprintCatalog
+
+
+def get_page_manager(
+    user_agent="Mozilla/5.0 (Windows NT 10.0)",
+    pin_user_agent=False,
+    viewport=None,
+    sample_viewport=False,
+):
+    page = Mock(url="about:blank")
+    page._client.send = AsyncMock(return_value={"identifier": "1"})
+    page.setUserAgent = AsyncMock()
+    page.setExtraHTTPHeaders = AsyncMock()
+    page.setViewport = AsyncMock()
+    page.goto = AsyncMock()
+    page.evaluate = AsyncMock()
+    page_manager = PageManager(
+        loop=None,
+        browser=Mock(),
+        viewport=viewport or {"width": 1200, "height": 800},
+        user_agent=user_agent,
+        timeout=1000,
+        fingerprints=FingerprintCatalog(size=8, seed=1, os=("mac",)),
+        pin_user_agent=pin_user_agent,
+        sample_viewport=sample_viewport,
+    )
+    page_manager.page = page
+    return page_manager
+
+
+class TestCloakNavigator:
+    @pytest.mark.asyncio
+    async def test_profile_is_consistent(self):
+        page_manager = get_page_manager()
+        await page_manager.cloak_navigator()
+
+        navigator = page_manager.navigator_config
+        assert navigator["platform"] == "MacIntel"
+        assert "Macintosh" in navigator["userAgent"]
+        assert navigator["userAgent"].endswith(navigator["appVersion"])
+        assert page_manager.user_agent == navigator["userAgent"]
+        page_manager.page.setUserAgent.assert_awaited_once_with(navigator["userAgent"])
+        page_manager.page.setExtraHTTPHeaders.assert_awaited_once_with(
+            headers={"User-Agent": navigator["userAgent"]}
+        )
+        page_manager.page.setViewport.assert_awaited_once_with(
+            {"width": 1200, "height": 800}
+        )
+        assert page_manager.viewport == {"width": 1200, "height": 800}
+
+    @pytest.mark.asyncio
+    async def test_sampled_viewport_must_fit_the_window(self):
+        window = {"width": 4000, "height": 3000}
+        page_manager = get_page_manager(viewport=window, sample_viewport=True)
+        await page_manager.cloak_navigator()
+        assert page_manager.viewport != window
+        assert page_manager.fits_window(page_manager.viewport)
+
+        page_manager = get_page_manager(
+            viewport={"width": 100, "height": 100}, sample_viewport=True
+        )
+        await page_manager.cloak_navigator()
+        assert page_manager.viewport == {"width": 100, "height": 100}
+
+    @pytest.mark.asyncio
+    async def test_pinned_user_agent_wins(self):
+        page_manager = get_page_manager(user_agent="custom agent", pin_user_agent=True)
+        await page_manager.cloak_navigator()
+        assert page_manager.navigator_config["userAgent"] == "custom agent"
+        assert page_manager.navigator_config["platform"] == "MacIntel"
+
+
+class TestResetPage:
+    async def get_armed_page_manager(self):
+        page_manager = get_page_manager()
+        await page_manager.cloak_navigator()
+        page_manager.page._client.send.reset_mock()
+        page_manager.page._client.send.return_value = {"identifier": "2"}
+        return page_manager
+
+    def sent(self, page_manager, method):
+        return [
+            command
+            for command in page_manager.page._client.send.await_args_list
+            if command[0][0] == method
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reset_rearms_injection_and_clears_origins(self):
+        page_manager = await self.get_armed_page_manager()
+        page_manager.visited_origins.update(
+            {"https://a.test", "https://b.test:8443", None}
+        )
+        page_manager.page.url = "https://c.test/cart"
+        injection = page_manager.injection
+
+        await page_manager.reset_page()
+        page = page_manager.page
+        page.evaluate.assert_awaited_once_with(CLEAR_SESSION_STORAGE)
+        page.goto.assert_awaited_once_with("about:blank")
+        commands = [command[0][0] for command in page._client.send.await_args_list]
+        assert commands.index("Page.removeScriptToEvaluateOnNewDocument") < (
+            commands.index("Page.addScriptToEvaluateOnNewDocument")
+        )
+        assert self.sent(page_manager, "Page.removeScriptToEvaluateOnNewDocument") == [
+            call("Page.removeScriptToEvaluateOnNewDocument", {"identifier": "1"})
+        ]
+        assert self.sent(page_manager, "Page.addScriptToEvaluateOnNewDocument") == [
+            call("Page.addScriptToEvaluateOnNewDocument", {"source": injection})
+        ]
+        cleared = self.sent(page_manager, "Storage.clearDataForOrigin")
+        assert sorted(command[0][1]["origin"] for command in cleared) == [
+            "https://a.test",
+            "https://b.test:8443",
+            "https://c.test",
+        ]
+        assert page_manager.injection_id == "2"
+        assert page_manager.visited_origins == set()
+
+    @pytest.mark.asyncio
+    async def test_reset_of_blank_page(self):
+        page_manager = await self.get_armed_page_manager()
+        await page_manager.reset_page()
+        page_manager.page.evaluate.assert_not_awaited()
+        assert self.sent(page_manager, "Storage.clearDataForOrigin") == []
+
+    @pytest.mark.asyncio
+    async def test_regenerated_navigator_replaces_injection(self):
+        page_manager = await self.get_armed_page_manager()
+        injection = page_manager.injection
+        page_manager.fingerprints = FingerprintCatalog(size=8, seed=2, os=("win",))
+
+        await page_manager.reset_page(regenerate_navigator=True)
+        assert page_manager.injection != injection
+        assert page_manager.navigator_config["platform"] == "Win32"
+        assert self.sent(page_manager, "Page.addScriptToEvaluateOnNewDocument") == [
+            call(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": page_manager.injection},
+            )
+        ]
+
+
+class TestBrowserSlot:
+    async def get_driver(self, close_error=None):
+        controller = ResourceController(max_browsers=2, initial_browsers=2)
+        driver = RawDriver(chrome_config=Mock(), resource_controller=controller)
+        launcher = Mock(proc=Mock(pid=123))
+        launcher.launch_chrome = AsyncMock()
+        launcher.close_chrome = AsyncMock(side_effect=close_error)
+        with patch("bopbot.browser.chrome.ChromeLauncher", return_value=launcher):
+            driver.set_page_manager = AsyncMock()
+            await driver.get_new_browser()
+        return driver, controller
+
+    @pytest.mark.asyncio
+    async def test_closing_twice_releases_once(self):
+        driver, controller = await self.get_driver()
+        # slot of another driver
+        await controller.browsers.acquire()
+        assert controller.browsers.in_use == 2
+
+        await driver.close()
+        await driver.close()
+        assert controller.browsers.in_use == 1
+        assert controller.pids == set()
+
+    @pytest.mark.asyncio
+    async def test_slot_released_when_closing_fails(self):
+        driver, controller = await self.get_driver(close_error=OSError("gone"))
+        with pytest.raises(OSError):
+            await driver.close()
+        assert controller.browsers.in_use == 0
+        assert driver.holds_browser_slot is False
@@ -0,0 +1,104 @@
+import pytest
+from pyee import BaseEventEmitter
+
+from bopbot.browser.frames import FrameRegistry
+from bopbot.dom.elements import LabeledSelector
+
+
+class FakeFrame:
+    def __init__(self, name="", url="", parent=None):
+        self.name = name
+        self.url = url
+        self.parentFrame = parent
+        self.detached = False
+
+    def isDetached(self):
+        return self.detached
+
+
+class FakeHandle:
+    def __init__(self, frame):
+        self.frame = frame
+
+    async def contentFrame(self):
+        return self.frame
+
+    async def dispose(self):
+        pass
+
+
+class FakePage(BaseEventEmitter):
+    def __init__(self, frames):
+        super().__init__()
+        self.frames = frames
+        self.queries = []
+
+    async def querySelector(self, selector):
+        self.queries.append(selector)
+        return FakeHandle(frame=self.frames[-1])
+
+
+@pytest.fixture
+def main_frame():
+    return FakeFrame(url="https://site.test/")
+
+
+@pytest.fixture
+def ad_frame(main_frame):
+    return FakeFrame(name="ads", url="https://ads.test/banner?id=1", parent=main_frame)
+
+
+class TestFrameRegistry:
+    def test_indexes_existing_frames(self, main_frame, ad_frame):
+        registry = FrameRegistry()
+        registry.attach(FakePage(frames=[main_frame, ad_frame]))
+
+        assert registry.by_name("ads") is ad_frame
+        assert registry.by_url("https://site.test/") is main_frame
+        assert registry.by_url_pattern(r"ads\.test/banner") is ad_frame
+        assert registry.by_url_pattern("nowhere") is None
+
+    def test_follows_frame_events(self, main_frame, ad_frame):
+        registry = FrameRegistry()
+        page = FakePage(frames=[main_frame])
+        registry.attach(page)
+        assert registry.by_url_pattern("ads") is None
+
+        page.emit("frameattached", ad_frame)
+        assert registry.by_url_pattern("ads") is ad_frame
+
+        ad_frame.url = "https://ads.test/video"
+        page.emit("framenavigated", ad_frame)
+        assert registry.by_url("https://ads.test/banner?id=1") is None
+        assert registry.by_url("https://ads.test/video") is ad_frame
+
+        page.emit("framedetached", ad_frame)
+        assert registry.by_name("ads") is None
+        assert ad_frame not in registry.frames
+
+    @pytest.mark.asyncio
+    async def test_by_selector_is_cached_until_main_navigation(
+        self, main_frame, ad_frame
+    ):
+        registry = FrameRegistry()
+        page = FakePage(frames=[main_frame, ad_frame])
+        registry.attach(page)
+        iframe = LabeledSelector(label="ad_iframe", dom_hierarchy=["body", "iframe"])
+
+        assert await registry.by_selector(iframe) is ad_frame
+        assert await registry.by_selector(iframe) is ad_frame
+        assert len(page.queries) == 1
+
+        page.emit("framenavigated", main_frame)
+        assert await registry.by_selector(iframe) is ad_frame
+        assert len(page.queries) == 2
+
+    def test_attach_drops_previous_page(self, main_frame, ad_frame):
+        registry = FrameRegistry()
+        old_page = FakePage(frames=[main_frame, ad_frame])
+        registry.attach(old_page)
+        registry.attach(FakePage(frames=[main_frame]))
+
+        old_page.emit("frameattached", FakeFrame(name="late"))
+        assert registry.by_name("ads") is None
+        assert registry.by_name("late") is None
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from pyee import BaseEventEmitter
+
+from bopbot.browser.handles import ElementHandleCache
+from bopbot.dom.elements import LabeledSelector
+
+
+class FakeClient:
+    def __init__(self):
+        self.connected = True
+        self.sent = []
+
+    async def send(self, method, params):
+        self.sent.append(method)
+        return {"result": {"type": "boolean", "value": self.connected}}
+
+
+class FakeHandle:
+    def __init__(self, client):
+        self._client = client
+        self._remoteObject = {"objectId": "1"}
+        self.disposed = False
+
+    async def dispose(self):
+        self.disposed = True
+
+
+class FakeFrame:
+    def __init__(self, parent=None):
+        self.parentFrame = parent
+        self.client = FakeClient()
+        self.queries = 0
+
+    async def querySelector(self, selector):
+        self.queries += 1
+        return FakeHandle(client=self.client)
+
+
+class FakePage(BaseEventEmitter, FakeFrame):
+    def __init__(self):
+        BaseEventEmitter.__init__(self)
+        FakeFrame.__init__(self)
+
+
+@pytest.fixture
+def page():
+    return FakePage()
+
+
+@pytest.fixture
+def cache(page):
+    handle_cache = ElementHandleCache()
+    handle_cache.attach(page)
+    return handle_cache
+
+
+submit = LabeledSelector(label="submit", dom_hierarchy=["form", "button"])
+
+
+class TestElementHandleCache:
+    @pytest.mark.asyncio
+    async def test_reuses_connected_handle(self, page, cache):
+        handle = await cache.get(elem=submit)
+        assert await cache.get(elem=submit) is handle
+        assert page.queries == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_requeries_disconnected_handle(self, page, cache):
+        cache.validate = True
+        handle = await cache.get(elem=submit)
+        page.client.connected = False
+        assert await cache.get(elem=submit) is not handle
+        assert page.queries == 2
+        assert handle.disposed is True
+
+    @pytest.mark.asyncio
+    async def test_invalidate_disposes_handle(self, page, cache):
+        handle = await cache.get(elem=submit)
+        cache.invalidate(elem=submit)
+        await asyncio.sleep(0)
+        assert handle.disposed is True
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_trusts_handles_by_default(self, page, cache):
+        await cache.get(elem=submit)
+        await cache.get(elem=submit)
+        assert page.client.sent == []
+
+    @pytest.mark.asyncio
+    async def test_main_navigation_clears_cache(self, page, cache):
+        await cache.get(elem=submit)
+        page.emit("framenavigated", FakeFrame())
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_frame_detach_only_drops_frame_handles(self, page, cache):
+        child = FakeFrame(parent=page)
+        await cache.get(elem=submit)
+        await cache.get(elem=submit, frame=child)
+        assert len(cache) == 2
+
+        page.emit("framedetached", child)
+        assert len(cache) == 1
+        await cache.get(elem=submit)
+        assert page.queries == 1
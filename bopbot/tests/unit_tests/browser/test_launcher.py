@@ -1,5 +1,5 @@
 import pytest
-from mock import patch, Mock
+from mock import AsyncMock, patch, Mock
 
 from bopbot.browser.launcher import (
     SupportedOS,
@@ -7,6 +7,7 @@ from bopbot.browser.launcher import (
     BrowserWindow,
     BrowserConfig,
     ChromeLauncher,
+    LaunchProfile,
     identify_running_os,
 )
 from bopbot.browser.exceptions import BrowserSetupError
@@ -111,6 +112,39 @@ class TestBrowserConfig:
         assert "executablePath" in chrome_launch_options
         assert chrome_launch_options["defaultViewport"] == window.view_port
 
+    def test_default_profile_keeps_default_args(self):
+        config = BrowserConfig(
+            running_os=SupportedOS.linux, browser_window=BrowserWindow()
+        )
+        args = config.default_args()
+        assert config.launch_profile == LaunchProfile.default
+        assert "--disable-features=site-per-process" in args
+        assert not any(arg.startswith("--renderer-process-limit") for arg in args)
+
+    @pytest.mark.parametrize("profile", [LaunchProfile.dense, LaunchProfile.fast])
+    def test_profiles_extend_default_args(self, profile):
+        window = BrowserWindow()
+        default = BrowserConfig(running_os=SupportedOS.linux, browser_window=window)
+        config = BrowserConfig(
+            running_os=SupportedOS.linux, browser_window=window, launch_profile=profile
+        )
+        args = config.default_args()
+        assert len(args) == len(set(args))
+        assert "--disable-gpu" in args and "--no-sandbox" in args
+        # Chrome honours one --disable-features flag, profiles merge into it
+        [features] = [arg for arg in args if arg.startswith("--disable-features=")]
+        assert "site-per-process" in features.split("=")[1].split(",")
+        kept = [arg for arg in default.default_args() if arg not in args]
+        assert kept == ["--disable-features=site-per-process"]
+
+    def test_dense_profile_limits_renderers(self):
+        config = BrowserConfig(
+            running_os=SupportedOS.linux,
+            browser_window=BrowserWindow(),
+            launch_profile=LaunchProfile.dense,
+        )
+        assert "--renderer-process-limit=2" in config.chrome_launch_options()["args"]
+
     def test_detect_running_os(self):
         detected_os = identify_running_os()
         get_chrome_path_mock = Mock()
@@ -135,6 +169,35 @@ class TestChromeLauncher:
         assert "xvfb-run" in launch_cmd
         assert "--headless" not in launch_cmd
 
+    @pytest.mark.asyncio
+    async def test_close_kills_only_its_own_xvfb(self, tmp_path):
+        browser_config = BrowserConfig(
+            running_os=SupportedOS.linux,
+            browser_window=BrowserWindow(),
+            xvfb_headless=True,
+        )
+        launcher = ChromeLauncher(chrome_config=browser_config)
+        launcher.proc = Mock(pid=4242)
+        launcher.killChrome = AsyncMock()
+        own_xvfb = Mock()
+        own_xvfb.name.return_value = "Xvfb"
+        own_xvfb.cmdline.return_value = ["Xvfb", ":99", "-screen", "0", "640x480x8"]
+        chrome = Mock()
+        chrome.name.return_value = "chrome"
+        process = Mock()
+        process.return_value.children.return_value = [own_xvfb, chrome]
+        removed = []
+        with patch("bopbot.browser.chrome.psutil.Process", process), patch(
+            "bopbot.browser.chrome.os.path.exists", Mock(return_value=True)
+        ), patch("bopbot.browser.chrome.os.remove", removed.append):
+            await launcher.close_chrome()
+
+        process.assert_called_once_with(4242)
+        launcher.killChrome.assert_awaited_once()
+        own_xvfb.kill.assert_called_once_with()
+        chrome.kill.assert_not_called()
+        assert removed == ["/tmp/.X99-lock"]
+
     def test_default_loop(self):
         browser_config = BrowserConfig(browser_window=BrowserWindow())
         launcher = ChromeLauncher(chrome_config=browser_config)
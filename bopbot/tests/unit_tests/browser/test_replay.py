@@ -0,0 +1,160 @@
+import asyncio
+import zipfile
+
+import pytest
+from pyee import BaseEventEmitter
+
+from bopbot.browser.exceptions import NetworkArchiveError
+from bopbot.browser.replay import (
+    NetworkMode,
+    NetworkArchive,
+    NetworkRecorder,
+    NetworkReplayer,
+    get_network_handler,
+    request_key,
+)
+
+
+class FakeRequest:
+    def __init__(self, url, method="GET", postData=None):
+        self.url = url
+        self.method = method
+        self.postData = postData
+        self.outcome = None
+
+    async def respond(self, response):
+        self.outcome = ("respond", response)
+
+    async def continue_(self):
+        self.outcome = ("continue", None)
+
+    async def abort(self, error_code="failed"):
+        self.outcome = ("abort", error_code)
+
+
+class FakeResponse:
+    def __init__(self, request, status=200, headers=None, body=b""):
+        self.request = request
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+    async def buffer(self):
+        if self.body is None:
+            raise Exception("No resource with given identifier found")
+        return self.body
+
+
+class FakePage(BaseEventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.intercepting = False
+
+    async def setRequestInterception(self, value):
+        self.intercepting = value
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / "session.zip")
+
+
+def test_request_key():
+    assert request_key("get", "https://a.test/x#top") == "GET https://a.test/x"
+    assert request_key("POST", "https://a.test/x", "q=1") != request_key(
+        "POST", "https://a.test/x", "q=2"
+    )
+
+
+class TestNetworkArchive:
+    def test_round_trip_dedupes_bodies(self, archive_path):
+        archive = NetworkArchive(path=archive_path)
+        headers = {"content-type": "text/css", "content-encoding": "gzip"}
+        archive.add(
+            key="GET /a.css", url="/a.css", status=200, headers=headers, body=b"a{}"
+        )
+        archive.add(
+            key="GET /b.css", url="/b.css", status=200, headers=headers, body=b"a{}"
+        )
+        archive.save()
+
+        with zipfile.ZipFile(archive_path) as fl:
+            assert (
+                len([name for name in fl.namelist() if name.startswith("bodies/")]) == 1
+            )
+
+        loaded = NetworkArchive(path=archive_path).load()
+        entry = loaded.get("GET /b.css")
+        assert entry["body"] == b"a{}"
+        assert entry["headers"] == {"content-type": "text/css"}
+        assert loaded.get("GET /missing") is None
+
+    def test_first_response_wins(self, archive_path):
+        archive = NetworkArchive(path=archive_path)
+        assert archive.add(key="GET /", url="/", status=200, headers={}, body=b"1")
+        assert not archive.add(key="GET /", url="/", status=200, headers={}, body=b"2")
+        assert archive.get("GET /")["body"] == b"1"
+
+    def test_missing_archive(self, archive_path):
+        with pytest.raises(NetworkArchiveError):
+            NetworkArchive(path=archive_path).load()
+
+    def test_modes_need_archive_path(self):
+        assert get_network_handler(mode=NetworkMode.live) is None
+        with pytest.raises(NetworkArchiveError):
+            get_network_handler(mode=NetworkMode.record)
+
+
+class TestRecordReplay:
+    @pytest.mark.asyncio
+    async def test_recorded_session_replays_offline(self, archive_path):
+        page = FakePage()
+        recorder = get_network_handler(
+            mode=NetworkMode.record, archive_path=archive_path
+        )
+        assert isinstance(recorder, NetworkRecorder)
+        await recorder.attach(page)
+        document = FakeRequest(url="https://a.test/")
+        redirect = FakeRequest(url="https://a.test/old")
+        page.emit("response", FakeResponse(request=document, body=b"<html></html>"))
+        page.emit(
+            "response",
+            FakeResponse(
+                request=redirect, status=302, headers={"location": "/"}, body=None
+            ),
+        )
+        page.emit("response", FakeResponse(request=FakeRequest(url="data:,x")))
+        await recorder.flush()
+        assert len(recorder.archive) == 2
+
+        page = FakePage()
+        replayer = get_network_handler(
+            mode=NetworkMode.replay, archive_path=archive_path
+        )
+        assert isinstance(replayer, NetworkReplayer)
+        await replayer.attach(page)
+        assert page.intercepting
+
+        requests = [
+            FakeRequest(url="https://a.test/#main"),
+            FakeRequest(url="https://a.test/old"),
+            FakeRequest(url="https://a.test/tracker.js"),
+        ]
+        for request in requests:
+            page.emit("request", request)
+        await asyncio.sleep(0)
+
+        assert requests[0].outcome[1]["body"] == b"<html></html>"
+        assert requests[1].outcome[1]["status"] == 302
+        assert requests[2].outcome == ("abort", "internetdisconnected")
+        assert (replayer.hits, replayer.misses) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_replay_can_fall_back_to_network(self, archive_path):
+        NetworkArchive(path=archive_path).save()
+        replayer = NetworkReplayer(
+            archive=NetworkArchive(path=archive_path).load(), allow_network=True
+        )
+        request = FakeRequest(url="https://a.test/")
+        await replayer.fulfill(request=request)
+        assert request.outcome == ("continue", None)
@@ -0,0 +1,128 @@
+import os
+import asyncio
+
+import pytest
+
+from bopbot.browser.exceptions import ResourceBudgetError
+from bopbot.browser.resources import (
+    Budget,
+    HostSample,
+    ResourceController,
+    sample_host,
+)
+
+
+IDLE = HostSample(cpu_percent=20, memory_percent=30)
+BUSY = HostSample(cpu_percent=95, memory_percent=30)
+
+
+async def wait_for(condition, timeout=2.0):
+    # sampling runs on an executor thread, slow hosts need more than a few intervals
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+
+
+def get_controller(**kwargs):
+    options = {"max_browsers": 8, "max_tabs": 32, "initial_browsers": 2}
+    options.update(kwargs)
+    return ResourceController(**options)
+
+
+class TestBudget:
+    def test_validates_limits(self):
+        with pytest.raises(ResourceBudgetError):
+            Budget(name="browsers", initial=5, minimum=1, maximum=4)
+
+    @pytest.mark.asyncio
+    async def test_slots_wait_for_release(self):
+        budget = Budget(name="browsers", initial=1, minimum=1, maximum=2)
+        await budget.acquire()
+        waiter = asyncio.ensure_future(budget.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done() and budget.waiting == 1
+
+        await budget.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert budget.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_raising_limit_admits_waiters(self):
+        budget = Budget(name="browsers", initial=1, minimum=1, maximum=3)
+        await budget.acquire()
+        waiters = [asyncio.ensure_future(budget.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        await budget.set_limit(10)
+        await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+        assert (budget.limit, budget.in_use) == (3, 3)
+
+
+class TestResourceController:
+    @pytest.mark.asyncio
+    async def test_additive_increase_only_when_saturated(self):
+        controller = get_controller()
+        await controller.adjust(sample=IDLE)
+        assert controller.limits["browsers"] == 2
+
+        async with controller.browser_slot(), controller.browser_slot():
+            await controller.adjust(sample=IDLE)
+            # a free slot means the budget is no longer the bottleneck
+            await controller.adjust(sample=IDLE)
+        assert controller.limits["browsers"] == 3
+
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_under_pressure(self):
+        controller = get_controller(initial_browsers=8, initial_tabs=32)
+        await controller.adjust(sample=BUSY)
+        assert (controller.limits["browsers"], controller.limits["tabs"]) == (4, 16)
+        for _ in range(5):
+            await controller.adjust(sample=BUSY)
+        assert (controller.limits["browsers"], controller.limits["tabs"]) == (1, 1)
+        assert controller.limits["cpu_percent"] == 95
+
+    @pytest.mark.asyncio
+    async def test_chrome_memory_pressure(self):
+        controller = get_controller(chrome_rss_high=1000)
+        sample = HostSample(cpu_percent=10, memory_percent=10, chrome_rss=2000)
+        await controller.adjust(sample=sample)
+        assert controller.limits["browsers"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_sampling(self):
+        samples = []
+
+        def sampler(pids):
+            samples.append(pids)
+            return BUSY
+
+        controller = get_controller(sampler=sampler, interval=0.01)
+        controller.register_process(pid=123)
+        await controller.start()
+        await wait_for(lambda: controller.limits["browsers"] == 1)
+        await controller.stop()
+        assert samples[0] == [123]
+        assert controller.limits["browsers"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sampling_errors_keep_the_loop_running(self):
+        samples = []
+
+        def sampler(pids):
+            samples.append(pids)
+            if len(samples) == 1:
+                raise OSError("psutil failed")
+            return BUSY
+
+        controller = get_controller(sampler=sampler, interval=0.01)
+        await controller.start()
+        await wait_for(lambda: controller.limits["browsers"] == 1)
+        await controller.stop()
+        assert len(samples) > 1
+        assert controller.limits["browsers"] == 1
+
+
+def test_sample_host_measures_process_tree():
+    sample = sample_host(pids=[os.getpid(), 2 ** 30])
+    assert 0 <= sample.memory_percent <= 100
+    assert sample.chrome_rss > 0
@@ -0,0 +1,41 @@
+import pytest
+
+from bopbot.crawl.bloom import BloomFilter
+from bopbot.crawl.exceptions import FrontierError
+
+
+class TestBloomFilter:
+    def test_added_keys_are_members(self):
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"https://example.com/{index}" for index in range(1000)]
+        assert all(bloom.add(key) for key in keys)
+        assert all(key in bloom for key in keys)
+        assert not bloom.add(keys[0])
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate_holds_at_capacity(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for index in range(10_000):
+            bloom.add(f"https://example.com/{index}")
+        false_positives = sum(
+            f"https://other.example/{index}" in bloom for index in range(10_000)
+        )
+        assert false_positives < 200
+
+    def test_size_does_not_depend_on_keys(self):
+        bloom = BloomFilter(capacity=10_000_000, error_rate=0.001)
+        assert 17_000_000 < len(bloom.to_bytes()) < 18_500_000
+
+    def test_round_trips_through_bytes(self):
+        bloom = BloomFilter(capacity=100)
+        bloom.add("a")
+        restored = BloomFilter(capacity=100, bits=bloom.to_bytes(), count=len(bloom))
+        assert "a" in restored and "b" not in restored and len(restored) == 1
+
+    def test_validates_arguments(self):
+        with pytest.raises(FrontierError):
+            BloomFilter(capacity=0)
+        with pytest.raises(FrontierError):
+            BloomFilter(capacity=10, error_rate=1)
+        with pytest.raises(FrontierError):
+            BloomFilter(capacity=100, bits=b"\x00")
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from bopbot.crawl.exceptions import FrontierError
+from bopbot.crawl.frontier import CrawlFrontier, DedupMode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def get_frontier(**kwargs):
+    options = {"host_delay": 0.0}
+    options.update(kwargs)
+    return CrawlFrontier(**options)
+
+
+class TestAdd:
+    @pytest.mark.parametrize("dedup", [DedupMode.bloom, DedupMode.exact])
+    def test_dedups_normalized_urls(self, dedup):
+        frontier = get_frontier(dedup=dedup)
+        assert frontier.add("https://example.com/a?x=1&y=2")
+        assert not frontier.add("HTTPS://EXAMPLE.com:443/a?y=2&x=1#part")
+        assert not frontier.add("https://example.com/a?x=1&y=2&utm_source=feed")
+        assert len(frontier) == 1
+
+    def test_drops_uncrawlable_and_too_deep_urls(self):
+        frontier = get_frontier(max_depth=1)
+        assert not frontier.add("mailto:someone@example.com")
+        assert not frontier.add("https://example.com/deep", depth=2)
+        assert frontier.add("https://example.com/shallow", depth=1)
+
+    def test_add_many_resolves_against_base(self):
+        frontier = get_frontier()
+        added = frontier.add_many(
+            ["/a", "b", "/a", "#top"], base="https://example.com/dir/page"
+        )
+        assert added == 3
+        assert len(frontier) == 3
+
+
+class TestNextUrl:
+    @pytest.mark.asyncio
+    async def test_leases_by_priority_then_insertion(self):
+        frontier = get_frontier(max_per_host=10)
+        frontier.add("https://example.com/low")
+        frontier.add("https://example.com/high", priority=5)
+        frontier.add("https://example.com/low2")
+        urls = [(await frontier.next_url()).url for _ in range(3)]
+        assert urls == [
+            "https://example.com/high",
+            "https://example.com/low",
+            "https://example.com/low2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_exhausted(self):
+        frontier = get_frontier()
+        frontier.add("https://example.com/")
+        request = await frontier.next_url()
+        frontier.done(request)
+        assert frontier.exhausted
+        assert await frontier.next_url() is None
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_host(self):
+        frontier = get_frontier(max_per_host=1)
+        frontier.add_many(["https://a.test/1", "https://a.test/2", "https://b.test/1"])
+        first = await frontier.next_url()
+        second = await frontier.next_url()
+        assert {first.host, second.host} == {"a.test", "b.test"}
+
+        waiter = asyncio.ensure_future(frontier.next_url())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        frontier.done(first if first.host == "a.test" else second)
+        third = await asyncio.wait_for(waiter, timeout=1)
+        assert third.url == "https://a.test/2"
+
+    @pytest.mark.asyncio
+    async def test_waits_for_host_delay(self):
+        clock = FakeClock()
+        frontier = get_frontier(max_per_host=5, host_delay=2.0, clock=clock)
+        frontier.add_many(["https://a.test/1", "https://a.test/2"])
+        frontier.done(await frontier.next_url())
+        assert frontier.poll() is None
+        assert frontier.next_ready_in() == 2.0
+
+        clock.now += 2.0
+        assert frontier.poll().url == "https://a.test/2"
+
+    @pytest.mark.asyncio
+    async def test_times_out_while_urls_are_in_flight(self):
+        frontier = get_frontier()
+        frontier.add("https://a.test/1")
+        await frontier.next_url()
+        with pytest.raises(asyncio.TimeoutError):
+            await frontier.next_url(timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_host_policy_overrides_default(self):
+        frontier = get_frontier(max_per_host=1)
+        frontier.set_host_policy("a.test", max_active=2)
+        frontier.add_many(["https://a.test/1", "https://a.test/2"])
+        assert frontier.poll() is not None and frontier.poll() is not None
+
+    def test_validates_policy(self):
+        with pytest.raises(FrontierError):
+            get_frontier(max_per_host=0)
+
+    @pytest.mark.asyncio
+    async def test_retry_queues_the_url_again(self):
+        frontier = get_frontier()
+        frontier.add("https://a.test/1")
+        request = await frontier.next_url()
+        frontier.done(request, retry=True)
+        assert (await frontier.next_url()).url == request.url
+
+    @pytest.mark.asyncio
+    async def test_many_blocked_hosts_still_lease_eligible_ones(self):
+        frontier = get_frontier(max_per_host=1)
+        for index in range(1000):
+            frontier.add(f"https://host{index}.test/1")
+            frontier.add(f"https://host{index}.test/2")
+        leased = [frontier.poll() for _ in range(1000)]
+        assert len({request.host for request in leased}) == 1000
+        assert frontier.poll() is None
+
+
+class TestCheckpoint:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("dedup", [DedupMode.bloom, DedupMode.exact])
+    async def test_resumes_from_last_checkpoint(self, tmp_path, dedup):
+        path = str(tmp_path / "frontier.sqlite")
+        frontier = get_frontier(path=path, dedup=dedup, max_per_host=5)
+        frontier.add_many(["https://a.test/1", "https://a.test/2", "https://a.test/3"])
+        frontier.done(await frontier.next_url())
+        in_flight = await frontier.next_url()
+        frontier.checkpoint()
+        frontier.add("https://a.test/uncommitted")
+        frontier.db.close()
+
+        resumed = get_frontier(path=path, dedup=dedup, max_per_host=5)
+        assert len(resumed) == 2
+        assert not resumed.add("https://a.test/1")
+        assert resumed.add("https://a.test/uncommitted")
+        urls = {(await resumed.next_url()).url for _ in range(3)}
+        assert in_flight.url in urls
+
+    def test_checkpoints_automatically(self, tmp_path):
+        path = str(tmp_path / "frontier.sqlite")
+        frontier = get_frontier(path=path, checkpoint_every=2)
+        frontier.add_many(["https://a.test/1", "https://a.test/2", "https://a.test/3"])
+        frontier.db.close()
+
+        assert len(get_frontier(path=path)) == 2
+
+    def test_keeps_bloom_size_on_resume(self, tmp_path):
+        path = str(tmp_path / "frontier.sqlite")
+        with get_frontier(path=path, capacity=1000) as frontier:
+            frontier.add("https://a.test/1")
+
+        resumed = get_frontier(path=path, capacity=5000)
+        assert resumed.bloom.capacity == 1000
+        assert len(resumed.bloom) == 1
@@ -0,0 +1,61 @@
+import pytest
+
+from bopbot.crawl.urls import get_host, normalize_url, remove_dot_segments
+
+
+class TestNormalizeUrl:
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            ("HTTP://Example.COM", "http://example.com/"),
+            ("https://example.com:443/a", "https://example.com/a"),
+            ("http://example.com:8080/a", "http://example.com:8080/a"),
+            ("https://example.com/a/./b/../c", "https://example.com/a/c"),
+            ("https://example.com/%7euser/%2f", "https://example.com/~user/%2F"),
+            ("https://example.com/a b", "https://example.com/a%20b"),
+            ("https://example.com/?b=2&a=1#top", "https://example.com/?a=1&b=2"),
+            (
+                "https://example.com/?utm_source=x&id=3&gclid=y",
+                "https://example.com/?id=3",
+            ),
+            ("https://user:pw@Example.com/", "https://user:pw@example.com/"),
+            ("https://bücher.de/", "https://xn--bcher-kva.de/"),
+        ],
+    )
+    def test_canonical_form(self, url, expected):
+        assert normalize_url(url) == expected
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "mailto:someone@example.com",
+            "javascript:void(0)",
+            "ftp://example.com/file",
+            "https:///path",
+            "https://example.com:99999/",
+        ],
+    )
+    def test_rejects_uncrawlable_urls(self, url):
+        assert normalize_url(url) is None
+
+    def test_resolves_relative_urls(self):
+        base = "https://example.com/blog/post.html?page=2"
+        assert normalize_url("../about", base=base) == "https://example.com/about"
+        page = normalize_url("?page=3", base=base)
+        assert page == "https://example.com/blog/post.html?page=3"
+        cdn = normalize_url("//cdn.example.com/x", base=base)
+        assert cdn == "https://cdn.example.com/x"
+
+    def test_keeps_tracking_params_on_request(self):
+        url = "https://example.com/?utm_source=x"
+        assert normalize_url(url, drop_tracking=False) == url
+
+
+def test_remove_dot_segments():
+    assert remove_dot_segments("/a/b/c/./../../g") == "/a/g"
+    assert remove_dot_segments("/../a") == "/a"
+    assert remove_dot_segments("/a/b/..") == "/a/"
+
+
+def test_get_host():
+    assert get_host("https://Sub.Example.com:8443/x") == "sub.example.com"
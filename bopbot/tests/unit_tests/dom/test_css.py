@@ -0,0 +1,100 @@
+import pytest
+
+from bopbot.dom.css import parse_nth, nth_matches, parse_selector
+from bopbot.dom.exceptions import SelectorError
+from bopbot.dom.snapshot import parse_html
+
+
+DOCUMENT = """
+<html><body>
+<div id="app" class="main wide">
+  <h1 title="Welcome home">Welcome</h1>
+  <ul>
+    <li class="item first">one</li>
+    <li class="item" data-id="2">two</li>
+    <li class="item" lang="en-US">three</li>
+    <p>para</p>
+    <li class="item last" hidden>four</li>
+  </ul>
+  <input type="checkbox" checked>
+  <input type="text" disabled>
+  <span></span>
+</div>
+</body></html>
+"""
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return parse_html(DOCUMENT)
+
+
+def texts(snapshot, selector):
+    return [node.text for node in snapshot.query_selector_all(selector)]
+
+
+class TestParser:
+    @pytest.mark.parametrize(
+        "argument,expected",
+        [("odd", (2, 1)), ("even", (2, 0)), ("3", (0, 3)), ("-n+2", (-1, 2))],
+    )
+    def test_parse_nth(self, argument, expected):
+        assert parse_nth(argument) == expected
+
+    def test_nth_matches(self):
+        assert [p for p in range(1, 8) if nth_matches(2, 1, p)] == [1, 3, 5, 7]
+        assert [p for p in range(1, 8) if nth_matches(-1, 2, p)] == [1, 2]
+
+    def test_parses_right_to_left(self):
+        (selector,) = parse_selector("#app > ul li.item").selectors
+        assert [combinator for _, combinator in selector.parts] == [" ", ">", None]
+        assert selector.key.tag == "li" and selector.key.classes == ["item"]
+
+    def test_parsed_selectors_are_cached(self):
+        assert parse_selector("div > p") is parse_selector("div > p")
+
+    @pytest.mark.parametrize(
+        "selector", ["", "div >", "p::before", "a:hover", "[href", "li:nth-child(x)"]
+    )
+    def test_invalid_selectors(self, selector):
+        with pytest.raises(SelectorError):
+            parse_selector(selector)
+
+
+class TestMatching:
+    @pytest.mark.parametrize(
+        "selector,expected",
+        [
+            ("#app > ul > li", ["one", "two", "three", "four"]),
+            ("div li.first", ["one"]),
+            (".item[data-id='2']", ["two"]),
+            ("li[lang|=en]", ["three"]),
+            ("h1[title^=Wel][title$=home][title*='e h']", ["Welcome"]),
+            ("li[class~=LAST i]", ["four"]),
+            ("li:nth-child(odd)", ["one", "three", "four"]),
+            ("li:nth-of-type(odd)", ["one", "three"]),
+            ("li:first-child, li:last-child", ["one", "four"]),
+            ("li:not(.first):not([hidden])", ["two", "three"]),
+            ("li + p", ["para"]),
+            ("li.first ~ li", ["two", "three", "four"]),
+            ("ul > :only-of-type", ["para"]),
+            ("li:is(.first, .last)", ["one", "four"]),
+        ],
+    )
+    def test_selectors(self, snapshot, selector, expected):
+        assert texts(snapshot, selector) == expected
+
+    def test_state_pseudo_classes(self, snapshot):
+        assert snapshot.query_selector("input:checked").get_attribute("type") == (
+            "checkbox"
+        )
+        assert snapshot.query_selector("input:disabled").get_attribute("type") == (
+            "text"
+        )
+        assert len(snapshot.query_selector_all("span:empty")) == 1
+        assert snapshot.query_selector(":root").tag == "html"
+
+    def test_escaped_identifiers(self):
+        snapshot = parse_html("<p id='1st'>a</p><p class='a:b'>b</p>")
+        assert snapshot.query_selector("#\\31 st").text == "a"
+        assert snapshot.query_selector(".a\\:b").text == "b"
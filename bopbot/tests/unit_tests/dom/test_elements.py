@@ -4,10 +4,12 @@ from mock import Mock, patch
 from bopbot.dom.elements import (
     BaseSelector,
     LabeledSelector,
+    SelectorResolver,
     flatten_selector_hierarchy,
     create_labeled_selector,
     validate_label_name,
     add_selector_to,
+    flatten_field_map,
 )
 from bopbot.dom.exceptions import SelectorError
 
@@ -85,3 +87,97 @@ class TestAddSelectorTo:
         add_selector_to(self, label=label_name, selector_hierarchy=["a"])
 
         assert hasattr(self, label_name)
+
+
+class TestFlattenFieldMap:
+    def test_flattens_supported_field_types(self):
+        fields = {
+            "title": "h3",
+            "link": (["td", "a"], "href"),
+            "rank": (None, "@data-rank"),
+            "price": BaseSelector(dom_hierarchy=["span", "b"]),
+        }
+        assert flatten_field_map(fields=fields) == [
+            ["title", "h3", "innerText"],
+            ["link", "td > a", "href"],
+            ["rank", "", "@data-rank"],
+            ["price", "span > b", "innerText"],
+        ]
+
+    def test_rejects_empty_or_invalid_fields(self):
+        with pytest.raises(SelectorError):
+            flatten_field_map(fields={})
+        with pytest.raises(SelectorError):
+            flatten_field_map(fields={"bad name!": "a"})
+
+
+class TestSelectorAlternatives:
+    def get_selector(self):
+        return LabeledSelector(
+            label="submit",
+            dom_hierarchy=["form", "button.submit"],
+            alternatives=[["form", "button[type=submit]"], ["#submit"]],
+        )
+
+    def test_candidates_in_declared_order(self):
+        selector = self.get_selector()
+        resolver = SelectorResolver()
+        assert selector.has_alternatives is True
+        assert selector.candidates() == [
+            "form > button.submit",
+            "form > button[type=submit]",
+            "#submit",
+        ]
+        assert resolver.candidates(selector) == ([0, 1, 2], selector.candidates())
+        assert resolver.matched(selector) is None
+        assert resolver.selector(selector) is selector
+
+    def test_match_activates_and_promotes(self):
+        selector = self.get_selector()
+        resolver = SelectorResolver()
+        assert resolver.record_match(selector, 2) == 2
+        assert resolver.selector(selector).to_str() == "#submit"
+        assert resolver.selector(selector).label == "submit"
+        assert resolver.candidates(selector) == (
+            [2, 0, 1],
+            ["#submit", "form > button.submit", "form > button[type=submit]"],
+        )
+        # the shared selector itself is never changed
+        assert selector.to_str() == "form > button.submit"
+        assert selector.candidates()[0] == "form > button.submit"
+
+    def test_promotion_follows_markup_back(self):
+        selector = self.get_selector()
+        resolver = SelectorResolver()
+        for _ in range(3):
+            resolver.record_match(selector, 2)
+        for _ in range(5):
+            resolver.record_match(selector, 0)
+        assert resolver.candidates(selector)[0][0] == 0
+        assert resolver.selector(selector) is selector
+
+    def test_no_match_keeps_active_hierarchy(self):
+        selector = self.get_selector()
+        resolver = SelectorResolver()
+        resolver.record_match(selector, 1)
+        assert resolver.record_match(selector, None) is None
+        assert resolver.matched(selector) is None
+        assert resolver.selector(selector).to_str() == "form > button[type=submit]"
+
+    def test_resolvers_are_independent(self):
+        selector = self.get_selector()
+        first, second = SelectorResolver(), SelectorResolver()
+        first.record_match(selector, 2)
+        assert second.selector(selector) is selector
+        assert second.candidates(selector)[0] == [0, 1, 2]
+
+    def test_invalid_alternative(self):
+        with pytest.raises(SelectorError):
+            LabeledSelector(label="submit", dom_hierarchy=["a"], alternatives=[[]])
+
+    def test_relabeling_keeps_alternatives(self):
+        selector = create_labeled_selector(
+            label="send", selector_hierarchy=[self.get_selector()]
+        )
+        assert selector.label == "send"
+        assert selector.alternatives == [["form", "button[type=submit]"], ["#submit"]]
@@ -0,0 +1,48 @@
+from bopbot.dom.geometry import ElementGeometry, HiddenReason
+
+
+class TestElementGeometry:
+    def test_visible_result(self):
+        geometry = ElementGeometry.from_result(
+            label="submit",
+            result={
+                "exists": True,
+                "reason": None,
+                "box": [0, 10, 50, 20],
+                "viewportRatio": 0.5,
+                "point": [25, 20],
+                "coveredBy": None,
+            },
+        )
+        assert geometry.visible is True
+        assert geometry.click_point == (25, 20)
+        assert geometry.box.center == (25, 20)
+        assert geometry.describe() == "[submit] is visible"
+
+    def test_hidden_results(self):
+        missing = ElementGeometry.from_result(
+            label="submit", result={"exists": False, "reason": "missing"}
+        )
+        covered = ElementGeometry.from_result(
+            label="submit",
+            result={"exists": True, "reason": "covered", "coveredBy": "div.modal"},
+        )
+        assert missing.visible is False and missing.box is None
+        assert covered.reason is HiddenReason.covered
+        assert covered.describe() == "[submit] is not visible: covered by div.modal"
+
+    def test_hidden_element_in_viewport_has_no_click_point(self):
+        hidden = ElementGeometry.from_result(
+            label="submit",
+            result={
+                "exists": True,
+                "reason": "visibility_hidden",
+                "box": [0, 10, 50, 20],
+                "viewportRatio": 1.0,
+                "point": [25, 20],
+                "coveredBy": None,
+            },
+        )
+        assert hidden.visible is False
+        assert hidden.box.center == (25, 20)
+        assert hidden.click_point is None
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from bopbot.dom.elements import LabeledSelector
+from bopbot.dom.exceptions import SelectorError
+from bopbot.dom.pages import PageObject
+
+
+class SearchPage(PageObject):
+    form = ["#search", "form"]
+    box = [form, "input[type=text]"]
+    submit = [form, "button"]
+    timeout = 30
+
+
+class AdvancedSearchPage(SearchPage):
+    submit = ["#advanced", "button"]
+    date = LabeledSelector(label="ignored", dom_hierarchy=["#advanced", "input"])
+
+
+class TestPageObject:
+    def test_compiles_class_level_selectors(self):
+        assert list(SearchPage.selectors) == ["form", "box", "submit"]
+        assert isinstance(SearchPage.box, LabeledSelector)
+        assert SearchPage.box.label == "box"
+        assert SearchPage.box.to_str() == "#search > form > input[type=text]"
+        assert SearchPage.timeout == 30
+
+    def test_states_script_embeds_selectors(self):
+        selectors = json.loads(SearchPage.states_script.split("= ")[1].split(";")[0])
+        assert selectors == [
+            "#search > form",
+            "#search > form > input[type=text]",
+            "#search > form > button",
+        ]
+
+    def test_subclass_inherits_and_overrides(self):
+        assert list(AdvancedSearchPage.selectors) == ["form", "box", "submit", "date"]
+        assert AdvancedSearchPage.submit.to_str() == "#advanced > button"
+        assert AdvancedSearchPage.date.label == "date"
+        assert SearchPage.submit.to_str() == "#search > form > button"
+
+    def test_parse_states(self):
+        states = SearchPage.parse_states([[True, True], [True, False], [False, False]])
+        assert states["box"] == {"exists": True, "visible": False}
+        assert states["submit"]["exists"] is False
+
+    def test_invalid_selectors_fail_at_class_creation(self):
+        with pytest.raises(SelectorError, match="BrokenPage.empty"):
+
+            class BrokenPage(PageObject):
+                empty = []
+
+        with pytest.raises(SelectorError):
+            SearchPage.get_selector("missing")
+
+
+def test_page_object_keeps_selector_alternatives():
+    class CheckoutPage(PageObject):
+        pay = LabeledSelector(
+            label="pay", dom_hierarchy=["#pay"], alternatives=[["button.pay"]]
+        )
+
+    assert CheckoutPage.pay.label == "pay"
+    assert CheckoutPage.pay.candidates() == ["#pay", "button.pay"]
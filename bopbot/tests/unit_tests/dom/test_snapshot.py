@@ -0,0 +1,100 @@
+import pytest
+
+from bopbot.benchmarks.pages import large_table
+from bopbot.dom.elements import LabeledSelector
+from bopbot.dom.exceptions import SnapshotError
+from bopbot.dom.snapshot import DomSnapshot, parse_html
+
+
+# shaped like the result of evaluating jsinject.scripts.CAPTURE_SNAPSHOT on
+# <html><body><p class="x">outer</p><iframe></iframe></body></html> whose
+# iframe document is <html><body><p class="x">inner</p></body></html>
+CAPTURE = {
+    "strings": ["#text", "html", "body", "p", "class", "x", "outer", "iframe"],
+    "parents": [-1, 0, 1, 2, 1, 4, 5, 6, 7],
+    "names": [1, 2, 3, 0, 7, 1, 2, 3, 0],
+    "values": [-1, -1, -1, 6, -1, -1, -1, -1, 8],
+    "frames": [0, 0, 0, 0, 0, 1, 1, 1, 1],
+    "attrCounts": [0, 0, 1, 0, 0, 0, 0, 1, 0],
+    "attrs": [4, 5, 4, 5],
+    "frameUrls": ["https://site.test/", "https://site.test/frame"],
+}
+CAPTURE["strings"].append("inner")
+
+title = LabeledSelector(label="title", dom_hierarchy=["#results", "h1"])
+rows = LabeledSelector(label="rows", dom_hierarchy=["#data", "tbody", "tr"])
+hidden = LabeledSelector(label="hidden", dom_hierarchy=["#results", "p"])
+missing = LabeledSelector(label="missing", dom_hierarchy=["#missing"])
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return parse_html(
+        f"""
+        <div id="results">
+          <h1 data-page-id="7">  Search
+             results </h1>
+          <p style="color: red; display: none">hidden</p>
+          <script>var ignored = "<h1>";</script>
+        </div>
+        {large_table(rows=3, cols=2)}
+        """
+    )
+
+
+class TestDomSnapshot:
+    def test_subtree_ranges(self, snapshot):
+        root = snapshot.query_selector("#results")
+        assert snapshot.ends[root.index] > root.index + 1
+        assert [child.tag for child in root.children] == ["h1", "p", "script"]
+        assert root.children[0].parent == root
+
+    def test_reads_match_page_reads(self, snapshot):
+        assert snapshot.query(elem=title) == "Search results"
+        assert snapshot.query(elem=title, attr="dataset.pageId") == "7"
+        assert snapshot.query(elem=title, attr="@data-page-id") == "7"
+        assert snapshot.query(elem=missing) is None
+        assert snapshot.selector_exists(elem=hidden) is True
+        assert snapshot.selector_visible(elem=hidden) is False
+        assert snapshot.selector_visible(elem=title) is True
+        assert "ignored" not in snapshot.query_selector("script").text
+
+    def test_uncaptured_property(self, snapshot):
+        with pytest.raises(SnapshotError):
+            snapshot.query(elem=title, attr="offsetHeight")
+
+    def test_read_batch(self, snapshot):
+        values = snapshot.read_batch(
+            reads=[
+                (title, "query", None),
+                (missing, "exists", None),
+                (hidden, "visible", None),
+            ]
+        )
+        assert values == ["Search results", False, False]
+
+    def test_extract(self, snapshot):
+        extracted = snapshot.extract(
+            container=rows,
+            fields={"name": "a", "link": ("a", "href"), "value": "td.c1"},
+        )
+        assert extracted[1] == {"name": "item 1", "link": "/item/1", "value": "1-1"}
+        assert len(extracted) == 3
+
+    def test_capture_frames(self):
+        snapshot = DomSnapshot.from_capture(CAPTURE)
+        assert snapshot.frame_urls[1] == "https://site.test/frame"
+        assert [node.text for node in snapshot.query_selector_all("p.x")] == ["outer"]
+        assert snapshot.query_selector("p.x", frame=1).text == "inner"
+        # selectors do not cross into the iframe document
+        assert snapshot.query_selector("iframe p") is None
+        assert snapshot.query_selector("body", frame=1).parent.tag == "html"
+
+    def test_invalid_capture(self):
+        with pytest.raises(SnapshotError):
+            DomSnapshot.from_capture({"strings": []})
+
+    def test_memory_usage(self):
+        snapshot = parse_html(large_table(rows=1000, cols=5))
+        # strings repeat (tag names, classes), most of a node is four array ints
+        assert snapshot.memory_usage() / len(snapshot) < 100
@@ -0,0 +1,84 @@
+import pytest
+
+from bopbot.jobs.checkpoints import CheckpointStore, JobState
+from bopbot.jobs.exceptions import CheckpointError
+
+
+def get_store(tmp_path, **kwargs):
+    options = {"batch_size": 100, "flush_interval": 60}
+    options.update(kwargs)
+    return CheckpointStore(path=str(tmp_path / "jobs.sqlite"), **options)
+
+
+class TestCheckpointStore:
+    def test_records_transitions(self, tmp_path):
+        store = get_store(tmp_path)
+        record = store.start("job-1")
+        assert (record.state, record.attempts) == (JobState.running, 1)
+
+        store.save("job-1", step="login", data={"page": 2})
+        store.finish("job-1")
+        record = store.get("job-1")
+        assert (record.state, record.step, record.data) == (
+            JobState.done,
+            "login",
+            {"page": 2},
+        )
+        assert store.get("job-2") is None
+
+    def test_rejects_invalid_transitions(self, tmp_path):
+        store = get_store(tmp_path)
+        with pytest.raises(CheckpointError):
+            store.finish("job-1")
+        store.start("job-1")
+        store.finish("job-1")
+        with pytest.raises(CheckpointError):
+            store.start("job-1")
+
+    def test_buffers_writes_until_a_batch_is_full(self, tmp_path):
+        store = get_store(tmp_path, batch_size=2)
+        store.start("job-1")
+        store.save("job-1", step="a")
+        store.save("job-1", step="b")
+        assert store.db.execute("SELECT step FROM jobs").fetchone() == (None,)
+
+        store.start("job-2")
+        store.save("job-2", step="a")
+        store.save("job-1", step="c")
+        steps = store.db.execute("SELECT id, step FROM jobs ORDER BY id").fetchall()
+        assert steps == [("job-1", "c"), ("job-2", "a")]
+
+    def test_start_is_written_right_away(self, tmp_path):
+        store = get_store(tmp_path)
+        store.start("job-1")
+        assert store.db.execute("SELECT attempts FROM jobs").fetchone() == (1,)
+
+    def test_flushes_after_interval(self, tmp_path):
+        store = get_store(tmp_path, flush_interval=0)
+        store.start("job-1")
+        assert store.db.execute("SELECT COUNT(*) FROM jobs").fetchone() == (1,)
+
+    def test_reopened_store_keeps_flushed_state(self, tmp_path):
+        store = get_store(tmp_path)
+        store.start("job-1")
+        store.finish("job-1")
+        store.start("job-2")
+        store.save("job-2", step="listing", data={"page": 3})
+        store.start("job-3")
+        store.fail("job-3", error="TimeoutError()")
+        store.close()
+
+        store = get_store(tmp_path)
+        assert store.counts() == {
+            JobState.pending: 0,
+            JobState.running: 1,
+            JobState.done: 1,
+            JobState.failed: 1,
+        }
+        [in_flight] = store.in_flight()
+        assert (in_flight.job_id, in_flight.step, in_flight.data) == (
+            "job-2",
+            "listing",
+            {"page": 3},
+        )
+        assert store.start("job-2").attempts == 2
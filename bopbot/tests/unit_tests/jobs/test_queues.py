@@ -0,0 +1,125 @@
+import pytest
+
+from bopbot.jobs.exceptions import QueueError
+from bopbot.jobs.queues import SqliteQueue, WorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def get_queue(tmp_path, clock, **kwargs):
+    options = {"visibility_timeout": 30, "max_attempts": 3}
+    options.update(kwargs)
+    return SqliteQueue(path=str(tmp_path / "queue.sqlite"), clock=clock, **options)
+
+
+class TestSqliteQueue:
+    def test_leases_oldest_first_and_hides_leased(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put_many([{"job": 1}, {"job": 2}, {"job": 3}])
+        first = queue.lease(count=2)
+        assert [message.body for message in first] == [{"job": 1}, {"job": 2}]
+        assert [message.body for message in queue.lease(count=5)] == [{"job": 3}]
+        assert queue.lease() == []
+        assert queue.counts() == {"ready": 0, "leased": 3, "delayed": 0, "dead": 0}
+
+    def test_zero_visibility_timeout_leases_each_message_once(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put_many([{"job": 1}, {"job": 2}])
+        leased = queue.lease(count=5, visibility_timeout=0)
+        assert [message.body for message in leased] == [{"job": 1}, {"job": 2}]
+        assert [message.attempts for message in leased] == [1, 1]
+        assert [message.attempts for message in queue.lease(count=5)] == [2, 2]
+
+    def test_ack_removes_message(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put({"job": 1})
+        [message] = queue.lease()
+        queue.ack(message)
+        clock.now += 60
+        assert queue.lease() == []
+
+    def test_expired_lease_is_redelivered(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put({"job": 1})
+        [message] = queue.lease()
+        clock.now += 31
+        [redelivered] = queue.lease()
+        assert (redelivered.id, redelivered.attempts) == (message.id, 2)
+        with pytest.raises(QueueError):
+            queue.ack(message)
+        queue.ack(redelivered)
+
+    def test_extend_keeps_message_hidden(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put({"job": 1})
+        [message] = queue.lease()
+        clock.now += 20
+        queue.extend(message, visibility_timeout=30)
+        clock.now += 20
+        assert queue.lease() == []
+
+    def test_nack_delays_then_dead_letters(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock)
+        queue.put({"job": 1})
+        [message] = queue.lease()
+        queue.nack(message, delay=10, error="TimeoutError()")
+        assert queue.lease() == []
+        assert queue.counts()["delayed"] == 1
+
+        clock.now += 10
+        [message] = queue.lease()
+        assert message.error == "TimeoutError()"
+        queue.nack(message)
+        [message] = queue.lease()
+        queue.nack(message, error="still failing")
+        assert queue.lease() == []
+        [dead] = queue.dead_letters()
+        assert (dead.body, dead.attempts, dead.error) == (
+            {"job": 1},
+            3,
+            "still failing",
+        )
+
+        assert queue.requeue_dead() == 1
+        assert queue.lease()[0].attempts == 1
+
+    def test_lease_expired_on_last_attempt_is_dead_lettered(self, tmp_path, clock):
+        queue = get_queue(tmp_path, clock, max_attempts=1)
+        queue.put({"job": 1})
+        queue.lease()
+        clock.now += 31
+        assert queue.lease() == []
+        assert queue.dead_letters()[0].error == "lease expired"
+
+    def test_queues_sharing_a_file_are_isolated(self, tmp_path, clock):
+        crawl = get_queue(tmp_path, clock, name="crawl")
+        export = get_queue(tmp_path, clock, name="export")
+        crawl.put({"job": 1})
+        assert export.lease() == []
+        assert crawl.lease()[0].body == {"job": 1}
+
+    def test_consumers_never_share_a_lease(self, tmp_path, clock):
+        producer = get_queue(tmp_path, clock)
+        producer.put_many([{"job": index} for index in range(50)])
+        consumers = [get_queue(tmp_path, clock) for _ in range(3)]
+        leased = []
+        for _ in range(20):
+            for consumer in consumers:
+                leased += [message.id for message in consumer.lease(count=2)]
+        assert len(leased) == len(set(leased)) == 50
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+from mock import Mock, AsyncMock
+
+from bopbot.jobs.checkpoints import CheckpointStore, JobState
+from bopbot.jobs.queues import SqliteQueue
+from bopbot.jobs.runner import JobRunner
+
+
+def get_driver(crashed=False):
+    driver = Mock()
+    driver.launcher.proc.poll.return_value = 1 if crashed else None
+    driver.reset_page = AsyncMock()
+    driver.close = AsyncMock()
+    driver.get_new_browser = AsyncMock()
+    return driver
+
+
+def get_runner(tmp_path, driver=None, **kwargs):
+    store = CheckpointStore(path=str(tmp_path / "jobs.sqlite"))
+    return JobRunner(driver=driver or get_driver(), store=store, **kwargs)
+
+
+JOBS = [("job-1", "https://a.test/1"), ("job-2", "https://a.test/2")]
+
+
+class TestJobRunner:
+    @pytest.mark.asyncio
+    async def test_runs_and_checkpoints_jobs(self, tmp_path):
+        runner = get_runner(tmp_path)
+        seen = []
+
+        async def handler(driver, job):
+            seen.append(job.payload)
+            job.checkpoint("visited", url=job.payload)
+
+        summary = await runner.run(JOBS, handler=handler)
+        assert summary == {"done": 2, "failed": 0, "skipped": 0}
+        assert seen == ["https://a.test/1", "https://a.test/2"]
+        assert runner.store.get("job-2").data == {"url": "https://a.test/2"}
+        assert runner.driver.reset_page.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_restart_skips_done_and_resumes_in_flight_jobs(self, tmp_path):
+        runner = get_runner(tmp_path)
+
+        async def crash(driver, job):
+            if job.job_id == "job-2":
+                job.checkpoint("listing", page=3)
+                raise asyncio.CancelledError()
+
+        with pytest.raises(asyncio.CancelledError):
+            await runner.run(JOBS, handler=crash)
+        runner.store.close()
+
+        restarted = get_runner(tmp_path)
+        resumed = []
+
+        async def resume(driver, job):
+            resumed.append((job.job_id, job.step, job.data, job.attempt))
+
+        summary = await restarted.run(JOBS, handler=resume)
+        assert summary == {"done": 1, "failed": 0, "skipped": 1}
+        assert resumed == [("job-2", "listing", {"page": 3}, 2)]
+
+    @pytest.mark.asyncio
+    async def test_retries_failed_jobs_up_to_max_attempts(self, tmp_path):
+        runner = get_runner(tmp_path, max_attempts=2)
+        attempts = []
+
+        async def flaky(driver, job):
+            attempts.append(job.attempt)
+            raise ValueError("boom")
+
+        summary = await runner.run(JOBS[:1], handler=flaky)
+        assert summary == {"done": 0, "failed": 1, "skipped": 0}
+        assert attempts == [1, 2]
+        record = runner.store.get("job-1")
+        assert (record.state, record.error) == (JobState.failed, "ValueError('boom')")
+
+        summary = await runner.run(JOBS[:1], handler=flaky)
+        assert summary == {"done": 0, "failed": 0, "skipped": 1}
+
+    @pytest.mark.asyncio
+    async def test_restarts_crashed_browser(self, tmp_path):
+        driver = get_driver(crashed=True)
+        runner = get_runner(tmp_path, driver=driver)
+        calls = []
+
+        async def handler(driver, job):
+            calls.append(job.attempt)
+            if job.attempt == 1:
+                raise ConnectionError("browser closed")
+
+        summary = await runner.run(JOBS[:1], handler=handler)
+        assert summary["done"] == 1 and calls == [1, 2]
+        driver.close.assert_awaited_once()
+        driver.get_new_browser.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_restarts_browser_when_reset_fails(self, tmp_path):
+        driver = get_driver()
+        driver.reset_page.side_effect = [RuntimeError("target closed"), None]
+        runner = get_runner(tmp_path, driver=driver)
+
+        async def handler(driver, job):
+            if job.attempt == 1:
+                raise ValueError("page crashed")
+
+        await runner.run(JOBS[:1], handler=handler)
+        driver.get_new_browser.assert_awaited_once()
+
+
+class TestRunQueue:
+    @pytest.mark.asyncio
+    async def test_acks_done_and_nacks_failed_jobs(self, tmp_path):
+        runner = get_runner(tmp_path, max_attempts=1)
+        queue = SqliteQueue(path=str(tmp_path / "queue.sqlite"), max_attempts=1)
+        queue.put_many([{"url": "https://a.test/1"}, {"url": "https://a.test/fail"}])
+        seen = []
+
+        async def handler(driver, job):
+            seen.append(job.job_id)
+            if job.payload["url"].endswith("fail"):
+                raise ValueError("boom")
+
+        summary = await runner.run_queue(queue, handler=handler)
+        assert summary == {"done": 1, "failed": 1, "skipped": 0}
+        assert seen == ["default:1", "default:2"]
+        assert queue.counts() == {"ready": 0, "leased": 0, "delayed": 0, "dead": 1}
+        assert queue.dead_letters()[0].error == "ValueError('boom')"
+
+    @pytest.mark.asyncio
+    async def test_acks_jobs_done_before_a_crash(self, tmp_path):
+        runner = get_runner(tmp_path)
+        queue = SqliteQueue(path=str(tmp_path / "queue.sqlite"), visibility_timeout=0)
+        queue.put({"url": "https://a.test/1"})
+        [message] = queue.lease()
+        runner.store.start("default:1")
+        runner.store.finish("default:1")
+
+        summary = await runner.run_queue(queue, handler=AsyncMock())
+        assert summary == {"done": 0, "failed": 0, "skipped": 1}
+        assert sum(queue.counts().values()) == 0
+
+
+class WorkerKilled(BaseException):
+    """Stands in for the worker process dying mid job (OOM kill, Chrome crash)"""
+
+
+class TestKilledWorker:
+    @pytest.mark.asyncio
+    async def test_attempt_is_durable_before_the_handler_runs(self, tmp_path):
+        runner = get_runner(tmp_path)
+
+        async def handler(driver, job):
+            other_process = CheckpointStore(path=str(tmp_path / "jobs.sqlite"))
+            record = other_process.get(job.job_id)
+            assert (record.state, record.attempts) == (JobState.running, 1)
+
+        await runner.run(JOBS[:1], handler=handler)
+
+    @pytest.mark.asyncio
+    async def test_restarts_stop_at_max_attempts(self, tmp_path):
+        calls = []
+
+        async def kill_worker(driver, job):
+            calls.append(job.attempt)
+            raise WorkerKilled()
+
+        for _ in range(3):
+            with pytest.raises(WorkerKilled):
+                await get_runner(tmp_path, max_attempts=3).run(
+                    JOBS[:1], handler=kill_worker
+                )
+
+        for _ in range(3):
+            runner = get_runner(tmp_path, max_attempts=3)
+            summary = await runner.run(JOBS[:1], handler=kill_worker)
+            assert summary == {"done": 0, "failed": int(_ == 0), "skipped": int(_ > 0)}
+
+        assert calls == [1, 2, 3]
+        record = runner.store.get("job-1")
+        assert (record.state, record.attempts) == (JobState.failed, 3)
+        assert record.error == "interrupted on its last attempt"
+
+    @pytest.mark.asyncio
+    async def test_attempt_past_max_fails_without_running(self, tmp_path):
+        runner = get_runner(tmp_path, max_attempts=1)
+        runner.store.start("job-1")
+        runner.store.fail("job-1", error="ValueError()")
+        handler = AsyncMock()
+
+        state = await runner.run_job("job-1", payload=None, handler=handler)
+        assert state == JobState.failed
+        assert runner.store.get("job-1").attempts == 2
+        handler.assert_not_awaited()
@@ -0,0 +1,54 @@
+from bopbot.jsinject.const import CHROME_VERSIONS
+from bopbot.jsinject.navigator import get_chrome_version_table
+from bopbot.jsinject.fingerprints import (
+    PLATFORMS,
+    FingerprintCatalog,
+    get_default_catalog,
+)
+
+
+def test_chrome_version_table_is_built_once():
+    table = get_chrome_version_table()
+    assert table is get_chrome_version_table()
+    newest_version = list(CHROME_VERSIONS.values())[-1][0]
+    oldest_version = list(CHROME_VERSIONS.values())[0][0]
+    assert table.count(newest_version) > table.count(oldest_version)
+
+
+class TestFingerprintCatalog:
+    def test_profiles_are_consistent(self):
+        catalog = FingerprintCatalog(size=50, seed=7)
+        for profile in catalog.profiles:
+            navigator = profile.navigator
+            assert PLATFORMS[profile.os]["ua_os"] in navigator["userAgent"]
+            assert navigator["platform"] == PLATFORMS[profile.os]["platform"]
+            assert navigator["appVersion"] in navigator["userAgent"]
+            viewport = (profile.width, profile.height)
+            assert viewport in PLATFORMS[profile.os]["viewports"]
+
+    def test_seeded_catalogs_are_reproducible(self):
+        first = FingerprintCatalog(size=20, seed=3)
+        second = FingerprintCatalog(size=20, seed=3)
+        assert [p.as_row() for p in first.profiles] == [
+            p.as_row() for p in second.profiles
+        ]
+        assert first.sample().as_row() == second.sample().as_row()
+
+    def test_restricts_os(self):
+        catalog = FingerprintCatalog(size=20, os=("mac",))
+        assert {profile.os for profile in catalog.profiles} == {"mac"}
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        path = str(tmp_path / "fingerprints.json.gz")
+        catalog = FingerprintCatalog(size=30, seed=1)
+        catalog.save(path)
+        loaded = FingerprintCatalog.load(path, seed=1)
+
+        assert len(loaded) == 30
+        assert [p.as_row() for p in loaded.profiles] == [
+            p.as_row() for p in catalog.profiles
+        ]
+
+
+def test_default_catalog_is_shared():
+    assert get_default_catalog() is get_default_catalog()
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import pytest
+
+from bopbot.jsinject import jslibs
+
+
+def test_payloads_load_on_first_access():
+    payload = jslibs.JQUERY_3_3_1
+    assert payload.startswith("\n!function(e,t)")
+    assert "\r" in payload
+    assert jslibs.__dict__["JQUERY_3_3_1"] is payload
+    with pytest.raises(AttributeError):
+        jslibs.JQUERY_4
+
+
+@pytest.mark.parametrize(
+    "module", ["bopbot", "bopbot.browser.launcher", "bopbot.browser.driver"]
+)
+def test_entry_points_do_not_load_pyppeteer(module):
+    check = (
+        f"import sys, {module}; "
+        "assert not [name for name in sys.modules "
+        "if name.split('.')[0] in ('pyppeteer', 'psutil')]"
+    )
+    subprocess.run([sys.executable, "-c", check], check=True)
@@ -0,0 +1,140 @@
+import os
+import gzip
+
+import pytest
+
+from bopbot.results.exceptions import ResultSinkError
+from bopbot.results.sinks import (
+    Compression,
+    JsonlSink,
+    iter_records,
+    iter_results,
+    list_parts,
+    load_checkpoint,
+)
+
+
+def get_sink(directory, **kwargs):
+    options = {"flush_interval": 0.01, "fsync": False}
+    options.update(kwargs)
+    return JsonlSink(directory=str(directory), **options)
+
+
+def zstandard_installed():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TestJsonlSink:
+    @pytest.mark.parametrize("compression", [Compression.none, Compression.gzip])
+    def test_round_trips_records(self, tmp_path, compression):
+        records = [{"id": index, "title": f"née {index}"} for index in range(1000)]
+        with get_sink(tmp_path, compression=compression, batch_size=64) as sink:
+            for record in records:
+                sink.write(record)
+
+        assert list(iter_results(str(tmp_path))) == records
+        [(_, path)] = list_parts(str(tmp_path))
+        assert path.endswith(compression.suffix)
+        assert list(iter_records(path)) == records
+
+    def test_batches_many_records_into_one_file(self, tmp_path):
+        with get_sink(tmp_path) as sink:
+            for index in range(10):
+                sink.write({"id": index})
+        assert sorted(os.listdir(str(tmp_path))) == [
+            "results-00000.jsonl",
+            "results.checkpoint",
+        ]
+
+    def test_flush_checkpoints_written_records(self, tmp_path):
+        sink = get_sink(tmp_path, flush_interval=60)
+        sink.write({"id": 1}, key="https://a.test/1")
+        sink.write({"id": 2})
+        sink.flush(timeout=5)
+
+        marker = load_checkpoint(str(tmp_path))
+        assert marker["records"] == 2 and marker["key"] == "https://a.test/1"
+        sink.close()
+
+    def test_rolls_parts_by_size(self, tmp_path):
+        with get_sink(tmp_path, max_bytes=100, batch_size=5) as sink:
+            for index in range(50):
+                sink.write({"id": index, "padding": "x" * 10})
+
+        parts = list_parts(str(tmp_path))
+        assert len(parts) > 1
+        assert [record["id"] for record in iter_results(str(tmp_path))] == list(
+            range(50)
+        )
+
+    def test_rolls_parts_by_age(self, tmp_path):
+        with get_sink(tmp_path, max_seconds=0) as sink:
+            for index in range(3):
+                sink.write({"id": index})
+                sink.flush(timeout=5)
+
+        assert [index for index, _ in list_parts(str(tmp_path))] == [0, 1, 2]
+
+    @pytest.mark.parametrize("compression", [Compression.none, Compression.gzip])
+    def test_reopening_drops_records_after_the_marker(self, tmp_path, compression):
+        with get_sink(tmp_path, compression=compression) as sink:
+            sink.write({"id": 1}, key="first")
+        [(_, path)] = list_parts(str(tmp_path))
+        with open(path, "ab") as fl:
+            fl.write(
+                gzip.compress(b'{"id": 2}\n')
+                if compression.name == "gzip"
+                else b'{"id"'
+            )
+        stray = os.path.join(str(tmp_path), f"results-00001{compression.suffix}")
+        open(stray, "wb").close()
+        assert [record["id"] for record in iter_results(str(tmp_path))] == [1]
+
+        with get_sink(tmp_path, compression=compression) as sink:
+            assert sink.resume_key == "first"
+            sink.write({"id": 3}, key="third")
+
+        assert not os.path.exists(stray)
+        assert [record["id"] for record in iter_results(str(tmp_path))] == [1, 3]
+        assert load_checkpoint(str(tmp_path))["records"] == 2
+
+    def test_reopening_with_other_compression_raises(self, tmp_path):
+        with get_sink(tmp_path) as sink:
+            sink.write({"id": 1})
+        with pytest.raises(ResultSinkError):
+            get_sink(tmp_path, compression=Compression.gzip)
+
+    def test_write_errors_surface_to_the_caller(self, tmp_path):
+        sink = get_sink(tmp_path)
+        sink.write({"id": 1})
+        sink.flush(timeout=5)
+        sink.directory = str(tmp_path / "missing")
+        sink.write({"id": 2})
+        with pytest.raises(ResultSinkError):
+            sink.flush(timeout=5)
+        with pytest.raises(ResultSinkError):
+            sink.write({"id": 3})
+
+    def test_rejects_writes_after_close(self, tmp_path):
+        sink = get_sink(tmp_path)
+        sink.close()
+        with pytest.raises(ResultSinkError):
+            sink.write({"id": 1})
+
+    @pytest.mark.skipif(zstandard_installed(), reason="zstandard is installed")
+    def test_zstd_needs_zstandard(self, tmp_path):
+        with pytest.raises(ResultSinkError):
+            get_sink(tmp_path, compression=Compression.zstd)
+
+    @pytest.mark.skipif(not zstandard_installed(), reason="zstandard is not installed")
+    def test_round_trips_zstd_records(self, tmp_path):
+        with get_sink(tmp_path, compression=Compression.zstd, batch_size=3) as sink:
+            for index in range(10):
+                sink.write({"id": index})
+        assert [record["id"] for record in iter_results(str(tmp_path))] == list(
+            range(10)
+        )
@@ -0,0 +1,98 @@
+import json
+import logging
+from uuid import uuid4
+
+import pytest
+
+from bopbot.utils import (
+    BatchedRotatingFileHandler,
+    QueueJsonLog,
+    get_logger,
+    log_context,
+    stop_queue_logging,
+)
+
+
+@pytest.fixture
+def log_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    name = f"bop_{uuid4().hex}"
+    yield name
+    stop_queue_logging()
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def read_records(path):
+    with open(path, "r") as fl:
+        return [json.loads(line) for line in fl if line.strip()]
+
+
+class TestGetLogger:
+    def test_does_not_truncate_existing_log(self, log_name):
+        with open(f"{log_name}.json", "w") as fl:
+            fl.write('{"message": "previous run"}\n')
+        logger = get_logger(log_name)
+        logger.info("current run")
+        for handler in logger.handlers:
+            handler.flush()
+
+        messages = [rec["message"] for rec in read_records(f"{log_name}.json")]
+        assert messages == ["previous run", "current run"]
+
+    def test_repeated_calls_do_not_duplicate_handlers(self, log_name):
+        logger = get_logger(log_name)
+        handler_count = len(logger.handlers)
+        assert get_logger(log_name) is logger
+        assert len(logger.handlers) == handler_count
+
+    def test_non_blocking_writes_context_fields(self, log_name):
+        logger = get_logger(log_name, non_blocking=True, flush_interval=0.05)
+        with log_context(session_id="s1", page_id="p1", action="click"):
+            logger.info("clicked")
+        logger.info("idle")
+        stop_queue_logging()
+
+        clicked, idle = read_records(f"{log_name}.json")
+        assert clicked["session_id"] == "s1"
+        assert clicked["page_id"] == "p1"
+        assert clicked["action"] == "click"
+        assert idle["action"] is None
+
+
+class TestQueueJsonLog:
+    def test_logger_only_has_queue_handler(self, log_name):
+        logger = QueueJsonLog(name=log_name).build().logger
+        assert [type(h).__name__ for h in logger.handlers] == ["QueueHandler"]
+        assert log_name in QueueJsonLog.listeners
+
+
+class TestBatchedRotatingFileHandler:
+    def test_holds_records_until_batch_is_full(self, tmp_path):
+        path = str(tmp_path / "batched.json")
+        handler = BatchedRotatingFileHandler(
+            filename=path, batch_size=3, flush_interval=60
+        )
+        record = logging.makeLogRecord({"msg": "hello"})
+        handler.handle(record)
+        handler.handle(record)
+        assert not (tmp_path / "batched.json").exists()
+        handler.handle(record)
+        assert (tmp_path / "batched.json").read_text().count("hello") == 3
+        handler.close()
+
+    def test_rotates_by_size(self, tmp_path):
+        path = str(tmp_path / "rotating.json")
+        handler = BatchedRotatingFileHandler(
+            filename=path, max_bytes=64, backup_count=2, batch_size=1
+        )
+        for _ in range(10):
+            handler.handle(logging.makeLogRecord({"msg": "x" * 30}))
+        handler.close()
+
+        assert (tmp_path / "rotating.json.1").exists()
+        assert (tmp_path / "rotating.json.2").exists()
+        assert not (tmp_path / "rotating.json.3").exists()
+        assert (tmp_path / "rotating.json").stat().st_size <= 64
@@ -1,10 +1,148 @@
 import os
+import time
 import uuid
 import json
+import queue
+import atexit
 import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pythonjsonlogger import jsonlogger
 
 
+CONTEXT_FIELDS = ("session_id", "page_id", "action")
+_log_context = contextvars.ContextVar("bopbot_log_context", default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Attach structured fields (session_id, page_id, action, ...) to every
+    record logged inside the block. Context is tracked per asyncio task, so
+    concurrent bots driven by the same loop don't leak fields into each other.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps the active log_context(..) fields onto records. Runs in the caller's
+    thread so context is captured before records are handed to a queue.
+    """
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        for field, value in context.items():
+            if not hasattr(record, field):
+                setattr(record, field, value)
+
+        return True
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that buffers formatted records and writes them in
+    batches. Rollover is checked per batch instead of per record.
+    """
+
+    def __init__(
+        self, filename, max_bytes=0, backup_count=0, batch_size=64, flush_interval=1.0
+    ):
+        """
+        Parameters
+        ==========
+        filename: path of the log file, opened in append mode
+        max_bytes: rotate once the file would grow past this size (0 disables rotation)
+        backup_count: number of rotated files to keep
+        batch_size: number of records buffered before writing to disk
+        flush_interval: max seconds a record waits in the buffer
+        """
+        super().__init__(
+            filename=filename,
+            mode="a",
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            delay=True,
+        )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._batch = []
+        self._last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self._batch.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+
+        elapsed = time.monotonic() - self._last_flush
+        if len(self._batch) >= self.batch_size or elapsed >= self.flush_interval:
+            self.flush()
+
+    def _batch_overflows(self, payload_size):
+        if self.maxBytes <= 0:
+            return False
+        written = self.stream.tell()
+        return written > 0 and written + payload_size > self.maxBytes
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._batch:
+                payload = "".join(self._batch)
+                self._batch = []
+                if self.stream is None:
+                    self.stream = self._open()
+                if self._batch_overflows(payload_size=len(payload)):
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                self.stream.write(payload)
+                self.stream.flush()
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class FlushingQueueListener(QueueListener):
+    """
+    QueueListener that flushes its handlers whenever the queue stays idle for
+    flush_interval seconds, so batched records are not held back indefinitely.
+    """
+
+    def __init__(self, log_queue, *handlers, flush_interval=1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+    def stop(self):
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+
+
 class JsonLog:
     def __init__(self, name):
         self.name = name
@@ -13,18 +151,18 @@ class JsonLog:
         self.logger = logging.getLogger(self.name)
 
     def get_formatter(self):
-        default_format = " ".join(
-            ["(asctime)", "(levelname)", "(lineno)", "(funcName)", "(message)"]
-        )
+        fields = ["asctime", "levelname", "lineno", "funcName", "message"]
+        # %-style placeholders keep logging's format validation (py3.8+) happy
+        default_format = " ".join(f"%({field})s" for field in fields)
 
         return jsonlogger.JsonFormatter(default_format)
 
-    def get_file_handler(self):
-        file_path = f"{self.name}.json"
-        with open(file_path, "w"):
-            pass
+    @property
+    def file_path(self):
+        return f"{self.name}.json"
 
-        handler = logging.FileHandler(filename=file_path)
+    def get_file_handler(self):
+        handler = logging.FileHandler(filename=self.file_path)
         handler.setFormatter(fmt=self.default_formatter)
 
         return handler
@@ -34,15 +172,107 @@ class JsonLog:
 
         return handler
 
+    def get_handlers(self):
+        return [self.get_file_handler(), self.get_stream_handler()]
+
+    def build(self):
+        # loggers are process wide singletons, building twice would duplicate output
+        if self.logger.handlers:
+            return self
+
+        for handler in self.get_handlers():
+            self.logger.addHandler(hdlr=handler)
+        self.logger.addFilter(ContextFilter())
+        self.logger.setLevel(level=self.level)
+
+        return self
+
+
+class QueueJsonLog(JsonLog):
+    """
+    JsonLog variant where the caller only enqueues records. Formatting and
+    disk/stream I/O happen on a QueueListener background thread, keeping the
+    event loop that drives the browsers free of blocking writes.
+    """
+
+    listeners = {}
+
+    def __init__(
+        self,
+        name,
+        max_bytes=10 * 1024 * 1024,
+        backup_count=5,
+        batch_size=64,
+        flush_interval=1.0,
+    ):
+        """
+        Parameters
+        ==========
+        name: logger name, also used for the {name}.json log file
+        max_bytes: rotate log file once it reaches this size (0 disables rotation)
+        backup_count: number of rotated log files to keep
+        batch_size: records buffered before a write to disk
+        flush_interval: max seconds a record waits before being written
+        """
+        super().__init__(name=name)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def get_file_handler(self):
+        handler = BatchedRotatingFileHandler(
+            filename=self.file_path,
+            max_bytes=self.max_bytes,
+            backup_count=self.backup_count,
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+        )
+        handler.setFormatter(fmt=self.default_formatter)
+
+        return handler
+
     def build(self):
-        self.logger.addHandler(hdlr=self.get_file_handler())
-        self.logger.addHandler(hdlr=self.get_stream_handler())
+        if self.logger.handlers:
+            return self
+
+        log_queue = queue.SimpleQueue()
+        listener = FlushingQueueListener(
+            log_queue, *self.get_handlers(), flush_interval=self.flush_interval
+        )
+        listener.start()
+        QueueJsonLog.listeners[self.name] = listener
+
+        self.logger.addHandler(hdlr=QueueHandler(log_queue))
+        self.logger.addFilter(ContextFilter())
         self.logger.setLevel(level=self.level)
 
         return self
 
 
-def get_logger(name):
+def stop_queue_logging():
+    """
+    Drains every queue backed logger and flushes its pending batches to disk
+    """
+    while QueueJsonLog.listeners:
+        _, listener = QueueJsonLog.listeners.popitem()
+        listener.stop()
+
+
+atexit.register(stop_queue_logging)
+
+
+def get_logger(name, non_blocking=False, **log_options):
+    """
+    Parameters
+    ==========
+    name: logger name, also used for the {name}.json log file
+    non_blocking: If True, logging I/O happens on a background thread (QueueJsonLog)
+    log_options: QueueJsonLog rotation/batching options, ignored when non_blocking is False
+    """
+    if non_blocking:
+        return QueueJsonLog(name=name, **log_options).build().logger
+
     return JsonLog(name=name).build().logger
 
 
@@ -59,6 +289,10 @@ def load_json(path):
 
 
 def dump_json(data, filename: str = None):
+    """
+    Writes data to its own {filename}.json, blocking. For streams of results
+    use bopbot.results.sinks.JsonlSink, which batches them off the event loop
+    """
     if not filename:
         filename = uuid.uuid4()
 